@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+AGREGAÇÕES EM STREAMING
+Sistema de Monitoramento Distribuído
+
+Este módulo implementa estruturas de agregação de memória constante
+usadas pelas projeções do Query Model:
+- Histograma logarítmico (estilo HDR/DDSketch) para percentis p50/p95/p99
+- Rollups temporais em níveis (1s/1m/1h) com expiração automática
+
+Nenhuma estrutura guarda as amostras brutas: cada valor é contabilizado
+em um bucket e descartado.
+
+AUTOR: Prof. Jackson Antonio do Prado Lima
+"""
+
+import heapq
+import math
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Any, Tuple
+
+
+class HistogramaLogaritmico:
+    """
+    Histograma com buckets logarítmicos para percentis em streaming
+
+    RESPONSABILIDADES:
+    - Contabilizar valores em buckets de largura relativa constante
+    - Estimar percentis com erro relativo limitado (`precisao_relativa`)
+    - Manter memória limitada (`max_buckets`), colapsando os buckets
+      mais baixos quando o limite é atingido
+    - Permitir mesclar histogramas (ex.: agregação entre séries)
+
+    Os índices dos buckets também ficam em um heap mínimo, de modo que
+    cada colapso custa O(log B) em vez de ordenar todos os buckets.
+    """
+
+    def __init__(self, precisao_relativa: float = 0.01, max_buckets: int = 2048):
+        if not 0 < precisao_relativa < 1:
+            raise ValueError("Precisão relativa deve estar entre 0 e 1")
+
+        self.precisao_relativa = precisao_relativa
+        self.max_buckets = max_buckets
+        self._gamma = (1 + precisao_relativa) / (1 - precisao_relativa)
+        self._log_gamma = math.log(self._gamma)
+
+        self._buckets: Dict[int, int] = {}
+        self._heap_indices: List[int] = []  # Mesmas chaves de _buckets
+        self._contagem_zero = 0
+        self.contagem = 0
+        self.soma = 0.0
+        self.minimo = float('inf')
+        self.maximo = float('-inf')
+
+    def _indice(self, valor: float) -> int:
+        return math.ceil(math.log(valor) / self._log_gamma)
+
+    def _valor_do_bucket(self, indice: int) -> float:
+        # Ponto do bucket com erro relativo mínimo
+        return 2 * self._gamma ** indice / (self._gamma + 1)
+
+    def registrar(self, valor: float, ocorrencias: int = 1) -> None:
+        """Contabiliza um valor (não negativo) no histograma"""
+        if valor < 0:
+            raise ValueError("Histograma aceita apenas valores não negativos")
+
+        self.contagem += ocorrencias
+        self.soma += valor * ocorrencias
+        self.minimo = min(self.minimo, valor)
+        self.maximo = max(self.maximo, valor)
+
+        if valor == 0:
+            self._contagem_zero += ocorrencias
+            return
+
+        self._somar_bucket(self._indice(valor), ocorrencias)
+
+        if len(self._buckets) > self.max_buckets:
+            self._colapsar()
+
+    def _somar_bucket(self, indice: int, ocorrencias: int) -> None:
+        atual = self._buckets.get(indice)
+        if atual is None:
+            heapq.heappush(self._heap_indices, indice)
+            self._buckets[indice] = ocorrencias
+        else:
+            self._buckets[indice] = atual + ocorrencias
+
+    def _colapsar(self) -> None:
+        """Funde os dois buckets mais baixos para respeitar max_buckets"""
+        menor = heapq.heappop(self._heap_indices)
+        self._buckets[self._heap_indices[0]] += self._buckets.pop(menor)
+
+    def mesclar(self, outro: 'HistogramaLogaritmico') -> None:
+        """Soma as contagens de outro histograma com a mesma precisão"""
+        if outro.precisao_relativa != self.precisao_relativa:
+            raise ValueError("Histogramas com precisões diferentes")
+
+        for indice, ocorrencias in outro._buckets.items():
+            self._somar_bucket(indice, ocorrencias)
+        self._contagem_zero += outro._contagem_zero
+        self.contagem += outro.contagem
+        self.soma += outro.soma
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+
+        while len(self._buckets) > self.max_buckets:
+            self._colapsar()
+
+    @property
+    def media(self) -> float:
+        return self.soma / self.contagem if self.contagem else 0.0
+
+    def percentil(self, percentil: float) -> Optional[float]:
+        """Estima o valor do percentil informado (0-100)"""
+        return self.percentis([percentil])[0]
+
+    def percentis(self, percentis: Iterable[float]) -> List[Optional[float]]:
+        """Estima vários percentis com uma única passada pelos buckets"""
+        percentis = list(percentis)
+        if not self.contagem:
+            return [None] * len(percentis)
+
+        # Ranks alvo em ordem crescente, lembrando a posição original
+        alvos = sorted(
+            (p / 100 * (self.contagem - 1), posicao)
+            for posicao, p in enumerate(percentis)
+        )
+        resultados: List[Optional[float]] = [None] * len(percentis)
+
+        acumulado = self._contagem_zero
+        proximo = 0
+        while proximo < len(alvos) and alvos[proximo][0] < acumulado:
+            resultados[alvos[proximo][1]] = 0.0
+            proximo += 1
+
+        for indice in sorted(self._buckets):
+            acumulado += self._buckets[indice]
+            while proximo < len(alvos) and alvos[proximo][0] < acumulado:
+                valor = self._valor_do_bucket(indice)
+                resultados[alvos[proximo][1]] = min(max(valor, self.minimo), self.maximo)
+                proximo += 1
+
+        for _, posicao in alvos[proximo:]:
+            resultados[posicao] = self.maximo
+
+        return resultados
+
+    def resumo(self) -> Dict[str, Any]:
+        """Resumo com contagem, extremos, média e p50/p95/p99"""
+        p50, p95, p99 = self.percentis([50, 95, 99])
+        return {
+            'count': self.contagem,
+            'min': self.minimo if self.contagem else None,
+            'max': self.maximo if self.contagem else None,
+            'media': self.media,
+            'p50': p50,
+            'p95': p95,
+            'p99': p99
+        }
+
+    def para_dict(self) -> Dict[str, Any]:
+        """Exporta o histograma como estruturas primitivas"""
+        return {
+            'precisao_relativa': self.precisao_relativa,
+            'max_buckets': self.max_buckets,
+            'buckets': [[indice, ocorrencias] for indice, ocorrencias in self._buckets.items()],
+            'contagem_zero': self._contagem_zero,
+            'contagem': self.contagem,
+            'soma': self.soma,
+            'minimo': self.minimo,
+            'maximo': self.maximo
+        }
+
+    @classmethod
+    def de_dict(cls, dados: Dict[str, Any]) -> 'HistogramaLogaritmico':
+        """Reconstrói um histograma exportado por `para_dict`"""
+        histograma = cls(dados['precisao_relativa'], dados['max_buckets'])
+        histograma._buckets = {int(indice): ocorrencias
+                               for indice, ocorrencias in dados['buckets']}
+        histograma._heap_indices = list(histograma._buckets)
+        heapq.heapify(histograma._heap_indices)
+        histograma._contagem_zero = dados['contagem_zero']
+        histograma.contagem = dados['contagem']
+        histograma.soma = dados['soma']
+        histograma.minimo = dados['minimo']
+        histograma.maximo = dados['maximo']
+        return histograma
+
+
+class NivelRollup:
+    """
+    Um nível de downsampling: buckets de largura fixa com retenção limitada
+
+    Cada bucket guarda [count, soma, min, max]. Os buckets ficam em um
+    dicionário indexado pelo início (epoch em segundos) e em uma fila na
+    ordem de criação, usada para expirar os mais antigos.
+
+    A retenção é medida a partir do bucket mais recente, que avança tanto
+    com as amostras quanto com `avancar(agora)`, chamado pelo
+    `RollupMetricas` com o relógio de parede.
+    """
+
+    def __init__(self, largura_segundos: int, retencao_segundos: int):
+        self.largura_segundos = largura_segundos
+        self.retencao_segundos = retencao_segundos
+        self.capacidade = retencao_segundos // largura_segundos
+        self._buckets: Dict[int, List[float]] = {}
+        self._ordem: Deque[int] = deque()
+        self._inicio_mais_recente = 0
+
+    def registrar(self, epoch_segundos: float, valor: float) -> None:
+        """Agrega o valor no bucket correspondente ao instante"""
+        inicio = int(epoch_segundos) // self.largura_segundos * self.largura_segundos
+        if inicio <= self._inicio_mais_recente - self.retencao_segundos:
+            return  # Amostra mais antiga que a retenção do nível
+
+        bucket = self._buckets.get(inicio)
+        if bucket is None:
+            self._buckets[inicio] = [1, valor, valor, valor]
+            self._ordem.append(inicio)
+            if inicio > self._inicio_mais_recente:
+                self._inicio_mais_recente = inicio
+            self._expirar()
+        else:
+            bucket[0] += 1
+            bucket[1] += valor
+            if valor < bucket[2]:
+                bucket[2] = valor
+            if valor > bucket[3]:
+                bucket[3] = valor
+
+    def avancar(self, epoch_agora: float) -> None:
+        """Expira os buckets que saíram da retenção até o instante atual"""
+        inicio = int(epoch_agora) // self.largura_segundos * self.largura_segundos
+        if inicio > self._inicio_mais_recente:
+            self._inicio_mais_recente = inicio
+            self._expirar()
+
+    @property
+    def vazio(self) -> bool:
+        return not self._buckets
+
+    def _expirar(self) -> None:
+        """Remove buckets fora da retenção ou além da capacidade"""
+        limite = self._inicio_mais_recente - self.retencao_segundos
+        while self._ordem and (self._ordem[0] <= limite
+                               or len(self._buckets) > self.capacidade):
+            self._buckets.pop(self._ordem.popleft(), None)
+
+    def cobre(self, epoch_segundos: float) -> bool:
+        """Indica se o instante ainda está dentro da retenção do nível"""
+        return epoch_segundos > self._inicio_mais_recente - self.retencao_segundos
+
+    def buckets(self, desde: float, ate: float) -> List[Tuple[int, List[float]]]:
+        """Buckets existentes entre desde e ate (epoch), em ordem temporal"""
+        largura = self.largura_segundos
+        inicio = int(desde) // largura * largura
+        resultado = []
+        for chave in range(inicio, int(ate) + 1, largura):
+            bucket = self._buckets.get(chave)
+            if bucket is not None:
+                resultado.append((chave, bucket))
+        return resultado
+
+    def para_dict(self) -> Dict[str, Any]:
+        return {
+            'largura_segundos': self.largura_segundos,
+            'retencao_segundos': self.retencao_segundos,
+            'buckets': [[inicio] + self._buckets[inicio] for inicio in self._ordem]
+        }
+
+    @classmethod
+    def de_dict(cls, dados: Dict[str, Any]) -> 'NivelRollup':
+        nivel = cls(dados['largura_segundos'], dados['retencao_segundos'])
+        nivel._buckets = {linha[0]: linha[1:] for linha in dados['buckets']}
+        nivel._ordem.extend(nivel._buckets)
+        nivel._inicio_mais_recente = max(nivel._ordem, default=0)
+        return nivel
+
+
+class RollupMetricas:
+    """
+    Motor de downsampling em níveis para séries de métricas
+
+    RESPONSABILIDADES:
+    - Manter buckets pré-agregados por série (métrica + origem + tags)
+      em vários níveis: 1s por 1h, 1min por 1 dia e 1h por 30 dias
+    - Responder consultas por período lendo apenas os buckets do nível
+      mais fino que ainda cobre o início do período
+    - Expirar buckets antigos automaticamente (memória limitada)
+    - Descartar séries que ficaram sem buckets
+
+    A expiração segue o mais recente entre o último bucket de cada nível
+    e o relógio de parede (`relogio`, epoch em segundos). Ela é aplicada
+    na série escrita ou consultada e, no máximo uma vez por largura do
+    nível mais fino, em todas as séries: uma série que parou de receber
+    amostras expira mesmo que ninguém volte a escrevê-la.
+    """
+
+    NIVEIS_PADRAO = ((1, 3600), (60, 86400), (3600, 30 * 86400))
+
+    def __init__(self, niveis: Tuple[Tuple[int, int], ...] = NIVEIS_PADRAO,
+                 relogio: Callable[[], float] = time.time):
+        self.niveis = tuple(sorted(niveis))
+        self.relogio = relogio
+        self._series: Dict[Tuple, List[NivelRollup]] = {}
+        self._proxima_varredura = 0.0
+        self.series_descartadas = 0
+
+    @staticmethod
+    def chave_serie(nome_metrica: str, origem: Optional[str] = None,
+                    tags: Optional[Dict[str, str]] = None) -> Tuple:
+        return (nome_metrica, origem, tuple(sorted((tags or {}).items())))
+
+    def _niveis_da_serie(self, chave: Tuple) -> List[NivelRollup]:
+        niveis = self._series.get(chave)
+        if niveis is None:
+            niveis = self._series[chave] = [
+                NivelRollup(largura, retencao) for largura, retencao in self.niveis
+            ]
+        return niveis
+
+    def expirar(self) -> None:
+        """Aplica a retenção pelo relógio de parede e remove séries vazias"""
+        agora = self.relogio()
+        self._proxima_varredura = agora + self.niveis[0][0]
+        vazias = []
+        for chave, niveis in self._series.items():
+            for nivel in niveis:
+                nivel.avancar(agora)
+            if all(nivel.vazio for nivel in niveis):
+                vazias.append(chave)
+        for chave in vazias:
+            del self._series[chave]
+        self.series_descartadas += len(vazias)
+
+    def _expirar_se_devido(self) -> float:
+        agora = self.relogio()
+        if agora >= self._proxima_varredura:
+            self.expirar()
+        return agora
+
+    def registrar(self, nome_metrica: str, origem: str, tags: Dict[str, str],
+                  timestamp: datetime, valor: float) -> None:
+        """Agrega a amostra na série específica e na série global da métrica"""
+        agora = self._expirar_se_devido()
+        epoch = timestamp.timestamp()
+        for chave in (self.chave_serie(nome_metrica, origem, tags),
+                      self.chave_serie(nome_metrica)):
+            niveis = self._niveis_da_serie(chave)
+            for nivel in niveis:
+                nivel.avancar(agora)
+                nivel.registrar(epoch, valor)
+            if all(nivel.vazio for nivel in niveis):
+                # Amostra anterior à retenção de todos os níveis
+                del self._series[chave]
+
+    def consultar(self, nome_metrica: str, desde: datetime,
+                  ate: Optional[datetime] = None, origem: Optional[str] = None,
+                  tags: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+        """
+        Série temporal de buckets entre desde e ate
+
+        Sem `origem`, consulta a série global da métrica. A resolução é a
+        do nível mais fino cuja retenção ainda cobre `desde`.
+        """
+        agora = self._expirar_se_devido()
+        niveis = self._series.get(self.chave_serie(nome_metrica, origem, tags))
+        if not niveis:
+            return []
+        for nivel in niveis:
+            nivel.avancar(agora)
+
+        epoch_desde = desde.timestamp()
+        epoch_ate = ate.timestamp() if ate else float(
+            max(nivel._inicio_mais_recente for nivel in niveis)
+        )
+        nivel = next((n for n in niveis if n.cobre(epoch_desde)), niveis[-1])
+
+        return [
+            {
+                'inicio': datetime.fromtimestamp(inicio),
+                'resolucao_segundos': nivel.largura_segundos,
+                'count': int(count),
+                'soma': soma,
+                'min': minimo,
+                'max': maximo,
+                'media': soma / count
+            }
+            for inicio, (count, soma, minimo, maximo) in nivel.buckets(epoch_desde, epoch_ate)
+        ]
+
+    def agregar(self, nome_metrica: str, desde: datetime,
+                ate: Optional[datetime] = None, origem: Optional[str] = None,
+                tags: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
+        """Resumo (count/min/max/media) de uma série em um período"""
+        buckets = self.consultar(nome_metrica, desde, ate, origem, tags)
+        if not buckets:
+            return None
+
+        count = sum(b['count'] for b in buckets)
+        soma = sum(b['soma'] for b in buckets)
+        return {
+            'count': count,
+            'min': min(b['min'] for b in buckets),
+            'max': max(b['max'] for b in buckets),
+            'media': soma / count,
+            'buckets_lidos': len(buckets),
+            'resolucao_segundos': buckets[0]['resolucao_segundos']
+        }
+
+    def para_dict(self) -> Dict[str, Any]:
+        self.expirar()
+        return {
+            'niveis': [list(nivel) for nivel in self.niveis],
+            'series': [
+                {
+                    'nome': nome,
+                    'origem': origem,
+                    'tags': dict(tags),
+                    'niveis': [nivel.para_dict() for nivel in niveis]
+                }
+                for (nome, origem, tags), niveis in self._series.items()
+            ]
+        }
+
+    @classmethod
+    def de_dict(cls, dados: Dict[str, Any]) -> 'RollupMetricas':
+        rollup = cls(tuple(tuple(nivel) for nivel in dados['niveis']))
+        for serie in dados['series']:
+            chave = cls.chave_serie(serie['nome'], serie['origem'], serie['tags'])
+            rollup._series[chave] = [NivelRollup.de_dict(n) for n in serie['niveis']]
+        return rollup
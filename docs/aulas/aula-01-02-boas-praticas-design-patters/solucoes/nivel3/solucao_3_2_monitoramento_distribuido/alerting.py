@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""
+REGRAS DE ALERTA DECLARATIVAS
+Sistema de Monitoramento Distribuído
+
+Regras escritas como expressões e avaliadas incrementalmente sobre o
+fluxo de METRICA_COLETADA, em vez de handlers escritos à mão:
+
+    avg(response_time_ms) over 1m > 2000 for 3 windows
+    max(cpu_usage) over 30s >= 90
+    count(error_rate) over 5m < 1 for 2 windows
+
+GRAMÁTICA:
+    <agregação>(<métrica>) over <janela> <operador> <limite> [for <N> windows]
+
+    agregação: avg | sum | min | max | count | last
+    janela:    número + ms | s | m | h (janelas fixas, alinhadas à época)
+    operador:  > | >= | < | <= | == | !=
+
+COMPILAÇÃO:
+Regras com a mesma métrica e a mesma janela compartilham um acumulador
+por série (origem do evento): soma, contagem, mínimo, máximo e último
+valor da janela corrente. Um evento atualiza um acumulador por janela
+distinta da métrica, independente do número de regras. Quando a janela
+da série fecha (chega um evento da janela seguinte), cada regra do grupo
+compara o valor agregado com o limite e atualiza seu contador de janelas
+consecutivas. Estado por regra e série: contador + flag de disparo (O(1)).
+
+DEDUPLICAÇÃO:
+Um ALERTA_GERADO é emitido quando a condição completa N janelas
+consecutivas; enquanto continuar verdadeira, nada mais é emitido. A
+primeira janela falsa (ou uma janela sem dados) rearma a regra.
+
+AUSÊNCIA DE DADOS:
+Janelas sem eventos só têm valor para `count` (zero): regras como
+`count(error_rate) over 5m < 1` detectam uma série que parou de
+reportar, desde que `fechar_janelas(instante)` seja chamado
+periodicamente. Uma série sem eventos há mais janelas do que a maior
+sequência exigida pelas regras do grupo é então descartada.
+
+AUTOR: Prof. Jackson Antonio do Prado Lima
+"""
+
+import math
+import operator
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Any, Callable, Tuple, Union
+
+from instrumentation import RegistroMetricas
+from patterns import EventBus, EventoSistema, EventStore, SeveridadeAlerta, TipoEvento
+
+
+_GRAMATICA = re.compile(
+    r"^\s*(?P<agregacao>avg|sum|min|max|count|last)\s*\(\s*(?P<metrica>[\w.\-]+)\s*\)"
+    r"\s+over\s+(?P<janela>\d+(?:\.\d+)?)\s*(?P<unidade>ms|s|m|h)"
+    r"\s*(?P<operador>>=|<=|==|!=|>|<)\s*(?P<limite>-?\d+(?:\.\d+)?)"
+    r"(?:\s+for\s+(?P<janelas>\d+)\s+windows?)?\s*$",
+    re.IGNORECASE
+)
+
+_SEGUNDOS_POR_UNIDADE = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+_OPERADORES: Dict[str, Callable[[float, float], bool]] = {
+    '>': operator.gt, '>=': operator.ge, '<': operator.lt,
+    '<=': operator.le, '==': operator.eq, '!=': operator.ne
+}
+
+
+@dataclass(frozen=True)
+class RegraAlerta:
+    """Regra de alerta compilada a partir de uma expressão"""
+    nome: str
+    expressao: str
+    agregacao: str
+    metrica: str
+    janela_segundos: float
+    operador: str
+    limite: float
+    janelas: int = 1
+    severidade: SeveridadeAlerta = SeveridadeAlerta.WARNING
+
+
+def compilar_regra(expressao: str, nome: Optional[str] = None,
+                   severidade: SeveridadeAlerta = SeveridadeAlerta.WARNING) -> RegraAlerta:
+    """Compila uma expressão de regra; lança ValueError se inválida"""
+    correspondencia = _GRAMATICA.match(expressao)
+    if correspondencia is None:
+        raise ValueError(f"Regra de alerta inválida: {expressao!r}")
+
+    partes = correspondencia.groupdict()
+    janela_segundos = float(partes['janela']) * _SEGUNDOS_POR_UNIDADE[partes['unidade'].lower()]
+    janelas = int(partes['janelas'] or 1)
+    if janela_segundos <= 0 or janelas < 1:
+        raise ValueError(f"Janela da regra precisa ser positiva: {expressao!r}")
+
+    expressao_normalizada = " ".join(expressao.split())
+    return RegraAlerta(
+        nome=nome or expressao_normalizada,
+        expressao=expressao_normalizada,
+        agregacao=partes['agregacao'].lower(),
+        metrica=partes['metrica'],
+        janela_segundos=janela_segundos,
+        operador=partes['operador'],
+        limite=float(partes['limite']),
+        janelas=janelas,
+        severidade=severidade
+    )
+
+
+# =============================================================================
+# AVALIAÇÃO INCREMENTAL
+# =============================================================================
+
+class _SerieJanela:
+    """Janela corrente de uma série e estado das regras do grupo"""
+
+    __slots__ = ('indice', 'soma', 'contagem', 'minimo', 'maximo', 'ultimo',
+                 'consecutivas', 'ativas', 'indice_dados')
+
+    def __init__(self, indice: int, regras: int):
+        self.indice = indice
+        self.indice_dados = indice  # Última janela que recebeu eventos
+        self.soma = 0.0
+        self.contagem = 0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+        self.ultimo = 0.0
+        self.consecutivas = [0] * regras
+        self.ativas = bytearray(regras)
+
+    def reiniciar(self, indice: int) -> None:
+        self.indice = indice
+        self.soma = 0.0
+        self.contagem = 0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+
+
+class _GrupoJanela:
+    """Regras de uma métrica que compartilham o mesmo tamanho de janela"""
+
+    __slots__ = ('janela_segundos', 'regras', 'comparadores', 'series')
+
+    def __init__(self, janela_segundos: float):
+        self.janela_segundos = janela_segundos
+        self.regras: List[RegraAlerta] = []
+        self.comparadores: List[Callable[[float, float], bool]] = []
+        self.series: Dict[str, _SerieJanela] = {}
+
+
+class MotorRegrasAlerta:
+    """
+    Avaliador incremental de regras de alerta alimentado pelo EventBus
+
+    RESPONSABILIDADES:
+    - Compilar expressões em regras e agrupá-las por métrica e janela
+    - Acumular os eventos METRICA_COLETADA por série (origem) e janela
+    - Avaliar as regras do grupo quando a janela de uma série fecha
+    - Emitir ALERTA_GERADO deduplicado no EventStore e no EventBus
+
+    O tempo vem do timestamp dos eventos, não do relógio do processo:
+    a avaliação é determinística e funciona com eventos reprocessados.
+    Eventos de uma janela já fechada (atrasados) são descartados e
+    contados em `eventos_atrasados`. `fechar_janelas(instante)` fecha as
+    janelas de séries que pararam de receber eventos.
+    """
+
+    def __init__(self, event_store: Optional[EventStore] = None,
+                 event_bus: Optional[EventBus] = None):
+        self.event_store = event_store
+        self.event_bus = event_bus
+        self._grupos_por_metrica: Dict[str, List[_GrupoJanela]] = {}
+        self._regras: Dict[str, RegraAlerta] = {}
+        self._lock = threading.Lock()
+        self._inscricao: Optional[str] = None
+
+        # Métricas
+        self._instrumentacao = RegistroMetricas("regras-alerta")
+        self._eventos_avaliados = self._instrumentacao.contador('eventos_avaliados')
+        self._eventos_atrasados = self._instrumentacao.contador('eventos_atrasados')
+        self._janelas_fechadas = self._instrumentacao.contador('janelas_fechadas')
+        self._alertas_emitidos = self._instrumentacao.contador('alertas_emitidos')
+        self._alertas_suprimidos = self._instrumentacao.contador('alertas_suprimidos')
+        self._series_descartadas = self._instrumentacao.contador('series_descartadas')
+        self._latencia_avaliacao = self._instrumentacao.histograma('latencia_avaliacao')
+
+    # ------------------------------------------------------------------
+    # Regras
+    # ------------------------------------------------------------------
+
+    def adicionar_regra(self, regra: Union[str, RegraAlerta], nome: Optional[str] = None,
+                        severidade: SeveridadeAlerta = SeveridadeAlerta.WARNING) -> RegraAlerta:
+        """Adiciona uma regra (expressão ou RegraAlerta já compilada)"""
+        if isinstance(regra, str):
+            regra = compilar_regra(regra, nome, severidade)
+
+        with self._lock:
+            if regra.nome in self._regras:
+                raise ValueError(f"Regra '{regra.nome}' já registrada")
+            self._regras[regra.nome] = regra
+
+            grupos = self._grupos_por_metrica.setdefault(regra.metrica, [])
+            grupo = next((g for g in grupos if g.janela_segundos == regra.janela_segundos), None)
+            if grupo is None:
+                grupo = _GrupoJanela(regra.janela_segundos)
+                grupos.append(grupo)
+
+            grupo.regras.append(regra)
+            grupo.comparadores.append(_OPERADORES[regra.operador])
+            for serie in grupo.series.values():
+                serie.consecutivas.append(0)
+                serie.ativas.append(0)
+        return regra
+
+    def remover_regra(self, nome: str) -> bool:
+        """Remove uma regra e seu estado em todas as séries"""
+        with self._lock:
+            regra = self._regras.pop(nome, None)
+            if regra is None:
+                return False
+
+            grupos = self._grupos_por_metrica[regra.metrica]
+            grupo = next(g for g in grupos if g.janela_segundos == regra.janela_segundos)
+            posicao = grupo.regras.index(regra)
+            del grupo.regras[posicao]
+            del grupo.comparadores[posicao]
+            for serie in grupo.series.values():
+                del serie.consecutivas[posicao]
+                del serie.ativas[posicao]
+
+            if not grupo.regras:
+                grupos.remove(grupo)
+                if not grupos:
+                    del self._grupos_por_metrica[regra.metrica]
+            return True
+
+    def obter_regras(self) -> List[RegraAlerta]:
+        with self._lock:
+            return list(self._regras.values())
+
+    # ------------------------------------------------------------------
+    # Integração com o EventBus
+    # ------------------------------------------------------------------
+
+    def conectar(self, event_bus: Optional[EventBus] = None, max_lote: int = 100,
+                 max_espera_ms: float = 50) -> str:
+        """Inscreve o motor em METRICA_COLETADA (entrega em lote)"""
+        if event_bus is not None:
+            self.event_bus = event_bus
+        if self.event_bus is None:
+            raise ValueError("Nenhum EventBus para conectar")
+        self._inscricao = self.event_bus.subscrever_lote(
+            TipoEvento.METRICA_COLETADA.value, self.processar_lote,
+            max_lote=max_lote, max_espera_ms=max_espera_ms
+        )
+        return self._inscricao
+
+    def desconectar(self) -> bool:
+        if self._inscricao is None or self.event_bus is None:
+            return False
+        removida = self.event_bus.desinscrever(self._inscricao)
+        self._inscricao = None
+        return removida
+
+    # ------------------------------------------------------------------
+    # Avaliação
+    # ------------------------------------------------------------------
+
+    def processar_evento(self, evento: EventoSistema) -> List[EventoSistema]:
+        """Avalia um evento; retorna os alertas emitidos"""
+        return self.processar_lote([evento])
+
+    def processar_lote(self, eventos: List[EventoSistema]) -> List[EventoSistema]:
+        """Avalia um lote de eventos; retorna os alertas emitidos"""
+        inicio = time.perf_counter_ns()
+        disparos: List[Tuple[RegraAlerta, str, float, int]] = []
+        grupos_por_metrica = self._grupos_por_metrica
+
+        with self._lock:
+            for evento in eventos:
+                if evento.tipo != TipoEvento.METRICA_COLETADA:
+                    continue
+                dados = evento.dados
+                grupos = grupos_por_metrica.get(dados.get('nome'))
+                valor = dados.get('valor')
+                if not grupos or not isinstance(valor, (int, float)):
+                    continue
+
+                instante = evento.timestamp.timestamp()
+                for grupo in grupos:
+                    self._acumular(grupo, evento.origem, instante, valor, disparos)
+                self._eventos_avaliados.incrementar()
+
+        self._latencia_avaliacao.registrar_ns(time.perf_counter_ns() - inicio)
+        return self._emitir(disparos)
+
+    def _acumular(self, grupo: _GrupoJanela, origem: str, instante: float,
+                  valor: float, disparos: List) -> None:
+        """Soma o valor à janela corrente da série, fechando a anterior (lock adquirido)"""
+        indice = int(instante // grupo.janela_segundos)
+        serie = grupo.series.get(origem)
+        if serie is None:
+            serie = grupo.series[origem] = _SerieJanela(indice, len(grupo.regras))
+        elif indice != serie.indice:
+            if indice < serie.indice:
+                self._eventos_atrasados.incrementar()
+                return
+            self._fechar_janela(grupo, origem, serie, indice, disparos)
+
+        serie.soma += valor
+        serie.contagem += 1
+        serie.indice_dados = indice
+        if valor < serie.minimo:
+            serie.minimo = valor
+        if valor > serie.maximo:
+            serie.maximo = valor
+        serie.ultimo = valor
+
+    def _fechar_janela(self, grupo: _GrupoJanela, origem: str, serie: _SerieJanela,
+                       novo_indice: int, disparos: List) -> None:
+        """Avalia as regras do grupo na janela que fechou (lock adquirido)"""
+        self._janelas_fechadas.incrementar()
+        valores = {
+            'avg': serie.soma / serie.contagem if serie.contagem else 0.0,
+            'sum': serie.soma,
+            'min': serie.minimo,
+            'max': serie.maximo,
+            'count': serie.contagem,
+            'last': serie.ultimo
+        }
+        vazias = novo_indice - serie.indice - 1  # Janelas seguintes, sem eventos
+
+        for posicao, regra in enumerate(grupo.regras):
+            comparador = grupo.comparadores[posicao]
+            if regra.agregacao == 'count':
+                # Contagem existe sem eventos: janelas vazias valem zero
+                self._avaliar(serie, posicao, regra, origem, serie.contagem, serie.indice,
+                              1, comparador(serie.contagem, regra.limite), disparos)
+                if vazias:
+                    self._avaliar(serie, posicao, regra, origem, 0, serie.indice + 1,
+                                  vazias, comparador(0, regra.limite), disparos)
+                continue
+
+            if serie.contagem:
+                valor = valores[regra.agregacao]
+                self._avaliar(serie, posicao, regra, origem, valor, serie.indice,
+                              1, comparador(valor, regra.limite), disparos)
+            if vazias or not serie.contagem:
+                # Janelas sem dados interrompem a sequência e rearmam a regra
+                serie.consecutivas[posicao] = 0
+                serie.ativas[posicao] = 0
+
+        serie.reiniciar(novo_indice)
+
+    def _avaliar(self, serie: _SerieJanela, posicao: int, regra: RegraAlerta, origem: str,
+                 valor: float, indice: int, janelas: int, condicao: bool,
+                 disparos: List) -> None:
+        """
+        Aplica o resultado de `janelas` janelas seguidas, a partir de
+        `indice`, ao estado da regra na série (lock adquirido)
+        """
+        if not condicao:
+            serie.consecutivas[posicao] = 0
+            serie.ativas[posicao] = 0
+            return
+
+        anteriores = serie.consecutivas[posicao]
+        serie.consecutivas[posicao] = anteriores + janelas
+        if serie.consecutivas[posicao] < regra.janelas:
+            return
+        if serie.ativas[posicao]:
+            self._alertas_suprimidos.incrementar(janelas)
+            return
+
+        # Dispara na janela em que a sequência atingiu o mínimo exigido
+        necessarias = max(1, regra.janelas - anteriores)
+        serie.ativas[posicao] = 1
+        disparos.append((regra, origem, valor, indice + necessarias - 1))
+        if janelas > necessarias:
+            self._alertas_suprimidos.incrementar(janelas - necessarias)
+
+    def fechar_janelas(self, instante: datetime) -> List[EventoSistema]:
+        """
+        Fecha as janelas terminadas antes de `instante` (séries sem eventos novos)
+
+        Séries sem eventos há mais janelas do que a maior sequência exigida
+        pelas regras do grupo já não podem mudar de estado e são descartadas.
+        """
+        segundos = instante.timestamp()
+        disparos: List[Tuple[RegraAlerta, str, float, int]] = []
+        with self._lock:
+            for grupos in self._grupos_por_metrica.values():
+                for grupo in grupos:
+                    indice = int(segundos // grupo.janela_segundos)
+                    janelas_maximas = max(regra.janelas for regra in grupo.regras)
+                    inativas = []
+                    for origem, serie in grupo.series.items():
+                        if serie.indice < indice:
+                            self._fechar_janela(grupo, origem, serie, indice, disparos)
+                        if indice - serie.indice_dados > janelas_maximas:
+                            inativas.append(origem)
+                    for origem in inativas:
+                        del grupo.series[origem]
+                    self._series_descartadas.incrementar(len(inativas))
+        return self._emitir(disparos)
+
+    def _emitir(self, disparos: List[Tuple[RegraAlerta, str, float, int]]) -> List[EventoSistema]:
+        """Converte disparos em ALERTA_GERADO, grava e publica"""
+        if not disparos:
+            return []
+
+        alertas = []
+        for regra, origem, valor, indice_janela in disparos:
+            fim_janela = datetime.fromtimestamp((indice_janela + 1) * regra.janela_segundos)
+            alertas.append(EventoSistema(
+                tipo=TipoEvento.ALERTA_GERADO,
+                origem=origem,
+                timestamp=fim_janela,
+                dados={
+                    'id': f"regra:{regra.nome}:{origem}:{indice_janela}",
+                    'titulo': regra.nome,
+                    'descricao': (f"{regra.agregacao}({regra.metrica}) = {valor:g} "
+                                  f"{regra.operador} {regra.limite:g} por {regra.janelas} "
+                                  f"janela(s) de {regra.janela_segundos:g}s em {origem}"),
+                    'severidade': regra.severidade.value,
+                    'metadados': {
+                        'regra': regra.expressao,
+                        'valor': valor,
+                        'limite': regra.limite,
+                        'janelas': regra.janelas,
+                        'inicio_janela': (fim_janela - timedelta(
+                            seconds=regra.janela_segundos)).isoformat()
+                    }
+                }
+            ))
+
+        self._alertas_emitidos.incrementar(len(alertas))
+        if self.event_store is not None:
+            self.event_store.adicionar_eventos(alertas)
+        if self.event_bus is not None:
+            self.event_bus.publicar_lote(alertas)
+        return alertas
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+
+    def obter_metricas(self) -> Dict[str, Any]:
+        """Obtém métricas do motor de regras"""
+        instrumentacao = self._instrumentacao.instantaneo()
+        with self._lock:
+            grupos = [g for lista in self._grupos_por_metrica.values() for g in lista]
+            regras = len(self._regras)
+            series = sum(len(g.series) for g in grupos)
+            ativas = sum(sum(s.ativas) for g in grupos for s in g.series.values())
+
+        return {
+            'regras': regras,
+            'grupos_janela': len(grupos),
+            'series': series,
+            'alertas_ativos': ativas,
+            'eventos_avaliados': instrumentacao['eventos_avaliados'],
+            'eventos_atrasados': instrumentacao['eventos_atrasados'],
+            'janelas_fechadas': instrumentacao['janelas_fechadas'],
+            'alertas_emitidos': instrumentacao['alertas_emitidos'],
+            'alertas_suprimidos': instrumentacao['alertas_suprimidos'],
+            'series_descartadas': instrumentacao['series_descartadas'],
+            'latencia_avaliacao_ms': instrumentacao['latencia_avaliacao_ms']
+        }
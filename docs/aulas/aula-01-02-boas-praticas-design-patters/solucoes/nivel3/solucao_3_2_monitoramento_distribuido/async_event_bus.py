@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+EVENT BUS ASSÍNCRONO
+Sistema de Monitoramento Distribuído
+
+Variante do EventBus baseada em `asyncio`, com uma fila limitada por
+subscriber. Um subscriber lento não faz a memória crescer sem limite:
+quando sua fila enche, a política de overflow decide entre aplicar
+backpressure ao publicador (BLOQUEAR) ou descartar eventos
+(DESCARTAR_MAIS_ANTIGO / DESCARTAR_MAIS_NOVO).
+
+Cada subscription tem sua própria task consumidora, de modo que um
+handler lento atrasa apenas a própria fila. Handlers podem ser funções
+comuns ou corrotinas (`async def`).
+
+AUTOR: Prof. Jackson Antonio do Prado Lima
+"""
+
+import asyncio
+import concurrent.futures
+import time
+import uuid
+from enum import Enum
+from typing import Dict, List, Optional, Any, Callable
+
+from instrumentation import RegistroMetricas
+from patterns import NANOS_POR_SEGUNDO, EventoSistema
+
+
+class PoliticaOverflow(Enum):
+    """Comportamento quando a fila de um subscriber está cheia"""
+    BLOQUEAR = "bloquear"                          # Publicador aguarda espaço
+    DESCARTAR_MAIS_ANTIGO = "descartar_mais_antigo"  # Remove o evento mais antigo da fila
+    DESCARTAR_MAIS_NOVO = "descartar_mais_novo"      # Descarta o evento publicado
+
+
+class InscricaoAssincrona:
+    """Subscription com fila limitada e task consumidora própria"""
+
+    def __init__(self, tipo_evento: Optional[str], handler: Callable,
+                 filtro: Optional[Callable], tamanho_fila: int,
+                 politica: PoliticaOverflow):
+        self.id = str(uuid.uuid4())
+        self.tipo_evento = tipo_evento  # None = subscriber global
+        self.handler = handler
+        self.filtro = filtro
+        self.politica = politica
+        self.assincrono = asyncio.iscoroutinefunction(handler)
+        self.fila: Optional[asyncio.Queue] = None
+        self.tamanho_fila = tamanho_fila
+        self.task: Optional[asyncio.Task] = None
+        self.fechada = False
+
+        self.processados = 0
+        self.falhados = 0
+        self.descartados = 0
+
+
+class EventBusAssincrono:
+    """
+    Event Bus assíncrono com filas limitadas e backpressure
+
+    RESPONSABILIDADES:
+    - Gerenciar inscrições de handlers síncronos e assíncronos
+    - Manter uma fila limitada por subscriber
+    - Aplicar a política de overflow (backpressure ou descarte)
+    - Expor profundidade das filas e eventos descartados
+
+    As filas e tasks são criadas no event loop em que o bus é usado pela
+    primeira vez (`publicar` ou `iniciar`). Produtores em outras threads
+    usam `publicar_de_thread`, que devolve um Future concluído quando o
+    evento foi enfileirado (respeitando a backpressure).
+    """
+
+    def __init__(self, nome: str = "EventBusAssincrono", tamanho_fila: int = 1000,
+                 politica_padrao: PoliticaOverflow = PoliticaOverflow.BLOQUEAR):
+        self.nome = nome
+        self.tamanho_fila = tamanho_fila
+        self.politica_padrao = politica_padrao
+
+        self._inscricoes: Dict[str, InscricaoAssincrona] = {}
+        self._por_tipo: Dict[Optional[str], List[InscricaoAssincrona]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Métricas
+        self._instrumentacao = RegistroMetricas(nome)
+        self._eventos_publicados = self._instrumentacao.contador('eventos_publicados')
+        self._eventos_descartados = self._instrumentacao.contador('eventos_descartados')
+        self._tempo_bloqueado_ns = self._instrumentacao.contador('tempo_bloqueado_ns')
+        self._espera_backpressure = self._instrumentacao.histograma('espera_backpressure')
+
+    # ------------------------------------------------------------------
+    # Inscrições
+    # ------------------------------------------------------------------
+
+    def subscrever(self, tipo_evento: str, handler: Callable,
+                   filtro: Optional[Callable] = None,
+                   tamanho_fila: Optional[int] = None,
+                   politica: Optional[PoliticaOverflow] = None) -> str:
+        """Subscreve um handler (função ou corrotina) para um tipo de evento"""
+        return self._registrar(tipo_evento, handler, filtro, tamanho_fila, politica)
+
+    def subscrever_global(self, handler: Callable,
+                          tamanho_fila: Optional[int] = None,
+                          politica: Optional[PoliticaOverflow] = None) -> str:
+        """Subscreve um handler para todos os eventos"""
+        return self._registrar(None, handler, None, tamanho_fila, politica)
+
+    def _registrar(self, tipo_evento: Optional[str], handler: Callable,
+                   filtro: Optional[Callable], tamanho_fila: Optional[int],
+                   politica: Optional[PoliticaOverflow]) -> str:
+        inscricao = InscricaoAssincrona(
+            tipo_evento, handler, filtro,
+            tamanho_fila or self.tamanho_fila,
+            politica or self.politica_padrao
+        )
+        self._inscricoes[inscricao.id] = inscricao
+        # Lista nova a cada alteração: publicações em andamento não são afetadas
+        self._por_tipo[tipo_evento] = self._por_tipo.get(tipo_evento, []) + [inscricao]
+
+        if self._loop is not None:
+            self._iniciar_inscricao(inscricao)
+        return inscricao.id
+
+    def desinscrever(self, subscription_id: str) -> bool:
+        """Remove uma subscription e cancela sua task consumidora"""
+        inscricao = self._inscricoes.pop(subscription_id, None)
+        if inscricao is None:
+            return False
+
+        self._por_tipo[inscricao.tipo_evento] = [
+            i for i in self._por_tipo[inscricao.tipo_evento] if i is not inscricao
+        ]
+        self._encerrar_inscricao(inscricao)
+        return True
+
+    @staticmethod
+    def _encerrar_inscricao(inscricao: InscricaoAssincrona) -> None:
+        """
+        Cancela o consumidor e esvazia a fila da subscription
+
+        Esvaziar a fila acorda os publicadores bloqueados em `put`
+        (BLOQUEAR); ao ver a subscription fechada, cada um retira o próprio
+        evento e libera o próximo publicador em espera.
+        """
+        inscricao.fechada = True
+        if inscricao.task is not None:
+            inscricao.task.cancel()
+        if inscricao.fila is not None:
+            EventBusAssincrono._esvaziar(inscricao.fila)
+
+    @staticmethod
+    def _esvaziar(fila: asyncio.Queue) -> None:
+        while not fila.empty():
+            fila.get_nowait()
+            fila.task_done()
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    async def iniciar(self) -> None:
+        """Associa o bus ao event loop atual e inicia os consumidores"""
+        self._garantir_loop()
+
+    def _garantir_loop(self) -> None:
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            for inscricao in self._inscricoes.values():
+                self._iniciar_inscricao(inscricao)
+
+    def _iniciar_inscricao(self, inscricao: InscricaoAssincrona) -> None:
+        inscricao.fechada = False
+        inscricao.fila = asyncio.Queue(maxsize=inscricao.tamanho_fila)
+        inscricao.task = self._loop.create_task(
+            self._consumir(inscricao), name=f"{self.nome}-{inscricao.id[:8]}"
+        )
+
+    async def _consumir(self, inscricao: InscricaoAssincrona) -> None:
+        """Task consumidora de uma subscription"""
+        fila = inscricao.fila
+        while True:
+            evento = await fila.get()
+            try:
+                if inscricao.filtro and not inscricao.filtro(evento):
+                    continue
+
+                resultado = inscricao.handler(evento)
+                if inscricao.assincrono:
+                    await resultado
+                inscricao.processados += 1
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                inscricao.falhados += 1
+                print(f"Erro em handler {inscricao.id}: {e}")
+            finally:
+                fila.task_done()
+
+    async def aguardar_processamento(self) -> None:
+        """Aguarda até que todas as filas estejam vazias e processadas"""
+        for inscricao in list(self._inscricoes.values()):
+            if inscricao.fila is not None:
+                await inscricao.fila.join()
+
+    async def fechar(self, drenar: bool = True) -> None:
+        """Finaliza o bus, opcionalmente processando os eventos pendentes"""
+        if drenar:
+            await self.aguardar_processamento()
+
+        tasks = [i.task for i in self._inscricoes.values() if i.task is not None]
+        for inscricao in self._inscricoes.values():
+            self._encerrar_inscricao(inscricao)
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # Um novo uso recria filas e consumidores no loop corrente
+        self._loop = None
+
+    # ------------------------------------------------------------------
+    # Publicação
+    # ------------------------------------------------------------------
+
+    async def publicar(self, evento: EventoSistema) -> None:
+        """
+        Publica um evento para os subscribers do tipo e globais
+
+        Com a política BLOQUEAR, aguarda espaço na fila de cada
+        subscriber cheio (backpressure).
+        """
+        self._garantir_loop()
+        self._eventos_publicados.incrementar()
+
+        inscricoes = self._por_tipo.get(evento.tipo.value, [])
+        globais = self._por_tipo.get(None, [])
+        for lista in (inscricoes, globais):
+            for inscricao in lista:
+                if not inscricao.fechada:
+                    await self._enfileirar(inscricao, evento)
+
+    async def _enfileirar(self, inscricao: InscricaoAssincrona,
+                          evento: EventoSistema) -> None:
+        fila = inscricao.fila
+        if not fila.full():
+            fila.put_nowait(evento)
+            return
+
+        if inscricao.politica is PoliticaOverflow.BLOQUEAR:
+            inicio = time.perf_counter_ns()
+            await fila.put(evento)
+            bloqueado_ns = time.perf_counter_ns() - inicio
+            self._tempo_bloqueado_ns.incrementar(bloqueado_ns)
+            self._espera_backpressure.registrar_ns(bloqueado_ns)
+            if inscricao.fechada:
+                # Desinscrita durante a espera: ninguém mais consome esta fila
+                self._esvaziar(fila)
+
+        elif inscricao.politica is PoliticaOverflow.DESCARTAR_MAIS_ANTIGO:
+            fila.get_nowait()
+            fila.task_done()
+            fila.put_nowait(evento)
+            self._registrar_descarte(inscricao)
+
+        else:  # DESCARTAR_MAIS_NOVO
+            self._registrar_descarte(inscricao)
+
+    def _registrar_descarte(self, inscricao: InscricaoAssincrona) -> None:
+        inscricao.descartados += 1
+        self._eventos_descartados.incrementar()
+
+    def publicar_de_thread(self, evento: EventoSistema) -> concurrent.futures.Future:
+        """
+        Publica a partir de outra thread (ex.: coletores síncronos)
+
+        O bus precisa já estar associado a um event loop em execução.
+        Aguardar o Future devolvido aplica a backpressure ao produtor.
+        """
+        if self._loop is None:
+            raise RuntimeError(f"{self.nome} ainda não foi iniciado em um event loop")
+        return asyncio.run_coroutine_threadsafe(self.publicar(evento), self._loop)
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+
+    def obter_metricas(self) -> Dict[str, Any]:
+        """Obtém métricas do event bus, incluindo profundidade das filas"""
+        instrumentacao = self._instrumentacao.instantaneo()
+        inscricoes = list(self._inscricoes.values())
+        return {
+            'nome': self.nome,
+            'subscribers_por_tipo': {
+                tipo: len(lista) for tipo, lista in self._por_tipo.items()
+                if tipo is not None and lista
+            },
+            'subscribers_globais': len(self._por_tipo.get(None, [])),
+            'total_subscribers': len(inscricoes),
+            'eventos_publicados': instrumentacao['eventos_publicados'],
+            'eventos_processados': sum(i.processados for i in inscricoes),
+            'eventos_falhados': sum(i.falhados for i in inscricoes),
+            'eventos_descartados': instrumentacao['eventos_descartados'],
+            'tempo_bloqueado_segundos': instrumentacao['tempo_bloqueado_ns'] / NANOS_POR_SEGUNDO,
+            'espera_backpressure_ms': instrumentacao['espera_backpressure_ms'],
+            'filas': {
+                i.id: {
+                    'tipo_evento': i.tipo_evento,
+                    'politica': i.politica.value,
+                    'profundidade': i.fila.qsize() if i.fila is not None else 0,
+                    'capacidade': i.tamanho_fila,
+                    'descartados': i.descartados
+                }
+                for i in inscricoes
+            }
+        }
@@ -0,0 +1,973 @@
+#!/usr/bin/env python3
+"""
+BENCHMARKS DO SISTEMA DE MONITORAMENTO DISTRIBUÍDO
+
+Medições de desempenho dos padrões implementados em patterns.py.
+Cada benchmark retorna uma lista de linhas (dicts) e imprime uma tabela.
+
+EXECUTAR:
+    python benchmarks.py              # todos os benchmarks
+    python benchmarks.py contencao    # apenas um benchmark
+
+AUTOR: Prof. Jackson Antonio do Prado Lima
+"""
+
+import asyncio
+import sys
+import os
+import time
+import threading
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+# Adicionar diretório atual ao path
+current_dir = os.path.dirname(os.path.abspath(__file__)) if '__file__' in globals() else os.getcwd()
+sys.path.append(current_dir)
+
+from patterns import (
+    BulkheadTimeoutException, CircuitBreaker, EventBus, EventoSistema, EventStore,
+    IngestorEventos, LimiteAIMD, LimiteGradiente, OrcamentoRetry, QueryModel,
+    RecursoBulkhead, RecursoBulkheadAssincrono, RetryExecutor, RetryStrategy, TipoEvento
+)
+from compact_models import EventoCompacto
+from load_generator import executar_cenario
+from collector import CATALOGO_METRICAS, ColetorDistribuido, coletar_simulado
+from health_check import MotorHealthCheck, RodaTemporizacao
+from alerting import MotorRegrasAlerta
+from columnar_store import ArmazemColunarMetricas, np as numpy_disponivel
+from persistence import EventStorePersistente
+
+
+def _executar_em_threads(num_threads: int, alvo: Callable[[int], None]) -> float:
+    """Executa `alvo(indice)` em N threads liberadas juntas; retorna segundos"""
+    barreira = threading.Barrier(num_threads + 1)
+
+    def trabalhador(indice: int):
+        barreira.wait()
+        alvo(indice)
+
+    threads = [threading.Thread(target=trabalhador, args=(i,)) for i in range(num_threads)]
+    for thread in threads:
+        thread.start()
+
+    barreira.wait()
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - inicio
+
+
+def _imprimir_tabela(titulo: str, linhas: List[Dict[str, Any]]) -> None:
+    print(f"\n📊 {titulo}")
+    print("-" * 70)
+    if not linhas:
+        return
+    colunas = list(linhas[0].keys())
+    print(" | ".join(f"{c:>18}" for c in colunas))
+    for linha in linhas:
+        print(" | ".join(
+            f"{v:>18.1f}" if isinstance(v, float) else f"{str(v):>18}"
+            for v in linha.values()
+        ))
+
+
+# =============================================================================
+# EVENT STORE - CONTENÇÃO NA INGESTÃO
+# =============================================================================
+
+def benchmark_contencao_event_store(threads=(1, 8, 32),
+                                    total_eventos: int = 96_000) -> List[Dict[str, Any]]:
+    """
+    Throughput de ingestão com 1, 8 e 32 threads produtoras
+
+    Compara `EventStore.adicionar_evento` (um lock por evento) com o
+    `IngestorEventos` (buffer por thread e lote por aquisição de lock).
+    Os eventos são criados antes da medição e compartilham o mesmo
+    timestamp, para isolar o custo de sincronização do custo de inserir
+    eventos atrasados no índice temporal.
+    """
+    linhas = []
+    for num_threads in threads:
+        por_thread = total_eventos // num_threads
+        agora = datetime.now()
+        lotes = [
+            [
+                EventoSistema(timestamp=agora, origem=f"servico-{t}", dados={'valor': i})
+                for i in range(por_thread)
+            ]
+            for t in range(num_threads)
+        ]
+
+        store_direto = EventStore()
+
+        def produzir_direto(indice: int):
+            adicionar = store_direto.adicionar_evento
+            for evento in lotes[indice]:
+                adicionar(evento)
+
+        tempo_direto = _executar_em_threads(num_threads, produzir_direto)
+
+        store_lote = EventStore()
+        ingestor = IngestorEventos(store_lote, tamanho_lote=256)
+
+        def produzir_lote(indice: int):
+            adicionar = ingestor.adicionar_evento
+            for evento in lotes[indice]:
+                adicionar(evento)
+
+        tempo_lote = _executar_em_threads(num_threads, produzir_lote)
+        ingestor.fechar()
+
+        assert store_lote.ultima_sequencia == store_direto.ultima_sequencia
+
+        linhas.append({
+            'threads': num_threads,
+            'eventos': por_thread * num_threads,
+            'direto_ev_s': por_thread * num_threads / tempo_direto,
+            'ingestor_ev_s': por_thread * num_threads / tempo_lote,
+            'ganho_x': tempo_direto / tempo_lote
+        })
+
+    _imprimir_tabela("Contenção na ingestão do EventStore", linhas)
+    return linhas
+
+
+# =============================================================================
+# MODELOS COMPACTOS - MEMÓRIA POR EVENTO
+# =============================================================================
+
+def _bytes_por_instancia(fabrica: Callable[[int], Any], quantidade: int) -> float:
+    """Memória alocada (tracemalloc) por instância criada pela fábrica"""
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    instancias = [fabrica(i) for i in range(quantidade)]
+    depois = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(instancias) == quantidade
+    return (depois - antes) / quantidade
+
+
+def benchmark_memoria_eventos(quantidade: int = 100_000) -> List[Dict[str, Any]]:
+    """
+    Bytes por evento: EventoSistema (dataclass) x EventoCompacto (__slots__)
+
+    Mede o evento "vazio" (sem dados), um evento de métrica típico, com
+    o dict de dados e tags produzido pelos coletores, e o mesmo evento
+    gravado no EventStore (índices temporais incluídos).
+    """
+    origens = [f"servico-{i}" for i in range(10)]
+    store_original, store_compacto = EventStore(), EventStore()
+
+    def dados_metrica(i: int) -> Dict[str, Any]:
+        return {'nome': 'cpu_usage', 'valor': float(i % 100), 'unidade': '%',
+                'tags': {'environment': 'production', 'region': 'us-east-1'}}
+
+    cenarios = {
+        'evento_sem_dados': (
+            lambda i: EventoSistema(origem=origens[i % 10]),
+            lambda i: EventoCompacto(origem=origens[i % 10])
+        ),
+        'evento_metrica': (
+            lambda i: EventoSistema(tipo=TipoEvento.METRICA_COLETADA,
+                                    origem=origens[i % 10], dados=dados_metrica(i)),
+            lambda i: EventoCompacto(tipo=TipoEvento.METRICA_COLETADA,
+                                     origem=origens[i % 10], dados=dados_metrica(i))
+        ),
+        'evento_metrica_no_store': (
+            lambda i: store_original.adicionar_evento(EventoSistema(
+                tipo=TipoEvento.METRICA_COLETADA, origem=origens[i % 10],
+                dados=dados_metrica(i))),
+            lambda i: store_compacto.adicionar_evento(EventoCompacto(
+                tipo=TipoEvento.METRICA_COLETADA, origem=origens[i % 10],
+                dados=dados_metrica(i)))
+        )
+    }
+
+    linhas = []
+    for nome, (fabrica_original, fabrica_compacta) in cenarios.items():
+        original = _bytes_por_instancia(fabrica_original, quantidade)
+        compacto = _bytes_por_instancia(fabrica_compacta, quantidade)
+        linhas.append({
+            'cenario': nome,
+            'original_bytes': original,
+            'compacto_bytes': compacto,
+            'reducao_pct': (1 - compacto / original) * 100
+        })
+
+    _imprimir_tabela("Memória por evento (antes x depois)", linhas)
+    return linhas
+
+
+# =============================================================================
+# EVENT BUS - ENTREGA POR EVENTO x EM LOTE
+# =============================================================================
+
+def benchmark_entrega_lote(total_eventos: int = 50_000,
+                           tamanhos_lote=(1, 100, 1000)) -> List[Dict[str, Any]]:
+    """
+    Custo de despacho do EventBus: `publicar` por evento x `publicar_lote`
+
+    O handler apenas conta eventos, de modo que o tempo medido é o
+    overhead de despacho (wrapper, filtro, submissão ao executor) até
+    que todos os eventos tenham sido entregues.
+    """
+    eventos = [EventoSistema(tipo=TipoEvento.METRICA_COLETADA, dados={'valor': i})
+               for i in range(total_eventos)]
+    linhas = []
+
+    for tamanho_lote in tamanhos_lote:
+        bus = EventBus(f"bench-{tamanho_lote}")
+        recebidos = [0]
+
+        if tamanho_lote == 1:
+            def handler(evento):
+                recebidos[0] += 1
+            bus.subscrever(TipoEvento.METRICA_COLETADA.value, handler)
+
+            inicio = time.perf_counter()
+            for evento in eventos:
+                bus.publicar(evento)
+        else:
+            def handler_lote(lote):
+                recebidos[0] += len(lote)
+            bus.subscrever_lote(TipoEvento.METRICA_COLETADA.value, handler_lote,
+                                max_lote=tamanho_lote, max_espera_ms=10)
+
+            inicio = time.perf_counter()
+            for i in range(0, total_eventos, tamanho_lote):
+                bus.publicar_lote(eventos[i:i + tamanho_lote])
+
+        bus.shutdown()  # Aguarda a entrega de tudo o que foi submetido
+        duracao = time.perf_counter() - inicio
+        assert recebidos[0] == total_eventos
+
+        linhas.append({
+            'modo': 'por_evento' if tamanho_lote == 1 else f'lote_{tamanho_lote}',
+            'eventos': total_eventos,
+            'eventos_s': total_eventos / duracao,
+            'us_por_evento': duracao / total_eventos * 1e6
+        })
+
+    _imprimir_tabela("Despacho do EventBus (por evento x lote)", linhas)
+    return linhas
+
+
+# =============================================================================
+# CIRCUIT BREAKER - THROUGHPUT COM CHAMADAS CONCORRENTES
+# =============================================================================
+
+def benchmark_throughput_circuit_breaker(threads=(1, 8, 32),
+                                         chamadas_por_thread: int = 200,
+                                         latencia_chamada_ms: float = 1.0) -> List[Dict[str, Any]]:
+    """
+    Throughput de chamadas através de um CircuitBreaker FECHADO
+
+    A chamada protegida simula I/O (sleep de `latencia_chamada_ms`).
+    Como a função executa fora do lock do breaker, o throughput deve
+    crescer com o número de threads; `escala_x` compara com 1 thread.
+    """
+    def chamada_remota():
+        time.sleep(latencia_chamada_ms / 1000)
+        return True
+
+    linhas = []
+    throughput_base = None
+    for num_threads in threads:
+        breaker = CircuitBreaker(threshold_falhas=5, nome=f"bench-{num_threads}")
+
+        def chamar(indice: int):
+            executar = breaker.executar
+            for _ in range(chamadas_por_thread):
+                executar(chamada_remota)
+
+        duracao = _executar_em_threads(num_threads, chamar)
+        total = num_threads * chamadas_por_thread
+        assert breaker.obter_metricas()['total_sucessos'] == total
+
+        throughput = total / duracao
+        throughput_base = throughput_base or throughput
+        linhas.append({
+            'threads': num_threads,
+            'chamadas': total,
+            'chamadas_s': throughput,
+            'escala_x': throughput / throughput_base
+        })
+
+    _imprimir_tabela("Throughput do CircuitBreaker (chamadas de 1 ms)", linhas)
+    return linhas
+
+
+# =============================================================================
+# RESILIÊNCIA ASSÍNCRONA - CHAMADAS CONCORRENTES EM UM EVENT LOOP
+# =============================================================================
+
+def benchmark_resiliencia_assincrona(concorrencia=(100, 1000, 5000),
+                                     latencia_chamada_ms: float = 20.0) -> List[Dict[str, Any]]:
+    """
+    Milhares de chamadas protegidas (CircuitBreaker + Retry + Bulkhead)
+    concorrentes em um único event loop, sem uma thread por chamada
+
+    Com a espera feita via `await`, o tempo total deve ficar próximo da
+    latência de uma única chamada, independentemente da concorrência.
+    """
+    linhas = []
+    for quantidade in concorrencia:
+        breaker = CircuitBreaker(nome=f"bench-async-{quantidade}")
+        retry = RetryExecutor(RetryStrategy(max_tentativas=3, delay_inicial_ms=10))
+        bulkhead = RecursoBulkheadAssincrono(f"bench-async-{quantidade}", quantidade)
+
+        @breaker
+        @retry
+        @bulkhead
+        async def chamada_remota():
+            await asyncio.sleep(latencia_chamada_ms / 1000)
+            return True
+
+        async def disparar():
+            return await asyncio.gather(*(chamada_remota() for _ in range(quantidade)))
+
+        inicio = time.perf_counter()
+        resultados = asyncio.run(disparar())
+        duracao = time.perf_counter() - inicio
+        assert all(resultados) and len(resultados) == quantidade
+
+        linhas.append({
+            'chamadas_concorrentes': quantidade,
+            'threads': threading.active_count(),
+            'tempo_total_ms': duracao * 1000,
+            'chamadas_s': quantidade / duracao
+        })
+
+    _imprimir_tabela(f"Resiliência assíncrona (chamadas de {latencia_chamada_ms:.0f} ms)", linhas)
+    return linhas
+
+
+def benchmark_orcamento_hedging(chamadas: int = 1000, probabilidade_lenta: float = 0.05,
+                                latencia_ms: float = 2.0,
+                                latencia_lenta_ms: float = 100.0) -> List[Dict[str, Any]]:
+    """
+    Amplificação de carga durante uma indisponibilidade total (com e sem
+    OrcamentoRetry) e latência de cauda com e sem hedging
+
+    Sem orçamento, cada chamada gera `max_tentativas` requisições ao
+    serviço indisponível; com orçamento de 10%, a carga fica perto de 1,1x.
+    A cauda é medida em `executar_assincrono` e em `executar`.
+    """
+    import random
+
+    linhas = []
+    for orcamento in (None, OrcamentoRetry(percentual=10, minimo_por_segundo=10)):
+        executor = RetryExecutor(
+            RetryStrategy(max_tentativas=3, delay_inicial_ms=0, jitter=False),
+            orcamento=orcamento
+        )
+        requisicoes = [0]
+
+        def servico_indisponivel():
+            requisicoes[0] += 1
+            raise ConnectionError("indisponível")
+
+        for _ in range(chamadas):
+            try:
+                executor.executar(servico_indisponivel)
+            except Exception:
+                pass
+
+        linhas.append({
+            'cenario': 'indisponibilidade ' + ('com orçamento' if orcamento else 'sem orçamento'),
+            'chamadas': chamadas,
+            'requisicoes_ao_servico': requisicoes[0],
+            'amplificacao': requisicoes[0] / chamadas,
+            'p99_ms': None
+        })
+
+    for hedge_percentil in (None, 90):
+        aleatorio = random.Random(42)
+        executor = RetryExecutor(RetryStrategy(max_tentativas=1), hedge_percentil=hedge_percentil)
+        requisicoes = [0]
+
+        async def servico_com_cauda():
+            requisicoes[0] += 1
+            lenta = aleatorio.random() < probabilidade_lenta
+            await asyncio.sleep((latencia_lenta_ms if lenta else latencia_ms) / 1000)
+            return True
+
+        async def disparar():
+            latencias = []
+            for _ in range(chamadas):
+                inicio = time.perf_counter()
+                await executor.executar_assincrono(servico_com_cauda)
+                latencias.append((time.perf_counter() - inicio) * 1000)
+            return sorted(latencias)
+
+        latencias = asyncio.run(disparar())
+        linhas.append({
+            'cenario': 'cauda ' + (f'com hedge p{hedge_percentil}' if hedge_percentil else 'sem hedge'),
+            'chamadas': chamadas,
+            'requisicoes_ao_servico': requisicoes[0],
+            'amplificacao': requisicoes[0] / chamadas,
+            'p99_ms': latencias[int(len(latencias) * 0.99) - 1]
+        })
+
+    for hedge_percentil in (None, 90):
+        aleatorio = random.Random(42)
+        executor = RetryExecutor(RetryStrategy(max_tentativas=1), hedge_percentil=hedge_percentil)
+        requisicoes = [0]
+
+        def servico_com_cauda_sincrono():
+            requisicoes[0] += 1
+            lenta = aleatorio.random() < probabilidade_lenta
+            time.sleep((latencia_lenta_ms if lenta else latencia_ms) / 1000)
+            return True
+
+        latencias = []
+        for _ in range(chamadas):
+            inicio = time.perf_counter()
+            executor.executar(servico_com_cauda_sincrono)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+        executor.fechar()
+        latencias.sort()
+        linhas.append({
+            'cenario': 'cauda síncrona ' + (f'com hedge p{hedge_percentil}'
+                                            if hedge_percentil else 'sem hedge'),
+            'chamadas': chamadas,
+            'requisicoes_ao_servico': requisicoes[0],
+            'amplificacao': requisicoes[0] / chamadas,
+            'p99_ms': latencias[int(len(latencias) * 0.99) - 1]
+        })
+
+    _imprimir_tabela("Orçamento de retries e hedging", linhas)
+    return linhas
+
+
+def benchmark_bulkhead_adaptativo(threads: int = 64, duracao_segundos: float = 2.0,
+                                  capacidade_servico: int = 8,
+                                  latencia_base_ms: float = 5.0) -> List[Dict[str, Any]]:
+    """
+    Bulkhead fixo x adaptativo diante de um serviço que satura acima de
+    `capacidade_servico` requisições simultâneas (a latência cresce
+    proporcionalmente à concorrência excedente)
+
+    Um pool grande demais só aumenta a latência do serviço; um pequeno
+    demais desperdiça vazão. Os limites adaptativos devem convergir para
+    perto da capacidade, com vazão alta e latência de serviço baixa.
+    """
+    cenarios = [
+        ('fixo 64', RecursoBulkhead("bench-fixo-64", threads)),
+        ('fixo 2', RecursoBulkhead("bench-fixo-2", 2)),
+        ('aimd', RecursoBulkhead("bench-aimd", limite_adaptativo=LimiteAIMD(limite_inicial=2))),
+        ('gradiente', RecursoBulkhead(
+            "bench-gradiente", limite_adaptativo=LimiteGradiente(limite_inicial=2)
+        )),
+    ]
+
+    linhas = []
+    for nome, bulkhead in cenarios:
+        ativos = [0]
+        lock = threading.Lock()
+        concluidas = [0] * threads
+        fim = time.monotonic() + duracao_segundos
+
+        def servico():
+            with lock:
+                ativos[0] += 1
+                concorrencia = ativos[0]
+            time.sleep(latencia_base_ms / 1000 * max(1.0, concorrencia / capacidade_servico))
+            with lock:
+                ativos[0] -= 1
+
+        def trabalhador(indice: int) -> None:
+            while time.monotonic() < fim:
+                try:
+                    with bulkhead.adquirir_recurso(timeout_segundos=1.0):
+                        servico()
+                except BulkheadTimeoutException:
+                    continue
+                concluidas[indice] += 1
+
+        duracao = _executar_em_threads(threads, trabalhador)
+        metricas = bulkhead.obter_metricas()
+        linhas.append({
+            'bulkhead': nome,
+            'requisicoes_s': sum(concluidas) / duracao,
+            'servico_p50_ms': metricas['tempo_uso_ms']['p50'],
+            'servico_p99_ms': metricas['tempo_uso_ms']['p99'],
+            'limite_final': metricas['limite_concorrencia'],
+            'limite_max': metricas['limite_concorrencia_max']
+        })
+
+    _imprimir_tabela(
+        f"Bulkhead adaptativo ({threads} threads, serviço satura em {capacidade_servico})",
+        linhas
+    )
+    return linhas
+
+
+def benchmark_carga_virtual(cenario: str = 'padrao') -> List[Dict[str, Any]]:
+    """
+    Perfil de carga do load_generator em tempo virtual
+
+    Vazão e latências são do tempo simulado (determinísticas); a última
+    linha mostra quanto tempo real a simulação levou.
+    """
+    inicio = time.perf_counter()
+    relatorio = executar_cenario(cenario)
+    duracao = time.perf_counter() - inicio
+
+    linhas = [
+        {
+            'fase': fase['nome'],
+            'requisicoes': fase['requisicoes'],
+            'sucessos_s': fase['vazao_rps'],
+            'p50_ms': fase['latencia_ms']['p50'],
+            'p99_ms': fase['latencia_ms']['p99']
+        }
+        for fase in relatorio['fases']
+    ]
+    _imprimir_tabela(f"Carga virtual '{cenario}' "
+                     f"({relatorio['duracao_virtual_segundos']:.0f} s simulados "
+                     f"em {duracao:.2f} s reais)", linhas)
+    return linhas
+
+
+def benchmark_coleta_distribuida(servicos: int = 200, rodadas: int = 2,
+                                 processos=(1, 2, 4)) -> List[Dict[str, Any]]:
+    """
+    Coleta serial (como `coletar_metricas_servico` em main.py: um serviço
+    por vez, um evento por amostra) x ColetorDistribuido
+
+    Ambos usam a mesma coleta simulada (5 ms de I/O por serviço). No
+    pipeline, os coletores sobrepõem o I/O e o agregador grava e publica
+    lotes inteiros.
+    """
+    import random
+
+    ids = [f"servico-{i:04d}" for i in range(servicos)]
+    linhas = []
+
+    store = EventStore()
+    bus = EventBus("bench-coleta-serial")
+    bus.subscrever(TipoEvento.METRICA_COLETADA.value, lambda evento: None)
+    aleatorio = random.Random(0)
+    inicio = time.perf_counter()
+    for _ in range(rodadas):
+        for servico_id in ids:
+            for metrica, valor in coletar_simulado(servico_id, aleatorio):
+                nome, unidade, _ = CATALOGO_METRICAS[metrica]
+                evento = EventoSistema(
+                    tipo=TipoEvento.METRICA_COLETADA, origem=servico_id,
+                    dados={'nome': nome, 'valor': valor, 'unidade': unidade,
+                           'tags': {'environment': 'production'}}
+                )
+                store.adicionar_evento(evento)
+                bus.publicar(evento, assincrono=False)
+    duracao = time.perf_counter() - inicio
+    bus.shutdown()
+    amostras = len(store.obter_todos_eventos())
+    linhas.append({'modo': 'serial', 'processos': 1, 'amostras': amostras,
+                   'tempo_ms': duracao * 1000, 'amostras_s': amostras / duracao})
+
+    for quantidade in processos:
+        store = EventStore()
+        bus = EventBus(f"bench-coleta-{quantidade}")
+        bus.subscrever(TipoEvento.METRICA_COLETADA.value, lambda evento: None)
+        coletor = ColetorDistribuido(store, bus, processos=quantidade)
+        inicio = time.perf_counter()
+        metricas = coletor.coletar(ids, rodadas=rodadas)
+        duracao = time.perf_counter() - inicio
+        bus.shutdown()
+        linhas.append({'modo': 'pipeline', 'processos': quantidade,
+                       'amostras': metricas['amostras_recebidas'],
+                       'tempo_ms': duracao * 1000,
+                       'amostras_s': metricas['amostras_recebidas'] / duracao})
+
+    _imprimir_tabela(f"Coleta de {servicos} serviços x {rodadas} rodadas", linhas)
+    return linhas
+
+
+def benchmark_agendamento_health_check(servicos=(10, 1000, 10_000),
+                                       intervalo_segundos: float = 30.0,
+                                       duracao_segundos: float = 60.0,
+                                       resolucao_segundos: float = 0.1) -> List[Dict[str, Any]]:
+    """
+    Custo de agendamento por sonda: varredura x timer wheel x motor completo
+
+    - varredura: a cada tick percorre todos os serviços procurando os
+      vencidos (O(N) por tick, ou intervalo/resolução verificações por sonda)
+    - roda: só a RodaTemporizacao (avançar + reagendar)
+    - motor: MotorHealthCheck com sondas vazias, incluindo Bulkhead e
+      CircuitBreaker de cada sonda
+
+    Tudo em relógio virtual: mede-se apenas CPU, sem esperas.
+    """
+    import random
+    from load_generator import RelogioVirtual
+    from patterns import Servico
+
+    ticks = round(duracao_segundos / resolucao_segundos)
+    linhas = []
+
+    for quantidade in servicos:
+        aleatorio = random.Random(0)
+        primeiros = [aleatorio.uniform(0, intervalo_segundos) for _ in range(quantidade)]
+
+        # Varredura linear
+        proximas = list(primeiros)
+        sondas = 0
+        inicio = time.perf_counter()
+        for tick in range(1, ticks + 1):
+            agora = tick * resolucao_segundos
+            for indice in range(quantidade):
+                if proximas[indice] <= agora:
+                    proximas[indice] = agora + intervalo_segundos
+                    sondas += 1
+        duracao = time.perf_counter() - inicio
+        linhas.append({'servicos': quantidade, 'modo': 'varredura', 'sondas': sondas,
+                       'us_por_sonda': duracao / sondas * 1_000_000})
+
+        # Timer wheel
+        roda = RodaTemporizacao(resolucao_segundos)
+        for indice, instante in enumerate(primeiros):
+            roda.agendar(instante, indice)
+        sondas = 0
+        inicio = time.perf_counter()
+        for tick in range(1, ticks + 1):
+            agora = tick * resolucao_segundos
+            for indice in roda.avancar(agora):
+                roda.agendar(agora + intervalo_segundos, indice)
+                sondas += 1
+        duracao = time.perf_counter() - inicio
+        linhas.append({'servicos': quantidade, 'modo': 'roda', 'sondas': sondas,
+                       'us_por_sonda': duracao / sondas * 1_000_000})
+
+        # Motor completo (Bulkhead + CircuitBreaker por sonda)
+        relogio = RelogioVirtual()
+        motor = MotorHealthCheck(relogio=relogio, resolucao_segundos=resolucao_segundos,
+                                 semente=0)
+        for indice in range(quantidade):
+            servico = Servico(id=f"servico-{indice:05d}", nome=f"servico-{indice:05d}",
+                              url="http://localhost")
+            motor.registrar(servico, lambda: None, intervalo_segundos)
+        sondas = 0
+        inicio = time.perf_counter()
+        for _ in range(ticks):
+            relogio.avancar(resolucao_segundos)
+            sondas += motor.executar_pendentes()
+        duracao = time.perf_counter() - inicio
+        linhas.append({'servicos': quantidade, 'modo': 'motor', 'sondas': sondas,
+                       'us_por_sonda': duracao / sondas * 1_000_000})
+
+    _imprimir_tabela(
+        f"Agendamento de health checks ({intervalo_segundos}s, {duracao_segundos}s virtuais)",
+        linhas
+    )
+    return linhas
+
+
+def benchmark_regras_alerta(regras=(100, 1000, 5000), eventos: int = 20_000,
+                            series: int = 50, eventos_ingenuo: int = 1000) -> List[Dict[str, Any]]:
+    """
+    Regras de alerta por evento: avaliação ingênua x MotorRegrasAlerta
+
+    Todas as regras observam `response_time_ms`, com janelas de 10s, 1m
+    e 5m e limites variados; um em cada dez serviços degrada na segunda
+    metade do fluxo. A versão ingênua percorre todas as regras a cada
+    evento, cada uma com seu próprio acumulador (como um handler
+    por regra); o motor compartilha o acumulador por métrica e janela e
+    só percorre as regras quando uma janela fecha.
+    """
+    import random
+
+    janelas = ('10s', '1m', '5m')
+    base = datetime(2026, 1, 1)
+    aleatorio = random.Random(0)
+
+    def _latencia_simulada(indice: int) -> float:
+        # Um serviço a cada dez degrada na segunda metade do fluxo
+        degradado = indice % series % 10 == 0 and indice >= eventos // 2
+        return max(1.0, aleatorio.gauss(5000 if degradado else 300, 100))
+    fluxo = [
+        EventoSistema(
+            tipo=TipoEvento.METRICA_COLETADA,
+            origem=f"servico-{indice % series:03d}",
+            timestamp=base + timedelta(milliseconds=indice * 20),
+            dados={'nome': 'response_time_ms', 'valor': _latencia_simulada(indice)}
+        )
+        for indice in range(eventos)
+    ]
+    linhas = []
+
+    for quantidade in regras:
+        expressoes = [
+            f"avg(response_time_ms) over {janelas[i % 3]} > {2000 + (i * 7) % 6000} "
+            f"for {1 + i % 3} windows"
+            for i in range(quantidade)
+        ]
+
+        # Ingênua: cada regra acumula e avalia sozinha a cada evento
+        estado: Dict[Any, List[float]] = {}
+        limites = [(i, (10, 60, 300)[i % 3], 2000 + (i * 7) % 6000) for i in range(quantidade)]
+        amostra = fluxo[:eventos_ingenuo]
+        inicio = time.perf_counter()
+        for evento in amostra:
+            instante = evento.timestamp.timestamp()
+            valor = evento.dados['valor']
+            for regra, janela, limite in limites:
+                indice = int(instante // janela)
+                acumulador = estado.get((regra, evento.origem))
+                if acumulador is None or acumulador[0] != indice:
+                    if acumulador is not None:
+                        _ = acumulador[1] / acumulador[2] > limite
+                    acumulador = estado[(regra, evento.origem)] = [indice, 0.0, 0]
+                acumulador[1] += valor
+                acumulador[2] += 1
+        duracao = time.perf_counter() - inicio
+        linhas.append({'regras': quantidade, 'modo': 'ingenuo', 'eventos': len(amostra),
+                       'us_por_evento': duracao / len(amostra) * 1_000_000, 'alertas': '-'})
+
+        # Motor compilado
+        motor = MotorRegrasAlerta()
+        for i, expressao in enumerate(expressoes):
+            motor.adicionar_regra(expressao, nome=f"regra-{i}")
+        inicio = time.perf_counter()
+        alertas = 0
+        for posicao in range(0, eventos, 100):
+            alertas += len(motor.processar_lote(fluxo[posicao:posicao + 100]))
+        duracao = time.perf_counter() - inicio
+        linhas.append({'regras': quantidade, 'modo': 'motor', 'eventos': eventos,
+                       'us_por_evento': duracao / eventos * 1_000_000, 'alertas': alertas})
+
+    _imprimir_tabela(f"Regras de alerta ({series} séries)", linhas)
+    return linhas
+
+
+def benchmark_snapshot_query_model(eventos=(10_000, 100_000),
+                                   servicos: int = 200) -> List[Dict[str, Any]]:
+    """
+    Partida a frio do QueryModel: replay completo x snapshot JSON x binário
+
+    - replay: reprocessa todos os eventos do EventStore
+    - json: `exportar_estado()` em JSON (formato dos snapshots de
+      persistence.py) + `restaurar_estado`
+    - binario: `salvar_snapshot` / `carregar_snapshot`
+    """
+    import json
+    import random
+    import tempfile
+
+    # Eventos recentes: os rollups expiram pelo relógio de parede
+    base = datetime.now() - timedelta(milliseconds=max(eventos) * 100)
+    linhas = []
+
+    for quantidade in eventos:
+        aleatorio = random.Random(0)
+        store = EventStore()
+        for indice in range(quantidade):
+            origem = f"servico-{indice % servicos:03d}"
+            if indice < servicos:
+                store.adicionar_evento(EventoSistema(
+                    tipo=TipoEvento.SERVICO_INICIADO, origem=origem, timestamp=base,
+                    dados={'nome': origem, 'url': f"http://{origem}.empresa.com"}
+                ))
+            else:
+                store.adicionar_evento(EventoSistema(
+                    tipo=TipoEvento.METRICA_COLETADA, origem=origem,
+                    timestamp=base + timedelta(milliseconds=indice * 100),
+                    dados={'nome': aleatorio.choice(('cpu_usage', 'response_time_ms')),
+                           'valor': aleatorio.uniform(0, 100), 'unidade': '%',
+                           'tags': {'environment': 'production'}}
+                ))
+
+        modelo = QueryModel(store)
+        inicio = time.perf_counter()
+        modelo.atualizar_projecoes()
+        linhas.append({'eventos': quantidade, 'modo': 'replay', 'bytes': '-',
+                       'salvar_ms': '-', 'carregar_ms': (time.perf_counter() - inicio) * 1000})
+
+        inicio = time.perf_counter()
+        texto = json.dumps(modelo.exportar_estado(), default=str)
+        salvar = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        QueryModel(store).restaurar_estado(json.loads(texto))
+        linhas.append({'eventos': quantidade, 'modo': 'json', 'bytes': len(texto.encode('utf-8')),
+                       'salvar_ms': salvar * 1000,
+                       'carregar_ms': (time.perf_counter() - inicio) * 1000})
+
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho = os.path.join(diretorio, "query_model.snap")
+            inicio = time.perf_counter()
+            modelo.salvar_snapshot(caminho)
+            salvar = time.perf_counter() - inicio
+            restaurado = QueryModel(store)
+            inicio = time.perf_counter()
+            restaurado.carregar_snapshot(caminho)
+            linhas.append({'eventos': quantidade, 'modo': 'binario',
+                           'bytes': os.path.getsize(caminho), 'salvar_ms': salvar * 1000,
+                           'carregar_ms': (time.perf_counter() - inicio) * 1000})
+
+    _imprimir_tabela(f"Partida a frio do QueryModel ({servicos} serviços)", linhas)
+    return linhas
+
+
+def benchmark_restart_persistente(eventos=(10_000, 100_000), cauda: int = 1000,
+                                  servicos: int = 200) -> List[Dict[str, Any]]:
+    """
+    Tempo de restart do EventStorePersistente + QueryModel
+
+    Grava `eventos` no log com um snapshot do QueryModel `cauda` eventos
+    antes do fim e mede a reabertura até as projeções estarem em dia:
+    com o snapshot (lê o snapshot e reprocessa só a cauda) e sem ele
+    (replay do log inteiro). Com snapshot, o tempo acompanha o tamanho do
+    estado das projeções (dominado pelos buckets de rollup, limitados pela
+    retenção) e a cauda, não o total de eventos no log.
+    """
+    import random
+    import tempfile
+
+    base = datetime.now() - timedelta(milliseconds=max(eventos) * 10)
+    linhas = []
+
+    for quantidade in eventos:
+        aleatorio = random.Random(0)
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho = os.path.join(diretorio, "eventos.log")
+            store = EventStorePersistente(caminho)
+            modelo = QueryModel(store)
+            lote = []
+            for indice in range(quantidade):
+                lote.append(EventoSistema(
+                    tipo=TipoEvento.METRICA_COLETADA, origem=f"servico-{indice % servicos:03d}",
+                    timestamp=base + timedelta(milliseconds=indice * 10),
+                    dados={'nome': aleatorio.choice(('cpu_usage', 'response_time_ms')),
+                           'valor': aleatorio.uniform(0, 100)}
+                ))
+                if len(lote) == 1000 or indice == quantidade - 1:
+                    store.adicionar_eventos(lote)
+                    lote = []
+                if indice == quantidade - cauda - 1:
+                    modelo.atualizar_projecoes()
+                    modelo.registrar_snapshot()
+            store.fechar()
+
+            for modo in ('com_snapshot', 'sem_snapshot'):
+                if modo == 'sem_snapshot':
+                    os.remove(caminho + ".snapshot")
+                inicio = time.perf_counter()
+                reaberto = EventStorePersistente(caminho)
+                QueryModel(reaberto).atualizar_projecoes()
+                tempo = time.perf_counter() - inicio
+                linhas.append({
+                    'eventos_no_log': quantidade,
+                    'modo': modo,
+                    'eventos_reprocessados': reaberto.obter_metricas()['eventos_em_memoria'],
+                    'restart_ms': tempo * 1000
+                })
+                reaberto.fechar()
+
+    _imprimir_tabela(f"Restart do EventStorePersistente (cauda de {cauda} eventos)", linhas)
+    return linhas
+
+
+def benchmark_armazem_colunar(amostras: int = 100_000,
+                              series: int = 100) -> List[Dict[str, Any]]:
+    """
+    Amostras de métricas: EventoSistema no EventStore x ArmazemColunarMetricas
+
+    Mede os bytes por amostra gravada e o tempo de agregar uma série e
+    todas as séries da métrica. A versão por linhas lê os eventos do
+    EventStore e o dict `dados` de cada um; a colunar usa NumPy quando
+    instalado e Python puro caso contrário (coluna `numpy`).
+    """
+    base = datetime(2026, 1, 1)
+    origens = [f"servico-{i:03d}" for i in range(series)]
+    tags = {'environment': 'production', 'region': 'us-east-1'}
+    store, armazem = EventStore(), ArmazemColunarMetricas()
+
+    def gravar_linha(i: int):
+        return store.adicionar_evento(EventoSistema(
+            tipo=TipoEvento.METRICA_COLETADA, origem=origens[i % series],
+            timestamp=base + timedelta(milliseconds=i),
+            dados={'nome': 'cpu_usage', 'valor': float(i % 100), 'unidade': '%',
+                   'tags': tags}
+        ))
+
+    def gravar_coluna(i: int):
+        return armazem.registrar('cpu_usage', float(i % 100),
+                                 base + timedelta(milliseconds=i),
+                                 origens[i % series], tags)
+
+    bytes_linha = _bytes_por_instancia(gravar_linha, amostras)
+    bytes_coluna = _bytes_por_instancia(gravar_coluna, amostras)
+    linhas = [{'medida': 'bytes_por_amostra', 'linhas': bytes_linha,
+               'colunar': bytes_coluna, 'ganho_x': bytes_linha / bytes_coluna}]
+
+    def agregar_serie_linhas():
+        valores = [e.dados['valor'] for e in store.obter_eventos_por_origem(origens[0])]
+        return len(valores), sum(valores), min(valores), max(valores)
+
+    def agregar_todas_linhas():
+        acumulados: Dict[str, List[float]] = {}
+        for evento in store.obter_eventos_por_tipo(TipoEvento.METRICA_COLETADA):
+            valor = evento.dados['valor']
+            acumulado = acumulados.get(evento.origem)
+            if acumulado is None:
+                acumulados[evento.origem] = [1, valor, valor]
+            else:
+                acumulado[0] += 1
+                acumulado[1] += valor
+                if valor > acumulado[2]:
+                    acumulado[2] = valor
+        return acumulados
+
+    serie = armazem.buscar_series('cpu_usage', origem=origens[0])[0]
+    consultas = {
+        'agregar_serie_ms': (agregar_serie_linhas, lambda: armazem.agregar(serie)),
+        'agregar_todas_ms': (agregar_todas_linhas,
+                             lambda: armazem.agregar_por_serie('cpu_usage'))
+    }
+    for medida, (por_linhas, colunar) in consultas.items():
+        inicio = time.perf_counter()
+        por_linhas()
+        tempo_linhas = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        colunar()
+        tempo_colunar = time.perf_counter() - inicio
+        linhas.append({'medida': medida, 'linhas': tempo_linhas * 1000,
+                       'colunar': tempo_colunar * 1000,
+                       'ganho_x': tempo_linhas / tempo_colunar})
+
+    for linha in linhas:
+        linha['numpy'] = numpy_disponivel is not None
+    _imprimir_tabela(f"Armazém colunar ({amostras} amostras, {series} séries)", linhas)
+    return linhas
+
+
+BENCHMARKS: Dict[str, Callable[[], List[Dict[str, Any]]]] = {
+    'contencao': benchmark_contencao_event_store,
+    'memoria': benchmark_memoria_eventos,
+    'lote': benchmark_entrega_lote,
+    'circuit_breaker': benchmark_throughput_circuit_breaker,
+    'assincrono': benchmark_resiliencia_assincrona,
+    'orcamento_hedging': benchmark_orcamento_hedging,
+    'bulkhead_adaptativo': benchmark_bulkhead_adaptativo,
+    'carga': benchmark_carga_virtual,
+    'coleta': benchmark_coleta_distribuida,
+    'health_check': benchmark_agendamento_health_check,
+    'alertas': benchmark_regras_alerta,
+    'snapshot': benchmark_snapshot_query_model,
+    'colunar': benchmark_armazem_colunar,
+    'restart': benchmark_restart_persistente,
+}
+
+
+if __name__ == "__main__":
+    print("⏱️ BENCHMARKS DO SISTEMA DE MONITORAMENTO DISTRIBUÍDO")
+    print("=" * 70)
+
+    selecionados = sys.argv[1:] or list(BENCHMARKS)
+    for nome in selecionados:
+        if nome not in BENCHMARKS:
+            print(f"❌ Benchmark desconhecido: {nome} (opções: {', '.join(BENCHMARKS)})")
+            continue
+        BENCHMARKS[nome]()
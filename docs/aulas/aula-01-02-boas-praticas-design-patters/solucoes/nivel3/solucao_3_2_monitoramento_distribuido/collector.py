@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+COLETA DISTRIBUÍDA DE MÉTRICAS
+Sistema de Monitoramento Distribuído
+
+Pipeline de coleta com vários processos coletores e um único agregador:
+
+    processos coletores (N)            processo principal
+    ┌──────────────────────┐          ┌──────────────────────────────┐
+    │ threads de coleta    │  bytes   │ agregador                    │
+    │ (I/O em paralelo)    │ ───────► │ decodifica lote → EventStore │
+    │ codifica em lotes    │  Queue   │                 → EventBus   │
+    └──────────────────────┘          └──────────────────────────────┘
+
+Cada processo coleta um subconjunto dos serviços com um pequeno pool de
+threads (a coleta é dominada por I/O) e codifica as amostras em registros
+binários de tamanho fixo (struct), enviados em lotes por uma
+`multiprocessing.Queue`. Só bytes atravessam a fila: nomes de serviços e
+de métricas viram índices em tabelas conhecidas pelos dois lados, e
+nenhum EventoSistema é serializado entre processos.
+
+O agregador roda no processo dono do EventStore e do EventBus: cada lote
+recebido vira uma chamada a `adicionar_eventos` e outra a `publicar_lote`.
+
+FORMATO DO REGISTRO (little-endian, 21 bytes):
+    [timestamp_ns: int64][serviço: uint32][métrica: uint8][valor: float64]
+
+AUTOR: Prof. Jackson Antonio do Prado Lima
+"""
+
+import multiprocessing
+import os
+import queue
+import random
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Any, Callable, Tuple
+
+from instrumentation import RegistroMetricas
+from patterns import EventBus, EventoSistema, EventStore, TipoEvento
+from compact_models import de_nanossegundos
+
+
+REGISTRO_AMOSTRA = struct.Struct("<qIBd")
+
+# Espera por coletores depois do fim do agregador, antes de terminá-los
+TIMEOUT_ENCERRAMENTO_SEGUNDOS = 5.0
+
+# Métricas coletadas de cada serviço: (nome, unidade, gerador do valor simulado)
+CATALOGO_METRICAS: Tuple[Tuple[str, str, Callable[[random.Random], float]], ...] = (
+    ('cpu_usage', '%', lambda aleatorio: aleatorio.uniform(30, 95)),
+    ('memory_usage', '%', lambda aleatorio: aleatorio.uniform(40, 85)),
+    ('response_time_ms', 'ms', lambda aleatorio: float(aleatorio.randint(50, 8000))),
+    ('requests_per_second', 'req/s', lambda aleatorio: float(aleatorio.randint(10, 500))),
+    ('error_rate', '%', lambda aleatorio: aleatorio.uniform(0, 15)),
+)
+
+
+def codificar_amostras(amostras: List[Tuple[int, int, int, float]]) -> bytes:
+    """Codifica (timestamp_ns, serviço, métrica, valor) em registros contíguos"""
+    buffer = bytearray(REGISTRO_AMOSTRA.size * len(amostras))
+    for posicao, amostra in enumerate(amostras):
+        REGISTRO_AMOSTRA.pack_into(buffer, posicao * REGISTRO_AMOSTRA.size, *amostra)
+    return bytes(buffer)
+
+
+def decodificar_amostras(lote: bytes) -> Iterator[Tuple[int, int, int, float]]:
+    """Percorre os registros de um lote"""
+    return REGISTRO_AMOSTRA.iter_unpack(lote)
+
+
+def coletar_simulado(servico_id: str, aleatorio: random.Random,
+                     latencia_segundos: float = 0.005) -> List[Tuple[int, float]]:
+    """
+    Coleta simulada: uma requisição (latência de I/O) devolve todas as
+    métricas do catálogo como pares (índice da métrica, valor)
+    """
+    time.sleep(latencia_segundos)
+    return [(indice, gerador(aleatorio))
+            for indice, (_, _, gerador) in enumerate(CATALOGO_METRICAS)]
+
+
+# =============================================================================
+# PROCESSO COLETOR
+# =============================================================================
+
+def _executar_coletor(indice_coletor: int, servicos: List[Tuple[int, str]],
+                      fila, parar, rodadas: Optional[int], intervalo_segundos: float,
+                      concorrencia: int, tamanho_lote: int,
+                      funcao_coleta: Callable, semente: int) -> None:
+    """
+    Corpo de um processo coletor
+
+    Envia lotes (bytes) pela fila e, ao terminar, uma tupla
+    ('fim', índice, estatísticas). Exceções de uma coleta são contadas
+    e não interrompem as demais.
+    """
+    aleatorios = threading.local()
+    pendentes: List[Tuple[int, int, int, float]] = []
+    lock_pendentes = threading.Lock()
+    estatisticas = {'coletas': 0, 'coletas_falhadas': 0, 'lotes': 0}
+
+    def enviar(amostras: List[Tuple[int, int, int, float]]) -> None:
+        fila.put(codificar_amostras(amostras))
+        estatisticas['lotes'] += 1
+
+    def coletar(servico: Tuple[int, str]) -> None:
+        indice_servico, servico_id = servico
+        if not hasattr(aleatorios, 'gerador'):
+            aleatorios.gerador = random.Random(f"{semente}-{indice_coletor}-{threading.get_ident()}")
+        try:
+            amostras = funcao_coleta(servico_id, aleatorios.gerador)
+        except Exception:
+            with lock_pendentes:
+                estatisticas['coletas_falhadas'] += 1
+            return
+
+        timestamp_ns = time.time_ns()
+        registros = [(timestamp_ns, indice_servico, metrica, valor) for metrica, valor in amostras]
+        with lock_pendentes:
+            estatisticas['coletas'] += 1
+            pendentes.extend(registros)
+            if len(pendentes) < tamanho_lote:
+                return
+            lote = pendentes[:]
+            pendentes.clear()
+            enviar(lote)
+
+    rodada = 0
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        while not parar.is_set() and (rodadas is None or rodada < rodadas):
+            inicio = time.monotonic()
+            list(executor.map(coletar, servicos))
+            rodada += 1
+
+            # Lote parcial ao fim de cada rodada: nada fica retido entre rodadas
+            with lock_pendentes:
+                if pendentes:
+                    enviar(pendentes[:])
+                    pendentes.clear()
+
+            espera = intervalo_segundos - (time.monotonic() - inicio)
+            if espera > 0 and (rodadas is None or rodada < rodadas):
+                parar.wait(espera)
+
+    fila.put(('fim', indice_coletor, estatisticas))
+
+
+# =============================================================================
+# COLETOR DISTRIBUÍDO
+# =============================================================================
+
+class ColetorDistribuido:
+    """
+    Pool de processos coletores alimentando um EventStore e um EventBus
+
+    RESPONSABILIDADES:
+    - Distribuir os serviços entre os processos coletores
+    - Receber lotes binários e convertê-los em EventoSistema
+    - Gravar cada lote no EventStore e publicá-lo no EventBus
+    - Expor métricas de amostras, lotes e coletas falhadas
+
+    `funcao_coleta(servico_id, aleatorio)` precisa ser uma função de nível
+    de módulo (é enviada aos processos) e retornar pares
+    (índice em CATALOGO_METRICAS, valor).
+    """
+
+    def __init__(self, event_store: EventStore, event_bus: Optional[EventBus] = None,
+                 processos: Optional[int] = None, concorrencia_por_processo: int = 8,
+                 tamanho_lote: int = 500, funcao_coleta: Callable = coletar_simulado,
+                 tags: Optional[Dict[str, str]] = None, publicar_assincrono: bool = True,
+                 semente: int = 0, nome: str = "ColetorDistribuido"):
+        self.event_store = event_store
+        self.event_bus = event_bus
+        self.processos = processos or os.cpu_count() or 1
+        self.concorrencia_por_processo = concorrencia_por_processo
+        self.tamanho_lote = tamanho_lote
+        self.funcao_coleta = funcao_coleta
+        self.tags = tags if tags is not None else {'environment': 'production'}
+        self.publicar_assincrono = publicar_assincrono
+        self.semente = semente
+
+        self._contexto = multiprocessing.get_context()
+        self._fila = None
+        self._parar = None
+        self._workers: List[multiprocessing.Process] = []
+        self._agregador: Optional[threading.Thread] = None
+        self._servicos: List[str] = []
+        self._erro_lote: Optional[Exception] = None
+
+        self._instrumentacao = RegistroMetricas(nome)
+        self._amostras_recebidas = self._instrumentacao.contador('amostras_recebidas')
+        self._lotes_recebidos = self._instrumentacao.contador('lotes_recebidos')
+        self._bytes_recebidos = self._instrumentacao.contador('bytes_recebidos')
+        self._coletas = self._instrumentacao.contador('coletas')
+        self._coletas_falhadas = self._instrumentacao.contador('coletas_falhadas')
+        self._coletores_finalizados = self._instrumentacao.contador('coletores_finalizados')
+        self._lotes_falhados = self._instrumentacao.contador('lotes_falhados')
+        self._coletores_terminados = self._instrumentacao.contador('coletores_terminados')
+        self._processamento_lote = self._instrumentacao.histograma('processamento_lote')
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def iniciar(self, servicos: List[str], rodadas: Optional[int] = None,
+                intervalo_segundos: float = 1.0) -> None:
+        """
+        Inicia os processos coletores e o agregador
+
+        Com `rodadas=None`, coleta continuamente a cada
+        `intervalo_segundos` até `parar()`.
+        """
+        if self._workers:
+            raise RuntimeError("Coletor já iniciado")
+
+        self._servicos = list(servicos)
+        self._fila = self._contexto.Queue()
+        self._parar = self._contexto.Event()
+
+        processos = min(self.processos, max(1, len(self._servicos)))
+        indexados = list(enumerate(self._servicos))
+        for indice in range(processos):
+            worker = self._contexto.Process(
+                target=_executar_coletor,
+                args=(indice, indexados[indice::processos], self._fila, self._parar,
+                      rodadas, intervalo_segundos, self.concorrencia_por_processo,
+                      self.tamanho_lote, self.funcao_coleta, self.semente),
+                name=f"Coletor-{indice}",
+                daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+        self._agregador = threading.Thread(
+            target=self._agregar, args=(processos,), name="Coletor-Agregador", daemon=True
+        )
+        self._agregador.start()
+
+    def aguardar(self, timeout: Optional[float] = None) -> bool:
+        """
+        Aguarda coletores e agregador terminarem (rodadas finitas)
+
+        Coletores que não encerram em `timeout` (ou
+        TIMEOUT_ENCERRAMENTO_SEGUNDOS) depois do agregador são terminados.
+        Se algum lote falhou no agregador, lança RuntimeError com a
+        primeira falha como causa.
+        """
+        if self._agregador is not None:
+            self._agregador.join(timeout)
+            if self._agregador.is_alive():
+                return False
+        limite = time.monotonic() + (TIMEOUT_ENCERRAMENTO_SEGUNDOS if timeout is None else timeout)
+        for worker in self._workers:
+            worker.join(max(0.0, limite - time.monotonic()))
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+                self._coletores_terminados.incrementar()
+        self._workers = []
+        self._agregador = None
+
+        if self._erro_lote is not None:
+            erro, self._erro_lote = self._erro_lote, None
+            raise RuntimeError(
+                f"{self._lotes_falhados.valor} lote(s) falharam no agregador"
+            ) from erro
+        return True
+
+    def parar(self, timeout: Optional[float] = None) -> None:
+        """Interrompe a coleta contínua e processa os lotes já enviados"""
+        if self._parar is not None:
+            self._parar.set()
+        self.aguardar(timeout)
+
+    def coletar(self, servicos: List[str], rodadas: int = 1,
+                intervalo_segundos: float = 0.0) -> Dict[str, Any]:
+        """Executa um número finito de rodadas e retorna as métricas"""
+        self.iniciar(servicos, rodadas, intervalo_segundos)
+        self.aguardar()
+        return self.obter_metricas()
+
+    # ------------------------------------------------------------------
+    # Agregador
+    # ------------------------------------------------------------------
+
+    def _agregar(self, coletores: int) -> None:
+        """Consome a fila até receber o aviso de fim de todos os coletores"""
+        finalizados = 0
+        while finalizados < coletores:
+            try:
+                mensagem = self._fila.get(timeout=0.5)
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in self._workers):
+                    break  # Coletor encerrado sem aviso de fim
+                continue
+
+            if isinstance(mensagem, tuple):
+                _, _, estatisticas = mensagem
+                finalizados += 1
+                self._coletores_finalizados.incrementar()
+                self._coletas.incrementar(estatisticas['coletas'])
+                self._coletas_falhadas.incrementar(estatisticas['coletas_falhadas'])
+                continue
+
+            # Um lote com falha não interrompe o consumo: parar de drenar a
+            # fila travaria os coletores no envio dos próximos lotes
+            try:
+                self._processar_lote(mensagem)
+            except Exception as e:
+                self._lotes_falhados.incrementar()
+                if self._erro_lote is None:
+                    self._erro_lote = e
+
+    def _processar_lote(self, lote: bytes) -> None:
+        inicio = time.perf_counter_ns()
+        servicos = self._servicos
+        eventos = []
+        for timestamp_ns, servico, metrica, valor in decodificar_amostras(lote):
+            nome, unidade, _ = CATALOGO_METRICAS[metrica]
+            eventos.append(EventoSistema(
+                timestamp=de_nanossegundos(timestamp_ns),
+                tipo=TipoEvento.METRICA_COLETADA,
+                origem=servicos[servico],
+                dados={'nome': nome, 'valor': valor, 'unidade': unidade,
+                       'tags': dict(self.tags)}
+            ))
+
+        self.event_store.adicionar_eventos(eventos)
+        if self.event_bus is not None:
+            self.event_bus.publicar_lote(eventos, assincrono=self.publicar_assincrono)
+
+        self._amostras_recebidas.incrementar(len(eventos))
+        self._lotes_recebidos.incrementar()
+        self._bytes_recebidos.incrementar(len(lote))
+        self._processamento_lote.registrar_ns(time.perf_counter_ns() - inicio)
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+
+    def obter_metricas(self) -> Dict[str, Any]:
+        """Obtém métricas do pipeline de coleta"""
+        instrumentacao = self._instrumentacao.instantaneo()
+        lotes = instrumentacao['lotes_recebidos']
+        return dict(
+            instrumentacao,
+            processos=self.processos,
+            concorrencia_por_processo=self.concorrencia_por_processo,
+            servicos=len(self._servicos),
+            amostras_por_lote=instrumentacao['amostras_recebidas'] / max(1, lotes)
+        )
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+ARMAZENAMENTO COLUNAR DE MÉTRICAS
+Sistema de Monitoramento Distribuído
+
+Este módulo implementa um armazém colunar para amostras de métricas, usado
+ao lado do EventStore para análises em massa. Em vez de um EventoSistema
+(dataclass + dict de dados + dict de tags) por amostra, cada amostra ocupa
+uma posição em três colunas paralelas:
+
+- timestamp: int64 em nanossegundos desde a época
+- série:     int32 (id de série internado)
+- valor:     float64
+
+Nomes de métricas, origens e tags são internados em um dicionário de
+strings, e cada combinação (métrica, origem, tags) recebe um id de série.
+
+As colunas são `array.array` (crescem por append, ~20 bytes por amostra).
+Cada série guarda ainda as posições das suas amostras (+4 bytes por
+amostra), de modo que selecionar uma série não percorre as demais.
+Quando o NumPy está instalado, as agregações usam views `np.frombuffer`
+sobre essas colunas (sem cópia) e são vetorizadas; sem NumPy, as mesmas
+operações são feitas em Python puro.
+
+AUTOR: Prof. Jackson Antonio do Prado Lima
+"""
+
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple, Union
+
+from patterns import EventoSistema, TipoEvento
+from compact_models import NANOS_POR_SEGUNDO, para_nanossegundos
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: sem ele as agregações usam Python puro
+    np = None
+
+
+class ArmazemColunarMetricas:
+    """
+    Armazém colunar de amostras de métricas
+
+    RESPONSABILIDADES:
+    - Armazenar amostras em colunas compactas (timestamp, série, valor)
+    - Internar strings de métricas, origens e tags
+    - Oferecer agregações por série (média, máximo, taxa, média móvel)
+      e agregações de todas as séries de uma métrica de uma só vez
+    """
+
+    def __init__(self):
+        self._timestamps = array('q')
+        self._series_ids = array('i')
+        self._valores = array('d')
+
+        # Dicionário de strings internadas (string -> código e código -> string)
+        self._codigos: Dict[str, int] = {}
+        self._strings: List[str] = []
+
+        # Catálogo de séries: chave internada -> id e id -> chave
+        self._ids_series: Dict[Tuple, int] = {}
+        self._series: List[Tuple[int, int, Tuple[Tuple[int, int], ...]]] = []
+        self._posicoes_por_serie: List[array] = []  # Posições em ordem crescente
+
+        self._ordenado = True  # Timestamps em ordem crescente de inserção
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def _internar(self, texto: str) -> int:
+        codigo = self._codigos.get(texto)
+        if codigo is None:
+            codigo = self._codigos[texto] = len(self._strings)
+            self._strings.append(texto)
+        return codigo
+
+    def _obter_id_serie(self, nome_metrica: str, origem: str,
+                        tags: Optional[Dict[str, str]]) -> int:
+        chave = (
+            self._internar(nome_metrica),
+            self._internar(origem),
+            tuple(sorted((self._internar(k), self._internar(str(v)))
+                         for k, v in (tags or {}).items()))
+        )
+        id_serie = self._ids_series.get(chave)
+        if id_serie is None:
+            id_serie = self._ids_series[chave] = len(self._series)
+            self._series.append(chave)
+            self._posicoes_por_serie.append(array('I'))
+        return id_serie
+
+    def registrar(self, nome_metrica: str, valor: float,
+                  timestamp: Union[datetime, int], origem: str = "",
+                  tags: Optional[Dict[str, str]] = None) -> int:
+        """Registra uma amostra e retorna o id da série"""
+        timestamp_ns = para_nanossegundos(timestamp)
+
+        with self._lock:
+            id_serie = self._obter_id_serie(nome_metrica, origem, tags)
+            if self._timestamps and timestamp_ns < self._timestamps[-1]:
+                self._ordenado = False
+            self._posicoes_por_serie[id_serie].append(len(self._valores))
+            self._timestamps.append(timestamp_ns)
+            self._series_ids.append(id_serie)
+            self._valores.append(float(valor))
+            return id_serie
+
+    def registrar_evento(self, evento: EventoSistema) -> None:
+        """Registra um evento METRICA_COLETADA (compatível com EventBus)"""
+        if evento.tipo != TipoEvento.METRICA_COLETADA:
+            return
+
+        dados = evento.dados
+        valor = dados.get('valor')
+        if isinstance(valor, (int, float)):
+            self.registrar(dados.get('nome', ''), valor, evento.timestamp,
+                           evento.origem, dados.get('tags'))
+
+    # ------------------------------------------------------------------
+    # Catálogo
+    # ------------------------------------------------------------------
+
+    def buscar_series(self, nome_metrica: str, origem: Optional[str] = None,
+                      tags: Optional[Dict[str, str]] = None) -> List[int]:
+        """Ids das séries da métrica que casam com origem e tags (subconjunto)"""
+        with self._lock:
+            codigo_nome = self._codigos.get(nome_metrica)
+            if codigo_nome is None:
+                return []
+
+            codigo_origem = self._codigos.get(origem) if origem is not None else None
+            if origem is not None and codigo_origem is None:
+                return []
+
+            filtro_tags = set()
+            for chave, valor in (tags or {}).items():
+                par = (self._codigos.get(chave), self._codigos.get(str(valor)))
+                if None in par:
+                    return []
+                filtro_tags.add(par)
+
+            return [
+                id_serie for id_serie, (nome, orig, tags_serie) in enumerate(self._series)
+                if nome == codigo_nome
+                and (codigo_origem is None or orig == codigo_origem)
+                and filtro_tags.issubset(tags_serie)
+            ]
+
+    def descrever_serie(self, id_serie: int) -> Dict[str, Any]:
+        """Nome, origem e tags de uma série"""
+        with self._lock:
+            nome, origem, tags = self._series[id_serie]
+            return {
+                'nome': self._strings[nome],
+                'origem': self._strings[origem],
+                'tags': {self._strings[k]: self._strings[v] for k, v in tags}
+            }
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def _limites(self, desde_ns: Optional[int], ate_ns: Optional[int]) -> Tuple[int, int]:
+        """Intervalo de posições entre desde e ate (busca binária se ordenado)"""
+        if not self._ordenado:
+            return 0, len(self._timestamps)
+        inicio = bisect_left(self._timestamps, desde_ns) if desde_ns is not None else 0
+        fim = (bisect_right(self._timestamps, ate_ns) if ate_ns is not None
+               else len(self._timestamps))
+        return inicio, max(inicio, fim)
+
+    def selecionar(self, id_serie: int, desde: Optional[Union[datetime, int]] = None,
+                   ate: Optional[Union[datetime, int]] = None) -> Tuple[Any, Any]:
+        """
+        Timestamps (ns) e valores de uma série em um período
+
+        Retorna arrays NumPy quando disponível, ou listas caso contrário.
+        Os resultados são cópias: não seguram as colunas internas.
+        """
+        desde_ns = para_nanossegundos(desde) if desde is not None else None
+        ate_ns = para_nanossegundos(ate) if ate is not None else None
+
+        with self._lock:
+            inicio, fim = self._limites(desde_ns, ate_ns)
+
+            if np is not None:
+                timestamps = np.frombuffer(self._timestamps, dtype=np.int64)[inicio:fim]
+                ids = np.frombuffer(self._series_ids, dtype=np.int32)[inicio:fim]
+                valores = np.frombuffer(self._valores, dtype=np.float64)[inicio:fim]
+
+                mascara = ids == id_serie
+                if not self._ordenado:
+                    if desde_ns is not None:
+                        mascara &= timestamps >= desde_ns
+                    if ate_ns is not None:
+                        mascara &= timestamps <= ate_ns
+                return timestamps[mascara], valores[mascara]
+
+            if not 0 <= id_serie < len(self._posicoes_por_serie):
+                return [], []
+            posicoes = self._posicoes_por_serie[id_serie]
+            timestamps_col, valores_col = self._timestamps, self._valores
+            if self._ordenado:
+                # Posições da série dentro de [inicio, fim): basta um slice
+                posicoes = posicoes[bisect_left(posicoes, inicio):bisect_left(posicoes, fim)]
+                return ([timestamps_col[p] for p in posicoes],
+                        [valores_col[p] for p in posicoes])
+
+            selecao_ts: List[int] = []
+            selecao_valores: List[float] = []
+            for posicao in posicoes:
+                timestamp_ns = timestamps_col[posicao]
+                if desde_ns is not None and timestamp_ns < desde_ns:
+                    continue
+                if ate_ns is not None and timestamp_ns > ate_ns:
+                    continue
+                selecao_ts.append(timestamp_ns)
+                selecao_valores.append(valores_col[posicao])
+            return selecao_ts, selecao_valores
+
+    def agregar(self, id_serie: int, desde: Optional[Union[datetime, int]] = None,
+                ate: Optional[Union[datetime, int]] = None) -> Optional[Dict[str, float]]:
+        """count, soma, média, mínimo e máximo de uma série"""
+        _, valores = self.selecionar(id_serie, desde, ate)
+        if len(valores) == 0:
+            return None
+
+        if np is not None:
+            soma = float(valores.sum())
+            return {
+                'count': int(valores.size),
+                'soma': soma,
+                'media': soma / valores.size,
+                'min': float(valores.min()),
+                'max': float(valores.max())
+            }
+
+        soma = sum(valores)
+        return {
+            'count': len(valores),
+            'soma': soma,
+            'media': soma / len(valores),
+            'min': min(valores),
+            'max': max(valores)
+        }
+
+    def taxa(self, id_serie: int, desde: Optional[Union[datetime, int]] = None,
+             ate: Optional[Union[datetime, int]] = None) -> Optional[float]:
+        """
+        Taxa média de variação por segundo (para métricas contadoras)
+
+        Soma apenas as variações não negativas entre amostras
+        consecutivas: uma queda é tratada como reset do contador, e não
+        como variação negativa.
+        """
+        timestamps, valores = self.selecionar(id_serie, desde, ate)
+        if len(valores) < 2:
+            return None
+
+        if np is not None:
+            ordem = np.argsort(timestamps, kind='stable')
+            timestamps, valores = timestamps[ordem], valores[ordem]
+            delta_t = int(timestamps[-1] - timestamps[0])
+            deltas = np.diff(valores)
+            delta_v = float(deltas[deltas >= 0].sum())
+        else:
+            pares = sorted(zip(timestamps, valores), key=lambda par: par[0])
+            delta_t = pares[-1][0] - pares[0][0]
+            delta_v = sum(max(0.0, atual[1] - anterior[1])
+                          for anterior, atual in zip(pares, pares[1:]))
+
+        if delta_t <= 0:
+            return None
+        return delta_v / (delta_t / NANOS_POR_SEGUNDO)
+
+    def media_movel(self, id_serie: int, janela: int,
+                    desde: Optional[Union[datetime, int]] = None,
+                    ate: Optional[Union[datetime, int]] = None) -> List[float]:
+        """Média móvel simples sobre as últimas `janela` amostras"""
+        if janela <= 0:
+            raise ValueError("Janela deve ser positiva")
+
+        _, valores = self.selecionar(id_serie, desde, ate)
+        if len(valores) < janela:
+            return []
+
+        if np is not None:
+            acumulado = np.cumsum(np.concatenate(([0.0], valores)))
+            return ((acumulado[janela:] - acumulado[:-janela]) / janela).tolist()
+
+        medias = []
+        soma = sum(valores[:janela])
+        medias.append(soma / janela)
+        for posicao in range(janela, len(valores)):
+            soma += valores[posicao] - valores[posicao - janela]
+            medias.append(soma / janela)
+        return medias
+
+    def agregar_por_serie(self, nome_metrica: str) -> Dict[int, Dict[str, float]]:
+        """count/soma/média/máximo de todas as séries de uma métrica"""
+        ids_alvo = set(self.buscar_series(nome_metrica))
+        if not ids_alvo:
+            return {}
+
+        with self._lock:
+            if np is not None:
+                ids = np.frombuffer(self._series_ids, dtype=np.int32)
+                valores = np.frombuffer(self._valores, dtype=np.float64)
+                total_series = len(self._series)
+                contagens = np.bincount(ids, minlength=total_series)
+                somas = np.bincount(ids, weights=valores, minlength=total_series)
+                maximos = np.full(total_series, -np.inf)
+                np.maximum.at(maximos, ids, valores)
+                return {
+                    id_serie: {
+                        'count': int(contagens[id_serie]),
+                        'soma': float(somas[id_serie]),
+                        'media': float(somas[id_serie] / contagens[id_serie]),
+                        'max': float(maximos[id_serie])
+                    }
+                    for id_serie in ids_alvo if contagens[id_serie]
+                }
+
+            acumulados: Dict[int, List[float]] = {}
+            for id_serie, valor in zip(self._series_ids, self._valores):
+                if id_serie not in ids_alvo:
+                    continue
+                acumulado = acumulados.get(id_serie)
+                if acumulado is None:
+                    acumulados[id_serie] = [1, valor, valor]
+                else:
+                    acumulado[0] += 1
+                    acumulado[1] += valor
+                    if valor > acumulado[2]:
+                        acumulado[2] = valor
+            return {
+                id_serie: {
+                    'count': count,
+                    'soma': soma,
+                    'media': soma / count,
+                    'max': maximo
+                }
+                for id_serie, (count, soma, maximo) in acumulados.items()
+            }
+
+    # ------------------------------------------------------------------
+    # Métricas do armazém
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._valores)
+
+    def obter_metricas(self) -> Dict[str, Any]:
+        """Tamanho do armazém e memória ocupada pelas colunas"""
+        with self._lock:
+            bytes_colunas = sum(
+                coluna.buffer_info()[1] * coluna.itemsize
+                for coluna in (self._timestamps, self._series_ids, self._valores)
+            )
+            total = len(self._valores)
+            return {
+                'total_amostras': total,
+                'total_series': len(self._series),
+                'strings_internadas': len(self._strings),
+                'bytes_colunas': bytes_colunas,
+                'bytes_por_amostra': bytes_colunas / total if total else 0.0,
+                'numpy': np is not None
+            }
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+MODELOS COMPACTOS
+Sistema de Monitoramento Distribuído
+
+Variantes compactas de EventoSistema, Metrica, Alerta e Servico para
+cenários com milhões de instâncias em memória:
+
+- `__slots__` em vez de `__dict__` por instância
+- ids inteiros sequenciais em vez de strings UUID
+- timestamps como inteiros (epoch em nanossegundos) em vez de `datetime`
+- `origem` internada (uma única string por origem distinta)
+- `tipo`/`severidade`/`status` guardados como referência ao membro do Enum
+
+Os atributos `id`, `timestamp`, `tipo` etc. continuam acessíveis com os
+mesmos nomes e tipos das classes originais (via properties), de modo que
+EventStore, QueryModel e handlers funcionam sem alterações.
+
+AUTOR: Prof. Jackson Antonio do Prado Lima
+"""
+
+import itertools
+import sys
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, Optional, Any, Union
+
+from patterns import (
+    EventoSistema, TipoEvento, SeveridadeAlerta, StatusServico,
+    MAX_METRICAS_POR_SERVICO, NANOS_POR_SEGUNDO, de_nanossegundos, para_nanossegundos
+)
+
+# next() em itertools.count é atômico no CPython: ids únicos entre threads
+_sequencia_ids = itertools.count(1)
+
+
+def proximo_id() -> int:
+    """Próximo id inteiro sequencial do processo"""
+    return next(_sequencia_ids)
+
+
+class EventoCompacto:
+    """
+    Evento imutável compacto, compatível com EventoSistema
+
+    `id` é exposto como string (como no EventoSistema); o valor inteiro
+    fica em `id_numerico`. `timestamp` cria o datetime a cada acesso, sem
+    guardá-lo; o EventStore indexa `timestamp_ns` diretamente.
+    """
+
+    __slots__ = ('id_numerico', 'timestamp_ns', 'tipo', 'origem', 'dados', 'versao')
+
+    def __init__(self, id_numerico: Optional[int] = None,
+                 timestamp_ns: Optional[int] = None,
+                 tipo: TipoEvento = TipoEvento.METRICA_COLETADA,
+                 origem: str = "",
+                 dados: Optional[Dict[str, Any]] = None,
+                 versao: int = 1):
+        atribuir = object.__setattr__
+        atribuir(self, 'id_numerico', id_numerico if id_numerico is not None else proximo_id())
+        atribuir(self, 'timestamp_ns', timestamp_ns if timestamp_ns is not None else time.time_ns())
+        atribuir(self, 'tipo', tipo)
+        atribuir(self, 'origem', sys.intern(origem))
+        atribuir(self, 'dados', dados if dados is not None else {})
+        atribuir(self, 'versao', versao)
+
+    def __setattr__(self, nome, valor):
+        raise AttributeError(f"EventoCompacto é imutável: não é possível alterar '{nome}'")
+
+    @property
+    def id(self) -> str:
+        return str(self.id_numerico)
+
+    @property
+    def timestamp(self) -> datetime:
+        return de_nanossegundos(self.timestamp_ns)
+
+    @classmethod
+    def de_evento(cls, evento: EventoSistema) -> 'EventoCompacto':
+        """Converte um EventoSistema (o id UUID é substituído por um sequencial)"""
+        return cls(
+            timestamp_ns=para_nanossegundos(evento.timestamp),
+            tipo=evento.tipo,
+            origem=evento.origem,
+            dados=evento.dados,
+            versao=evento.versao
+        )
+
+    def para_evento(self) -> EventoSistema:
+        """Converte para EventoSistema"""
+        return EventoSistema(
+            id=self.id,
+            timestamp=self.timestamp,
+            tipo=self.tipo,
+            origem=self.origem,
+            dados=self.dados,
+            versao=self.versao
+        )
+
+    def __eq__(self, outro) -> bool:
+        if not isinstance(outro, EventoCompacto):
+            return NotImplemented
+        return all(getattr(self, campo) == getattr(outro, campo) for campo in self.__slots__)
+
+    def __hash__(self) -> int:
+        return hash(self.id_numerico)
+
+    def __repr__(self) -> str:
+        return (f"EventoCompacto(id={self.id_numerico}, timestamp={self.timestamp}, "
+                f"tipo={self.tipo}, origem={self.origem!r}, dados={self.dados!r}, "
+                f"versao={self.versao})")
+
+
+class MetricaCompacta:
+    """Value Object compacto para métricas, compatível com Metrica"""
+
+    __slots__ = ('nome', 'valor', 'unidade', 'timestamp_ns', 'tags')
+
+    def __init__(self, nome: str, valor: Union[int, float, str], unidade: str,
+                 timestamp: Optional[Union[datetime, int]] = None,
+                 tags: Optional[Dict[str, str]] = None):
+        if isinstance(valor, (int, float)) and valor < 0:
+            raise ValueError("Métricas numéricas não podem ser negativas")
+
+        self.nome = sys.intern(nome)
+        self.valor = valor
+        self.unidade = sys.intern(unidade)
+        self.timestamp_ns = (para_nanossegundos(timestamp) if timestamp is not None
+                             else time.time_ns())
+        self.tags = tags if tags is not None else {}
+
+    @property
+    def timestamp(self) -> datetime:
+        return de_nanossegundos(self.timestamp_ns)
+
+    @timestamp.setter
+    def timestamp(self, valor: datetime) -> None:
+        self.timestamp_ns = para_nanossegundos(valor)
+
+    def __repr__(self) -> str:
+        return (f"MetricaCompacta(nome={self.nome!r}, valor={self.valor!r}, "
+                f"unidade={self.unidade!r}, timestamp={self.timestamp})")
+
+
+class AlertaCompacto:
+    """Entidade de alerta compacta, compatível com Alerta"""
+
+    __slots__ = ('id_numerico', 'titulo', 'descricao', 'severidade', 'origem',
+                 'timestamp_ns', 'resolvido', 'timestamp_resolucao_ns', 'metadados')
+
+    def __init__(self, id_numerico: Optional[int] = None, titulo: str = "",
+                 descricao: str = "",
+                 severidade: SeveridadeAlerta = SeveridadeAlerta.INFO,
+                 origem: str = "",
+                 timestamp: Optional[Union[datetime, int]] = None,
+                 resolvido: bool = False,
+                 timestamp_resolucao: Optional[Union[datetime, int]] = None,
+                 metadados: Optional[Dict[str, Any]] = None):
+        self.id_numerico = id_numerico if id_numerico is not None else proximo_id()
+        self.titulo = titulo
+        self.descricao = descricao
+        self.severidade = severidade
+        self.origem = sys.intern(origem)
+        self.timestamp_ns = (para_nanossegundos(timestamp) if timestamp is not None
+                             else time.time_ns())
+        self.resolvido = resolvido
+        self.timestamp_resolucao_ns = (para_nanossegundos(timestamp_resolucao)
+                                       if timestamp_resolucao is not None else None)
+        self.metadados = metadados if metadados is not None else {}
+
+    @property
+    def id(self) -> str:
+        return str(self.id_numerico)
+
+    @property
+    def timestamp(self) -> datetime:
+        return de_nanossegundos(self.timestamp_ns)
+
+    @timestamp.setter
+    def timestamp(self, valor: datetime) -> None:
+        self.timestamp_ns = para_nanossegundos(valor)
+
+    @property
+    def timestamp_resolucao(self) -> Optional[datetime]:
+        if self.timestamp_resolucao_ns is None:
+            return None
+        return de_nanossegundos(self.timestamp_resolucao_ns)
+
+    @timestamp_resolucao.setter
+    def timestamp_resolucao(self, valor: Optional[datetime]) -> None:
+        self.timestamp_resolucao_ns = para_nanossegundos(valor) if valor is not None else None
+
+    def __repr__(self) -> str:
+        return (f"AlertaCompacto(id={self.id_numerico}, titulo={self.titulo!r}, "
+                f"severidade={self.severidade}, origem={self.origem!r}, "
+                f"resolvido={self.resolvido})")
+
+
+class ServicoCompacto:
+    """Entidade de serviço monitorado compacta, compatível com Servico"""
+
+    __slots__ = ('id', 'nome', 'url', 'status', 'ultima_verificacao_ns',
+                 'tempo_resposta_ms', 'taxa_erro', 'metricas', 'alertas_ativos',
+                 'configuracao')
+
+    def __init__(self, id: str = "", nome: str = "", url: str = "",
+                 status: StatusServico = StatusServico.INICIANDO,
+                 ultima_verificacao: Optional[Union[datetime, int]] = None,
+                 tempo_resposta_ms: float = 0.0, taxa_erro: float = 0.0,
+                 configuracao: Optional[Dict[str, Any]] = None):
+        self.id = sys.intern(id)
+        self.nome = nome
+        self.url = url
+        self.status = status
+        self.ultima_verificacao_ns = (para_nanossegundos(ultima_verificacao)
+                                      if ultima_verificacao is not None else time.time_ns())
+        self.tempo_resposta_ms = tempo_resposta_ms
+        self.taxa_erro = taxa_erro
+        self.metricas = deque(maxlen=MAX_METRICAS_POR_SERVICO)
+        self.alertas_ativos = []
+        self.configuracao = configuracao if configuracao is not None else {}
+
+    @property
+    def ultima_verificacao(self) -> datetime:
+        return de_nanossegundos(self.ultima_verificacao_ns)
+
+    @ultima_verificacao.setter
+    def ultima_verificacao(self, valor: datetime) -> None:
+        self.ultima_verificacao_ns = para_nanossegundos(valor)
+
+    def __repr__(self) -> str:
+        return (f"ServicoCompacto(id={self.id!r}, nome={self.nome!r}, "
+                f"status={self.status}, metricas={len(self.metricas)})")
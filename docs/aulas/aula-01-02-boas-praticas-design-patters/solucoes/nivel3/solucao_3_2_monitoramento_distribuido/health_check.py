@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+HEALTH CHECK AGENDADO
+Sistema de Monitoramento Distribuído
+
+Motor de health check que sonda periodicamente os serviços registrados e
+publica SISTEMA_INDISPONIVEL / SISTEMA_RECUPERADO apenas nas transições,
+alimentando o QueryModel pelo mesmo caminho dos demais eventos.
+
+AGENDAMENTO:
+Os próximos disparos ficam em uma timer wheel hierárquica
+(RodaTemporizacao): agendar e cancelar são O(1), e avançar o relógio
+custa O(1) por tick mais os temporizadores vencidos. O custo de
+agendamento por sonda é o mesmo com 10 ou 10.000 serviços, ao contrário
+de varrer todos os serviços a cada ciclo.
+
+EXECUÇÃO:
+Cada sonda adquire uma vaga de um RecursoBulkhead (limita sondas
+simultâneas) e roda dentro do CircuitBreaker do serviço: com o circuito
+aberto, o serviço não é sondado até o timeout de recuperação.
+
+AUTOR: Prof. Jackson Antonio do Prado Lima
+"""
+
+import math
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Callable
+
+from instrumentation import RELOGIO_SISTEMA, RegistroMetricas, Relogio
+from patterns import (
+    BulkheadTimeoutException, CircuitBreaker, CircuitBreakerAbertoException, EventBus,
+    EventoSistema, EventStore, RecursoBulkhead, Servico, StatusServico, TipoEvento
+)
+
+
+# =============================================================================
+# TIMER WHEEL HIERÁRQUICA
+# =============================================================================
+
+# Tolerância na conversão instante → tick: somas de ponto flutuante
+# (0.1 + 0.2 + ...) não podem empurrar um disparo para o tick seguinte
+_TOLERANCIA_TICK = 1e-6
+
+class Temporizador:
+    """Disparo agendado em uma RodaTemporizacao"""
+
+    __slots__ = ('expira_tick', 'item', 'cancelado')
+
+    def __init__(self, expira_tick: int, item: Any):
+        self.expira_tick = expira_tick
+        self.item = item
+        self.cancelado = False
+
+
+class RodaTemporizacao:
+    """
+    Timer wheel hierárquica (Varghese & Lauck)
+
+    `niveis` rodas de 2**bits_por_nivel slots. O nível 0 tem um slot por
+    tick de `resolucao_segundos`; cada slot do nível N cobre um giro
+    completo do nível N-1. Um temporizador entra no nível mais baixo que
+    alcança seu vencimento e desce de nível (cascata) quando o nível
+    inferior completa um giro.
+
+    - agendar: O(1) (cálculo do nível e append no slot)
+    - cancelar: O(1) (marcação; o slot descarta na passagem)
+    - avancar: O(1) por tick, mais os temporizadores vencidos/em cascata
+
+    Com os valores padrão (0,1 s, 4 níveis de 64 slots) o horizonte é de
+    64**4 ticks (~19 dias); vencimentos além disso são limitados a ele.
+    Não é thread-safe: o chamador sincroniza.
+    """
+
+    def __init__(self, resolucao_segundos: float = 0.1, bits_por_nivel: int = 6,
+                 niveis: int = 4, inicio: float = 0.0):
+        self.resolucao = resolucao_segundos
+        self._bits = bits_por_nivel
+        self._mascara = (1 << bits_por_nivel) - 1
+        self._niveis: List[List[List[Temporizador]]] = [
+            [[] for _ in range(1 << bits_por_nivel)] for _ in range(niveis)
+        ]
+        self._horizonte = (1 << (bits_por_nivel * niveis)) - 1
+        self._inicio = inicio
+        self._proximo_tick = 0
+        self.pendentes = 0
+
+    def agendar(self, instante: float, item: Any) -> Temporizador:
+        """Agenda `item` para o instante (mesma escala do `inicio`)"""
+        expira = math.ceil((instante - self._inicio) / self.resolucao - _TOLERANCIA_TICK)
+        temporizador = Temporizador(max(expira, self._proximo_tick), item)
+        self._inserir(temporizador)
+        self.pendentes += 1
+        return temporizador
+
+    def cancelar(self, temporizador: Temporizador) -> None:
+        if not temporizador.cancelado:
+            temporizador.cancelado = True
+            self.pendentes -= 1
+
+    def _inserir(self, temporizador: Temporizador) -> None:
+        delta = temporizador.expira_tick - self._proximo_tick
+        if delta > self._horizonte:
+            temporizador.expira_tick = self._proximo_tick + self._horizonte
+            delta = self._horizonte
+
+        nivel = max(0, delta.bit_length() - 1) // self._bits
+        slot = (temporizador.expira_tick >> (self._bits * nivel)) & self._mascara
+        self._niveis[nivel][slot].append(temporizador)
+
+    def avancar(self, instante: float) -> List[Any]:
+        """Processa os ticks até `instante` e retorna os itens vencidos"""
+        alvo = math.floor((instante - self._inicio) / self.resolucao + _TOLERANCIA_TICK)
+        vencidos: List[Any] = []
+
+        if not self.pendentes:
+            # Roda vazia: nada a percorrer, só acompanhar o relógio
+            self._proximo_tick = max(self._proximo_tick, alvo + 1)
+            return vencidos
+
+        while self._proximo_tick <= alvo:
+            self._processar_tick(self._proximo_tick, vencidos)
+            self._proximo_tick += 1
+        return vencidos
+
+    def _processar_tick(self, tick: int, vencidos: List[Any]) -> None:
+        indice = tick & self._mascara
+        if indice == 0:
+            # Nível 0 completou um giro: descer o slot corrente dos níveis acima
+            for nivel in range(1, len(self._niveis)):
+                indice_nivel = (tick >> (self._bits * nivel)) & self._mascara
+                slot = self._niveis[nivel][indice_nivel]
+                self._niveis[nivel][indice_nivel] = []
+                for temporizador in slot:
+                    if not temporizador.cancelado:
+                        self._inserir(temporizador)
+                if indice_nivel != 0:
+                    break
+
+        slot = self._niveis[0][indice]
+        if slot:
+            self._niveis[0][indice] = []
+            for temporizador in slot:
+                if not temporizador.cancelado:
+                    temporizador.cancelado = True  # Disparado: cancelar vira no-op
+                    self.pendentes -= 1
+                    vencidos.append(temporizador.item)
+
+
+# =============================================================================
+# MOTOR DE HEALTH CHECK
+# =============================================================================
+
+@dataclass
+class VerificacaoServico:
+    """Estado do health check de um serviço registrado"""
+    servico: Servico
+    sonda: Callable[[], Any]
+    intervalo_segundos: float
+    circuit_breaker: CircuitBreaker
+    disponivel: bool = True
+    falhas_consecutivas: int = 0
+    sucessos_consecutivos: int = 0
+    indisponivel_desde: Optional[float] = None
+    proxima_em: float = 0.0
+    temporizador: Optional[Temporizador] = field(default=None, repr=False)
+    ativa: bool = True
+
+
+class MotorHealthCheck:
+    """
+    Health check periódico com timer wheel, CircuitBreaker e Bulkhead
+
+    RESPONSABILIDADES:
+    - Manter o próximo disparo de cada serviço na RodaTemporizacao
+    - Executar as sondas através do RecursoBulkhead e do CircuitBreaker
+    - Detectar transições com histerese (`falhas_para_indisponivel`,
+      `sucessos_para_recuperar`) e publicar eventos só nelas
+    - Atualizar status e última verificação das instâncias de Servico
+
+    O próximo disparo é agendado quando a sonda termina, de modo que um
+    serviço nunca tem duas sondas simultâneas. O primeiro disparo de cada
+    serviço é espalhado aleatoriamente dentro do intervalo.
+
+    `iniciar()` roda o agendador em uma thread (sondas em um pool de
+    threads); `executar_pendentes()` executa as sondas vencidas no
+    thread chamador, útil com um relógio virtual.
+    """
+
+    def __init__(self, event_store: Optional[EventStore] = None,
+                 event_bus: Optional[EventBus] = None,
+                 bulkhead: Optional[RecursoBulkhead] = None,
+                 max_sondas_simultaneas: int = 32,
+                 resolucao_segundos: float = 0.1,
+                 falhas_para_indisponivel: int = 2,
+                 sucessos_para_recuperar: int = 2,
+                 threshold_falhas_circuito: int = 3,
+                 timeout_circuito_segundos: int = 30,
+                 timeout_bulkhead_segundos: float = 1.0,
+                 relogio: Optional[Relogio] = None,
+                 semente: Optional[int] = None):
+        self.event_store = event_store
+        self.event_bus = event_bus
+        self.relogio = relogio or RELOGIO_SISTEMA
+        self.max_sondas_simultaneas = max_sondas_simultaneas
+        self.bulkhead = bulkhead or RecursoBulkhead(
+            "health-check", max_sondas_simultaneas, relogio=self.relogio
+        )
+        self.falhas_para_indisponivel = falhas_para_indisponivel
+        self.sucessos_para_recuperar = sucessos_para_recuperar
+        self.threshold_falhas_circuito = threshold_falhas_circuito
+        self.timeout_circuito_segundos = timeout_circuito_segundos
+        self.timeout_bulkhead_segundos = timeout_bulkhead_segundos
+
+        self._roda = RodaTemporizacao(resolucao_segundos, inicio=self.relogio.monotonico())
+        self._verificacoes: Dict[str, VerificacaoServico] = {}
+        self._lock = threading.Lock()
+        self._aleatorio = random.Random(semente)
+
+        self._parar = threading.Event()
+        self._agendador: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # Métricas
+        self._instrumentacao = RegistroMetricas("health-check")
+        self._sondas_executadas = self._instrumentacao.contador('sondas_executadas')
+        self._sondas_falhadas = self._instrumentacao.contador('sondas_falhadas')
+        self._sondas_rejeitadas = self._instrumentacao.contador('sondas_rejeitadas_circuito')
+        self._sondas_adiadas = self._instrumentacao.contador('sondas_adiadas_bulkhead')
+        self._transicoes = self._instrumentacao.contador('transicoes')
+        self._atraso_agendamento = self._instrumentacao.histograma('atraso_agendamento')
+        self._duracao_sonda = self._instrumentacao.histograma('duracao_sonda')
+
+    # ------------------------------------------------------------------
+    # Registro
+    # ------------------------------------------------------------------
+
+    def registrar(self, servico: Servico, sonda: Callable[[], Any],
+                  intervalo_segundos: float = 10.0,
+                  circuit_breaker: Optional[CircuitBreaker] = None) -> VerificacaoServico:
+        """
+        Registra (ou substitui) o health check de um serviço
+
+        `sonda()` deve lançar uma exceção quando o serviço não está
+        saudável; o valor retornado é ignorado.
+        """
+        verificacao = VerificacaoServico(
+            servico=servico,
+            sonda=sonda,
+            intervalo_segundos=intervalo_segundos,
+            circuit_breaker=circuit_breaker or CircuitBreaker(
+                threshold_falhas=self.threshold_falhas_circuito,
+                timeout_segundos=self.timeout_circuito_segundos,
+                nome=f"health-{servico.id}",
+                relogio=self.relogio
+            )
+        )
+
+        with self._lock:
+            anterior = self._verificacoes.get(servico.id)
+            if anterior is not None:
+                self._desativar(anterior)
+            self._verificacoes[servico.id] = verificacao
+            self._agendar(verificacao, self._aleatorio.uniform(0, intervalo_segundos))
+        return verificacao
+
+    def remover(self, servico_id: str) -> bool:
+        """Remove o health check de um serviço"""
+        with self._lock:
+            verificacao = self._verificacoes.pop(servico_id, None)
+            if verificacao is None:
+                return False
+            self._desativar(verificacao)
+            return True
+
+    def _desativar(self, verificacao: VerificacaoServico) -> None:
+        """Cancela o próximo disparo (lock adquirido)"""
+        verificacao.ativa = False
+        if verificacao.temporizador is not None:
+            self._roda.cancelar(verificacao.temporizador)
+
+    def _agendar(self, verificacao: VerificacaoServico, atraso_segundos: float) -> None:
+        """Agenda a próxima sonda do serviço (lock adquirido)"""
+        verificacao.proxima_em = self.relogio.monotonico() + atraso_segundos
+        verificacao.temporizador = self._roda.agendar(verificacao.proxima_em, verificacao)
+
+    # ------------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------------
+
+    def _vencidas(self) -> List[VerificacaoServico]:
+        with self._lock:
+            return self._roda.avancar(self.relogio.monotonico())
+
+    def executar_pendentes(self) -> int:
+        """Executa no thread atual as sondas vencidas; retorna quantas"""
+        vencidas = self._vencidas()
+        for verificacao in vencidas:
+            self._sondar(verificacao)
+        return len(vencidas)
+
+    def iniciar(self) -> None:
+        """Inicia o agendador em segundo plano"""
+        if self._agendador is not None:
+            return
+        self._parar.clear()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_sondas_simultaneas, thread_name_prefix="HealthCheck"
+        )
+        self._agendador = threading.Thread(
+            target=self._executar_agendador, name="HealthCheck-Agendador", daemon=True
+        )
+        self._agendador.start()
+
+    def parar(self) -> None:
+        """Para o agendador e aguarda as sondas em andamento"""
+        self._parar.set()
+        if self._agendador is not None:
+            self._agendador.join()
+            self._agendador = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _executar_agendador(self) -> None:
+        while not self._parar.wait(self._roda.resolucao):
+            for verificacao in self._vencidas():
+                self._executor.submit(self._sondar, verificacao)
+
+    def _sondar(self, verificacao: VerificacaoServico) -> None:
+        """Executa uma sonda e reagenda a próxima"""
+        if not verificacao.ativa:
+            return
+
+        agora = self.relogio.monotonico()
+        self._atraso_agendamento.registrar_ns(
+            int((agora - verificacao.proxima_em) * 1_000_000_000)
+        )
+
+        inicio = self.relogio.monotonico_ns()
+        motivo = None
+        try:
+            with self.bulkhead.adquirir_recurso(self.timeout_bulkhead_segundos):
+                verificacao.circuit_breaker.executar(verificacao.sonda)
+            sucesso = True
+        except BulkheadTimeoutException:
+            # Saturação local, não evidência sobre o serviço: só reagendar
+            self._sondas_adiadas.incrementar()
+            sucesso = None
+        except CircuitBreakerAbertoException:
+            self._sondas_rejeitadas.incrementar()
+            sucesso, motivo = False, 'circuito_aberto'
+        except Exception as e:
+            sucesso, motivo = False, f"{type(e).__name__}: {e}"
+        duracao_ns = self.relogio.monotonico_ns() - inicio
+
+        transicao = None
+        with self._lock:
+            if sucesso is not None:
+                self._sondas_executadas.incrementar()
+                self._duracao_sonda.registrar_ns(duracao_ns)
+                transicao = self._registrar_resultado(verificacao, sucesso, duracao_ns)
+            if verificacao.ativa:
+                self._agendar(verificacao, verificacao.intervalo_segundos)
+
+        if transicao is not None:
+            self._emitir(verificacao, transicao, motivo)
+
+    def _registrar_resultado(self, verificacao: VerificacaoServico, sucesso: bool,
+                             duracao_ns: int) -> Optional[TipoEvento]:
+        """Atualiza contadores e status; retorna o evento da transição (lock adquirido)"""
+        servico = verificacao.servico
+        servico.ultima_verificacao = self.relogio.agora()
+
+        if sucesso:
+            servico.tempo_resposta_ms = duracao_ns / 1_000_000
+            verificacao.sucessos_consecutivos += 1
+            verificacao.falhas_consecutivas = 0
+            if verificacao.disponivel:
+                if servico.status == StatusServico.INICIANDO:
+                    servico.status = StatusServico.ATIVO
+                return None
+            if verificacao.sucessos_consecutivos < self.sucessos_para_recuperar:
+                return None
+            verificacao.disponivel = True
+            servico.status = StatusServico.ATIVO
+            return TipoEvento.SISTEMA_RECUPERADO
+
+        self._sondas_falhadas.incrementar()
+        verificacao.falhas_consecutivas += 1
+        verificacao.sucessos_consecutivos = 0
+        if not verificacao.disponivel:
+            return None
+        if verificacao.falhas_consecutivas < self.falhas_para_indisponivel:
+            return None
+        verificacao.disponivel = False
+        verificacao.indisponivel_desde = self.relogio.monotonico()
+        servico.status = StatusServico.INDISPONIVEL
+        return TipoEvento.SISTEMA_INDISPONIVEL
+
+    def _emitir(self, verificacao: VerificacaoServico, tipo: TipoEvento,
+                motivo: Optional[str]) -> None:
+        """Grava e publica o evento de transição"""
+        self._transicoes.incrementar()
+        if tipo == TipoEvento.SISTEMA_INDISPONIVEL:
+            dados = {
+                'motivo': motivo,
+                'falhas_consecutivas': verificacao.falhas_consecutivas,
+                'detectado_por': 'health_check'
+            }
+        else:
+            dados = {
+                'sucessos_consecutivos': verificacao.sucessos_consecutivos,
+                'tempo_indisponibilidade_segundos': round(
+                    self.relogio.monotonico() - (verificacao.indisponivel_desde or 0.0), 3
+                ),
+                'tempo_resposta_ms': verificacao.servico.tempo_resposta_ms,
+                'detectado_por': 'health_check'
+            }
+
+        evento = EventoSistema(tipo=tipo, origem=verificacao.servico.id,
+                               timestamp=self.relogio.agora(), dados=dados)
+        if self.event_store is not None:
+            self.event_store.adicionar_evento(evento)
+        if self.event_bus is not None:
+            self.event_bus.publicar(evento)
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+
+    def obter_metricas(self) -> Dict[str, Any]:
+        """Obtém métricas do motor de health check"""
+        instrumentacao = self._instrumentacao.instantaneo()
+        with self._lock:
+            registradas = len(self._verificacoes)
+            indisponiveis = sum(1 for v in self._verificacoes.values() if not v.disponivel)
+            pendentes = self._roda.pendentes
+
+        return {
+            'servicos_registrados': registradas,
+            'servicos_indisponiveis': indisponiveis,
+            'temporizadores_pendentes': pendentes,
+            'resolucao_segundos': self._roda.resolucao,
+            'sondas_executadas': instrumentacao['sondas_executadas'],
+            'sondas_falhadas': instrumentacao['sondas_falhadas'],
+            'sondas_rejeitadas_circuito': instrumentacao['sondas_rejeitadas_circuito'],
+            'sondas_adiadas_bulkhead': instrumentacao['sondas_adiadas_bulkhead'],
+            'transicoes': instrumentacao['transicoes'],
+            'atraso_agendamento_ms': instrumentacao['atraso_agendamento_ms'],
+            'duracao_sonda_ms': instrumentacao['duracao_sonda_ms']
+        }
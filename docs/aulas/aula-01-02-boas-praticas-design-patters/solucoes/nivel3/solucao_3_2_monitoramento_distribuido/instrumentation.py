@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+INSTRUMENTAÇÃO
+Sistema de Monitoramento Distribuído
+
+Primitivas de métricas compartilhadas pelos padrões de resiliência
+(EventBus, CircuitBreaker, RetryExecutor, RecursoBulkhead):
+
+- ContadorDistribuido: uma célula por thread, somadas na leitura
+- Medidor: valor instantâneo (gauge) com máximo observado
+- HistogramaLatencia: durações em nanossegundos, um histograma
+  logarítmico por thread, mesclados na leitura
+- RegistroMetricas: agrupa as métricas de um componente
+- Relogio: fonte de tempo dos componentes, substituível por um relógio
+  virtual em simulações (ver load_generator.py)
+
+O caminho de escrita não disputa locks entre threads: cada thread
+escreve apenas na própria célula. O custo de agregação fica na leitura
+(`obter_metricas`), que é rara.
+
+AUTOR: Prof. Jackson Antonio do Prado Lima
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple
+
+from aggregation import HistogramaLogaritmico
+
+
+NANOS_POR_MILISSEGUNDO = 1_000_000
+
+
+class Relogio:
+    """
+    Fonte de tempo dos padrões de resiliência (relógio do sistema)
+
+    Componentes que recebem `relogio` leem o tempo apenas por aqui, de
+    modo que um relógio virtual pode conduzi-los sem esperas reais.
+    """
+
+    def monotonico(self) -> float:
+        """Segundos de um relógio monotônico (janelas, timeouts)"""
+        return time.monotonic()
+
+    def monotonico_ns(self) -> int:
+        """Nanossegundos de alta resolução (medição de durações)"""
+        return time.perf_counter_ns()
+
+    def agora(self) -> datetime:
+        """Data e hora atuais (timestamps de métricas e transições)"""
+        return datetime.now()
+
+    def dormir(self, segundos: float) -> None:
+        time.sleep(segundos)
+
+
+RELOGIO_SISTEMA = Relogio()
+
+
+class ContadorDistribuido:
+    """
+    Contador monotônico sem contenção entre threads
+
+    Cada thread incrementa a própria célula; `valor` soma todas. Células
+    de threads encerradas são incorporadas a uma base na leitura, para
+    que a lista de células não cresça com threads de vida curta.
+    """
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self._local = threading.local()
+        self._celulas: List[Tuple[threading.Thread, List[int]]] = []
+        self._base = 0
+        self._lock = threading.Lock()  # Apenas registro e leitura
+
+    def _nova_celula(self) -> List[int]:
+        celula = [0]
+        self._local.celula = celula
+        with self._lock:
+            self._celulas.append((threading.current_thread(), celula))
+        return celula
+
+    def incrementar(self, quantidade: int = 1) -> None:
+        try:
+            celula = self._local.celula
+        except AttributeError:
+            celula = self._nova_celula()
+        celula[0] += quantidade
+
+    @property
+    def valor(self) -> int:
+        with self._lock:
+            vivas = []
+            for thread, celula in self._celulas:
+                if thread.is_alive():
+                    vivas.append((thread, celula))
+                else:
+                    self._base += celula[0]
+            self._celulas = vivas
+            return self._base + sum(celula[0] for _, celula in vivas)
+
+
+class Medidor:
+    """Valor instantâneo (ex.: recursos em uso) com máximo observado"""
+
+    def __init__(self, nome: str, valor_inicial: float = 0):
+        self.nome = nome
+        self._valor = valor_inicial
+        self._maximo = valor_inicial
+        self._lock = threading.Lock()
+
+    def definir(self, valor: float) -> None:
+        with self._lock:
+            self._valor = valor
+            self._maximo = max(self._maximo, valor)
+
+    def ajustar(self, delta: float, minimo: Optional[float] = None) -> float:
+        """Soma `delta` ao valor (limitado a `minimo`) e retorna o novo valor"""
+        with self._lock:
+            self._valor += delta
+            if minimo is not None and self._valor < minimo:
+                self._valor = minimo
+            self._maximo = max(self._maximo, self._valor)
+            return self._valor
+
+    @property
+    def valor(self) -> float:
+        return self._valor
+
+    @property
+    def maximo(self) -> float:
+        return self._maximo
+
+
+class HistogramaLatencia:
+    """
+    Histograma de durações em nanossegundos, particionado por thread
+
+    Cada thread registra no próprio HistogramaLogaritmico (protegido por
+    um lock só disputado durante a leitura); `resumo_ms` mescla todos.
+    Partições de threads encerradas são mescladas a um histograma base
+    (na leitura e ao criar partições), como no ContadorDistribuido.
+    """
+
+    def __init__(self, nome: str, precisao_relativa: float = 0.01):
+        self.nome = nome
+        self.precisao_relativa = precisao_relativa
+        self._local = threading.local()
+        self._particoes: List[Tuple[threading.Thread, threading.Lock, HistogramaLogaritmico]] = []
+        self._base = HistogramaLogaritmico(precisao_relativa)
+        self._lock = threading.Lock()
+
+    def _nova_particao(self) -> Tuple[threading.Lock, HistogramaLogaritmico]:
+        particao = (threading.Lock(), HistogramaLogaritmico(self.precisao_relativa))
+        self._local.particao = particao
+        with self._lock:
+            self._incorporar_encerradas()
+            self._particoes.append((threading.current_thread(), *particao))
+        return particao
+
+    def _incorporar_encerradas(self) -> None:
+        """Mescla à base as partições de threads encerradas (lock já adquirido)"""
+        vivas = []
+        for thread, lock, histograma in self._particoes:
+            if thread.is_alive():
+                vivas.append((thread, lock, histograma))
+            else:
+                with lock:
+                    self._base.mesclar(histograma)
+        self._particoes = vivas
+
+    def registrar_ns(self, duracao_ns: int) -> None:
+        try:
+            lock, histograma = self._local.particao
+        except AttributeError:
+            lock, histograma = self._nova_particao()
+        with lock:
+            histograma.registrar(max(0, duracao_ns))
+
+    def agregado(self) -> HistogramaLogaritmico:
+        """Histograma único com as durações de todas as threads (em ns)"""
+        total = HistogramaLogaritmico(self.precisao_relativa)
+        with self._lock:
+            self._incorporar_encerradas()
+            total.mesclar(self._base)
+            particoes = list(self._particoes)
+        for _, lock, histograma in particoes:
+            with lock:
+                total.mesclar(histograma)
+        return total
+
+    def resumo_ms(self) -> Dict[str, Any]:
+        """Contagem, extremos, média e p50/p95/p99 em milissegundos"""
+        resumo = self.agregado().resumo()
+        for chave in ('min', 'max', 'media', 'p50', 'p95', 'p99'):
+            if resumo[chave] is not None:
+                resumo[chave] = resumo[chave] / NANOS_POR_MILISSEGUNDO
+        return resumo
+
+
+class RegistroMetricas:
+    """
+    Conjunto de métricas de um componente
+
+    As métricas são criadas sob demanda pelo nome e reaproveitadas:
+    `registro.contador('falhas')` devolve sempre o mesmo contador.
+    """
+
+    def __init__(self, componente: str):
+        self.componente = componente
+        self._contadores: Dict[str, ContadorDistribuido] = {}
+        self._medidores: Dict[str, Medidor] = {}
+        self._histogramas: Dict[str, HistogramaLatencia] = {}
+        self._lock = threading.Lock()
+
+    def contador(self, nome: str) -> ContadorDistribuido:
+        with self._lock:
+            if nome not in self._contadores:
+                self._contadores[nome] = ContadorDistribuido(nome)
+            return self._contadores[nome]
+
+    def medidor(self, nome: str, valor_inicial: float = 0) -> Medidor:
+        with self._lock:
+            if nome not in self._medidores:
+                self._medidores[nome] = Medidor(nome, valor_inicial)
+            return self._medidores[nome]
+
+    def histograma(self, nome: str) -> HistogramaLatencia:
+        with self._lock:
+            if nome not in self._histogramas:
+                self._histogramas[nome] = HistogramaLatencia(nome)
+            return self._histogramas[nome]
+
+    def instantaneo(self, incluir_histogramas: bool = True) -> Dict[str, Any]:
+        """Leitura agregada de todas as métricas do componente"""
+        with self._lock:
+            contadores = list(self._contadores.values())
+            medidores = list(self._medidores.values())
+            histogramas = list(self._histogramas.values())
+
+        instantaneo: Dict[str, Any] = {c.nome: c.valor for c in contadores}
+        for medidor in medidores:
+            instantaneo[medidor.nome] = medidor.valor
+            instantaneo[f"{medidor.nome}_max"] = medidor.maximo
+        if incluir_histogramas:
+            for histograma in histogramas:
+                instantaneo[f"{histograma.nome}_ms"] = histograma.resumo_ms()
+        return instantaneo
@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+"""
+GERADOR DE CARGA DETERMINÍSTICO
+Sistema de Monitoramento Distribuído
+
+Simulação de carga com relógio virtual: requisições chegam segundo um
+processo de Poisson com semente fixa e atravessam a pilha real de
+resiliência (RetryExecutor → CircuitBreaker → RecursoBulkheadAssincrono)
+até um serviço simulado. Cada resultado vira um evento gravado no
+EventStore e publicado no EventBus.
+
+O serviço segue um perfil roteirizado em fases (FaseCarga): operação
+estável, picos de latência, brownouts, indisponibilidade e recuperação
+em rampa. Nenhuma espera é real: o LoopVirtual é um event loop asyncio
+cujo relógio avança direto para o próximo timer agendado, e os
+componentes recebem o mesmo RelogioVirtual. Com a mesma semente, o
+relatório (vazão e percentis de latência por fase) é idêntico entre
+execuções, o que permite compará-lo com uma baseline gravada.
+
+EXECUTAR:
+    python load_generator.py                        # relatório do cenário padrão
+    python load_generator.py --atualizar-baseline   # regrava baseline_carga.json
+
+AUTOR: Prof. Jackson Antonio do Prado Lima
+"""
+
+import asyncio
+import json
+import math
+import os
+import random
+import selectors
+import sys
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Any, Callable, Tuple
+
+# Adicionar diretório atual ao path
+current_dir = os.path.dirname(os.path.abspath(__file__)) if '__file__' in globals() else os.getcwd()
+sys.path.append(current_dir)
+
+from instrumentation import Relogio
+from patterns import (
+    BulkheadTimeoutException, CircuitBreaker, CircuitBreakerAbertoException,
+    EstadoCircuitBreaker, EventBus, EventoSistema, EventStore, JanelaTemporal,
+    OrcamentoRetry, RecursoBulkheadAssincrono, RetryExecutor, RetryExhaustedException,
+    RetryStrategy, TipoEvento
+)
+
+
+CAMINHO_BASELINE = os.path.join(current_dir, "baseline_carga.json")
+VERSAO_BASELINE = 1
+EPOCA_VIRTUAL = datetime(2024, 1, 1)
+
+
+# =============================================================================
+# RELÓGIO E EVENT LOOP VIRTUAIS
+# =============================================================================
+
+class RelogioVirtual(Relogio):
+    """Relógio que só avança quando a simulação manda"""
+
+    def __init__(self, inicio: datetime = EPOCA_VIRTUAL):
+        self.inicio = inicio
+        self._segundos = 0.0
+
+    def monotonico(self) -> float:
+        return self._segundos
+
+    def monotonico_ns(self) -> int:
+        return round(self._segundos * 1_000_000_000)
+
+    def agora(self) -> datetime:
+        return self.inicio + timedelta(seconds=self._segundos)
+
+    def dormir(self, segundos: float) -> None:
+        self.avancar(segundos)
+
+    def avancar(self, segundos: float) -> None:
+        if segundos > 0:
+            self._segundos += segundos
+
+
+class _SeletorVirtual(selectors.SelectSelector):
+    """Seletor que, em vez de bloquear, avança o relógio virtual"""
+
+    def __init__(self, relogio: RelogioVirtual):
+        super().__init__()
+        self._relogio = relogio
+
+    def select(self, timeout: Optional[float] = None):
+        if timeout is None:
+            raise RuntimeError("Simulação parada: nenhuma tarefa agendada no relógio virtual")
+        self._relogio.avancar(timeout)
+        return super().select(0)
+
+
+class LoopVirtual(asyncio.SelectorEventLoop):
+    """
+    Event loop asyncio em tempo virtual
+
+    `asyncio.sleep`, `asyncio.wait_for` e demais timers usam `time()`;
+    quando não há nada pronto para executar, o seletor avança o relógio
+    até o próximo timer, sem esperar de fato.
+    """
+
+    def __init__(self, relogio: RelogioVirtual):
+        self.relogio = relogio
+        super().__init__(_SeletorVirtual(relogio))
+
+    def time(self) -> float:
+        return self.relogio.monotonico()
+
+
+# =============================================================================
+# PERFIS DE CARGA
+# =============================================================================
+
+@dataclass(frozen=True)
+class FaseCarga:
+    """
+    Trecho do perfil com taxa de chegada e comportamento do serviço
+
+    Com `latencia_final_ms` / `taxa_falha_final`, latência e taxa de
+    falha variam linearmente ao longo da fase (rampas de degradação ou
+    recuperação). A latência de cada requisição é lognormal em torno do
+    valor da fase, com desvio do logaritmo igual a `dispersao`.
+    """
+    nome: str
+    duracao_segundos: float
+    requisicoes_por_segundo: float
+    latencia_ms: float
+    taxa_falha: float = 0.0
+    latencia_final_ms: Optional[float] = None
+    taxa_falha_final: Optional[float] = None
+    dispersao: float = 0.25
+
+    def latencia_em(self, progresso: float) -> float:
+        if self.latencia_final_ms is None:
+            return self.latencia_ms
+        return self.latencia_ms + (self.latencia_final_ms - self.latencia_ms) * progresso
+
+    def taxa_falha_em(self, progresso: float) -> float:
+        if self.taxa_falha_final is None:
+            return self.taxa_falha
+        return self.taxa_falha + (self.taxa_falha_final - self.taxa_falha) * progresso
+
+
+def estavel(nome: str, duracao_segundos: float, requisicoes_por_segundo: float,
+            latencia_ms: float = 20.0, taxa_falha: float = 0.01) -> FaseCarga:
+    """Operação normal"""
+    return FaseCarga(nome, duracao_segundos, requisicoes_por_segundo, latencia_ms, taxa_falha)
+
+
+def pico_latencia(nome: str, duracao_segundos: float, requisicoes_por_segundo: float,
+                  latencia_ms: float = 20.0, fator: float = 10.0) -> FaseCarga:
+    """Serviço responde, mas `fator` vezes mais devagar"""
+    return FaseCarga(nome, duracao_segundos, requisicoes_por_segundo,
+                     latencia_ms * fator, taxa_falha=0.01)
+
+
+def brownout(nome: str, duracao_segundos: float, requisicoes_por_segundo: float,
+             latencia_ms: float = 60.0, taxa_falha: float = 0.3) -> FaseCarga:
+    """Degradação parcial: mais lento e com parte das requisições falhando"""
+    return FaseCarga(nome, duracao_segundos, requisicoes_por_segundo, latencia_ms,
+                     taxa_falha, dispersao=0.5)
+
+
+def indisponibilidade(nome: str, duracao_segundos: float,
+                      requisicoes_por_segundo: float,
+                      latencia_ms: float = 5.0) -> FaseCarga:
+    """Todas as requisições falham (rapidamente, como conexão recusada)"""
+    return FaseCarga(nome, duracao_segundos, requisicoes_por_segundo, latencia_ms,
+                     taxa_falha=1.0)
+
+
+def recuperacao(nome: str, duracao_segundos: float, requisicoes_por_segundo: float,
+                de: FaseCarga, latencia_ms: float = 20.0,
+                taxa_falha: float = 0.01) -> FaseCarga:
+    """Rampa linear das condições da fase `de` até a operação normal"""
+    return FaseCarga(nome, duracao_segundos, requisicoes_por_segundo,
+                     de.latencia_em(1.0), de.taxa_falha_em(1.0),
+                     latencia_final_ms=latencia_ms, taxa_falha_final=taxa_falha)
+
+
+def perfil_padrao() -> List[FaseCarga]:
+    """Estável → pico → brownout → indisponibilidade → recuperação → estável"""
+    queda = indisponibilidade("indisponibilidade", 5, 200)
+    return [
+        estavel("aquecimento", 10, 200),
+        pico_latencia("pico_latencia", 5, 200),
+        estavel("normal", 10, 200),
+        brownout("brownout", 10, 200),
+        queda,
+        recuperacao("recuperacao", 10, 200, de=queda),
+        estavel("estabilizado", 10, 200),
+    ]
+
+
+PERFIS: Dict[str, Callable[[], List[FaseCarga]]] = {
+    'padrao': perfil_padrao,
+}
+
+
+# =============================================================================
+# GERADOR DE CARGA
+# =============================================================================
+
+@dataclass
+class ConfiguracaoCarga:
+    """Parâmetros da pilha de resiliência usada na simulação"""
+    tamanho_pool: int = 100
+    timeout_bulkhead_segundos: float = 0.5
+    max_tentativas: int = 3
+    delay_inicial_ms: int = 50
+    orcamento_retry_pct: float = 20.0
+    janela_circuito_segundos: int = 10
+    timeout_circuito_segundos: int = 5
+    taxa_falhas_limite_pct: float = 50.0
+    minimo_chamadas: int = 20
+    limite_chamada_lenta_ms: float = 1000.0
+
+
+class GeradorCarga:
+    """
+    Gerador de carga determinístico em tempo virtual
+
+    RESPONSABILIDADES:
+    - Gerar chegadas de Poisson por fase a partir de uma semente
+    - Conduzir CircuitBreaker, RetryExecutor e RecursoBulkhead reais
+      com um RelogioVirtual compartilhado
+    - Registrar resultados no EventStore e publicá-los no EventBus
+    - Produzir o relatório de vazão e percentis de latência
+
+    Chegadas, comportamento do serviço e jitter do retry usam geradores
+    aleatórios independentes, derivados da semente: mudar a pilha de
+    resiliência não altera a sequência de chegadas.
+    """
+
+    def __init__(self, fases: List[FaseCarga], semente: int = 42,
+                 configuracao: Optional[ConfiguracaoCarga] = None):
+        self.fases = list(fases)
+        self.semente = semente
+        self.configuracao = configuracao or ConfiguracaoCarga()
+        self.relogio = RelogioVirtual()
+
+        self._chegadas = random.Random(semente)
+        self._servico = random.Random(semente + 1)
+
+        # Início de cada fase no tempo virtual
+        self._inicios: List[float] = []
+        inicio = 0.0
+        for fase in self.fases:
+            self._inicios.append(inicio)
+            inicio += fase.duracao_segundos
+        self.duracao_segundos = inicio
+
+        c = self.configuracao
+        self.circuit_breaker = CircuitBreaker(
+            nome="carga-circuito",
+            timeout_segundos=c.timeout_circuito_segundos,
+            max_chamadas_meio_aberto=3,
+            janela=JanelaTemporal(c.janela_circuito_segundos, self.relogio),
+            taxa_falhas_limite_pct=c.taxa_falhas_limite_pct,
+            limite_chamada_lenta_ms=c.limite_chamada_lenta_ms,
+            taxa_lentas_limite_pct=80.0,
+            minimo_chamadas=c.minimo_chamadas,
+            relogio=self.relogio
+        )
+        self.retry = RetryExecutor(
+            RetryStrategy(max_tentativas=c.max_tentativas,
+                          delay_inicial_ms=c.delay_inicial_ms,
+                          aleatorio=random.Random(semente + 2)),
+            nome="carga-retry",
+            orcamento=OrcamentoRetry(percentual=c.orcamento_retry_pct, relogio=self.relogio),
+            relogio=self.relogio
+        )
+        self.bulkhead = RecursoBulkheadAssincrono("carga-bulkhead", c.tamanho_pool,
+                                                  relogio=self.relogio)
+        self.event_store = EventStore()
+        self.event_bus = EventBus("carga-bus")
+        self._eventos_entregues = 0
+        self.event_bus.subscrever_global(self._contar_evento)
+
+        # (índice da fase na chegada, resultado, latência ponta a ponta em ms)
+        self._resultados: List[Tuple[int, str, float]] = []
+        self._estado_circuito = EstadoCircuitBreaker.FECHADO
+        self._aberturas = 0
+        self._recuperacoes = 0
+
+    def _contar_evento(self, evento: EventoSistema) -> None:
+        self._eventos_entregues += 1
+
+    # ------------------------------------------------------------------
+    # Simulação
+    # ------------------------------------------------------------------
+
+    def executar(self) -> Dict[str, Any]:
+        """Roda todo o perfil em tempo virtual e retorna o relatório"""
+        loop = LoopVirtual(self.relogio)
+        try:
+            loop.run_until_complete(self._gerar_chegadas())
+        finally:
+            loop.close()
+            self.event_bus.shutdown()
+        return self.relatorio()
+
+    async def _gerar_chegadas(self) -> None:
+        tarefas = []
+        for indice, fase in enumerate(self.fases):
+            fim = self._inicios[indice] + fase.duracao_segundos
+            proxima = self._inicios[indice] + self._chegadas.expovariate(fase.requisicoes_por_segundo)
+            while proxima < fim:
+                await asyncio.sleep(proxima - self.relogio.monotonico())
+                tarefas.append(asyncio.ensure_future(self._requisicao(indice)))
+                proxima += self._chegadas.expovariate(fase.requisicoes_por_segundo)
+            await asyncio.sleep(fim - self.relogio.monotonico())
+        await asyncio.gather(*tarefas)
+
+    async def _requisicao(self, indice_fase: int) -> None:
+        inicio = self.relogio.monotonico()
+        try:
+            await self.retry.executar_assincrono(self.circuit_breaker.executar_assincrono,
+                                                 self._chamar_servico)
+            resultado = 'sucesso'
+        except RetryExhaustedException as e:
+            if isinstance(e.causa_original, CircuitBreakerAbertoException):
+                resultado = 'rejeitada_circuito'
+            elif isinstance(e.causa_original, BulkheadTimeoutException):
+                resultado = 'rejeitada_bulkhead'
+            else:
+                resultado = 'falha'
+
+        latencia_ms = (self.relogio.monotonico() - inicio) * 1000
+        self._resultados.append((indice_fase, resultado, latencia_ms))
+        self._registrar_evento(
+            TipoEvento.TRANSACAO_COMPLETADA if resultado == 'sucesso' else TipoEvento.TRANSACAO_FALHADA,
+            {'fase': self.fases[indice_fase].nome, 'resultado': resultado,
+             'latencia_ms': latencia_ms}
+        )
+        self._verificar_circuito()
+
+    async def _chamar_servico(self) -> Dict[str, Any]:
+        """Serviço simulado nas condições da fase atual (tempo da tentativa)"""
+        async with await self.bulkhead.adquirir_recurso_assincrono(
+                self.configuracao.timeout_bulkhead_segundos):
+            fase, progresso = self._fase_atual()
+            latencia_ms = fase.latencia_em(progresso) * self._servico.lognormvariate(0, fase.dispersao)
+            falhou = self._servico.random() < fase.taxa_falha_em(progresso)
+            await asyncio.sleep(latencia_ms / 1000)
+            if falhou:
+                raise ConnectionError(f"Falha simulada na fase {fase.nome}")
+            return {'status': 'success', 'latencia_ms': latencia_ms}
+
+    def _fase_atual(self) -> Tuple[FaseCarga, float]:
+        agora = self.relogio.monotonico()
+        indice = max(0, bisect_right(self._inicios, agora) - 1)
+        fase = self.fases[indice]
+        progresso = min(1.0, (agora - self._inicios[indice]) / fase.duracao_segundos)
+        return fase, progresso
+
+    def _verificar_circuito(self) -> None:
+        """Publica SISTEMA_INDISPONIVEL/SISTEMA_RECUPERADO nas transições"""
+        estado = self.circuit_breaker.estado
+        if estado == self._estado_circuito:
+            return
+
+        if estado == EstadoCircuitBreaker.ABERTO:
+            self._aberturas += 1
+            self._registrar_evento(TipoEvento.SISTEMA_INDISPONIVEL, {'estado': estado.value})
+        elif estado == EstadoCircuitBreaker.FECHADO:
+            self._recuperacoes += 1
+            self._registrar_evento(TipoEvento.SISTEMA_RECUPERADO, {'estado': estado.value})
+        self._estado_circuito = estado
+
+    def _registrar_evento(self, tipo: TipoEvento, dados: Dict[str, Any]) -> None:
+        evento = EventoSistema(tipo=tipo, origem="gerador_carga",
+                               timestamp=self.relogio.agora(), dados=dados)
+        self.event_store.adicionar_evento(evento)
+        self.event_bus.publicar(evento, assincrono=False)
+
+    # ------------------------------------------------------------------
+    # Relatório
+    # ------------------------------------------------------------------
+
+    def relatorio(self) -> Dict[str, Any]:
+        """Vazão e percentis por fase e no total (tempo virtual)"""
+        por_fase: Dict[int, List[Tuple[str, float]]] = defaultdict(list)
+        for indice, resultado, latencia_ms in self._resultados:
+            por_fase[indice].append((resultado, latencia_ms))
+
+        metricas_retry = self.retry.obter_metricas()
+        return {
+            'semente': self.semente,
+            'duracao_virtual_segundos': self.duracao_segundos,
+            'total': _resumir(
+                [(r, l) for _, r, l in self._resultados], self.duracao_segundos
+            ),
+            'fases': [
+                dict(nome=fase.nome, **_resumir(por_fase[indice], fase.duracao_segundos))
+                for indice, fase in enumerate(self.fases)
+            ],
+            'circuit_breaker': {
+                'aberturas': self._aberturas,
+                'recuperacoes': self._recuperacoes,
+                'estado_final': self.circuit_breaker.estado.value
+            },
+            'retry': {
+                'tentativas': metricas_retry['total_tentativas'],
+                'retries_negados_orcamento': metricas_retry['retries_negados_orcamento']
+            },
+            'bulkhead': {
+                'max_recursos_utilizados': self.bulkhead.obter_metricas()['max_recursos_utilizados']
+            },
+            'eventos': {
+                'armazenados': {
+                    tipo.value: quantidade
+                    for tipo, quantidade in sorted(self.event_store.contar_por_tipo().items(),
+                                                   key=lambda item: item[0].value)
+                },
+                'entregues_event_bus': self._eventos_entregues
+            }
+        }
+
+
+def _percentil(ordenados: List[float], percentil: float) -> Optional[float]:
+    """Percentil pelo método nearest-rank"""
+    if not ordenados:
+        return None
+    posicao = max(0, math.ceil(percentil / 100 * len(ordenados)) - 1)
+    return round(ordenados[posicao], 3)
+
+
+def _resumir(resultados: List[Tuple[str, float]], duracao_segundos: float) -> Dict[str, Any]:
+    """Contagens por resultado, vazão e latência das requisições bem-sucedidas"""
+    contagem: Dict[str, int] = defaultdict(int)
+    latencias = []
+    for resultado, latencia_ms in resultados:
+        contagem[resultado] += 1
+        if resultado == 'sucesso':
+            latencias.append(latencia_ms)
+    latencias.sort()
+
+    return {
+        'requisicoes': len(resultados),
+        'sucessos': contagem['sucesso'],
+        'falhas': contagem['falha'],
+        'rejeitadas_circuito': contagem['rejeitada_circuito'],
+        'rejeitadas_bulkhead': contagem['rejeitada_bulkhead'],
+        'vazao_rps': round(contagem['sucesso'] / duracao_segundos, 3),
+        'latencia_ms': {
+            'p50': _percentil(latencias, 50),
+            'p95': _percentil(latencias, 95),
+            'p99': _percentil(latencias, 99),
+            'max': round(latencias[-1], 3) if latencias else None
+        }
+    }
+
+
+# =============================================================================
+# CENÁRIOS E BASELINE
+# =============================================================================
+
+def executar_cenario(nome: str = 'padrao', semente: int = 42,
+                     configuracao: Optional[ConfiguracaoCarga] = None) -> Dict[str, Any]:
+    """Executa um perfil registrado em PERFIS e retorna o relatório"""
+    relatorio = GeradorCarga(PERFIS[nome](), semente, configuracao).executar()
+    relatorio['perfil'] = nome
+    return relatorio
+
+
+def carregar_baseline(caminho: str = CAMINHO_BASELINE) -> Dict[str, Dict[str, Any]]:
+    """Relatórios de referência por cenário"""
+    with open(caminho, 'r', encoding='utf-8') as arquivo:
+        conteudo = json.load(arquivo)
+    if conteudo.get('versao') != VERSAO_BASELINE:
+        raise ValueError(f"Versão de baseline não suportada: {conteudo.get('versao')}")
+    return conteudo['cenarios']
+
+
+def salvar_baseline(caminho: str = CAMINHO_BASELINE) -> Dict[str, Dict[str, Any]]:
+    """Executa todos os cenários e grava os relatórios como baseline"""
+    cenarios = {nome: executar_cenario(nome) for nome in PERFIS}
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump({'versao': VERSAO_BASELINE, 'cenarios': cenarios},
+                  arquivo, indent=2, ensure_ascii=False)
+        arquivo.write("\n")
+    return cenarios
+
+
+def imprimir_relatorio(relatorio: Dict[str, Any]) -> None:
+    print(f"\n📊 Cenário '{relatorio['perfil']}' (semente {relatorio['semente']}, "
+          f"{relatorio['duracao_virtual_segundos']:.0f} s virtuais)")
+    print("-" * 100)
+    print(f"{'fase':>18} | {'req':>6} | {'ok':>6} | {'falha':>6} | {'rej_cb':>6} | "
+          f"{'rej_bh':>6} | {'ok/s':>8} | {'p50 ms':>8} | {'p99 ms':>8}")
+    for linha in relatorio['fases'] + [dict(nome='TOTAL', **relatorio['total'])]:
+        latencia = linha['latencia_ms']
+        print(f"{linha['nome']:>18} | {linha['requisicoes']:>6} | {linha['sucessos']:>6} | "
+              f"{linha['falhas']:>6} | {linha['rejeitadas_circuito']:>6} | "
+              f"{linha['rejeitadas_bulkhead']:>6} | {linha['vazao_rps']:>8.1f} | "
+              f"{latencia['p50'] or 0:>8.1f} | {latencia['p99'] or 0:>8.1f}")
+    print(f"🔌 Circuit breaker: {relatorio['circuit_breaker']}")
+    print(f"🔄 Retry: {relatorio['retry']}")
+    print(f"📦 Eventos: {relatorio['eventos']}")
+
+
+if __name__ == "__main__":
+    print("🎛️ GERADOR DE CARGA DETERMINÍSTICO")
+    print("=" * 70)
+
+    if "--atualizar-baseline" in sys.argv[1:]:
+        for relatorio in salvar_baseline().values():
+            imprimir_relatorio(relatorio)
+        print(f"\n💾 Baseline gravada em {CAMINHO_BASELINE}")
+    else:
+        imprimir_relatorio(executar_cenario())
@@ -500,19 +500,21 @@ def demonstrar_sistema_monitoramento():
     print("\n📋 10. RELATÓRIO DE EVENTOS - EVENT SOURCING")
     print("-" * 50)
     
-    # Consultar eventos por tipo
-    tipos_evento = {}
+    # Consultar eventos por tipo (índice secundário)
+    tipos_evento = {tipo.value: count for tipo, count in event_store.contar_por_tipo().items()}
     todos_eventos = event_store.obter_todos_eventos()
     
-    for evento in todos_eventos:
-        tipo = evento.tipo.value
-        tipos_evento[tipo] = tipos_evento.get(tipo, 0) + 1
-    
     print(f"📊 Total de eventos no sistema: {len(todos_eventos)}")
     print("📈 Distribuição por tipo:")
     for tipo, count in sorted(tipos_evento.items()):
         print(f"   {tipo}: {count} eventos")
     
+    # Consultar eventos por tag (interseção de índices)
+    metricas_producao = event_store.consultar(
+        tipo=TipoEvento.METRICA_COLETADA, tags={'environment': 'production'}
+    )
+    print(f"🏷️ Métricas com environment=production: {len(metricas_producao)}")
+    
     # Timeline dos últimos eventos
     print(f"\n⏰ Timeline dos últimos eventos:")
     ultimos_eventos = todos_eventos[-10:]
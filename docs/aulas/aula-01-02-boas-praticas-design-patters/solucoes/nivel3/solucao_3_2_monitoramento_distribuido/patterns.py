@@ -22,17 +22,25 @@ import time
 import uuid
 import threading
 import random
+import sys
+import weakref
 from abc import ABC, abstractmethod
+from array import array
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from decimal import Decimal
 from enum import Enum, auto
-from typing import Dict, List, Optional, Any, Callable, Union
+from typing import Dict, List, Optional, Any, Callable, Deque, Tuple, Union
 from collections import defaultdict, deque
+from bisect import bisect_left, bisect_right
 import concurrent.futures
 import asyncio
 from functools import wraps
 
+from aggregation import HistogramaLogaritmico, RollupMetricas
+from instrumentation import NANOS_POR_MILISSEGUNDO, RELOGIO_SISTEMA, RegistroMetricas, Relogio
+from snapshot_codec import escrever_snapshot, ler_snapshot, pausar_coleta_ciclica
+
 
 # =============================================================================
 # DOMAIN LAYER - EVENTOS E AGREGADOS
@@ -59,6 +67,9 @@ class SeveridadeAlerta(Enum):
     CRITICAL = 4
 
 
+MAX_METRICAS_POR_SERVICO = 100
+
+
 class StatusServico(Enum):
     """Status possíveis de um serviço"""
     INICIANDO = auto()
@@ -117,7 +128,10 @@ class Servico:
     ultima_verificacao: datetime = field(default_factory=datetime.now)
     tempo_resposta_ms: float = 0.0
     taxa_erro: float = 0.0
-    metricas: List[Metrica] = field(default_factory=list)
+    # Ring buffer: mantém apenas as últimas métricas, sem realocar listas
+    metricas: Deque[Metrica] = field(
+        default_factory=lambda: deque(maxlen=MAX_METRICAS_POR_SERVICO)
+    )
     alertas_ativos: List[str] = field(default_factory=list)  # IDs dos alertas
     configuracao: Dict[str, Any] = field(default_factory=dict)
 
@@ -126,6 +140,174 @@ class Servico:
 # PADRÃO EVENT SOURCING E CQRS
 # =============================================================================
 
+NANOS_POR_SEGUNDO = 1_000_000_000
+
+
+def para_nanossegundos(timestamp: Union[datetime, int]) -> int:
+    """Converte datetime (ou ns já inteiros) para epoch em nanossegundos"""
+    if isinstance(timestamp, int):
+        return timestamp
+    return int(timestamp.timestamp()) * NANOS_POR_SEGUNDO + timestamp.microsecond * 1000
+
+
+def de_nanossegundos(timestamp_ns: int) -> datetime:
+    """Converte epoch em nanossegundos para datetime local (como datetime.now)"""
+    segundos, resto = divmod(timestamp_ns, NANOS_POR_SEGUNDO)
+    return datetime.fromtimestamp(segundos).replace(microsecond=resto // 1000)
+
+
+def chave_temporal(evento: 'EventoSistema') -> int:
+    """
+    Instante do evento em epoch-ns, a chave dos índices temporais
+    
+    Eventos que já guardam `timestamp_ns` (EventoCompacto) são
+    indexados sem criar um datetime.
+    """
+    if type(evento) is EventoSistema:
+        return para_nanossegundos(evento.timestamp)
+    timestamp_ns = getattr(evento, 'timestamp_ns', None)
+    return timestamp_ns if timestamp_ns is not None else para_nanossegundos(evento.timestamp)
+
+
+class IndiceTemporal:
+    """
+    Índice ordenado por timestamp com busca binária
+    
+    Mantém as chaves (epoch em nanossegundos, em um `array('q')` de
+    8 bytes por evento) e as posições dos eventos em sequências
+    paralelas ordenadas. Como os eventos chegam quase sempre em ordem,
+    a inserção é um append; eventos atrasados são inseridos via bisect.
+    As consultas aceitam datetime ou epoch-ns.
+    """
+    
+    def __init__(self):
+        self._chaves = array('q')
+        self._posicoes: List[int] = []
+        self.em_ordem_de_insercao = True
+    
+    def inserir(self, timestamp_ns: int, posicao: int) -> None:
+        """Insere posição mantendo a ordenação temporal"""
+        if not self._chaves or timestamp_ns >= self._chaves[-1]:
+            self._chaves.append(timestamp_ns)
+            self._posicoes.append(posicao)
+            return
+        
+        # Evento atrasado: bisect_right preserva a ordem de chegada em empates
+        indice = bisect_right(self._chaves, timestamp_ns)
+        self._chaves.insert(indice, timestamp_ns)
+        self._posicoes.insert(indice, posicao)
+        self.em_ordem_de_insercao = False
+    
+    def limites(self, desde: Optional[Union[datetime, int]] = None,
+                ate: Optional[Union[datetime, int]] = None) -> Tuple[int, int]:
+        """Retorna o intervalo [inicio, fim) do índice entre desde e ate"""
+        inicio = (bisect_left(self._chaves, para_nanossegundos(desde))
+                  if desde is not None else 0)
+        fim = (bisect_right(self._chaves, para_nanossegundos(ate)) if ate is not None
+               else len(self._chaves))
+        return inicio, max(inicio, fim)
+    
+    def intervalo_de_posicoes(self, desde: Optional[Union[datetime, int]] = None,
+                              ate: Optional[Union[datetime, int]] = None
+                              ) -> Optional[Tuple[int, int]]:
+        """
+        Intervalo [primeira, ultima + 1) das posições entre desde e ate
+        
+        Só existe quando as posições estão em ordem temporal (nenhum
+        evento atrasado); caso contrário retorna None.
+        """
+        if not self.em_ordem_de_insercao:
+            return None
+        inicio, fim = self.limites(desde, ate)
+        if inicio == fim:
+            return 0, 0
+        return self._posicoes[inicio], self._posicoes[fim - 1] + 1
+    
+    def posicoes(self, desde: Optional[Union[datetime, int]] = None,
+                 ate: Optional[Union[datetime, int]] = None) -> List[int]:
+        """Posições dos eventos entre desde e ate, em ordem temporal"""
+        inicio, fim = self.limites(desde, ate)
+        return self._posicoes[inicio:fim]
+    
+    def remover_posicoes(self, removidas: set, deslocamento: int) -> None:
+        """Remove posições do índice e desloca as restantes (compactação)"""
+        chaves = array('q')
+        posicoes: List[int] = []
+        em_ordem = True
+        for chave, posicao in zip(self._chaves, self._posicoes):
+            if posicao in removidas:
+                continue
+            if posicoes and posicao - deslocamento < posicoes[-1]:
+                em_ordem = False
+            chaves.append(chave)
+            posicoes.append(posicao - deslocamento)
+        
+        self._chaves = chaves
+        self._posicoes = posicoes
+        self.em_ordem_de_insercao = em_ordem
+    
+    def __len__(self) -> int:
+        return len(self._posicoes)
+
+
+def intersectar_postagens(listas: List[List[int]],
+                          limite_posicao: Optional[int] = None) -> List[int]:
+    """
+    Interseção de listas de postagens (posições em ordem crescente)
+    
+    Percorre a menor lista e localiza cada posição nas demais por busca
+    binária, avançando o limite inferior: o custo é proporcional à menor
+    lista (vezes log das maiores), não ao histórico.
+    
+    Com `limite_posicao`, posições a partir dele são ignoradas. Como as
+    listas só crescem por append de posições maiores, isso permite
+    intersectá-las fora do lock enquanto produtores continuam anexando.
+    """
+    if not listas:
+        return []
+    
+    listas = sorted(listas, key=len)
+    resultado = listas[0]
+    if limite_posicao is not None:
+        resultado = resultado[:bisect_left(resultado, limite_posicao)]
+    for outra in listas[1:]:
+        if not resultado:
+            break
+        
+        comuns = []
+        inicio = 0
+        for posicao in resultado:
+            inicio = bisect_left(outra, posicao, inicio)
+            if inicio == len(outra):
+                break
+            if outra[inicio] == posicao:
+                comuns.append(posicao)
+        resultado = comuns
+    
+    return list(resultado)
+
+
+@dataclass
+class PoliticaRetencao:
+    """
+    Política de retenção de eventos em memória do Event Store
+    
+    Qualquer limite pode ser omitido (None). A compactação roda a cada
+    `compactar_a_cada` eventos adicionados, ou sob demanda via `compactar()`.
+    """
+    idade_maxima: Optional[timedelta] = None
+    max_eventos_por_origem: Optional[int] = None
+    max_bytes: Optional[int] = None
+    compactar_a_cada: Optional[int] = 10000
+
+
+def estimar_bytes_evento(evento: EventoSistema) -> int:
+    """Estimativa rasa da memória ocupada por um evento e seus dados"""
+    dados = evento.dados
+    return (sys.getsizeof(evento) + sys.getsizeof(dados) +
+            sum(sys.getsizeof(valor) for valor in dados.values()))
+
+
 class EventStore:
     """
     Event Store para Event Sourcing
@@ -135,45 +317,555 @@ class EventStore:
     - Permitir consulta de eventos por agregado
     - Suportar snapshots para performance
     - Garantir ordenação temporal
+    
+    Os eventos são mantidos em ordem temporal no momento da inserção,
+    de modo que consultas por período custam uma busca binária mais
+    um slice, sem reordenar o histórico a cada chamada.
+    
+    Cada evento recebe um número de sequência monotônico (ordem de
+    chegada), usado como cursor por consumidores incrementais.
+    
+    A lista `_eventos` só cresce por append (nunca é alterada no lugar),
+    o que permite entregar a leitores visões imutáveis sem cópia. A
+    compactação (retenção) substitui a lista por uma nova: eventos
+    removidos no meio viram lacunas (None) e o prefixo removido avança
+    `_sequencia_base`, de modo que as sequências nunca mudam. As
+    leituras seguram o lock apenas para capturar a visão e os limites
+    nos índices; a cópia dos eventos acontece fora dele.
+    
+    Índices secundários (listas de postagens em ordem de chegada) por
+    TipoEvento e por par (tag, valor) de `dados['tags']` permitem
+    consultas filtradas via `consultar()` com custo proporcional ao
+    resultado.
     """
     
-    def __init__(self):
-        self._eventos: List[EventoSistema] = []
-        self._indices_por_origem: Dict[str, List[int]] = defaultdict(list)
+    def __init__(self, politica_retencao: Optional[PoliticaRetencao] = None):
+        self._eventos: List[Optional[EventoSistema]] = []
+        self._sequencia_base = 1  # Sequência do primeiro evento em memória
+        self._indice_temporal = IndiceTemporal()
+        self._indices_por_origem: Dict[str, IndiceTemporal] = defaultdict(IndiceTemporal)
+        self._indices_por_tipo: Dict[TipoEvento, List[int]] = defaultdict(list)
+        self._indices_por_tag: Dict[Tuple[str, str], List[int]] = defaultdict(list)
         self._snapshots: Dict[str, Any] = {}
         self._lock = threading.RLock()
+        
+        # Retenção e compactação
+        self._politica_retencao = politica_retencao
+        self._lacunas = 0
+        self._bytes_estimados = 0
+        self._bytes_por_posicao = array('L')  # Só com max_bytes: paralelo a _eventos
+        self._eventos_desde_compactacao = 0
+        self._total_compactados = 0
+        self._consumidores: List[weakref.WeakMethod] = []
+        self._lock_compactacao = threading.Lock()
     
-    def adicionar_evento(self, evento: EventoSistema) -> None:
-        """Adiciona evento ao store"""
+    def adicionar_evento(self, evento: EventoSistema) -> int:
+        """Adiciona evento ao store e retorna seu número de sequência"""
+        with self._lock:
+            sequencia = self._anexar(evento)
+        self._verificar_retencao()
+        return sequencia
+    
+    def adicionar_eventos(self, eventos: List[EventoSistema]) -> int:
+        """
+        Adiciona um lote de eventos com uma única aquisição do lock
+        
+        Retorna a sequência do último evento do lote.
+        """
+        with self._lock:
+            for evento in eventos:
+                self._anexar(evento)
+            sequencia = self._sequencia_base + len(self._eventos) - 1
+        self._verificar_retencao()
+        return sequencia
+    
+    def _anexar(self, evento: EventoSistema) -> int:
+        """Anexa o evento e atualiza os índices (lock já adquirido)"""
+        posicao = len(self._eventos)
+        self._eventos.append(evento)
+        timestamp_ns = chave_temporal(evento)
+        self._indice_temporal.inserir(timestamp_ns, posicao)
+        self._indices_por_origem[evento.origem].inserir(timestamp_ns, posicao)
+        self._indices_por_tipo[evento.tipo].append(posicao)
+        
+        tags = evento.dados.get('tags') if isinstance(evento.dados, dict) else None
+        if tags:
+            for chave, valor in tags.items():
+                self._indices_por_tag[(chave, str(valor))].append(posicao)
+        
+        if self._politica_retencao is not None:
+            self._eventos_desde_compactacao += 1
+            if self._politica_retencao.max_bytes is not None:
+                tamanho = estimar_bytes_evento(evento)
+                self._bytes_por_posicao.append(tamanho)
+                self._bytes_estimados += tamanho
+        return self._sequencia_base + posicao
+    
+    # ------------------------------------------------------------------
+    # Retenção e compactação
+    # ------------------------------------------------------------------
+    
+    def registrar_consumidor(self, preparar_compactacao: Callable[[], int]) -> None:
+        """
+        Registra um consumidor (ex.: QueryModel) a ser avisado antes da compactação
+        
+        O callback deve incorporar os eventos pendentes ao seu estado
+        (projeções, rollups, snapshot) e retornar a sequência até a qual
+        os eventos brutos podem ser liberados. Deve ser um método ligado;
+        o store guarda apenas uma referência fraca a ele.
+        """
         with self._lock:
-            posicao = len(self._eventos)
-            self._eventos.append(evento)
-            self._indices_por_origem[evento.origem].append(posicao)
+            self._consumidores.append(weakref.WeakMethod(preparar_compactacao))
+    
+    def _verificar_retencao(self) -> None:
+        politica = self._politica_retencao
+        if (politica is not None and politica.compactar_a_cada and
+                self._eventos_desde_compactacao >= politica.compactar_a_cada):
+            self.compactar()
+    
+    def _limite_consumidores(self) -> int:
+        """Menor sequência já incorporada por todos os consumidores vivos"""
+        with self._lock:
+            vivos = [ref for ref in self._consumidores if ref() is not None]
+            self._consumidores = vivos
+            limite = self._sequencia_base + len(self._eventos) - 1
+        
+        # Chamados fora do lock do store: consumidores leem o store
+        for ref in vivos:
+            callback = ref()
+            if callback is not None:
+                limite = min(limite, callback())
+        return limite
+    
+    def compactar(self, agora: Optional[datetime] = None) -> int:
+        """
+        Aplica a política de retenção e libera os eventos expirados
+        
+        Antes de liberar, os consumidores registrados incorporam os
+        eventos ao seu estado; só são removidos eventos com sequência
+        até o limite informado por eles. Retorna o total removido.
+        """
+        politica = self._politica_retencao
+        if politica is None:
+            return 0
+        
+        if not self._lock_compactacao.acquire(blocking=False):
+            return 0  # Outra thread já está compactando
+        try:
+            limite_sequencia = self._limite_consumidores()
+            
+            with self._lock:
+                self._eventos_desde_compactacao = 0
+                removidas = self._selecionar_expirados(
+                    politica, agora or datetime.now(),
+                    limite_sequencia - self._sequencia_base
+                )
+                if removidas:
+                    self._liberar(removidas)
+                return len(removidas)
+        finally:
+            self._lock_compactacao.release()
+    
+    def _selecionar_expirados(self, politica: PoliticaRetencao, agora: datetime,
+                              limite_posicao: int) -> set:
+        """
+        Posições a remover segundo a política (lock já adquirido)
+        
+        As remoções são contadas por origem e em bytes à medida que são
+        marcadas, de modo que o custo acompanha os eventos removidos (e os
+        percorridos até atingir cada limite), não o total em memória.
+        """
+        removidas = set()
+        removidas_por_origem: Dict[str, int] = defaultdict(int)
+        eventos = self._eventos
+        
+        def marcar(posicao: int) -> None:
+            removidas.add(posicao)
+            removidas_por_origem[eventos[posicao].origem] += 1
+        
+        if politica.idade_maxima is not None:
+            for posicao in self._indice_temporal.posicoes(ate=agora - politica.idade_maxima):
+                if posicao <= limite_posicao:
+                    marcar(posicao)
+        
+        if politica.max_eventos_por_origem is not None:
+            for origem, indice in self._indices_por_origem.items():
+                excesso = (len(indice) - removidas_por_origem.get(origem, 0)
+                           - politica.max_eventos_por_origem)
+                for posicao in indice._posicoes:  # Mais antigos primeiro
+                    if excesso <= 0:
+                        break
+                    if posicao not in removidas and posicao <= limite_posicao:
+                        marcar(posicao)
+                        excesso -= 1
+        
+        if politica.max_bytes is not None:
+            bytes_por_posicao = self._bytes_por_posicao
+            bytes_restantes = self._bytes_estimados - sum(
+                bytes_por_posicao[p] for p in removidas
+            )
+            for posicao in self._indice_temporal._posicoes:
+                if bytes_restantes <= politica.max_bytes:
+                    break
+                if posicao not in removidas and posicao <= limite_posicao:
+                    removidas.add(posicao)
+                    bytes_restantes -= bytes_por_posicao[posicao]
+        
+        return removidas
+    
+    def _liberar(self, removidas: set) -> None:
+        """Substitui a lista de eventos e ajusta índices e sequências"""
+        eventos = list(self._eventos)
+        bytes_por_posicao = self._bytes_por_posicao
+        contar_bytes = self._politica_retencao.max_bytes is not None
+        for posicao in removidas:
+            if contar_bytes:
+                self._bytes_estimados -= bytes_por_posicao[posicao]
+                bytes_por_posicao[posicao] = 0
+            eventos[posicao] = None
+        
+        # Prefixo removido: avança a sequência base em vez de deixar lacunas
+        deslocamento = 0
+        while deslocamento < len(eventos) and eventos[deslocamento] is None:
+            deslocamento += 1
+        
+        self._eventos = eventos[deslocamento:]
+        if contar_bytes:
+            del bytes_por_posicao[:deslocamento]
+        self._sequencia_base += deslocamento
+        self._lacunas = self._eventos.count(None)
+        self._total_compactados += len(removidas)
+        
+        self._indice_temporal.remover_posicoes(removidas, deslocamento)
+        for origem in list(self._indices_por_origem):
+            indice = self._indices_por_origem[origem]
+            indice.remover_posicoes(removidas, deslocamento)
+            if not indice:
+                del self._indices_por_origem[origem]
+        
+        for indices in (self._indices_por_tipo, self._indices_por_tag):
+            for chave in list(indices):
+                postagens = [posicao - deslocamento for posicao in indices[chave]
+                             if posicao not in removidas]
+                if postagens:
+                    indices[chave] = postagens
+                else:
+                    del indices[chave]
+        
+        self._apos_compactacao(deslocamento)
+    
+    def _apos_compactacao(self, deslocamento: int) -> None:
+        """Gancho para subclasses com estruturas paralelas a `_eventos`"""
+        pass
+    
+    def obter_metricas(self) -> Dict[str, Any]:
+        """Obtém métricas do event store"""
+        with self._lock:
+            return {
+                'eventos_em_memoria': len(self._eventos) - self._lacunas,
+                'primeira_sequencia': self._sequencia_base,
+                'ultima_sequencia': self._sequencia_base + len(self._eventos) - 1,
+                'origens_indexadas': len(self._indices_por_origem),
+                'tipos_indexados': len(self._indices_por_tipo),
+                'tags_indexadas': len(self._indices_por_tag),
+                'bytes_estimados': self._bytes_estimados,
+                'total_compactados': self._total_compactados,
+                'snapshots': list(self._snapshots)
+            }
+    
+    def obter_visao(self) -> 'VisaoEventos':
+        """Obtém uma visão imutável dos eventos atuais (leitura sem lock)"""
+        with self._lock:
+            return self._visao()
+    
+    def _visao(self) -> 'VisaoEventos':
+        """Visão dos eventos atuais (lock já adquirido)"""
+        return VisaoEventos(self._eventos, len(self._eventos), self._sequencia_base,
+                            com_lacunas=bool(self._lacunas))
+    
+    @property
+    def primeira_sequencia(self) -> int:
+        """Sequência do primeiro evento em memória (avança com a compactação)"""
+        with self._lock:
+            return self._sequencia_base
+    
+    @property
+    def ultima_sequencia(self) -> int:
+        """Sequência do último evento armazenado (0 se vazio)"""
+        with self._lock:
+            return self._sequencia_base + len(self._eventos) - 1
+    
+    def ler_desde(self, sequencia: int, 
+                  limite: Optional[int] = None) -> Tuple[List[EventoSistema], int]:
+        """
+        Lê os eventos com sequência maior que `sequencia`, em ordem de chegada
+        
+        Retorna a lista de eventos e o novo cursor (sequência do último
+        evento retornado), que deve ser passado na próxima leitura.
+        """
+        return self.obter_visao().ler_desde(sequencia, limite)
+    
+    def registrar_snapshot(self, nome: str, sequencia: int, estado: Any) -> None:
+        """Registra o snapshot de uma projeção até a sequência informada"""
+        with self._lock:
+            self._snapshots[nome] = {
+                'sequencia': sequencia,
+                'estado': estado,
+                'timestamp': datetime.now()
+            }
+    
+    def obter_snapshot(self, nome: str) -> Optional[Dict[str, Any]]:
+        """Obtém o último snapshot registrado de uma projeção"""
+        with self._lock:
+            return self._snapshots.get(nome)
     
     def obter_eventos_por_origem(self, origem: str, 
                                 desde: Optional[datetime] = None) -> List[EventoSistema]:
         """Obtém todos os eventos de uma origem"""
         with self._lock:
-            indices = self._indices_por_origem.get(origem, [])
-            eventos = [self._eventos[i] for i in indices]
-            
-            if desde:
-                eventos = [e for e in eventos if e.timestamp >= desde]
-            
-            return sorted(eventos, key=lambda e: e.timestamp)
+            indice = self._indices_por_origem.get(origem)
+            if indice is None:
+                return []
+            visao = self._visao()
+            posicoes = indice.posicoes(desde)
+        return visao.obter(posicoes)
     
     def obter_todos_eventos(self, desde: Optional[datetime] = None,
                            ate: Optional[datetime] = None) -> List[EventoSistema]:
         """Obtém todos os eventos do sistema"""
         with self._lock:
-            eventos = list(self._eventos)
-            
-            if desde:
-                eventos = [e for e in eventos if e.timestamp >= desde]
-            if ate:
-                eventos = [e for e in eventos if e.timestamp <= ate]
+            visao = self._visao()
+            if self._indice_temporal.em_ordem_de_insercao and not self._lacunas:
+                # Posições coincidem com a ordem temporal: basta um slice
+                inicio, fim = self._indice_temporal.limites(desde, ate)
+                return visao.fatia(inicio, fim)
+            posicoes = self._indice_temporal.posicoes(desde, ate)
+        return visao.obter(posicoes)
+    
+    def obter_eventos_por_tipo(self, tipo: TipoEvento,
+                               desde: Optional[datetime] = None) -> List[EventoSistema]:
+        """Obtém todos os eventos de um tipo, em ordem de chegada"""
+        return self.consultar(tipo=tipo, desde=desde)
+    
+    def obter_eventos_por_tag(self, chave: str, valor: str) -> List[EventoSistema]:
+        """Obtém todos os eventos com a tag `chave=valor`, em ordem de chegada"""
+        return self.consultar(tags={chave: valor})
+    
+    def contar_por_tipo(self) -> Dict[TipoEvento, int]:
+        """Quantidade de eventos em memória por tipo (tamanho das postagens)"""
+        with self._lock:
+            return {tipo: len(postagens) for tipo, postagens in self._indices_por_tipo.items()}
+    
+    def consultar(self, tipo: Optional[TipoEvento] = None,
+                  tags: Optional[Dict[str, str]] = None,
+                  origem: Optional[str] = None,
+                  desde: Optional[datetime] = None,
+                  ate: Optional[datetime] = None,
+                  limite: Optional[int] = None) -> List[EventoSistema]:
+        """
+        Consulta eventos combinando tipo, tags, origem e período
+        
+        Tipo e tags são resolvidos pela interseção das listas de
+        postagens; origem e período filtram os candidatos resultantes.
+        Sem tipo nem tags, usa os índices temporais. O resultado segue
+        a ordem de chegada (sequência).
+        """
+        intervalo = None
+        with self._lock:
+            visao = self._visao()
+            listas = []
+            if tipo is not None:
+                listas.append(self._indices_por_tipo.get(tipo, []))
+            for chave, valor in (tags or {}).items():
+                listas.append(self._indices_por_tag.get((chave, str(valor)), []))
             
-            return sorted(eventos, key=lambda e: e.timestamp)
+            if not listas:
+                indice = (self._indices_por_origem.get(origem) if origem is not None
+                          else self._indice_temporal)
+                posicoes = indice.posicoes(desde, ate) if indice else []
+            elif desde is not None or ate is not None:
+                intervalo = self._indice_temporal.intervalo_de_posicoes(desde, ate)
+        
+        # Daqui em diante, sem lock: as listas de postagens capturadas só
+        # crescem com posições além da visão, e a visão não muda
+        desde_ns = ate_ns = None
+        if not listas:
+            posicoes.sort()
+        else:
+            posicoes = intersectar_postagens(listas, limite_posicao=len(visao))
+            if intervalo is not None:
+                # Período vira um intervalo de posições na lista ordenada
+                posicoes = posicoes[bisect_left(posicoes, intervalo[0]):
+                                    bisect_left(posicoes, intervalo[1])]
+            elif desde is not None or ate is not None:
+                desde_ns = para_nanossegundos(desde) if desde is not None else None
+                ate_ns = para_nanossegundos(ate) if ate is not None else None
+        
+        eventos = []
+        for posicao in posicoes:
+            evento = visao[posicao]
+            if origem is not None and evento.origem != origem:
+                continue
+            if desde_ns is not None and chave_temporal(evento) < desde_ns:
+                continue
+            if ate_ns is not None and chave_temporal(evento) > ate_ns:
+                continue
+            eventos.append(evento)
+            if limite is not None and len(eventos) >= limite:
+                break
+        return eventos
+
+
+class VisaoEventos:
+    """
+    Visão imutável de um prefixo do log de eventos
+    
+    Guarda a referência à lista do store e o tamanho no momento da
+    captura. Como o log só cresce por append, o prefixo nunca muda e
+    pode ser lido sem lock, enquanto produtores continuam escrevendo.
+    """
+    
+    def __init__(self, eventos: List[EventoSistema], tamanho: int, sequencia_base: int,
+                 com_lacunas: bool = True):
+        self._eventos = eventos
+        self._tamanho = tamanho
+        self.sequencia_base = sequencia_base
+        self._com_lacunas = com_lacunas
+    
+    def __len__(self) -> int:
+        return self._tamanho
+    
+    def __getitem__(self, posicao: int) -> Optional[EventoSistema]:
+        if not 0 <= posicao < self._tamanho:
+            raise IndexError(posicao)
+        return self._eventos[posicao]
+    
+    def __iter__(self):
+        for posicao in range(self._tamanho):
+            evento = self._eventos[posicao]
+            if evento is not None:  # Lacuna deixada pela compactação
+                yield evento
+    
+    @property
+    def ultima_sequencia(self) -> int:
+        return self.sequencia_base + self._tamanho - 1
+    
+    def fatia(self, inicio: int, fim: int) -> List[EventoSistema]:
+        """Eventos nas posições [inicio, fim) da visão, sem lacunas"""
+        eventos = self._eventos[inicio:min(fim, self._tamanho)]
+        if self._com_lacunas:
+            eventos = [evento for evento in eventos if evento is not None]
+        return eventos
+    
+    def obter(self, posicoes: List[int]) -> List[EventoSistema]:
+        """Eventos nas posições informadas (vindas dos índices do store)"""
+        eventos = self._eventos
+        return [eventos[posicao] for posicao in posicoes]
+    
+    def ler_desde(self, sequencia: int,
+                  limite: Optional[int] = None) -> Tuple[List[EventoSistema], int]:
+        """Eventos da visão com sequência maior que `sequencia`"""
+        inicio = max(0, sequencia - self.sequencia_base + 1)
+        fim = self._tamanho if limite is None else min(self._tamanho, inicio + limite)
+        return self.fatia(inicio, fim), max(sequencia, self.sequencia_base + fim - 1)
+
+
+class ParticaoIngestao:
+    """Buffer de ingestão de uma thread produtora"""
+    
+    def __init__(self, thread: threading.Thread):
+        self.thread = thread
+        self.fila: Deque[EventoSistema] = deque()
+        self.lock_descarga = threading.Lock()
+
+
+class IngestorEventos:
+    """
+    Caminho rápido de ingestão para muitas threads produtoras
+    
+    RESPONSABILIDADES:
+    - Dar a cada thread produtora um buffer próprio (sem lock compartilhado)
+    - Enviar os eventos ao Event Store em lotes, com uma aquisição do lock
+      do store por lote em vez de uma por evento
+    - Descarregar periodicamente os buffers parcialmente cheios
+    
+    Eventos ficam visíveis no store após a descarga do lote; a ordem de
+    chegada é preservada por thread produtora.
+    """
+    
+    def __init__(self, event_store: EventStore, tamanho_lote: int = 256,
+                 intervalo_descarga_segundos: Optional[float] = None):
+        self._event_store = event_store
+        self.tamanho_lote = tamanho_lote
+        self._local = threading.local()
+        self._particoes: List[ParticaoIngestao] = []
+        self._lock_registro = threading.Lock()
+        self._parar = threading.Event()
+        self._thread_descarga = None
+        
+        if intervalo_descarga_segundos:
+            self._thread_descarga = threading.Thread(
+                target=self._descarregar_periodicamente,
+                args=(intervalo_descarga_segundos,),
+                name="IngestorEventos-descarga",
+                daemon=True
+            )
+            self._thread_descarga.start()
+    
+    def _particao_local(self) -> ParticaoIngestao:
+        particao = getattr(self._local, 'particao', None)
+        if particao is None:
+            particao = ParticaoIngestao(threading.current_thread())
+            with self._lock_registro:
+                self._particoes.append(particao)
+            self._local.particao = particao
+        return particao
+    
+    def adicionar_evento(self, evento: EventoSistema) -> None:
+        """Enfileira o evento no buffer da thread atual"""
+        particao = self._particao_local()
+        particao.fila.append(evento)
+        if len(particao.fila) >= self.tamanho_lote:
+            self._descarregar_particao(particao)
+    
+    def _descarregar_particao(self, particao: ParticaoIngestao) -> int:
+        """Envia o conteúdo de um buffer ao store como um único lote"""
+        with particao.lock_descarga:
+            fila = particao.fila
+            lote = [fila.popleft() for _ in range(len(fila))]
+            if lote:
+                self._event_store.adicionar_eventos(lote)
+            return len(lote)
+    
+    def descarregar(self) -> int:
+        """Descarrega todos os buffers e retorna o total de eventos enviados"""
+        with self._lock_registro:
+            particoes = list(self._particoes)
+        
+        total = sum(self._descarregar_particao(p) for p in particoes)
+        
+        # Esquecer buffers vazios de threads que já terminaram
+        with self._lock_registro:
+            self._particoes = [
+                p for p in self._particoes if p.fila or p.thread.is_alive()
+            ]
+        return total
+    
+    def _descarregar_periodicamente(self, intervalo_segundos: float) -> None:
+        while not self._parar.wait(intervalo_segundos):
+            self.descarregar()
+    
+    def fechar(self) -> None:
+        """Para a descarga periódica e envia os eventos pendentes"""
+        self._parar.set()
+        if self._thread_descarga:
+            self._thread_descarga.join()
+        self.descarregar()
+
+
+def _como_datetime(valor: Union[str, datetime]) -> datetime:
+    """Data exportada como texto ISO ou já como datetime"""
+    return valor if isinstance(valor, datetime) else datetime.fromisoformat(valor)
 
 
 class QueryModel:
@@ -181,28 +873,254 @@ class QueryModel:
     Modelo de consulta para CQRS
     
     Projetado a partir dos eventos para consultas otimizadas
+    
+    Com `intervalo_snapshot` definido, o estado das projeções é salvo no
+    Event Store a cada N eventos processados; ao ser recriado, o modelo
+    parte do último snapshot e reprocessa apenas os eventos posteriores.
     """
     
-    def __init__(self, event_store: EventStore):
+    NOME_SNAPSHOT = "query_model"
+    
+    def __init__(self, event_store: EventStore,
+                 intervalo_snapshot: Optional[int] = None):
         self._event_store = event_store
         self._servicos: Dict[str, Servico] = {}
         self._alertas: Dict[str, Alerta] = {}
         self._metricas_agregadas: Dict[str, Dict[str, Any]] = defaultdict(dict)
+        # Histogramas de memória constante para percentis (sem amostras brutas)
+        self._histogramas: Dict[str, HistogramaLogaritmico] = {}
+        self._histogramas_por_serie: Dict[Tuple, HistogramaLogaritmico] = {}
+        # Buckets pré-agregados (1s/1m/1h) para consultas por período
+        self._rollups = RollupMetricas()
         self._lock = threading.RLock()
-        self._ultimo_evento_processado = 0
+        self._ultima_sequencia_processada = 0
+        self._intervalo_snapshot = intervalo_snapshot
+        self._sequencia_ultimo_snapshot = 0
+        
+        snapshot = event_store.obter_snapshot(self.NOME_SNAPSHOT)
+        if snapshot:
+            self.restaurar_estado(snapshot['estado'])
+            self._ultima_sequencia_processada = snapshot['sequencia']
+            self._sequencia_ultimo_snapshot = snapshot['sequencia']
+        
+        # Antes de liberar eventos brutos, o store pede um snapshot atualizado
+        event_store.registrar_consumidor(self._preparar_compactacao)
     
     def atualizar_projecoes(self) -> None:
         """Atualiza as projeções baseadas nos novos eventos"""
         with self._lock:
-            todos_eventos = self._event_store.obter_todos_eventos()
-            
-            # Processar apenas eventos novos
-            novos_eventos = todos_eventos[self._ultimo_evento_processado:]
+            # Ler apenas a cauda nova do Event Store, a partir do cursor
+            novos_eventos, sequencia = self._event_store.ler_desde(
+                self._ultima_sequencia_processada
+            )
             
             for evento in novos_eventos:
                 self._processar_evento(evento)
             
-            self._ultimo_evento_processado = len(todos_eventos)
+            self._ultima_sequencia_processada = sequencia
+            
+            if (self._intervalo_snapshot and
+                    sequencia - self._sequencia_ultimo_snapshot >= self._intervalo_snapshot):
+                self.registrar_snapshot()
+    
+    def _preparar_compactacao(self) -> int:
+        """Incorpora eventos pendentes e salva snapshot antes da compactação"""
+        with self._lock:
+            self.atualizar_projecoes()
+            if self._sequencia_ultimo_snapshot < self._ultima_sequencia_processada:
+                self.registrar_snapshot()
+            return self._ultima_sequencia_processada
+    
+    def registrar_snapshot(self) -> None:
+        """Salva o estado atual das projeções no Event Store"""
+        with self._lock:
+            self._event_store.registrar_snapshot(
+                self.NOME_SNAPSHOT,
+                self._ultima_sequencia_processada,
+                self.exportar_estado()
+            )
+            self._sequencia_ultimo_snapshot = self._ultima_sequencia_processada
+    
+    def salvar_snapshot(self, caminho: str) -> int:
+        """
+        Grava as projeções e o cursor de sequência em um arquivo binário
+        
+        Formato versionado de snapshot_codec (struct, sem pickle), gravado
+        de forma atômica. Retorna a sequência do cursor gravado.
+        """
+        with self._lock:
+            estado = self.exportar_estado(datas_como_texto=False)
+            sequencia = self._ultima_sequencia_processada
+        escrever_snapshot(caminho, sequencia, estado)
+        return sequencia
+    
+    def carregar_snapshot(self, caminho: str) -> int:
+        """
+        Restaura as projeções de um arquivo gravado por `salvar_snapshot`
+        
+        O cursor passa a ser a sequência do snapshot: o próximo
+        `atualizar_projecoes()` reprocessa apenas os eventos posteriores.
+        Se o Event Store já compactou eventos posteriores ao arquivo, eles
+        não podem mais ser reprocessados: usa o snapshot do próprio store
+        quando ele cobre o horizonte de compactação, ou lança ValueError.
+        Retorna a sequência restaurada.
+        """
+        sequencia, estado = ler_snapshot(caminho)
+        if sequencia > self._event_store.ultima_sequencia:
+            raise ValueError(
+                f"Snapshot na sequência {sequencia}, mas o Event Store termina em "
+                f"{self._event_store.ultima_sequencia}"
+            )
+        
+        horizonte = self._event_store.primeira_sequencia - 1
+        if sequencia < horizonte:
+            snapshot = self._event_store.obter_snapshot(self.NOME_SNAPSHOT)
+            if not snapshot or snapshot['sequencia'] < horizonte:
+                raise ValueError(
+                    f"Snapshot na sequência {sequencia}, mas o Event Store já "
+                    f"compactou os eventos até {horizonte}"
+                )
+            sequencia, estado = snapshot['sequencia'], snapshot['estado']
+        
+        with self._lock, pausar_coleta_ciclica():
+            self.restaurar_estado(estado)
+            self._ultima_sequencia_processada = sequencia
+            self._sequencia_ultimo_snapshot = sequencia
+        return sequencia
+    
+    def exportar_estado(self, datas_como_texto: bool = True) -> Dict[str, Any]:
+        """
+        Exporta as projeções como estruturas primitivas (serializáveis)
+        
+        Com `datas_como_texto=False`, as datas são mantidas como datetime
+        (para formatos que as codificam nativamente, como o snapshot binário).
+        """
+        data = (lambda d: d.isoformat()) if datas_como_texto else (lambda d: d)
+        with self._lock:
+            return {
+                'servicos': [
+                    {
+                        'id': s.id,
+                        'nome': s.nome,
+                        'url': s.url,
+                        'status': s.status.name,
+                        'ultima_verificacao': data(s.ultima_verificacao),
+                        'tempo_resposta_ms': s.tempo_resposta_ms,
+                        'taxa_erro': s.taxa_erro,
+                        'metricas': [
+                            {
+                                'nome': m.nome,
+                                'valor': m.valor,
+                                'unidade': m.unidade,
+                                'timestamp': data(m.timestamp),
+                                'tags': dict(m.tags)
+                            }
+                            for m in s.metricas
+                        ],
+                        'alertas_ativos': list(s.alertas_ativos),
+                        'configuracao': dict(s.configuracao)
+                    }
+                    for s in self._servicos.values()
+                ],
+                'alertas': [
+                    {
+                        'id': a.id,
+                        'titulo': a.titulo,
+                        'descricao': a.descricao,
+                        'severidade': a.severidade.value,
+                        'origem': a.origem,
+                        'timestamp': data(a.timestamp),
+                        'resolvido': a.resolvido,
+                        'timestamp_resolucao': (data(a.timestamp_resolucao)
+                                                if a.timestamp_resolucao else None),
+                        'metadados': dict(a.metadados)
+                    }
+                    for a in self._alertas.values()
+                ],
+                'metricas_agregadas': {
+                    nome: dict(agg, ultima_atualizacao=data(agg['ultima_atualizacao']))
+                    for nome, agg in self._metricas_agregadas.items()
+                },
+                'histogramas': {
+                    nome: histograma.para_dict()
+                    for nome, histograma in self._histogramas.items()
+                },
+                'histogramas_por_serie': [
+                    {
+                        'nome': nome,
+                        'origem': origem,
+                        'tags': dict(tags),
+                        'histograma': histograma.para_dict()
+                    }
+                    for (nome, origem, tags), histograma in self._histogramas_por_serie.items()
+                ],
+                'rollups': self._rollups.para_dict()
+            }
+    
+    def restaurar_estado(self, estado: Dict[str, Any]) -> None:
+        """Restaura as projeções a partir de um estado exportado"""
+        with self._lock:
+            self._servicos = {}
+            for dados in estado.get('servicos', []):
+                servico = Servico(
+                    id=dados['id'],
+                    nome=dados['nome'],
+                    url=dados['url'],
+                    status=StatusServico[dados['status']],
+                    ultima_verificacao=_como_datetime(dados['ultima_verificacao']),
+                    tempo_resposta_ms=dados['tempo_resposta_ms'],
+                    taxa_erro=dados['taxa_erro'],
+                    metricas=deque(
+                        (
+                            Metrica(
+                                nome=m['nome'],
+                                valor=m['valor'],
+                                unidade=m['unidade'],
+                                timestamp=_como_datetime(m['timestamp']),
+                                tags=m['tags']
+                            )
+                            for m in dados['metricas']
+                        ),
+                        maxlen=MAX_METRICAS_POR_SERVICO
+                    ),
+                    alertas_ativos=dados['alertas_ativos'],
+                    configuracao=dados['configuracao']
+                )
+                self._servicos[servico.id] = servico
+            
+            self._alertas = {}
+            for dados in estado.get('alertas', []):
+                alerta = Alerta(
+                    id=dados['id'],
+                    titulo=dados['titulo'],
+                    descricao=dados['descricao'],
+                    severidade=SeveridadeAlerta(dados['severidade']),
+                    origem=dados['origem'],
+                    timestamp=_como_datetime(dados['timestamp']),
+                    resolvido=dados['resolvido'],
+                    timestamp_resolucao=(_como_datetime(dados['timestamp_resolucao'])
+                                         if dados['timestamp_resolucao'] else None),
+                    metadados=dados['metadados']
+                )
+                self._alertas[alerta.id] = alerta
+            
+            self._metricas_agregadas = defaultdict(dict)
+            for nome, agg in estado.get('metricas_agregadas', {}).items():
+                self._metricas_agregadas[nome] = dict(
+                    agg, ultima_atualizacao=_como_datetime(agg['ultima_atualizacao'])
+                )
+            
+            self._histogramas = {
+                nome: HistogramaLogaritmico.de_dict(dados)
+                for nome, dados in estado.get('histogramas', {}).items()
+            }
+            self._histogramas_por_serie = {
+                self._chave_serie(serie['nome'], serie['origem'], serie['tags']):
+                    HistogramaLogaritmico.de_dict(serie['histograma'])
+                for serie in estado.get('histogramas_por_serie', [])
+            }
+            self._rollups = (RollupMetricas.de_dict(estado['rollups'])
+                             if 'rollups' in estado else RollupMetricas())
     
     def _processar_evento(self, evento: EventoSistema) -> None:
         """Processa um evento para atualizar as projeções"""
@@ -244,11 +1162,8 @@ class QueryModel:
                 timestamp=evento.timestamp,
                 tags=dados.get('tags', {})
             )
+            # Deque com maxlen descarta a métrica mais antiga automaticamente
             servico.metricas.append(metrica)
-            
-            # Manter apenas últimas 100 métricas por performance
-            if len(servico.metricas) > 100:
-                servico.metricas = servico.metricas[-100:]
         
         # Agregações para consultas rápidas
         nome_metrica = dados.get('nome', '')
@@ -270,8 +1185,35 @@ class QueryModel:
             agg['min'] = min(agg['min'], valor)
             agg['max'] = max(agg['max'], valor)
             agg['media'] = agg['total'] / agg['count']
+            
+            if valor >= 0:
+                self._registrar_em_histogramas(
+                    nome_metrica, evento.origem, dados.get('tags', {}), valor
+                )
+            self._rollups.registrar(
+                nome_metrica, evento.origem, dados.get('tags', {}),
+                evento.timestamp, valor
+            )
         agg['ultima_atualizacao'] = evento.timestamp
     
+    @staticmethod
+    def _chave_serie(nome_metrica: str, origem: str, tags: Dict[str, str]) -> Tuple:
+        return (nome_metrica, origem, tuple(sorted(tags.items())))
+    
+    def _registrar_em_histogramas(self, nome_metrica: str, origem: str,
+                                  tags: Dict[str, str], valor: float) -> None:
+        """Contabiliza o valor no histograma da métrica e no da série"""
+        histograma = self._histogramas.get(nome_metrica)
+        if histograma is None:
+            histograma = self._histogramas[nome_metrica] = HistogramaLogaritmico()
+        histograma.registrar(valor)
+        
+        chave = self._chave_serie(nome_metrica, origem, tags)
+        histograma_serie = self._histogramas_por_serie.get(chave)
+        if histograma_serie is None:
+            histograma_serie = self._histogramas_por_serie[chave] = HistogramaLogaritmico()
+        histograma_serie.registrar(valor)
+    
     def _processar_alerta_gerado(self, evento: EventoSistema) -> None:
         """Processa evento de alerta gerado"""
         dados = evento.dados
@@ -321,10 +1263,60 @@ class QueryModel:
             return [a for a in self._alertas.values() if not a.resolvido]
     
     def obter_metricas_agregadas(self, nome_metrica: str) -> Optional[Dict[str, Any]]:
-        """Obtém agregações de uma métrica"""
+        """Obtém agregações de uma métrica (inclui p50/p95/p99)"""
+        self.atualizar_projecoes()
+        with self._lock:
+            agg = self._metricas_agregadas.get(nome_metrica)
+            if agg is None:
+                return None
+            
+            resultado = dict(agg)
+            histograma = self._histogramas.get(nome_metrica)
+            if histograma:
+                resultado['p50'], resultado['p95'], resultado['p99'] = (
+                    histograma.percentis([50, 95, 99])
+                )
+            return resultado
+    
+    def obter_percentis(self, nome_metrica: str, origem: Optional[str] = None,
+                        tags: Optional[Dict[str, str]] = None,
+                        percentis: Tuple[float, ...] = (50, 95, 99)) -> Dict[str, Optional[float]]:
+        """
+        Obtém percentis de uma métrica, opcionalmente de uma série específica
+        
+        Sem `origem`, usa o histograma global da métrica; com `origem`,
+        usa o histograma da série (origem + tags).
+        """
+        self.atualizar_projecoes()
+        with self._lock:
+            if origem is None:
+                histograma = self._histogramas.get(nome_metrica)
+            else:
+                histograma = self._histogramas_por_serie.get(
+                    self._chave_serie(nome_metrica, origem, tags or {})
+                )
+            
+            valores = (histograma.percentis(percentis) if histograma
+                       else [None] * len(percentis))
+            return {f'p{p:g}': valor for p, valor in zip(percentis, valores)}
+    
+    def obter_serie_temporal(self, nome_metrica: str, desde: datetime,
+                             ate: Optional[datetime] = None,
+                             origem: Optional[str] = None,
+                             tags: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+        """Obtém os buckets pré-agregados de uma métrica em um período"""
+        self.atualizar_projecoes()
+        with self._lock:
+            return self._rollups.consultar(nome_metrica, desde, ate, origem, tags)
+    
+    def obter_agregado_periodo(self, nome_metrica: str, desde: datetime,
+                               ate: Optional[datetime] = None,
+                               origem: Optional[str] = None,
+                               tags: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
+        """Obtém count/min/max/média de uma métrica em um período"""
         self.atualizar_projecoes()
         with self._lock:
-            return self._metricas_agregadas.get(nome_metrica)
+            return self._rollups.agregar(nome_metrica, desde, ate, origem, tags)
 
 
 # =============================================================================
@@ -338,6 +1330,99 @@ class EstadoCircuitBreaker(Enum):
     MEIO_ABERTO = "meio_aberto"  # Testando recuperação
 
 
+MAX_HISTORICO_ESTADOS = 100
+
+
+class JanelaContagem:
+    """
+    Janela deslizante das últimas N chamadas (buffer circular)
+    
+    Mantém totais correntes de falhas e chamadas lentas: registrar uma
+    chamada subtrai a que sai da janela e soma a nova, em O(1).
+    """
+    
+    def __init__(self, tamanho: int = 100):
+        self.tamanho = tamanho
+        self.limpar()
+    
+    def limpar(self) -> None:
+        self._resultados = [0] * self.tamanho  # bit 1 = falha, bit 2 = lenta
+        self._proxima = 0
+        self.total = 0
+        self.falhas = 0
+        self.lentas = 0
+    
+    def registrar(self, falha: bool, lenta: bool) -> None:
+        if self.total == self.tamanho:
+            saindo = self._resultados[self._proxima]
+            self.falhas -= saindo & 1
+            self.lentas -= (saindo >> 1) & 1
+        else:
+            self.total += 1
+        
+        self._resultados[self._proxima] = int(falha) | (int(lenta) << 1)
+        self.falhas += falha
+        self.lentas += lenta
+        self._proxima = (self._proxima + 1) % self.tamanho
+    
+    def atualizar(self) -> None:
+        """Nada expira por tempo (mesma interface de JanelaTemporal)"""
+    
+    def descrever(self) -> Dict[str, Any]:
+        return {'tipo': 'contagem', 'tamanho': self.tamanho}
+
+
+class JanelaTemporal:
+    """
+    Janela deslizante dos últimos T segundos
+    
+    Buffer circular de T buckets de 1 segundo com totais correntes.
+    Avançar o tempo zera apenas os buckets expirados (no máximo T), de
+    modo que o custo por chamada é O(1) amortizado.
+    """
+    
+    def __init__(self, segundos: int = 60, relogio: Optional[Relogio] = None):
+        self.segundos = segundos
+        self.relogio = relogio or RELOGIO_SISTEMA
+        self.limpar()
+    
+    def limpar(self) -> None:
+        # Cada bucket: [segundo, total, falhas, lentas]
+        self._buckets = [[0, 0, 0, 0] for _ in range(self.segundos)]
+        self._segundo_atual = int(self.relogio.monotonico())
+        self.total = 0
+        self.falhas = 0
+        self.lentas = 0
+    
+    def atualizar(self) -> None:
+        """Descarta os buckets expirados (chamar antes de ler os totais)"""
+        agora = int(self.relogio.monotonico())
+        if agora == self._segundo_atual:
+            return
+        
+        inicio = max(self._segundo_atual + 1, agora - self.segundos + 1)
+        for segundo in range(inicio, agora + 1):
+            bucket = self._buckets[segundo % self.segundos]
+            self.total -= bucket[1]
+            self.falhas -= bucket[2]
+            self.lentas -= bucket[3]
+            bucket[:] = [segundo, 0, 0, 0]
+        self._segundo_atual = agora
+    
+    def registrar(self, falha: bool, lenta: bool) -> None:
+        self.atualizar()
+        bucket = self._buckets[self._segundo_atual % self.segundos]
+        bucket[1] += 1
+        bucket[2] += falha
+        bucket[3] += lenta
+        self.total += 1
+        self.falhas += falha
+        self.lentas += lenta
+    
+    def descrever(self) -> Dict[str, Any]:
+        return {'tipo': 'temporal', 'segundos': self.segundos}
+
+
 class CircuitBreaker:
     """
     Implementação do Circuit Breaker Pattern
@@ -347,30 +1432,86 @@ class CircuitBreaker:
     - Falhar rapidamente quando sistema está indisponível
     - Permitir recuperação automática
     - Coletar métricas de falhas
+    
+    O lock protege apenas duas seções curtas: a admissão da chamada
+    (verificação de estado) e o registro do resultado. A função
+    protegida executa fora do lock, de modo que chamadas concorrentes
+    não são serializadas. No estado MEIO_ABERTO, no máximo
+    `max_chamadas_meio_aberto` chamadas de teste são admitidas ao mesmo
+    tempo; o circuito fecha quando esse número de testes for bem-sucedido
+    e reabre na primeira falha.
+    
+    Cada transição de estado incrementa uma geração: resultados de
+    chamadas admitidas em uma geração anterior entram nas métricas, mas
+    não alteram o estado atual.
+    
+    `executar_assincrono` (e o decorator aplicado a `async def`) usa a
+    mesma lógica de estado; o lock nunca é mantido durante um `await`.
+    
+    MODOS DE ABERTURA:
+    - Sem `janela`: contador de falhas consecutivas (`threshold_falhas`)
+    - Com `janela` (JanelaContagem ou JanelaTemporal): abre quando, com
+      pelo menos `minimo_chamadas` na janela, a taxa de falhas atinge
+      `taxa_falhas_limite_pct` ou a taxa de chamadas mais lentas que
+      `limite_chamada_lenta_ms` atinge `taxa_lentas_limite_pct`
+    
+    Todo o tempo (timeout de recuperação, latências, timestamps) é lido
+    de `relogio`, por padrão o relógio do sistema.
     """
     
     def __init__(self, 
                  threshold_falhas: int = 5,
                  timeout_segundos: int = 60,
-                 nome: str = "CircuitBreaker"):
+                 nome: str = "CircuitBreaker",
+                 max_chamadas_meio_aberto: int = 1,
+                 janela: Optional[Union[JanelaContagem, JanelaTemporal]] = None,
+                 taxa_falhas_limite_pct: float = 50.0,
+                 taxa_lentas_limite_pct: float = 100.0,
+                 limite_chamada_lenta_ms: Optional[float] = None,
+                 minimo_chamadas: int = 10,
+                 relogio: Optional[Relogio] = None):
         self.threshold_falhas = threshold_falhas
         self.timeout_segundos = timeout_segundos
         self.nome = nome
+        self.max_chamadas_meio_aberto = max_chamadas_meio_aberto
+        self.relogio = relogio or RELOGIO_SISTEMA
+        
+        # Modo janela deslizante
+        self.janela = janela
+        self.taxa_falhas_limite_pct = taxa_falhas_limite_pct
+        self.taxa_lentas_limite_pct = taxa_lentas_limite_pct
+        self._limite_lenta_ns = (int(limite_chamada_lenta_ms * 1_000_000)
+                                 if limite_chamada_lenta_ms is not None else None)
+        self.minimo_chamadas = minimo_chamadas
         
         self._estado = EstadoCircuitBreaker.FECHADO
+        self._geracao = 0
         self._contador_falhas = 0
+        self._chamadas_meio_aberto = 0   # Testes em andamento
+        self._sucessos_meio_aberto = 0   # Testes concluídos com sucesso
         self._timestamp_ultimo_erro = None
         self._timestamp_ultima_tentativa = None
+        self._timestamp_abertura = None
         self._lock = threading.RLock()
         
         # Métricas
-        self._total_chamadas = 0
-        self._total_sucessos = 0
-        self._total_falhas = 0
-        self._historico_estados = []
+        self._instrumentacao = RegistroMetricas(nome)
+        self._total_chamadas = self._instrumentacao.contador('total_chamadas')
+        self._total_sucessos = self._instrumentacao.contador('total_sucessos')
+        self._total_falhas = self._instrumentacao.contador('total_falhas')
+        self._total_rejeitadas = self._instrumentacao.contador('total_rejeitadas')
+        self._total_canceladas = self._instrumentacao.contador('total_canceladas')
+        self._latencia = self._instrumentacao.histograma('latencia_chamada')
+        self._historico_estados: Deque[Dict[str, Any]] = deque(maxlen=MAX_HISTORICO_ESTADOS)
     
     def __call__(self, func: Callable) -> Callable:
-        """Decorator para aplicar circuit breaker"""
+        """Decorator para aplicar circuit breaker (funções ou corrotinas)"""
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper_assincrono(*args, **kwargs):
+                return await self.executar_assincrono(func, *args, **kwargs)
+            return wrapper_assincrono
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
             return self.executar(func, *args, **kwargs)
@@ -378,106 +1519,254 @@ class CircuitBreaker:
     
     def executar(self, func: Callable, *args, **kwargs) -> Any:
         """Executa função com proteção do circuit breaker"""
-        with self._lock:
-            self._total_chamadas += 1
-            self._timestamp_ultima_tentativa = datetime.now()
-            
-            # Verificar estado antes de executar
-            if self._estado == EstadoCircuitBreaker.ABERTO:
-                if self._deve_tentar_recuperacao():
+        geracao, teste = self._admitir_chamada()
+        
+        inicio = self.relogio.monotonico_ns()
+        try:
+            resultado = func(*args, **kwargs)
+        except Exception as e:
+            self._concluir_chamada(geracao, teste, inicio, falhou=True)
+            raise e
+        except BaseException:
+            # KeyboardInterrupt, SystemExit...: sem veredito sobre o serviço
+            self._liberar_chamada(geracao, teste)
+            raise
+        
+        self._concluir_chamada(geracao, teste, inicio, falhou=False)
+        return resultado
+    
+    async def executar_assincrono(self, func: Callable, *args, **kwargs) -> Any:
+        """Executa uma corrotina com proteção do circuit breaker"""
+        geracao, teste = self._admitir_chamada()
+        
+        inicio = self.relogio.monotonico_ns()
+        try:
+            resultado = await func(*args, **kwargs)
+        except Exception as e:
+            self._concluir_chamada(geracao, teste, inicio, falhou=True)
+            raise e
+        except BaseException:
+            # Cancelamento (ex.: hedge perdedor, wait_for): chamada neutra
+            self._liberar_chamada(geracao, teste)
+            raise
+        
+        self._concluir_chamada(geracao, teste, inicio, falhou=False)
+        return resultado
+    
+    def _concluir_chamada(self, geracao: int, teste: bool, inicio_ns: int,
+                          falhou: bool) -> None:
+        """Registra latência e resultado de uma chamada admitida"""
+        duracao_ns = self.relogio.monotonico_ns() - inicio_ns
+        self._latencia.registrar_ns(duracao_ns)
+        if falhou:
+            self._registrar_falha(geracao, teste, duracao_ns)
+        else:
+            self._registrar_sucesso(geracao, teste, duracao_ns)
+    
+    def _liberar_chamada(self, geracao: int, teste: bool) -> None:
+        """
+        Encerra uma chamada admitida sem resultado (cancelada)
+        
+        Não conta como sucesso nem como falha; apenas devolve a vaga de
+        teste do MEIO_ABERTO, para que outra chamada possa testar o serviço.
+        """
+        self._total_canceladas.incrementar()
+        if not teste:
+            return
+        with self._lock:
+            if geracao == self._geracao:
+                self._chamadas_meio_aberto -= 1
+    
+    def _admitir_chamada(self) -> Tuple[int, bool]:
+        """
+        Verifica o estado e admite (ou rejeita) uma chamada
+        
+        Retorna a geração em que a chamada foi admitida e se ela é uma
+        chamada de teste do estado MEIO_ABERTO.
+        """
+        self._total_chamadas.incrementar()
+        
+        with self._lock:
+            self._timestamp_ultima_tentativa = self.relogio.agora()
+            
+            if self._estado == EstadoCircuitBreaker.ABERTO:
+                if self._deve_tentar_recuperacao():
                     self._transicionar_para_meio_aberto()
                 else:
+                    self._total_rejeitadas.incrementar()
                     raise CircuitBreakerAbertoException(
                         f"Circuit breaker {self.nome} está aberto"
                     )
             
-            try:
-                resultado = func(*args, **kwargs)
-                self._registrar_sucesso()
-                return resultado
-                
-            except Exception as e:
-                self._registrar_falha()
-                raise e
+            if self._estado == EstadoCircuitBreaker.MEIO_ABERTO:
+                if self._chamadas_meio_aberto >= self.max_chamadas_meio_aberto:
+                    self._total_rejeitadas.incrementar()
+                    raise CircuitBreakerAbertoException(
+                        f"Circuit breaker {self.nome} está meio-aberto "
+                        f"(limite de {self.max_chamadas_meio_aberto} chamadas de teste)"
+                    )
+                self._chamadas_meio_aberto += 1
+                return self._geracao, True
+            
+            return self._geracao, False
     
     def _deve_tentar_recuperacao(self) -> bool:
         """Verifica se é hora de tentar recuperação"""
-        if not self._timestamp_ultimo_erro:
+        # Abertura por chamadas lentas não tem erro: conta desde a abertura
+        referencia = self._timestamp_ultimo_erro
+        if self._timestamp_abertura and (not referencia or self._timestamp_abertura > referencia):
+            referencia = self._timestamp_abertura
+        if not referencia:
             return True
         
-        tempo_desde_ultimo_erro = datetime.now() - self._timestamp_ultimo_erro
-        return tempo_desde_ultimo_erro.total_seconds() >= self.timeout_segundos
+        tempo_desde_referencia = self.relogio.agora() - referencia
+        return tempo_desde_referencia.total_seconds() >= self.timeout_segundos
     
-    def _transicionar_para_meio_aberto(self) -> None:
-        """Transiciona para estado meio-aberto"""
-        self._estado = EstadoCircuitBreaker.MEIO_ABERTO
+    def _transicionar(self, estado: EstadoCircuitBreaker, motivo: str) -> None:
+        """Muda de estado e inicia uma nova geração (lock já adquirido)"""
+        self._estado = estado
+        self._geracao += 1
+        self._chamadas_meio_aberto = 0
+        self._sucessos_meio_aberto = 0
+        if self.janela is not None:
+            self.janela.limpar()
+        if estado == EstadoCircuitBreaker.ABERTO:
+            self._timestamp_abertura = self.relogio.agora()
         self._historico_estados.append({
             'estado': self._estado,
-            'timestamp': datetime.now(),
-            'motivo': 'tentativa_recuperacao'
+            'timestamp': self.relogio.agora(),
+            'motivo': motivo
         })
     
-    def _registrar_sucesso(self) -> None:
+    def _transicionar_para_meio_aberto(self) -> None:
+        """Transiciona para estado meio-aberto"""
+        self._transicionar(EstadoCircuitBreaker.MEIO_ABERTO, 'tentativa_recuperacao')
+    
+    def _chamada_lenta(self, duracao_ns: int) -> bool:
+        return self._limite_lenta_ns is not None and duracao_ns >= self._limite_lenta_ns
+    
+    def _registrar_sucesso(self, geracao: int, teste: bool, duracao_ns: int = 0) -> None:
         """Registra execução bem-sucedida"""
-        self._total_sucessos += 1
+        self._total_sucessos.incrementar()
         
-        if self._estado == EstadoCircuitBreaker.MEIO_ABERTO:
-            # Sucesso no meio-aberto: volta para fechado
-            self._estado = EstadoCircuitBreaker.FECHADO
-            self._contador_falhas = 0
-            self._historico_estados.append({
-                'estado': self._estado,
-                'timestamp': datetime.now(),
-                'motivo': 'recuperacao_bem_sucedida'
-            })
-        elif self._estado == EstadoCircuitBreaker.FECHADO:
-            # Reduzir contador de falhas gradualmente
-            self._contador_falhas = max(0, self._contador_falhas - 1)
-    
-    def _registrar_falha(self) -> None:
+        with self._lock:
+            if geracao != self._geracao:
+                return  # Resultado de uma geração anterior: só métricas
+            
+            lenta = self._chamada_lenta(duracao_ns)
+            if teste:
+                self._chamadas_meio_aberto -= 1
+                if lenta and self.janela is not None:
+                    # Teste lento no modo janela: ainda não recuperado
+                    self._transicionar(EstadoCircuitBreaker.ABERTO, 'chamada_lenta_no_meio_aberto')
+                    return
+                
+                # Teste bem-sucedido: fecha após o número configurado
+                self._sucessos_meio_aberto += 1
+                if self._sucessos_meio_aberto >= self.max_chamadas_meio_aberto:
+                    self._contador_falhas = 0
+                    self._transicionar(EstadoCircuitBreaker.FECHADO, 'recuperacao_bem_sucedida')
+            elif self._estado == EstadoCircuitBreaker.FECHADO:
+                if self.janela is not None:
+                    self.janela.registrar(False, lenta)
+                    self._avaliar_janela()
+                else:
+                    # Reduzir contador de falhas gradualmente
+                    self._contador_falhas = max(0, self._contador_falhas - 1)
+    
+    def _registrar_falha(self, geracao: int, teste: bool, duracao_ns: int = 0) -> None:
         """Registra execução falhada"""
-        self._total_falhas += 1
-        self._contador_falhas += 1
-        self._timestamp_ultimo_erro = datetime.now()
-        
-        if self._contador_falhas >= self.threshold_falhas:
-            if self._estado != EstadoCircuitBreaker.ABERTO:
-                self._estado = EstadoCircuitBreaker.ABERTO
-                self._historico_estados.append({
-                    'estado': self._estado,
-                    'timestamp': datetime.now(),
-                    'motivo': f'threshold_atingido_{self._contador_falhas}'
-                })
+        self._total_falhas.incrementar()
+        
+        with self._lock:
+            if geracao != self._geracao:
+                return  # Resultado de uma geração anterior: só métricas
+            
+            self._timestamp_ultimo_erro = self.relogio.agora()
+            if teste:
+                # Falha no meio-aberto: volta a abrir imediatamente
+                self._transicionar(EstadoCircuitBreaker.ABERTO, 'falha_no_meio_aberto')
+                return
+            
+            if self.janela is not None:
+                if self._estado == EstadoCircuitBreaker.FECHADO:
+                    self.janela.registrar(True, self._chamada_lenta(duracao_ns))
+                    self._avaliar_janela()
+                return
+            
+            self._contador_falhas += 1
+            if (self._contador_falhas >= self.threshold_falhas and
+                    self._estado != EstadoCircuitBreaker.ABERTO):
+                self._transicionar(
+                    EstadoCircuitBreaker.ABERTO,
+                    f'threshold_atingido_{self._contador_falhas}'
+                )
+    
+    def _taxas_janela(self) -> Tuple[float, float]:
+        """Taxas de falhas e de chamadas lentas (%) na janela"""
+        total = self.janela.total
+        if not total:
+            return 0.0, 0.0
+        return self.janela.falhas / total * 100, self.janela.lentas / total * 100
+    
+    def _avaliar_janela(self) -> None:
+        """Abre o circuito se a janela ultrapassar algum limite (lock adquirido)"""
+        if self.janela.total < self.minimo_chamadas:
+            return
+        
+        taxa_falhas, taxa_lentas = self._taxas_janela()
+        if taxa_falhas >= self.taxa_falhas_limite_pct:
+            self._transicionar(EstadoCircuitBreaker.ABERTO,
+                               f'taxa_falhas_{taxa_falhas:.1f}pct')
+        elif self._limite_lenta_ns is not None and taxa_lentas >= self.taxa_lentas_limite_pct:
+            self._transicionar(EstadoCircuitBreaker.ABERTO,
+                               f'taxa_chamadas_lentas_{taxa_lentas:.1f}pct')
     
     def obter_metricas(self) -> Dict[str, Any]:
         """Obtém métricas do circuit breaker"""
+        instrumentacao = self._instrumentacao.instantaneo()
+        total_chamadas = instrumentacao['total_chamadas']
+        taxa_sucesso = (instrumentacao['total_sucessos'] / total_chamadas * 100 
+                       if total_chamadas > 0 else 0)
+        
         with self._lock:
-            taxa_sucesso = (self._total_sucessos / self._total_chamadas * 100 
-                           if self._total_chamadas > 0 else 0)
+            janela = None
+            if self.janela is not None:
+                self.janela.atualizar()
+                taxa_falhas, taxa_lentas = self._taxas_janela()
+                janela = dict(self.janela.descrever(),
+                              chamadas=self.janela.total,
+                              taxa_falhas_pct=round(taxa_falhas, 2),
+                              taxa_lentas_pct=round(taxa_lentas, 2))
             
             return {
                 'nome': self.nome,
                 'estado': self._estado.value,
-                'total_chamadas': self._total_chamadas,
-                'total_sucessos': self._total_sucessos,
-                'total_falhas': self._total_falhas,
+                'total_chamadas': total_chamadas,
+                'total_sucessos': instrumentacao['total_sucessos'],
+                'total_falhas': instrumentacao['total_falhas'],
+                'total_rejeitadas': instrumentacao['total_rejeitadas'],
+                'total_canceladas': instrumentacao['total_canceladas'],
                 'contador_falhas_atual': self._contador_falhas,
+                'chamadas_meio_aberto_em_andamento': self._chamadas_meio_aberto,
                 'taxa_sucesso_pct': round(taxa_sucesso, 2),
+                'latencia_chamada_ms': instrumentacao['latencia_chamada_ms'],
                 'timestamp_ultimo_erro': self._timestamp_ultimo_erro,
                 'timestamp_ultima_tentativa': self._timestamp_ultima_tentativa,
-                'historico_estados': self._historico_estados[-10:]  # Últimos 10
+                'janela': janela,
+                'historico_estados': list(self._historico_estados)[-10:]  # Últimos 10
             }
     
+    @property
+    def estado(self) -> EstadoCircuitBreaker:
+        """Estado atual do circuito"""
+        return self._estado
+    
     def reset(self) -> None:
         """Reset manual do circuit breaker"""
         with self._lock:
-            self._estado = EstadoCircuitBreaker.FECHADO
             self._contador_falhas = 0
-            self._historico_estados.append({
-                'estado': self._estado,
-                'timestamp': datetime.now(),
-                'motivo': 'reset_manual'
-            })
+            self._transicionar(EstadoCircuitBreaker.FECHADO, 'reset_manual')
 
 
 class CircuitBreakerAbertoException(Exception):
@@ -504,12 +1793,14 @@ class RetryStrategy:
                  delay_inicial_ms: int = 100,
                  multiplicador: float = 2.0,
                  delay_maximo_ms: int = 30000,
-                 jitter: bool = True):
+                 jitter: bool = True,
+                 aleatorio: Optional[random.Random] = None):
         self.max_tentativas = max_tentativas
         self.delay_inicial_ms = delay_inicial_ms
         self.multiplicador = multiplicador
         self.delay_maximo_ms = delay_maximo_ms
         self.jitter = jitter
+        self.aleatorio = aleatorio  # None = módulo random (gerador global)
     
     def calcular_delay(self, tentativa: int) -> int:
         """Calcula delay para uma tentativa específica"""
@@ -523,7 +1814,7 @@ class RetryStrategy:
         # Adicionar jitter para evitar thundering herd
         if self.jitter:
             jitter_amount = delay * 0.1  # 10% de jitter
-            delay += random.uniform(-jitter_amount, jitter_amount)
+            delay += (self.aleatorio or random).uniform(-jitter_amount, jitter_amount)
         
         return max(0, int(delay))
     
@@ -539,70 +1830,403 @@ class RetryStrategy:
         return True
 
 
+class OrcamentoRetry:
+    """
+    Orçamento de retries (token bucket) compartilhável entre executores
+    
+    Cada execução deposita `percentual / 100` tokens e cada retry (ou
+    requisição hedge) consome um token inteiro, limitando os retries a
+    um percentual do tráfego recente. `minimo_por_segundo` garante um
+    piso de retries com pouco tráfego, e `capacidade` limita o acúmulo.
+    """
+    
+    def __init__(self, percentual: float = 20.0, minimo_por_segundo: float = 10.0,
+                 capacidade: Optional[float] = None,
+                 relogio: Optional[Relogio] = None):
+        self.percentual = percentual
+        self.relogio = relogio or RELOGIO_SISTEMA
+        self.minimo_por_segundo = minimo_por_segundo
+        self.capacidade = capacidade if capacidade is not None else max(10.0, minimo_por_segundo)
+        
+        self._tokens = self.capacidade
+        self._ultima_recarga = self.relogio.monotonico()
+        self._lock = threading.Lock()
+        self._retries_permitidos = 0
+        self._retries_negados = 0
+    
+    def _recarregar(self) -> None:
+        agora = self.relogio.monotonico()
+        self._tokens = min(
+            self.capacidade,
+            self._tokens + (agora - self._ultima_recarga) * self.minimo_por_segundo
+        )
+        self._ultima_recarga = agora
+    
+    def depositar(self) -> None:
+        """Registra uma execução (requisição original)"""
+        with self._lock:
+            self._recarregar()
+            self._tokens = min(self.capacidade, self._tokens + self.percentual / 100)
+    
+    def retirar(self) -> bool:
+        """Tenta consumir um token para um retry; False se o orçamento acabou"""
+        with self._lock:
+            self._recarregar()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self._retries_permitidos += 1
+                return True
+            self._retries_negados += 1
+            return False
+    
+    def obter_metricas(self) -> Dict[str, Any]:
+        with self._lock:
+            self._recarregar()
+            return {
+                'tokens_disponiveis': round(self._tokens, 2),
+                'capacidade': self.capacidade,
+                'percentual': self.percentual,
+                'retries_permitidos': self._retries_permitidos,
+                'retries_negados': self._retries_negados
+            }
+
+
 class RetryExecutor:
     """
     Executor de operações com retry
+    
+    OPCIONAIS:
+    - `orcamento`: OrcamentoRetry compartilhado; sem tokens, a falha é
+      propagada em vez de gerar mais carga sobre o serviço degradado
+    - `hedge_percentil`: se uma tentativa demora mais que esse percentil
+      da latência observada, dispara uma segunda requisição em paralelo
+      e usa o primeiro sucesso (requer `hedge_minimo_amostras` amostras)
+    
+    Com hedge ativo, no modo síncrono as duas requisições rodam em um
+    pool de threads (criado na primeira chamada com hedge, liberado por
+    `fechar()`) e a thread chamadora aguarda o primeiro sucesso; a
+    perdedora é cancelada se ainda não começou, ou ignorada. No modo
+    assíncrono a perdedora é cancelada. Hedges negadas pelo orçamento
+    contam em `retries_negados_orcamento`.
+    
+    As métricas ocupam memória constante: um contador por número de
+    tentativas (1..max_tentativas), um histograma de latência por
+    tentativa e uma janela deslizante de `janela_segundos` com as
+    execuções recentes.
     """
     
-    def __init__(self, strategy: RetryStrategy, nome: str = "RetryExecutor"):
+    INTERVALO_LIMITE_HEDGE_SEGUNDOS = 1.0
+    
+    def __init__(self, strategy: RetryStrategy, nome: str = "RetryExecutor",
+                 orcamento: Optional[OrcamentoRetry] = None,
+                 hedge_percentil: Optional[float] = None,
+                 hedge_minimo_amostras: int = 20,
+                 janela_segundos: int = 60,
+                 relogio: Optional[Relogio] = None):
         self.strategy = strategy
+        self.relogio = relogio or RELOGIO_SISTEMA
         self.nome = nome
+        self.orcamento = orcamento
+        self.hedge_percentil = hedge_percentil
+        self.hedge_minimo_amostras = hedge_minimo_amostras
         self._metricas = {
-            'total_execucoes': 0,
-            'total_sucessos': 0,
-            'total_falhas': 0,
-            'tentativas_por_execucao': [],
             'ultima_execucao': None
         }
+        self._instrumentacao = RegistroMetricas(nome)
+        self._total_execucoes = self._instrumentacao.contador('total_execucoes')
+        self._total_sucessos = self._instrumentacao.contador('total_sucessos')
+        self._total_falhas = self._instrumentacao.contador('total_falhas')
+        self._total_tentativas = self._instrumentacao.contador('total_tentativas')
+        self._retries_negados = self._instrumentacao.contador('retries_negados_orcamento')
+        self._hedges_disparados = self._instrumentacao.contador('hedges_disparados')
+        self._hedges_vencedores = self._instrumentacao.contador('hedges_vencedores')
+        self._latencia_tentativa = self._instrumentacao.histograma('latencia_tentativa')
+        
+        # Histograma de tentativas por execução e latência de cada tentativa
+        self._execucoes_por_tentativas = [
+            self._instrumentacao.contador(f'execucoes_{n}_tentativas')
+            for n in range(1, strategy.max_tentativas + 1)
+        ]
+        self._latencia_por_tentativa = [
+            self._instrumentacao.histograma(f'latencia_tentativa_{n}')
+            for n in range(1, strategy.max_tentativas + 1)
+        ]
+        
+        # Execuções recentes (janela deslizante, O(1) por registro)
+        self._janela_recente = JanelaTemporal(janela_segundos, self.relogio)
+        self._lock_janela = threading.Lock()
+        
+        # Limite de hedge (segundos), recalculado periodicamente
+        self._limite_hedge: Optional[float] = None
+        self._limite_hedge_calculado_em = float('-inf')
+        self._executor_hedge: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._lock_hedge = threading.Lock()
+        self._fechado = False
+    
+    def __call__(self, func: Callable) -> Callable:
+        """Decorator para aplicar retry (funções ou corrotinas)"""
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper_assincrono(*args, **kwargs):
+                return await self.executar_assincrono(func, *args, **kwargs)
+            return wrapper_assincrono
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return self.executar(func, *args, **kwargs)
+        return wrapper
     
     def executar(self, func: Callable, *args, **kwargs) -> Any:
         """Executa função com retry"""
-        self._metricas['total_execucoes'] += 1
-        self._metricas['ultima_execucao'] = datetime.now()
-        
+        self._iniciar_execucao()
         ultima_exception = None
+        tentativa = 0  # max_tentativas < 1: nenhuma tentativa
         
         for tentativa in range(1, self.strategy.max_tentativas + 1):
+            inicio = self._iniciar_tentativa()
             try:
-                resultado = func(*args, **kwargs)
-                self._metricas['total_sucessos'] += 1
-                self._metricas['tentativas_por_execucao'].append(tentativa)
-                return resultado
-                
+                resultado = self._chamar(func, args, kwargs)
             except Exception as e:
                 ultima_exception = e
-                
-                if not self.strategy.deve_tentar_novamente(tentativa, e):
+                delay_ms = self._avaliar_falha(tentativa, e, inicio)
+                if delay_ms is None:
                     break
-                
-                if tentativa < self.strategy.max_tentativas:
-                    delay_ms = self.strategy.calcular_delay(tentativa)
-                    if delay_ms > 0:
-                        time.sleep(delay_ms / 1000)  # Converter para segundos
+                if delay_ms > 0:
+                    self.relogio.dormir(delay_ms / 1000)  # Converter para segundos
+                continue
+            
+            self._registrar_sucesso(tentativa, inicio)
+            return resultado
         
         # Se chegou aqui, todas as tentativas falharam
-        self._metricas['total_falhas'] += 1
-        self._metricas['tentativas_por_execucao'].append(self.strategy.max_tentativas)
+        raise self._esgotar(tentativa, ultima_exception)
+    
+    async def executar_assincrono(self, func: Callable, *args, **kwargs) -> Any:
+        """Executa uma corrotina com retry (backoff via asyncio.sleep)"""
+        self._iniciar_execucao()
+        ultima_exception = None
+        tentativa = 0  # max_tentativas < 1: nenhuma tentativa
+        
+        for tentativa in range(1, self.strategy.max_tentativas + 1):
+            inicio = self._iniciar_tentativa()
+            try:
+                resultado = await self._chamar_assincrono(func, args, kwargs)
+            except Exception as e:
+                ultima_exception = e
+                delay_ms = self._avaliar_falha(tentativa, e, inicio)
+                if delay_ms is None:
+                    break
+                if delay_ms > 0:
+                    await asyncio.sleep(delay_ms / 1000)
+                continue
+            
+            self._registrar_sucesso(tentativa, inicio)
+            return resultado
         
-        raise RetryExhaustedException(
+        raise self._esgotar(tentativa, ultima_exception)
+    
+    def _chamar(self, func: Callable, args: tuple, kwargs: dict) -> Any:
+        """Uma tentativa, com hedge no pool se ela passar do limite"""
+        limite = self._obter_limite_hedge()
+        primaria = self._submeter_hedge(func, args, kwargs) if limite is not None else None
+        if primaria is None:
+            return func(*args, **kwargs)
+        
+        concluidas, _ = concurrent.futures.wait({primaria}, timeout=limite)
+        secundaria = None
+        if not concluidas and self._permitir_hedge():
+            secundaria = self._submeter_hedge(func, args, kwargs)
+        if secundaria is None:
+            return primaria.result()
+        
+        pendentes = {primaria, secundaria}
+        erro = None
+        try:
+            while pendentes:
+                concluidas, pendentes = concurrent.futures.wait(
+                    pendentes, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for futuro in concluidas:
+                    if futuro.exception() is None:
+                        if futuro is secundaria:
+                            self._hedges_vencedores.incrementar()
+                        return futuro.result()
+                    erro = futuro.exception()
+            raise erro
+        finally:
+            for futuro in pendentes:
+                futuro.cancel()  # Já em execução: o resultado é ignorado
+    
+    def _submeter_hedge(self, func: Callable, args: tuple,
+                        kwargs: dict) -> Optional[concurrent.futures.Future]:
+        """Submete ao pool de hedge; None depois de `fechar()`"""
+        with self._lock_hedge:
+            if self._fechado:
+                return None
+            if self._executor_hedge is None:
+                self._executor_hedge = concurrent.futures.ThreadPoolExecutor(
+                    thread_name_prefix=f"Retry-{self.nome}-hedge"
+                )
+            return self._executor_hedge.submit(func, *args, **kwargs)
+    
+    async def _chamar_assincrono(self, func: Callable, args: tuple, kwargs: dict) -> Any:
+        """Versão assíncrona de `_chamar`; a requisição perdedora é cancelada"""
+        limite = self._obter_limite_hedge()
+        if limite is None:
+            return await func(*args, **kwargs)
+        
+        primaria = asyncio.ensure_future(func(*args, **kwargs))
+        concluidas, _ = await asyncio.wait({primaria}, timeout=limite)
+        if concluidas or not self._permitir_hedge():
+            return await primaria
+        secundaria = asyncio.ensure_future(func(*args, **kwargs))
+        
+        pendentes = {primaria, secundaria}
+        erro = None
+        try:
+            while pendentes:
+                concluidas, pendentes = await asyncio.wait(
+                    pendentes, return_when=asyncio.FIRST_COMPLETED
+                )
+                for tarefa in concluidas:
+                    if tarefa.exception() is None:
+                        if tarefa is secundaria:
+                            self._hedges_vencedores.incrementar()
+                        return tarefa.result()
+                    erro = tarefa.exception()
+            raise erro
+        finally:
+            for tarefa in pendentes:
+                tarefa.cancel()
+    
+    def _permitir_hedge(self) -> bool:
+        if self.orcamento is not None and not self.orcamento.retirar():
+            self._retries_negados.incrementar()
+            return False
+        self._hedges_disparados.incrementar()
+        return True
+    
+    def _obter_limite_hedge(self) -> Optional[float]:
+        """Percentil de latência (segundos) a partir do qual disparar hedge"""
+        if self.hedge_percentil is None:
+            return None
+        
+        agora = self.relogio.monotonico()
+        # Enquanto não há amostras suficientes, tenta a cada chamada
+        if (self._limite_hedge is None or
+                agora - self._limite_hedge_calculado_em >= self.INTERVALO_LIMITE_HEDGE_SEGUNDOS):
+            self._limite_hedge_calculado_em = agora
+            histograma = self._latencia_tentativa.agregado()
+            if histograma.contagem >= self.hedge_minimo_amostras:
+                self._limite_hedge = histograma.percentil(self.hedge_percentil) / 1e9
+        return self._limite_hedge
+    
+    def fechar(self) -> None:
+        """
+        Libera o pool das hedges
+        
+        Requisições já submetidas terminam normalmente; chamadas
+        posteriores seguem sem hedge, na thread chamadora.
+        """
+        with self._lock_hedge:
+            self._fechado = True
+            executor, self._executor_hedge = self._executor_hedge, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+    
+    def _iniciar_execucao(self) -> None:
+        self._total_execucoes.incrementar()
+        self._metricas['ultima_execucao'] = self.relogio.agora()
+        if self.orcamento is not None:
+            self.orcamento.depositar()
+    
+    def _iniciar_tentativa(self) -> int:
+        self._total_tentativas.incrementar()
+        return self.relogio.monotonico_ns()
+    
+    def _registrar_latencia(self, tentativa: int, inicio_ns: int) -> None:
+        duracao_ns = self.relogio.monotonico_ns() - inicio_ns
+        self._latencia_tentativa.registrar_ns(duracao_ns)
+        self._latencia_por_tentativa[tentativa - 1].registrar_ns(duracao_ns)
+    
+    def _concluir_execucao(self, tentativas: int, sucesso: bool) -> None:
+        if tentativas:
+            self._execucoes_por_tentativas[tentativas - 1].incrementar()
+        with self._lock_janela:
+            self._janela_recente.registrar(falha=not sucesso, lenta=False)
+    
+    def _registrar_sucesso(self, tentativa: int, inicio_ns: int) -> None:
+        self._registrar_latencia(tentativa, inicio_ns)
+        self._total_sucessos.incrementar()
+        self._concluir_execucao(tentativa, sucesso=True)
+    
+    def _avaliar_falha(self, tentativa: int, exception: Exception,
+                       inicio_ns: int) -> Optional[int]:
+        """Registra a falha e retorna o delay até a próxima tentativa (None = parar)"""
+        self._registrar_latencia(tentativa, inicio_ns)
+        if not self.strategy.deve_tentar_novamente(tentativa, exception):
+            return None
+        if self.orcamento is not None and not self.orcamento.retirar():
+            self._retries_negados.incrementar()
+            return None
+        return self.strategy.calcular_delay(tentativa)
+    
+    def _esgotar(self, tentativas: int,
+                 ultima_exception: Exception) -> 'RetryExhaustedException':
+        self._total_falhas.incrementar()
+        self._concluir_execucao(tentativas, sucesso=False)
+        return RetryExhaustedException(
             f"Todas as {self.strategy.max_tentativas} tentativas falharam",
             ultima_exception
         )
     
     def obter_metricas(self) -> Dict[str, Any]:
-        """Obtém métricas do retry executor"""
-        tentativas = self._metricas['tentativas_por_execucao']
+        """Obtém métricas do retry executor (custo e memória constantes)"""
+        instrumentacao = self._instrumentacao.instantaneo()
+        max_tentativas = len(self._execucoes_por_tentativas)
+        histograma_tentativas = {
+            n: instrumentacao[f'execucoes_{n}_tentativas']
+            for n in range(1, max_tentativas + 1)
+        }
+        concluidas = sum(histograma_tentativas.values())
+        
+        with self._lock_janela:
+            self._janela_recente.atualizar()
+            recentes = self._janela_recente.total
+            falhas_recentes = self._janela_recente.falhas
         
         return {
             'nome': self.nome,
-            'total_execucoes': self._metricas['total_execucoes'],
-            'total_sucessos': self._metricas['total_sucessos'],
-            'total_falhas': self._metricas['total_falhas'],
+            'total_execucoes': instrumentacao['total_execucoes'],
+            'total_sucessos': instrumentacao['total_sucessos'],
+            'total_falhas': instrumentacao['total_falhas'],
+            'total_tentativas': instrumentacao['total_tentativas'],
             'taxa_sucesso_pct': (
-                self._metricas['total_sucessos'] / 
-                max(1, self._metricas['total_execucoes']) * 100
+                instrumentacao['total_sucessos'] / 
+                max(1, instrumentacao['total_execucoes']) * 100
+            ),
+            'media_tentativas': (
+                sum(n * quantidade for n, quantidade in histograma_tentativas.items()) /
+                max(1, concluidas)
             ),
-            'media_tentativas': sum(tentativas) / max(1, len(tentativas)),
+            'histograma_tentativas': histograma_tentativas,
+            'recentes': {
+                'janela_segundos': self._janela_recente.segundos,
+                'execucoes': recentes,
+                'falhas': falhas_recentes,
+                'taxa_sucesso_pct': (recentes - falhas_recentes) / max(1, recentes) * 100
+            },
+            'retries_negados_orcamento': instrumentacao['retries_negados_orcamento'],
+            'hedges_disparados': instrumentacao['hedges_disparados'],
+            'hedges_vencedores': instrumentacao['hedges_vencedores'],
+            'limite_hedge_ms': (self._limite_hedge * 1000
+                                if self._limite_hedge is not None else None),
+            'latencia_tentativa_ms': instrumentacao['latencia_tentativa_ms'],
+            'latencia_por_tentativa_ms': {
+                n: instrumentacao[f'latencia_tentativa_{n}_ms']
+                for n in range(1, max_tentativas + 1)
+            },
+            'orcamento': self.orcamento.obter_metricas() if self.orcamento else None,
             'ultima_execucao': self._metricas['ultima_execucao']
         }
 
@@ -619,6 +2243,125 @@ class RetryExhaustedException(Exception):
 # PUBLISH-SUBSCRIBE PATTERN
 # =============================================================================
 
+class AcumuladorLote:
+    """
+    Buffer de uma subscription em lote
+    
+    Acumula eventos até `max_lote` ou até o evento mais antigo esperar
+    `max_espera_ms`, o que ocorrer primeiro. O instante de chegada é
+    guardado por chamada de `adicionar` (quantidade, instante): depois de
+    entregar lotes completos, o prazo do resto continua sendo o do evento
+    mais antigo que ficou no buffer.
+    
+    `ao_ficar_pendente`, se informado, é chamado (fora do lock) quando o
+    buffer deixa de estar vazio, para acordar quem aguarda prazos.
+    """
+    
+    def __init__(self, subscription_id: str, tipo_evento: Optional[str],
+                 handler: Callable[[List[EventoSistema]], None],
+                 max_lote: int, max_espera_ms: float,
+                 filtro: Optional[Callable] = None,
+                 ao_ficar_pendente: Optional[Callable[[], None]] = None):
+        self.subscription_id = subscription_id
+        self.tipo_evento = tipo_evento  # None = todos os tipos
+        self.handler = handler
+        self.max_lote = max_lote
+        self.max_espera = max_espera_ms / 1000
+        self.filtro = filtro
+        self.ao_ficar_pendente = ao_ficar_pendente
+        self.itens: List[EventoSistema] = []
+        self.chegadas: Deque[List[float]] = deque()  # [quantidade, time.monotonic()]
+        self.lock = threading.Lock()
+    
+    @property
+    def primeiro_em(self) -> float:
+        """time.monotonic() da chegada do evento mais antigo no buffer"""
+        chegadas = self.chegadas
+        return chegadas[0][1] if chegadas else 0.0
+    
+    def prazo(self) -> Optional[float]:
+        """Instante (time.monotonic()) em que o lote parcial expira; None se vazio"""
+        with self.lock:
+            return self.chegadas[0][1] + self.max_espera if self.chegadas else None
+    
+    def adicionar(self, eventos: List[EventoSistema]) -> List[List[EventoSistema]]:
+        """Acumula eventos e retorna os lotes completos a entregar"""
+        if self.filtro:
+            eventos = [evento for evento in eventos if self.filtro(evento)]
+        if not eventos:
+            return []
+        
+        with self.lock:
+            estava_vazio = not self.itens
+            self.chegadas.append([len(eventos), time.monotonic()])
+            self.itens.extend(eventos)
+            if len(self.itens) < self.max_lote:
+                lotes = []
+            else:
+                # Entregar lotes completos; o resto aguarda no buffer
+                completos = len(self.itens) - len(self.itens) % self.max_lote
+                itens = self.itens[:completos]
+                self.itens = self.itens[completos:]
+                self._descontar_chegadas(completos)
+                lotes = [itens[i:i + self.max_lote] for i in range(0, completos, self.max_lote)]
+            ficou_pendente = estava_vazio and bool(self.itens)
+        
+        if ficou_pendente and self.ao_ficar_pendente is not None:
+            self.ao_ficar_pendente()
+        return lotes
+    
+    def _descontar_chegadas(self, retirados: int) -> None:
+        """Remove das chegadas os `retirados` eventos mais antigos (lock adquirido)"""
+        chegadas = self.chegadas
+        while retirados:
+            if chegadas[0][0] <= retirados:
+                retirados -= chegadas.popleft()[0]
+            else:
+                chegadas[0][0] -= retirados
+                retirados = 0
+    
+    def retirar_expirado(self, agora: Optional[float] = None,
+                         forcar: bool = False) -> List[EventoSistema]:
+        """Retira o lote parcial se esperou além de `max_espera` (ou se forçado)"""
+        with self.lock:
+            if not self.itens:
+                return []
+            if not forcar and (agora or time.monotonic()) - self.primeiro_em < self.max_espera:
+                return []
+            
+            itens, self.itens = self.itens, []
+            self.chegadas.clear()
+            return itens
+
+
+@dataclass(frozen=True)
+class TabelaDespacho:
+    """
+    Tabela de despacho imutável do EventBus
+    
+    Para cada tipo com subscribers, guarda a tupla já concatenada
+    (handlers do tipo + globais). É reconstruída apenas quando as
+    inscrições mudam e substituída por atribuição atômica, de modo que
+    publicadores a leem sem lock.
+    """
+    handlers_por_tipo: Dict[str, Tuple[Callable, ...]] = field(default_factory=dict)
+    handlers_globais: Tuple[Callable, ...] = ()
+    lotes_por_tipo: Dict[str, Tuple[AcumuladorLote, ...]] = field(default_factory=dict)
+    lotes_globais: Tuple[AcumuladorLote, ...] = ()
+    
+    def handlers(self, tipo_evento: str) -> Tuple[Callable, ...]:
+        return self.handlers_por_tipo.get(tipo_evento, self.handlers_globais)
+    
+    def lotes(self, tipo_evento: str) -> Tuple[AcumuladorLote, ...]:
+        return self.lotes_por_tipo.get(tipo_evento, self.lotes_globais)
+    
+    @property
+    def todos_lotes(self) -> List[AcumuladorLote]:
+        vistos = {id(a): a for lotes in self.lotes_por_tipo.values() for a in lotes}
+        vistos.update((id(a), a) for a in self.lotes_globais)
+        return list(vistos.values())
+
+
 class EventBus:
     """
     Event Bus para comunicação desacoplada
@@ -628,21 +2371,35 @@ class EventBus:
     - Distribuir eventos para subscribers
     - Suportar filtragem de eventos
     - Processamento assíncrono opcional
+    - Entrega em lote (`subscrever_lote` / `publicar_lote`)
+    
+    O lock protege apenas as alterações de inscrições. A publicação lê
+    a `TabelaDespacho` corrente (copy-on-write) sem lock, e o mapa
+    id -> (tipo, handler) torna `desinscrever` O(1).
     """
     
     def __init__(self, nome: str = "EventBus"):
         self.nome = nome
-        self._subscribers: Dict[str, List[Callable]] = defaultdict(list)
-        self._global_subscribers: List[Callable] = []
-        self._filtros: Dict[str, Callable] = {}
-        self._metricas = {
-            'eventos_publicados': 0,
-            'eventos_processados': 0,
-            'eventos_falhados': 0,
-            'subscribers_ativos': 0
-        }
+        # Inscrições por tipo (None = globais), em ordem de inscrição
+        self._subscribers: Dict[Optional[str], Dict[str, Callable]] = defaultdict(dict)
+        self._acumuladores: Dict[Optional[str], Dict[str, AcumuladorLote]] = defaultdict(dict)
+        self._inscricoes: Dict[str, Tuple[Optional[str], Any]] = {}
+        self._tabela = TabelaDespacho()
         self._lock = threading.RLock()
         
+        # Métricas (escritas pelas threads do executor sem lock compartilhado)
+        self._instrumentacao = RegistroMetricas(nome)
+        self._eventos_publicados = self._instrumentacao.contador('eventos_publicados')
+        self._eventos_processados = self._instrumentacao.contador('eventos_processados')
+        self._eventos_falhados = self._instrumentacao.contador('eventos_falhados')
+        self._lotes_entregues = self._instrumentacao.contador('lotes_entregues')
+        self._latencia_handler = self._instrumentacao.histograma('latencia_handler')
+        
+        # Entrega de subscriptions em lote
+        self._descarregador: Optional[threading.Thread] = None
+        self._parar_descarregador = threading.Event()
+        self._sinal_lotes = threading.Condition()  # Acorda o descarregador
+        
         # Pool de threads para processamento assíncrono
         self._executor = concurrent.futures.ThreadPoolExecutor(
             max_workers=5, thread_name_prefix=f"EventBus-{nome}"
@@ -656,24 +2413,25 @@ class EventBus:
             
             # Wrapper que inclui ID da subscription
             def wrapper_handler(evento):
+                inicio = time.perf_counter_ns()
                 try:
                     # Aplicar filtro se fornecido
                     if filtro and not filtro(evento):
                         return
                     
                     handler(evento)
-                    self._metricas['eventos_processados'] += 1
+                    self._eventos_processados.incrementar()
                     
                 except Exception as e:
-                    self._metricas['eventos_falhados'] += 1
+                    self._eventos_falhados.incrementar()
                     print(f"Erro em handler {subscription_id}: {e}")
+                
+                self._latencia_handler.registrar_ns(time.perf_counter_ns() - inicio)
             
             wrapper_handler.subscription_id = subscription_id
             wrapper_handler.original_handler = handler
             
-            self._subscribers[tipo_evento].append(wrapper_handler)
-            self._metricas['subscribers_ativos'] += 1
-            
+            self._adicionar_inscricao(subscription_id, tipo_evento, wrapper_handler)
             return subscription_id
     
     def subscrever_global(self, handler: Callable) -> str:
@@ -682,92 +2440,261 @@ class EventBus:
             subscription_id = str(uuid.uuid4())
             
             def wrapper_handler(evento):
+                inicio = time.perf_counter_ns()
                 try:
                     handler(evento)
-                    self._metricas['eventos_processados'] += 1
+                    self._eventos_processados.incrementar()
                 except Exception as e:
-                    self._metricas['eventos_falhados'] += 1
+                    self._eventos_falhados.incrementar()
                     print(f"Erro em handler global {subscription_id}: {e}")
+                
+                self._latencia_handler.registrar_ns(time.perf_counter_ns() - inicio)
             
             wrapper_handler.subscription_id = subscription_id
             wrapper_handler.original_handler = handler
             
-            self._global_subscribers.append(wrapper_handler)
-            self._metricas['subscribers_ativos'] += 1
+            self._adicionar_inscricao(subscription_id, None, wrapper_handler)
+            return subscription_id
+    
+    def subscrever_lote(self, tipo_evento: Optional[str],
+                        handler: Callable[[List[EventoSistema]], None],
+                        max_lote: int = 100, max_espera_ms: float = 50,
+                        filtro: Optional[Callable] = None) -> str:
+        """
+        Subscreve um handler que recebe listas de eventos
+        
+        O lote é entregue ao atingir `max_lote` eventos ou quando o
+        evento mais antigo espera `max_espera_ms`. `tipo_evento=None`
+        recebe todos os tipos.
+        """
+        with self._lock:
+            subscription_id = str(uuid.uuid4())
+            acumulador = AcumuladorLote(
+                subscription_id, tipo_evento, handler, max_lote, max_espera_ms, filtro,
+                ao_ficar_pendente=self._avisar_descarregador
+            )
+            self._adicionar_inscricao(subscription_id, tipo_evento, acumulador)
+            
+            if self._descarregador is None:
+                self._descarregador = threading.Thread(
+                    target=self._descarregar_periodicamente,
+                    name=f"EventBus-{self.nome}-lotes", daemon=True
+                )
+                self._descarregador.start()
             
             return subscription_id
     
+    def _adicionar_inscricao(self, subscription_id: str, tipo_evento: Optional[str],
+                             inscrito: Any) -> None:
+        """Registra a inscrição e republica a tabela de despacho (lock adquirido)"""
+        destino = self._acumuladores if isinstance(inscrito, AcumuladorLote) else self._subscribers
+        destino[tipo_evento][subscription_id] = inscrito
+        self._inscricoes[subscription_id] = (tipo_evento, inscrito)
+        self._reconstruir_tabela()
+    
+    def _reconstruir_tabela(self) -> None:
+        """Monta uma nova TabelaDespacho a partir das inscrições (lock adquirido)"""
+        globais = tuple(self._subscribers.get(None, {}).values())
+        lotes_globais = tuple(self._acumuladores.get(None, {}).values())
+        
+        self._tabela = TabelaDespacho(
+            handlers_por_tipo={
+                tipo: tuple(handlers.values()) + globais
+                for tipo, handlers in self._subscribers.items()
+                if tipo is not None and handlers
+            },
+            handlers_globais=globais,
+            lotes_por_tipo={
+                tipo: tuple(acumuladores.values()) + lotes_globais
+                for tipo, acumuladores in self._acumuladores.items()
+                if tipo is not None and acumuladores
+            },
+            lotes_globais=lotes_globais
+        )
+    
+    def _avisar_descarregador(self) -> None:
+        with self._sinal_lotes:
+            self._sinal_lotes.notify()
+    
+    def _descarregar_periodicamente(self) -> None:
+        """
+        Entrega lotes parciais cujo prazo `max_espera_ms` expirou
+        
+        Dorme até o prazo mais próximo entre os buffers pendentes; sem
+        nada pendente, espera o aviso de um buffer que deixou de estar vazio.
+        Os prazos são lidos com a condição adquirida, então um aviso nunca
+        se perde entre a leitura e a espera.
+        """
+        while True:
+            with self._sinal_lotes:
+                if self._parar_descarregador.is_set():
+                    return
+                acumuladores = self._tabela.todos_lotes
+                prazos = [prazo for prazo in (a.prazo() for a in acumuladores)
+                          if prazo is not None]
+                if not prazos:
+                    self._sinal_lotes.wait()
+                    continue
+                espera = min(prazos) - time.monotonic()
+                if espera > 0:
+                    self._sinal_lotes.wait(espera)
+                    continue
+            
+            agora = time.monotonic()
+            for acumulador in acumuladores:
+                lote = acumulador.retirar_expirado(agora)
+                if lote:
+                    self._executor.submit(self._entregar_lote, acumulador, lote)
+    
+    def _entregar_lote(self, acumulador: AcumuladorLote,
+                       lote: List[EventoSistema]) -> None:
+        inicio = time.perf_counter_ns()
+        try:
+            acumulador.handler(lote)
+            self._eventos_processados.incrementar(len(lote))
+            self._lotes_entregues.incrementar()
+        except Exception as e:
+            self._eventos_falhados.incrementar(len(lote))
+            print(f"Erro em handler de lote {acumulador.subscription_id}: {e}")
+        
+        self._latencia_handler.registrar_ns(time.perf_counter_ns() - inicio)
+    
+    def _acumular(self, tabela: TabelaDespacho,
+                  eventos_por_tipo: Dict[str, List[EventoSistema]],
+                  assincrono: bool) -> None:
+        """Repassa eventos às subscriptions em lote e entrega lotes completos"""
+        entregas = []
+        for tipo, eventos in eventos_por_tipo.items():
+            for acumulador in tabela.lotes(tipo):
+                entregas.extend((acumulador, lote) for lote in acumulador.adicionar(eventos))
+        
+        for acumulador, lote in entregas:
+            if assincrono:
+                self._executor.submit(self._entregar_lote, acumulador, lote)
+            else:
+                self._entregar_lote(acumulador, lote)
+    
+    def descarregar_lotes(self) -> None:
+        """Entrega imediatamente todos os lotes parciais (sincronamente)"""
+        for acumulador in self._tabela.todos_lotes:
+            lote = acumulador.retirar_expirado(forcar=True)
+            if lote:
+                self._entregar_lote(acumulador, lote)
+    
     def desinscrever(self, subscription_id: str) -> bool:
         """Remove uma subscription"""
         with self._lock:
-            # Procurar em subscribers por tipo
-            for tipo, handlers in self._subscribers.items():
-                handlers_removidos = [
-                    h for h in handlers 
-                    if getattr(h, 'subscription_id', None) == subscription_id
-                ]
-                if handlers_removidos:
-                    for handler in handlers_removidos:
-                        handlers.remove(handler)
-                        self._metricas['subscribers_ativos'] -= 1
-                    return True
-            
-            # Procurar em subscribers globais
-            handlers_removidos = [
-                h for h in self._global_subscribers
-                if getattr(h, 'subscription_id', None) == subscription_id
-            ]
-            if handlers_removidos:
-                for handler in handlers_removidos:
-                    self._global_subscribers.remove(handler)
-                    self._metricas['subscribers_ativos'] -= 1
-                return True
+            inscricao = self._inscricoes.pop(subscription_id, None)
+            if inscricao is None:
+                return False
             
-            return False
+            tipo_evento, inscrito = inscricao
+            origem = self._acumuladores if isinstance(inscrito, AcumuladorLote) else self._subscribers
+            del origem[tipo_evento][subscription_id]
+            if not origem[tipo_evento]:
+                del origem[tipo_evento]
+            self._reconstruir_tabela()
+        
+        # Entregar o lote parcial de uma subscription em lote
+        if isinstance(inscrito, AcumuladorLote):
+            lote = inscrito.retirar_expirado(forcar=True)
+            if lote:
+                self._executor.submit(self._entregar_lote, inscrito, lote)
+        return True
     
     def publicar(self, evento: EventoSistema, assincrono: bool = True) -> None:
         """Publica um evento para todos os subscribers"""
-        with self._lock:
-            self._metricas['eventos_publicados'] += 1
-            
-            # Coletar handlers relevantes
-            handlers_tipo = self._subscribers.get(evento.tipo.value, [])
-            handlers_global = self._global_subscribers
-            todos_handlers = handlers_tipo + handlers_global
-            
-            if not todos_handlers:
-                return
-            
+        tabela = self._tabela  # Leitura sem lock: a tabela é imutável
+        self._eventos_publicados.incrementar()
+        
+        if tabela.lotes_por_tipo or tabela.lotes_globais:
+            self._acumular(tabela, {evento.tipo.value: [evento]}, assincrono)
+        
+        todos_handlers = tabela.handlers(evento.tipo.value)
+        if not todos_handlers:
+            return
+        
+        if assincrono:
+            # Processar assincronamente
+            for handler in todos_handlers:
+                self._executor.submit(handler, evento)
+        else:
+            # Processar sincronamente
+            for handler in todos_handlers:
+                try:
+                    handler(evento)
+                except Exception as e:
+                    print(f"Erro ao processar evento {evento.id}: {e}")
+    
+    def publicar_lote(self, eventos: List[EventoSistema], assincrono: bool = True) -> None:
+        """
+        Publica vários eventos de uma vez
+        
+        Subscriptions em lote recebem os eventos com uma única operação
+        no buffer; handlers por evento recebem uma única submissão ao
+        executor com todos os seus eventos, em vez de uma por evento.
+        """
+        if not eventos:
+            return
+        
+        tabela = self._tabela
+        self._eventos_publicados.incrementar(len(eventos))
+        
+        eventos_por_tipo: Dict[str, List[EventoSistema]] = defaultdict(list)
+        for evento in eventos:
+            eventos_por_tipo[evento.tipo.value].append(evento)
+        
+        if tabela.lotes_por_tipo or tabela.lotes_globais:
+            self._acumular(tabela, eventos_por_tipo, assincrono)
+        
+        if not (tabela.handlers_por_tipo or tabela.handlers_globais):
+            return
+        
+        # Agrupar por handler, preservando a ordem de publicação
+        trabalhos: Dict[Callable, List[EventoSistema]] = {}
+        for evento in eventos:
+            for handler in tabela.handlers(evento.tipo.value):
+                trabalhos.setdefault(handler, []).append(evento)
+        
+        for handler, eventos_handler in trabalhos.items():
             if assincrono:
-                # Processar assincronamente
-                for handler in todos_handlers:
-                    self._executor.submit(handler, evento)
+                self._executor.submit(self._entregar_em_sequencia, handler, eventos_handler)
             else:
-                # Processar sincronamente
-                for handler in todos_handlers:
-                    try:
-                        handler(evento)
-                    except Exception as e:
-                        print(f"Erro ao processar evento {evento.id}: {e}")
+                self._entregar_em_sequencia(handler, eventos_handler)
+    
+    @staticmethod
+    def _entregar_em_sequencia(handler: Callable, eventos: List[EventoSistema]) -> None:
+        for evento in eventos:
+            handler(evento)  # O wrapper do handler já trata exceções
     
     def obter_metricas(self) -> Dict[str, Any]:
         """Obtém métricas do event bus"""
+        instrumentacao = self._instrumentacao.instantaneo()
         with self._lock:
             return {
                 'nome': self.nome,
                 'subscribers_por_tipo': {
                     tipo: len(handlers) 
                     for tipo, handlers in self._subscribers.items()
+                    if tipo is not None
                 },
-                'subscribers_globais': len(self._global_subscribers),
-                'total_subscribers': self._metricas['subscribers_ativos'],
-                'eventos_publicados': self._metricas['eventos_publicados'],
-                'eventos_processados': self._metricas['eventos_processados'],
-                'eventos_falhados': self._metricas['eventos_falhados']
+                'subscribers_globais': len(self._subscribers.get(None, {})),
+                'subscribers_em_lote': sum(len(a) for a in self._acumuladores.values()),
+                'total_subscribers': len(self._inscricoes),
+                'eventos_publicados': instrumentacao['eventos_publicados'],
+                'eventos_processados': instrumentacao['eventos_processados'],
+                'eventos_falhados': instrumentacao['eventos_falhados'],
+                'lotes_entregues': instrumentacao['lotes_entregues'],
+                'latencia_handler_ms': instrumentacao['latencia_handler_ms']
             }
     
     def shutdown(self) -> None:
         """Finaliza o event bus"""
+        self._parar_descarregador.set()
+        self._avisar_descarregador()
+        if self._descarregador is not None:
+            self._descarregador.join()
+        self.descarregar_lotes()
         self._executor.shutdown(wait=True)
 
 
@@ -775,6 +2702,145 @@ class EventBus:
 # BULKHEAD PATTERN
 # =============================================================================
 
+class LimiteAdaptativo(ABC):
+    """
+    Algoritmo de ajuste do limite de concorrência de um RecursoBulkhead
+    
+    `atualizar` é chamado a cada recurso liberado, com o tempo de uso
+    observado e o número de recursos em uso, e retorna o novo limite.
+    O limite só cresce quando o pool está de fato sendo utilizado
+    (pelo menos metade do limite em uso).
+    """
+    
+    def __init__(self, limite_inicial: int = 10, limite_minimo: int = 1,
+                 limite_maximo: int = 200):
+        self.limite = float(limite_inicial)
+        self.limite_minimo = limite_minimo
+        self.limite_maximo = limite_maximo
+    
+    def _limitar(self, limite: float) -> float:
+        return max(self.limite_minimo, min(self.limite_maximo, limite))
+    
+    @abstractmethod
+    def atualizar(self, tempo_uso_ns: int, em_uso: float) -> int:
+        """Registra uma amostra de latência e retorna o novo limite"""
+        pass
+    
+    @abstractmethod
+    def descrever(self) -> Dict[str, Any]:
+        pass
+
+
+class LimiteAIMD(LimiteAdaptativo):
+    """
+    Additive Increase / Multiplicative Decrease
+    
+    Uma amostra acima de `latencia_maxima_ms` (ou, sem ela, acima de
+    `tolerancia` vezes a menor latência observada) multiplica o limite
+    por `fator_reducao`; caso contrário o limite cresce 1 por janela
+    de uso completa (+1/limite por amostra).
+    """
+    
+    def __init__(self, limite_inicial: int = 10, limite_minimo: int = 1,
+                 limite_maximo: int = 200, fator_reducao: float = 0.9,
+                 latencia_maxima_ms: Optional[float] = None, tolerancia: float = 2.0):
+        super().__init__(limite_inicial, limite_minimo, limite_maximo)
+        self.fator_reducao = fator_reducao
+        self.latencia_maxima_ms = latencia_maxima_ms
+        self.tolerancia = tolerancia
+        self._latencia_minima_ns: Optional[int] = None
+    
+    def atualizar(self, tempo_uso_ns: int, em_uso: float) -> int:
+        if self._latencia_minima_ns is None or tempo_uso_ns < self._latencia_minima_ns:
+            self._latencia_minima_ns = tempo_uso_ns
+        
+        if self.latencia_maxima_ms is not None:
+            sobrecarga = tempo_uso_ns > self.latencia_maxima_ms * NANOS_POR_MILISSEGUNDO
+        else:
+            sobrecarga = tempo_uso_ns > self.tolerancia * self._latencia_minima_ns
+        
+        if sobrecarga:
+            self.limite = self._limitar(self.limite * self.fator_reducao)
+        elif em_uso * 2 >= self.limite:
+            self.limite = self._limitar(self.limite + 1 / self.limite)
+        return int(self.limite)
+    
+    def descrever(self) -> Dict[str, Any]:
+        return {
+            'tipo': 'aimd',
+            'limite': round(self.limite, 2),
+            'latencia_minima_ms': (self._latencia_minima_ns / NANOS_POR_MILISSEGUNDO
+                                   if self._latencia_minima_ns is not None else None)
+        }
+
+
+class LimiteGradiente(LimiteAdaptativo):
+    """
+    Ajuste por gradiente de latência (no estilo Gradient2)
+    
+    Compara a latência de curto prazo (média móvel exponencial com
+    `janela_curta` amostras) com a linha de base sem carga:
+    
+        gradiente = clamp(tolerancia * base / curta, 0.5, 1.0)
+        novo = limite * gradiente + folga
+    
+    Com latência estável o gradiente é 1 e o limite cresce pela `folga`;
+    quando a latência sobe o gradiente cai e o limite encolhe. O novo
+    limite é suavizado por `suavizacao`.
+    
+    A linha de base desce imediatamente e só sobe (média lenta com
+    `janela_longa` amostras) enquanto a latência está dentro da
+    tolerância, ou com o limite já no mínimo: assim uma fila crescente
+    não é confundida com um serviço que ficou mais lento.
+    """
+    
+    def __init__(self, limite_inicial: int = 10, limite_minimo: int = 1,
+                 limite_maximo: int = 200, tolerancia: float = 1.5,
+                 folga: int = 4, janela_curta: int = 10, janela_longa: int = 600,
+                 suavizacao: float = 0.2):
+        super().__init__(limite_inicial, limite_minimo, limite_maximo)
+        self.tolerancia = tolerancia
+        self.folga = folga
+        self.suavizacao = suavizacao
+        self._alfa_curta = 2 / (janela_curta + 1)
+        self._alfa_longa = 2 / (janela_longa + 1)
+        self._latencia_curta_ns: Optional[float] = None
+        self._latencia_base_ns: Optional[float] = None
+    
+    def atualizar(self, tempo_uso_ns: int, em_uso: float) -> int:
+        if self._latencia_curta_ns is None:
+            self._latencia_curta_ns = self._latencia_base_ns = float(tempo_uso_ns)
+            return int(self.limite)
+        
+        self._latencia_curta_ns += self._alfa_curta * (tempo_uso_ns - self._latencia_curta_ns)
+        curta, base = self._latencia_curta_ns, self._latencia_base_ns
+        if curta < base:
+            self._latencia_base_ns = base = curta
+        elif curta <= self.tolerancia * base or self.limite <= self.limite_minimo:
+            self._latencia_base_ns = base = base + self._alfa_longa * (curta - base)
+        
+        # Pool ocioso: a latência não diz nada sobre o limite
+        if em_uso * 2 < self.limite:
+            return int(self.limite)
+        
+        gradiente = max(0.5, min(1.0, self.tolerancia * base / max(curta, 1.0)))
+        novo = self.limite * gradiente + self.folga
+        self.limite = self._limitar(
+            self.limite * (1 - self.suavizacao) + novo * self.suavizacao
+        )
+        return int(self.limite)
+    
+    def descrever(self) -> Dict[str, Any]:
+        return {
+            'tipo': 'gradiente',
+            'limite': round(self.limite, 2),
+            'latencia_curta_ms': (self._latencia_curta_ns / NANOS_POR_MILISSEGUNDO
+                                  if self._latencia_curta_ns is not None else None),
+            'latencia_base_ms': (self._latencia_base_ns / NANOS_POR_MILISSEGUNDO
+                                 if self._latencia_base_ns is not None else None)
+        }
+
+
 class RecursoBulkhead:
     """
     Implementação do Bulkhead Pattern para isolamento de recursos
@@ -784,83 +2850,146 @@ class RecursoBulkhead:
     - Prevenir que falhas em um pool afetem outros
     - Monitorar utilização de recursos
     - Aplicar throttling quando necessário
+    
+    Com `limite_adaptativo` (LimiteAIMD ou LimiteGradiente), o tamanho
+    do pool deixa de ser fixo: a cada recurso liberado o algoritmo
+    recebe o tempo de uso e redefine o limite. Reduções viram uma
+    "dívida" paga pelas próximas liberações, já que o semáforo não
+    permite retirar vagas em uso.
     """
     
-    def __init__(self, nome: str, tamanho_pool: int = 10):
+    def __init__(self, nome: str, tamanho_pool: int = 10,
+                 limite_adaptativo: Optional[LimiteAdaptativo] = None,
+                 relogio: Optional[Relogio] = None):
         self.nome = nome
+        self.relogio = relogio or RELOGIO_SISTEMA
+        self.limite_adaptativo = limite_adaptativo
+        if limite_adaptativo is not None:
+            tamanho_pool = int(limite_adaptativo.limite)
         self.tamanho_pool = tamanho_pool
         self._semaforo = threading.Semaphore(tamanho_pool)
-        self._recursos_em_uso = 0
-        self._max_recursos_utilizados = 0
-        self._total_aquisicoes = 0
-        self._total_timeouts = 0
-        self._lock = threading.RLock()
         self._historico_utilizacao = deque(maxlen=100)
+        
+        # Vagas a retirar do semáforo após reduções do limite adaptativo
+        self._divida_limite = 0
+        self._lock_limite = threading.Lock()
+        
+        # Métricas
+        self._instrumentacao = RegistroMetricas(nome)
+        self._recursos_em_uso = self._instrumentacao.medidor('recursos_em_uso')
+        self._total_aquisicoes = self._instrumentacao.contador('total_aquisicoes')
+        self._total_timeouts = self._instrumentacao.contador('total_timeouts')
+        self._espera_aquisicao = self._instrumentacao.histograma('espera_aquisicao')
+        self._tempo_uso = self._instrumentacao.histograma('tempo_uso')
+        self._limite_atual = self._instrumentacao.medidor('limite_concorrencia', tamanho_pool)
+    
+    def __call__(self, func: Callable) -> Callable:
+        """Decorator que executa a função com um recurso do pool"""
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.adquirir_recurso():
+                return func(*args, **kwargs)
+        return wrapper
     
     def adquirir_recurso(self, timeout_segundos: float = 5.0) -> 'RecursoContext':
         """Adquire um recurso do pool"""
+        inicio = self.relogio.monotonico_ns()
         acquired = self._semaforo.acquire(timeout=timeout_segundos)
+        return self._registrar_aquisicao(acquired, inicio)
+    
+    def _registrar_aquisicao(self, acquired: bool, inicio_ns: int) -> 'RecursoContext':
+        """Contabiliza a tentativa de aquisição e cria o contexto do recurso"""
+        self._espera_aquisicao.registrar_ns(self.relogio.monotonico_ns() - inicio_ns)
+        self._total_aquisicoes.incrementar()
         
-        with self._lock:
-            self._total_aquisicoes += 1
-            
-            if not acquired:
-                self._total_timeouts += 1
-                raise BulkheadTimeoutException(
-                    f"Timeout ao adquirir recurso do pool {self.nome}"
-                )
-            
-            self._recursos_em_uso += 1
-            self._max_recursos_utilizados = max(
-                self._max_recursos_utilizados, 
-                self._recursos_em_uso
+        if not acquired:
+            self._total_timeouts.incrementar()
+            raise BulkheadTimeoutException(
+                f"Timeout ao adquirir recurso do pool {self.nome}"
             )
-            
-            timestamp = datetime.now()
-            self._historico_utilizacao.append({
-                'timestamp': timestamp,
-                'recursos_em_uso': self._recursos_em_uso,
-                'utilizacao_pct': (self._recursos_em_uso / self.tamanho_pool) * 100
-            })
-            
-            return RecursoContext(self, timestamp)
+        
+        em_uso = self._recursos_em_uso.ajustar(1)
+        
+        timestamp = self.relogio.agora()
+        self._historico_utilizacao.append({
+            'timestamp': timestamp,
+            'recursos_em_uso': em_uso,
+            'utilizacao_pct': (em_uso / self.tamanho_pool) * 100
+        })
+        
+        return RecursoContext(self, timestamp)
     
-    def liberar_recurso(self) -> None:
+    def liberar_recurso(self, tempo_uso_ns: Optional[int] = None) -> None:
         """Libera um recurso do pool"""
-        with self._lock:
-            if self._recursos_em_uso > 0:
-                self._recursos_em_uso -= 1
+        em_uso = self._recursos_em_uso.valor
+        self._recursos_em_uso.ajustar(-1, minimo=0)
+        if tempo_uso_ns is not None:
+            self._tempo_uso.registrar_ns(tempo_uso_ns)
+        
+        if self.limite_adaptativo is None:
+            self._semaforo.release()
+            return
         
-        self._semaforo.release()
+        with self._lock_limite:
+            if self._divida_limite:
+                self._divida_limite -= 1
+            else:
+                self._semaforo.release()
+            if tempo_uso_ns is not None:
+                self._redefinir_limite(self.limite_adaptativo.atualizar(tempo_uso_ns, em_uso))
+    
+    def _redefinir_limite(self, novo_limite: int) -> None:
+        """Aplica um novo tamanho de pool ao semáforo (lock do limite adquirido)"""
+        delta = novo_limite - self.tamanho_pool
+        if delta == 0:
+            return
+        
+        self.tamanho_pool = novo_limite
+        self._limite_atual.definir(novo_limite)
+        if delta < 0:
+            self._divida_limite -= delta
+            return
+        
+        quitado = min(delta, self._divida_limite)
+        self._divida_limite -= quitado
+        for _ in range(delta - quitado):
+            self._semaforo.release()
     
     def obter_metricas(self) -> Dict[str, Any]:
         """Obtém métricas do bulkhead"""
-        with self._lock:
-            utilizacao_atual = (self._recursos_em_uso / self.tamanho_pool) * 100
-            
-            # Calcular utilização média nas últimas medições
-            utilizacoes_recentes = [
-                h['utilizacao_pct'] for h in list(self._historico_utilizacao)[-10:]
-            ]
-            utilizacao_media = (
-                sum(utilizacoes_recentes) / len(utilizacoes_recentes)
-                if utilizacoes_recentes else 0
-            )
-            
-            return {
-                'nome': self.nome,
-                'tamanho_pool': self.tamanho_pool,
-                'recursos_em_uso': self._recursos_em_uso,
-                'recursos_disponiveis': self.tamanho_pool - self._recursos_em_uso,
-                'utilizacao_atual_pct': round(utilizacao_atual, 2),
-                'utilizacao_media_pct': round(utilizacao_media, 2),
-                'max_recursos_utilizados': self._max_recursos_utilizados,
-                'total_aquisicoes': self._total_aquisicoes,
-                'total_timeouts': self._total_timeouts,
-                'taxa_timeout_pct': (
-                    self._total_timeouts / max(1, self._total_aquisicoes) * 100
-                )
-            }
+        instrumentacao = self._instrumentacao.instantaneo()
+        em_uso = instrumentacao['recursos_em_uso']
+        utilizacao_atual = (em_uso / self.tamanho_pool) * 100
+        
+        # Calcular utilização média nas últimas medições
+        utilizacoes_recentes = [
+            h['utilizacao_pct'] for h in list(self._historico_utilizacao)[-10:]
+        ]
+        utilizacao_media = (
+            sum(utilizacoes_recentes) / len(utilizacoes_recentes)
+            if utilizacoes_recentes else 0
+        )
+        
+        return {
+            'nome': self.nome,
+            'tamanho_pool': self.tamanho_pool,
+            'recursos_em_uso': em_uso,
+            'recursos_disponiveis': self.tamanho_pool - em_uso,
+            'utilizacao_atual_pct': round(utilizacao_atual, 2),
+            'utilizacao_media_pct': round(utilizacao_media, 2),
+            'max_recursos_utilizados': instrumentacao['recursos_em_uso_max'],
+            'total_aquisicoes': instrumentacao['total_aquisicoes'],
+            'total_timeouts': instrumentacao['total_timeouts'],
+            'taxa_timeout_pct': (
+                instrumentacao['total_timeouts'] / max(1, instrumentacao['total_aquisicoes']) * 100
+            ),
+            'espera_aquisicao_ms': instrumentacao['espera_aquisicao_ms'],
+            'tempo_uso_ms': instrumentacao['tempo_uso_ms'],
+            'limite_concorrencia': instrumentacao['limite_concorrencia'],
+            'limite_concorrencia_max': instrumentacao['limite_concorrencia_max'],
+            'limite_adaptativo': (self.limite_adaptativo.descrever()
+                                  if self.limite_adaptativo is not None else None)
+        }
 
 
 class RecursoContext:
@@ -869,6 +2998,7 @@ class RecursoContext:
     def __init__(self, bulkhead: RecursoBulkhead, timestamp_aquisicao: datetime):
         self.bulkhead = bulkhead
         self.timestamp_aquisicao = timestamp_aquisicao
+        self._inicio_ns = bulkhead.relogio.monotonico_ns()
         self._liberado = False
     
     def __enter__(self):
@@ -876,12 +3006,58 @@ class RecursoContext:
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         if not self._liberado:
-            self.bulkhead.liberar_recurso()
+            self.bulkhead.liberar_recurso(
+                self.bulkhead.relogio.monotonico_ns() - self._inicio_ns
+            )
             self._liberado = True
     
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.__exit__(exc_type, exc_val, exc_tb)
+    
     def tempo_uso(self) -> timedelta:
         """Retorna tempo de uso do recurso"""
-        return datetime.now() - self.timestamp_aquisicao
+        return self.bulkhead.relogio.agora() - self.timestamp_aquisicao
+
+
+class RecursoBulkheadAssincrono(RecursoBulkhead):
+    """
+    Bulkhead para corrotinas, baseado em asyncio.Semaphore
+    
+    Compartilha métricas e contabilização com o RecursoBulkhead; apenas
+    a espera por uma vaga é feita com `await`, sem ocupar threads.
+    """
+    
+    def __init__(self, nome: str, tamanho_pool: int = 10,
+                 limite_adaptativo: Optional[LimiteAdaptativo] = None,
+                 relogio: Optional[Relogio] = None):
+        super().__init__(nome, tamanho_pool, limite_adaptativo, relogio)
+        self._semaforo = asyncio.Semaphore(self.tamanho_pool)
+    
+    def __call__(self, func: Callable) -> Callable:
+        """Decorator que executa a corrotina com um recurso do pool"""
+        @wraps(func)
+        async def wrapper_assincrono(*args, **kwargs):
+            async with await self.adquirir_recurso_assincrono():
+                return await func(*args, **kwargs)
+        return wrapper_assincrono
+    
+    def adquirir_recurso(self, timeout_segundos: float = 5.0) -> 'RecursoContext':
+        raise TypeError(
+            f"{self.nome} é assíncrono: use 'await adquirir_recurso_assincrono()'"
+        )
+    
+    async def adquirir_recurso_assincrono(self, timeout_segundos: float = 5.0) -> RecursoContext:
+        """Aguarda (sem bloquear o event loop) um recurso do pool"""
+        inicio = self.relogio.monotonico_ns()
+        try:
+            await asyncio.wait_for(self._semaforo.acquire(), timeout_segundos)
+            acquired = True
+        except asyncio.TimeoutError:
+            acquired = False
+        return self._registrar_aquisicao(acquired, inicio)
 
 
 class BulkheadTimeoutException(Exception):
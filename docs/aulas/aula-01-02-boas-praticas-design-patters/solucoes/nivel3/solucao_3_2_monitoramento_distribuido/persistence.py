@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+PERSISTÊNCIA DO EVENT STORE
+Sistema de Monitoramento Distribuído
+
+Este módulo implementa um Event Store persistente: os eventos são gravados
+em um log append-only de registros com prefixo de tamanho e lidos de volta
+através de `mmap`. Snapshots das projeções são gravados em um arquivo ao
+lado do log, de modo que um restart reprocessa apenas a cauda do log
+posterior ao último snapshot.
+
+FORMATO DO LOG:
+- Cabeçalho: 8 bytes mágicos (versão do formato)
+- Registros: [tamanho: uint32][crc32: uint32][payload JSON UTF-8]
+
+Um registro incompleto ou corrompido no fim do arquivo (escrita
+interrompida) é descartado na abertura.
+
+AUTOR: Prof. Jackson Antonio do Prado Lima
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from array import array
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Any, Tuple
+
+from patterns import EventoSistema, EventStore, PoliticaRetencao, TipoEvento
+
+
+MAGIC_LOG = b"EVLOG001"
+CABECALHO_REGISTRO = struct.Struct(">II")  # tamanho, crc32
+VERSAO_SNAPSHOT = 1
+
+
+def codificar_evento(evento: EventoSistema) -> bytes:
+    """Codifica um evento como registro do log (cabeçalho + payload)"""
+    payload = json.dumps({
+        'id': evento.id,
+        'timestamp': evento.timestamp.isoformat(),
+        'tipo': evento.tipo.value,
+        'origem': evento.origem,
+        'dados': evento.dados,
+        'versao': evento.versao
+    }, separators=(',', ':'), default=str).encode('utf-8')
+    return CABECALHO_REGISTRO.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decodificar_evento(payload: bytes) -> EventoSistema:
+    """Decodifica o payload de um registro do log"""
+    dados = json.loads(payload)
+    return EventoSistema(
+        id=dados['id'],
+        timestamp=datetime.fromisoformat(dados['timestamp']),
+        tipo=TipoEvento(dados['tipo']),
+        origem=dados['origem'],
+        dados=dados['dados'],
+        versao=dados['versao']
+    )
+
+
+def iterar_registros(buffer, offset: int) -> Iterator[Tuple[int, bytes]]:
+    """
+    Percorre os registros de um buffer (ex.: mmap) a partir de um offset
+
+    Produz tuplas (offset_fim, payload) e para no primeiro registro
+    incompleto ou com CRC inválido.
+    """
+    tamanho_buffer = len(buffer)
+    while offset + CABECALHO_REGISTRO.size <= tamanho_buffer:
+        tamanho, crc = CABECALHO_REGISTRO.unpack_from(buffer, offset)
+        inicio = offset + CABECALHO_REGISTRO.size
+        fim = inicio + tamanho
+        if fim > tamanho_buffer:
+            return
+
+        payload = buffer[inicio:fim]
+        if zlib.crc32(payload) != crc:
+            return
+
+        yield fim, payload
+        offset = fim
+
+
+class EventStorePersistente(EventStore):
+    """
+    Event Store persistente em log append-only com leitura via mmap
+
+    RESPONSABILIDADES:
+    - Gravar cada evento no log antes de expô-lo em memória
+    - Persistir snapshots das projeções junto com o offset do log
+    - Na abertura, carregar em memória apenas os eventos posteriores
+      ao snapshot mais antigo, sem decodificar o histórico anterior
+
+    Eventos anteriores ao snapshot permanecem apenas em disco e podem ser
+    percorridos com `iterar_log()`. A política de retenção libera eventos
+    da memória, mas o log em disco continua completo.
+    """
+
+    def __init__(self, caminho_log: str, sincronizar: bool = False,
+                 politica_retencao: Optional[PoliticaRetencao] = None):
+        super().__init__(politica_retencao)
+        self.caminho_log = caminho_log
+        self.caminho_snapshot = caminho_log + ".snapshot"
+        self.sincronizar = sincronizar
+
+        # Offset (no arquivo) do fim de cada evento mantido em memória
+        self._offsets_fim = array('Q')
+        self._offset_fim = len(MAGIC_LOG)
+        self._lock_snapshot = threading.Lock()
+
+        self._abrir()
+
+    def _abrir(self) -> None:
+        """Abre o log, restaura snapshots e reprocessa a cauda"""
+        if not os.path.exists(self.caminho_log):
+            with open(self.caminho_log, 'wb') as arquivo:
+                arquivo.write(MAGIC_LOG)
+
+        sequencia_inicial, offset_inicial = self._carregar_snapshots()
+        self._sequencia_base = sequencia_inicial + 1
+
+        offset_valido = offset_inicial
+        with open(self.caminho_log, 'rb') as arquivo:
+            if arquivo.read(len(MAGIC_LOG)) != MAGIC_LOG:
+                raise ValueError(f"Arquivo {self.caminho_log} não é um log de eventos")
+
+            tamanho = os.fstat(arquivo.fileno()).st_size
+            if tamanho > offset_inicial:
+                with mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+                    for offset_fim, payload in iterar_registros(mapa, offset_inicial):
+                        self._anexar(decodificar_evento(payload))
+                        self._offsets_fim.append(offset_fim)
+                        offset_valido = offset_fim
+
+        # Descartar cauda incompleta de uma escrita interrompida
+        if os.path.getsize(self.caminho_log) > offset_valido:
+            os.truncate(self.caminho_log, offset_valido)
+
+        self._offset_fim = offset_valido
+        self._arquivo = open(self.caminho_log, 'ab')
+
+    def _carregar_snapshots(self) -> Tuple[int, int]:
+        """Carrega snapshots do disco e retorna (sequência, offset) de replay"""
+        if not os.path.exists(self.caminho_snapshot):
+            return 0, len(MAGIC_LOG)
+
+        with open(self.caminho_snapshot, 'r', encoding='utf-8') as arquivo:
+            conteudo = json.load(arquivo)
+
+        if conteudo.get('versao') != VERSAO_SNAPSHOT or not conteudo['snapshots']:
+            return 0, len(MAGIC_LOG)
+
+        for nome, snapshot in conteudo['snapshots'].items():
+            self._snapshots[nome] = {
+                'sequencia': snapshot['sequencia'],
+                'offset': snapshot['offset'],
+                'estado': snapshot['estado'],
+                'timestamp': datetime.fromisoformat(snapshot['timestamp'])
+            }
+
+        # Reprocessar a partir do snapshot mais antigo cobre todas as projeções
+        mais_antigo = min(self._snapshots.values(), key=lambda s: s['sequencia'])
+        return mais_antigo['sequencia'], mais_antigo['offset']
+
+    def adicionar_evento(self, evento: EventoSistema) -> int:
+        """Grava o evento no log e o adiciona ao store"""
+        registro = codificar_evento(evento)
+
+        with self._lock:
+            self._gravar([registro])
+            sequencia = self._anexar(evento)
+        self._verificar_retencao()
+        return sequencia
+
+    def adicionar_eventos(self, eventos: List[EventoSistema]) -> int:
+        """Grava o lote no log com uma única escrita e o adiciona ao store"""
+        registros = [codificar_evento(evento) for evento in eventos]
+
+        with self._lock:
+            self._gravar(registros)
+            for evento in eventos:
+                self._anexar(evento)
+            sequencia = self._sequencia_base + len(self._eventos) - 1
+        self._verificar_retencao()
+        return sequencia
+
+    def _gravar(self, registros: List[bytes]) -> None:
+        """Anexa registros ao log (lock já adquirido)"""
+        self._arquivo.write(b"".join(registros))
+        self._arquivo.flush()
+        if self.sincronizar:
+            os.fsync(self._arquivo.fileno())
+
+        for registro in registros:
+            self._offset_fim += len(registro)
+            self._offsets_fim.append(self._offset_fim)
+
+    def _apos_compactacao(self, deslocamento: int) -> None:
+        """Descarta offsets do prefixo liberado da memória"""
+        if deslocamento:
+            self._offsets_fim = self._offsets_fim[deslocamento:]
+
+    def _offset_da_sequencia(self, sequencia: int) -> int:
+        """Offset do log imediatamente após o evento de sequência informada"""
+        posicao = sequencia - self._sequencia_base
+        if posicao >= 0:
+            return self._offsets_fim[posicao]
+        if sequencia <= 0:
+            return len(MAGIC_LOG)
+
+        # Sequência anterior aos eventos em memória: reaproveitar um
+        # snapshot na mesma sequência ou localizar o registro no log
+        snapshot = self._snapshot_na_sequencia(sequencia)
+        if snapshot:
+            return snapshot['offset']
+        self._arquivo.flush()
+        with open(self.caminho_log, 'rb') as arquivo:
+            with mmap.mmap(arquivo.fileno(), self._offset_fim, access=mmap.ACCESS_READ) as mapa:
+                for lidos, (offset_fim, _) in enumerate(
+                        iterar_registros(mapa, len(MAGIC_LOG)), start=1):
+                    if lidos == sequencia:
+                        return offset_fim
+        raise ValueError(f"Sequência {sequencia} não existe no log {self.caminho_log}")
+
+    def _snapshot_na_sequencia(self, sequencia: int) -> Optional[Dict[str, Any]]:
+        """Snapshot já persistido exatamente na sequência informada"""
+        for snapshot in self._snapshots.values():
+            if snapshot['sequencia'] == sequencia and 'offset' in snapshot:
+                return snapshot
+        return None
+
+    def registrar_snapshot(self, nome: str, sequencia: int, estado: Any) -> None:
+        """
+        Registra o snapshot e o persiste de forma atômica
+
+        Sob o lock do store apenas o offset é calculado e o snapshot é
+        registrado; o fsync do log, a serialização e a gravação do arquivo
+        acontecem fora dele, sem bloquear os produtores. Gravações de
+        snapshots concorrentes são serializadas por `_lock_snapshot`, e
+        cada uma grava o conjunto mais recente de snapshots.
+        """
+        with self._lock_snapshot:
+            with self._lock:
+                offset = self._offset_da_sequencia(sequencia)
+                super().registrar_snapshot(nome, sequencia, estado)
+                self._snapshots[nome]['offset'] = offset
+                snapshots = list(self._snapshots.items())
+                descritor_log = self._arquivo.fileno()
+
+            # Garantir que o log contém tudo o que o snapshot referencia
+            os.fsync(descritor_log)
+
+            conteudo = {
+                'versao': VERSAO_SNAPSHOT,
+                'snapshots': {
+                    nome_snapshot: {
+                        'sequencia': snapshot['sequencia'],
+                        'offset': snapshot['offset'],
+                        'estado': snapshot['estado'],
+                        'timestamp': snapshot['timestamp'].isoformat()
+                    }
+                    for nome_snapshot, snapshot in snapshots
+                }
+            }
+
+            caminho_temporario = self.caminho_snapshot + ".tmp"
+            with open(caminho_temporario, 'w', encoding='utf-8') as arquivo:
+                json.dump(conteudo, arquivo, default=str)
+                arquivo.flush()
+                os.fsync(arquivo.fileno())
+            os.replace(caminho_temporario, self.caminho_snapshot)
+
+    def iterar_log(self, desde_sequencia: int = 0) -> Iterator[EventoSistema]:
+        """Percorre via mmap todos os eventos gravados no log"""
+        with self._lock:
+            self._arquivo.flush()
+            tamanho = self._offset_fim
+
+        if tamanho <= len(MAGIC_LOG):
+            return
+
+        with open(self.caminho_log, 'rb') as arquivo:
+            with mmap.mmap(arquivo.fileno(), tamanho, access=mmap.ACCESS_READ) as mapa:
+                sequencia = 0
+                for _, payload in iterar_registros(mapa, len(MAGIC_LOG)):
+                    sequencia += 1
+                    if sequencia > desde_sequencia:
+                        yield decodificar_evento(payload)
+
+    def fechar(self) -> None:
+        """Fecha o arquivo de log"""
+        with self._lock:
+            if not self._arquivo.closed:
+                self._arquivo.flush()
+                self._arquivo.close()
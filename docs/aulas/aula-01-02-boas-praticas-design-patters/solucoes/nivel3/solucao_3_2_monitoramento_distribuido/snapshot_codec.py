@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+FORMATO BINÁRIO DE SNAPSHOTS
+Sistema de Monitoramento Distribuído
+
+Codificação compacta (struct, sem pickle) das estruturas primitivas
+exportadas pelas projeções: None, bool, int, float, str, bytes, datetime,
+listas/tuplas e dicts. Cada valor é uma tag de 1 byte seguida do conteúdo
+em tamanho fixo (little-endian); textos repetidos (chaves de dict, nomes
+de métricas, origens) são gravados uma vez e depois referenciados pelo
+índice, e datas ocupam 8 bytes em vez do texto ISO.
+
+Listas homogêneas ganham representações em bloco, lidas com uma única
+chamada `struct` em vez de uma por valor:
+- só números (int64/float64): uma linha empacotada
+- linhas numéricas com o mesmo layout (buckets de rollups e histogramas):
+  uma tabela contígua
+- só datas sem fuso: um vetor de int64 (microssegundos)
+- dicts com as mesmas chaves (métricas, alertas): chaves uma vez e uma
+  coluna por chave, cada coluna codificada pelas regras acima
+
+Como só tipos primitivos são aceitos, ler um snapshot nunca executa
+código nem instancia classes arbitrárias.
+
+FORMATO DO ARQUIVO:
+- Cabeçalho: [mágico: 6 bytes][versão: uint16][sequência: uint64]
+             [tamanho do payload: uint32][crc32 do payload: uint32]
+- Payload: valor codificado
+
+AUTOR: Prof. Jackson Antonio do Prado Lima
+"""
+
+import gc
+import os
+import struct
+import zlib
+from contextlib import contextmanager
+from itertools import groupby
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Any, Tuple
+
+
+MAGIC_SNAPSHOT = b"QMSNAP"
+VERSAO_FORMATO = 1
+CABECALHO_SNAPSHOT = struct.Struct("<6sHQII")
+
+# Tags dos valores
+_NULO = 0
+_FALSO = 1
+_VERDADEIRO = 2
+_INTEIRO = 3
+_INTEIRO_GRANDE = 4
+_REAL = 5
+_TEXTO = 6
+_REF_TEXTO = 7
+_BYTES = 8
+_DATA = 9
+_DATA_FUSO = 10
+_LISTA = 11
+_MAPA = 12
+_LINHA_NUMERICA = 13
+_TABELA_NUMERICA = 14
+_LINHA_DATAS = 15
+_REGISTROS = 16
+
+_I32 = struct.Struct("<i")
+_U32 = struct.Struct("<I")
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+
+_EPOCA = datetime(1970, 1, 1)
+_EPOCA_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSSEGUNDO = timedelta(microseconds=1)
+_MINIMO_I64 = -(1 << 63)
+_MAXIMO_I64 = (1 << 63) - 1
+
+
+def _codigos_numericos(valores) -> Optional[str]:
+    """Código struct ('q'/'d') de cada valor de uma lista só de números, ou None"""
+    codigos = []
+    for valor in valores:
+        tipo = type(valor)
+        if tipo is float:
+            codigos.append('d')
+        elif tipo is int and _MINIMO_I64 <= valor <= _MAXIMO_I64:
+            codigos.append('q')
+        else:
+            return None
+    return ''.join(codigos)
+
+
+def _compactar_formato(codigos: str) -> str:
+    """'qqddd' -> '2q3d' (formato struct equivalente e curto)"""
+    return ''.join(
+        f"{quantidade}{codigo}" if quantidade > 1 else codigo
+        for codigo, quantidade in ((c, len(list(grupo))) for c, grupo in groupby(codigos))
+    )
+
+
+def _formato_numerico(valores) -> Optional[str]:
+    """Layout struct de uma lista só de números, ou None"""
+    codigos = _codigos_numericos(valores)
+    return _compactar_formato(codigos) if codigos is not None else None
+
+
+def _formato_tabela(linhas) -> Optional[str]:
+    """Layout comum de uma lista de linhas numéricas, ou None"""
+    formato = None
+    for linha in linhas:
+        if type(linha) not in (list, tuple) or not linha:
+            return None
+        codigos = _codigos_numericos(linha)
+        if codigos is None or (formato is not None and codigos != formato):
+            return None
+        formato = codigos
+    return _compactar_formato(formato) if formato is not None else None
+
+
+def _chaves_registros(registros) -> Optional[Tuple[str, ...]]:
+    """Chaves comuns (mesma ordem) de uma lista de dicts, ou None"""
+    chaves = None
+    for registro in registros:
+        if type(registro) is not dict or not registro:
+            return None
+        chaves_registro = tuple(registro)
+        if chaves is None:
+            if not all(isinstance(chave, str) for chave in chaves_registro):
+                return None
+            chaves = chaves_registro
+        elif chaves_registro != chaves:
+            return None
+    return chaves
+
+
+class _Codificador:
+    """Escreve valores em um buffer, reaproveitando textos já vistos"""
+
+    def __init__(self):
+        self.saida = bytearray()
+        self._textos: Dict[str, int] = {}
+
+    def escrever(self, valor: Any) -> None:
+        saida = self.saida
+        if isinstance(valor, str):
+            indice = self._textos.get(valor)
+            if indice is not None:
+                saida.append(_REF_TEXTO)
+                saida += _U32.pack(indice)
+            else:
+                self._textos[valor] = len(self._textos)
+                codificado = valor.encode('utf-8')
+                saida.append(_TEXTO)
+                saida += _U32.pack(len(codificado))
+                saida += codificado
+        elif valor is None:
+            saida.append(_NULO)
+        elif valor is True:
+            saida.append(_VERDADEIRO)
+        elif valor is False:
+            saida.append(_FALSO)
+        elif isinstance(valor, int):
+            if _MINIMO_I64 <= valor <= _MAXIMO_I64:
+                saida.append(_INTEIRO)
+                saida += _I64.pack(valor)
+            else:
+                saida.append(_INTEIRO_GRANDE)
+                self.escrever(str(valor))
+        elif isinstance(valor, float):
+            saida.append(_REAL)
+            saida += _F64.pack(valor)
+        elif isinstance(valor, dict):
+            saida.append(_MAPA)
+            saida += _U32.pack(len(valor))
+            for chave, item in valor.items():
+                self.escrever(chave)
+                self.escrever(item)
+        elif isinstance(valor, (list, tuple)):
+            self._escrever_lista(valor)
+        elif isinstance(valor, datetime):
+            deslocamento = valor.utcoffset()
+            if deslocamento is None:
+                saida.append(_DATA)
+                saida += _I64.pack((valor - _EPOCA) // _MICROSSEGUNDO)
+            else:
+                saida.append(_DATA_FUSO)
+                saida += _I64.pack((valor - _EPOCA_UTC) // _MICROSSEGUNDO)
+                saida += _I32.pack(int(deslocamento.total_seconds()))
+        elif isinstance(valor, (bytes, bytearray)):
+            saida.append(_BYTES)
+            saida += _U32.pack(len(valor))
+            saida += valor
+        else:
+            raise TypeError(f"Tipo não suportado no snapshot: {type(valor).__name__}")
+
+    def _escrever_lista(self, valores) -> None:
+        saida = self.saida
+        if valores:
+            formato = _formato_numerico(valores)
+            if formato is not None:
+                saida.append(_LINHA_NUMERICA)
+                self.escrever(formato)
+                saida += struct.pack('<' + formato, *valores)
+                return
+
+            if all(type(valor) is datetime and valor.tzinfo is None for valor in valores):
+                saida.append(_LINHA_DATAS)
+                saida += _U32.pack(len(valores))
+                saida += struct.pack(f'<{len(valores)}q',
+                                     *[(valor - _EPOCA) // _MICROSSEGUNDO for valor in valores])
+                return
+
+            chaves = _chaves_registros(valores) if len(valores) > 1 else None
+            if chaves is not None:
+                saida.append(_REGISTROS)
+                saida += _U32.pack(len(chaves))
+                for chave in chaves:
+                    self.escrever(chave)
+                for chave in chaves:
+                    self._escrever_lista([registro[chave] for registro in valores])
+                return
+
+            formato = _formato_tabela(valores) if len(valores) > 1 else None
+            if formato is not None:
+                estrutura = struct.Struct('<' + formato)
+                saida.append(_TABELA_NUMERICA)
+                self.escrever(formato)
+                saida += _U32.pack(len(valores))
+                for linha in valores:
+                    saida += estrutura.pack(*linha)
+                return
+
+        saida.append(_LISTA)
+        saida += _U32.pack(len(valores))
+        for item in valores:
+            self.escrever(item)
+
+
+class _Decodificador:
+    """Lê valores de um buffer produzido pelo _Codificador"""
+
+    def __init__(self, buffer: bytes):
+        self._buffer = buffer
+        self._posicao = 0
+        self._textos: List[str] = []
+        self._estruturas: Dict[str, struct.Struct] = {}
+
+    def _ler_struct(self, formato: struct.Struct) -> Any:
+        valor = formato.unpack_from(self._buffer, self._posicao)[0]
+        self._posicao += formato.size
+        return valor
+
+    def _estrutura(self, formato: str) -> struct.Struct:
+        estrutura = self._estruturas.get(formato)
+        if estrutura is None:
+            estrutura = self._estruturas[formato] = struct.Struct('<' + formato)
+        return estrutura
+
+    def ler(self) -> Any:
+        buffer = self._buffer
+        posicao = self._posicao
+        tag = buffer[posicao]
+        posicao += 1
+
+        if tag == _REF_TEXTO:
+            self._posicao = posicao + 4
+            return self._textos[_U32.unpack_from(buffer, posicao)[0]]
+        if tag == _TEXTO:
+            fim = posicao + 4 + _U32.unpack_from(buffer, posicao)[0]
+            texto = str(buffer[posicao + 4:fim], 'utf-8')
+            self._posicao = fim
+            self._textos.append(texto)
+            return texto
+        if tag == _REAL:
+            self._posicao = posicao + 8
+            return _F64.unpack_from(buffer, posicao)[0]
+        if tag == _INTEIRO:
+            self._posicao = posicao + 8
+            return _I64.unpack_from(buffer, posicao)[0]
+        if tag == _MAPA:
+            self._posicao = posicao + 4
+            mapa = {}
+            for _ in range(_U32.unpack_from(buffer, posicao)[0]):
+                chave = self.ler()
+                mapa[chave] = self.ler()
+            return mapa
+        if tag == _LISTA:
+            self._posicao = posicao + 4
+            return [self.ler() for _ in range(_U32.unpack_from(buffer, posicao)[0])]
+        if tag == _LINHA_NUMERICA:
+            self._posicao = posicao
+            estrutura = self._estrutura(self.ler())
+            linha = list(estrutura.unpack_from(buffer, self._posicao))
+            self._posicao += estrutura.size
+            return linha
+        if tag == _TABELA_NUMERICA:
+            self._posicao = posicao
+            estrutura = self._estrutura(self.ler())
+            linhas = self._ler_struct(_U32)
+            fim = self._posicao + linhas * estrutura.size
+            tabela = [list(linha) for linha in estrutura.iter_unpack(buffer[self._posicao:fim])]
+            self._posicao = fim
+            return tabela
+        if tag == _REGISTROS:
+            self._posicao = posicao + 4
+            quantidade = _U32.unpack_from(buffer, posicao)[0]
+            chaves = [self.ler() for _ in range(quantidade)]
+            colunas = [self.ler() for _ in range(quantidade)]
+            return [dict(zip(chaves, linha)) for linha in zip(*colunas)]
+        if tag == _LINHA_DATAS:
+            quantidade = _U32.unpack_from(buffer, posicao)[0]
+            self._posicao = posicao + 4 + 8 * quantidade
+            return [_EPOCA + timedelta(microseconds=micros)
+                    for micros in struct.unpack_from(f'<{quantidade}q', buffer, posicao + 4)]
+        if tag == _NULO:
+            self._posicao = posicao
+            return None
+        if tag == _VERDADEIRO:
+            self._posicao = posicao
+            return True
+        if tag == _FALSO:
+            self._posicao = posicao
+            return False
+        if tag == _DATA:
+            self._posicao = posicao + 8
+            return _EPOCA + timedelta(microseconds=_I64.unpack_from(buffer, posicao)[0])
+        self._posicao = posicao
+        if tag == _DATA_FUSO:
+            instante = _EPOCA_UTC + timedelta(microseconds=self._ler_struct(_I64))
+            fuso = timezone(timedelta(seconds=self._ler_struct(_I32)))
+            return instante.astimezone(fuso)
+        if tag == _INTEIRO_GRANDE:
+            return int(self.ler())
+        if tag == _BYTES:
+            tamanho = self._ler_struct(_U32)
+            fim = self._posicao + tamanho
+            dados = bytes(buffer[self._posicao:fim])
+            self._posicao = fim
+            return dados
+        raise ValueError(f"Tag desconhecida no snapshot: {tag}")
+
+
+@contextmanager
+def pausar_coleta_ciclica():
+    """
+    Suspende o coletor de ciclos enquanto muitos objetos são criados
+
+    Decodificar e restaurar um snapshot aloca centenas de milhares de
+    listas e dicts sem ciclos; cada coleta disparada no meio percorreria
+    todo o heap do processo (incluindo os eventos em memória).
+    """
+    estava_ativo = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if estava_ativo:
+            gc.enable()
+
+
+def codificar_valor(valor: Any) -> bytes:
+    """Codifica uma estrutura primitiva no formato binário"""
+    codificador = _Codificador()
+    codificador.escrever(valor)
+    return bytes(codificador.saida)
+
+
+def decodificar_valor(dados: bytes) -> Any:
+    """Decodifica uma estrutura gravada por `codificar_valor`"""
+    return _Decodificador(dados).ler()
+
+
+def escrever_snapshot(caminho: str, sequencia: int, estado: Any) -> int:
+    """
+    Grava o estado e o cursor de sequência de forma atômica
+
+    Escreve em um arquivo temporário, faz fsync e o renomeia sobre o
+    destino: um snapshot anterior nunca fica parcialmente sobrescrito.
+    Retorna o tamanho do arquivo em bytes.
+    """
+    payload = codificar_valor(estado)
+    cabecalho = CABECALHO_SNAPSHOT.pack(
+        MAGIC_SNAPSHOT, VERSAO_FORMATO, sequencia, len(payload), zlib.crc32(payload)
+    )
+
+    caminho_temporario = caminho + ".tmp"
+    with open(caminho_temporario, 'wb') as arquivo:
+        arquivo.write(cabecalho)
+        arquivo.write(payload)
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+    os.replace(caminho_temporario, caminho)
+    return len(cabecalho) + len(payload)
+
+
+def ler_snapshot(caminho: str) -> Tuple[int, Any]:
+    """Lê um snapshot e retorna (sequência, estado); ValueError se inválido"""
+    with open(caminho, 'rb') as arquivo:
+        conteudo = arquivo.read()
+
+    if len(conteudo) < CABECALHO_SNAPSHOT.size:
+        raise ValueError(f"Snapshot {caminho} truncado")
+
+    magico, versao, sequencia, tamanho, crc = CABECALHO_SNAPSHOT.unpack_from(conteudo)
+    if magico != MAGIC_SNAPSHOT:
+        raise ValueError(f"Arquivo {caminho} não é um snapshot do Query Model")
+    if versao > VERSAO_FORMATO:
+        raise ValueError(f"Versão de snapshot não suportada: {versao}")
+
+    payload = memoryview(conteudo)[CABECALHO_SNAPSHOT.size:]
+    if len(payload) != tamanho or zlib.crc32(payload) != crc:
+        raise ValueError(f"Snapshot {caminho} corrompido")
+
+    with pausar_coleta_ciclica():
+        return sequencia, _Decodificador(payload).ler()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Testes das Agregações em Streaming
+
+OBJETIVO: Garantir que os rollups expiram pelo relógio de parede, mesmo
+quando a série deixa de receber amostras, que séries vazias são
+descartadas e que o histograma colapsa sempre os buckets mais baixos.
+
+AUTOR: Prof. Jackson Antonio do Prado Lima
+"""
+
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+# Adicionar diretório atual ao path
+current_dir = os.path.dirname(os.path.abspath(__file__)) if '__file__' in globals() else os.getcwd()
+sys.path.append(current_dir)
+
+from aggregation import HistogramaLogaritmico, RollupMetricas
+
+INICIO = 1_800_000_000  # Epoch alinhado a minutos e horas
+NIVEIS = ((1, 60), (60, 3600))
+
+
+class RelogioParede:
+    def __init__(self, epoch: float):
+        self.epoch = epoch
+
+    def __call__(self) -> float:
+        return self.epoch
+
+
+def _rollup(relogio: RelogioParede) -> RollupMetricas:
+    return RollupMetricas(NIVEIS, relogio=relogio)
+
+
+def test_consulta_expira_buckets_de_serie_sem_escritas():
+    relogio = RelogioParede(INICIO)
+    rollup = _rollup(relogio)
+    rollup.registrar("cpu", "api", {}, datetime.fromtimestamp(INICIO), 10.0)
+    assert rollup.consultar("cpu", datetime.fromtimestamp(INICIO - 1), origem="api")
+
+    # Fora da retenção de 1s, ainda dentro da de 1min: cai para o nível grosso
+    relogio.epoch = INICIO + 120
+    buckets = rollup.consultar("cpu", datetime.fromtimestamp(INICIO), origem="api")
+    assert [b['resolucao_segundos'] for b in buckets] == [60]
+
+    relogio.epoch = INICIO + 7200
+    assert rollup.consultar("cpu", datetime.fromtimestamp(INICIO), origem="api") == []
+    assert rollup.agregar("cpu", datetime.fromtimestamp(INICIO)) is None
+
+
+def test_escrita_em_outra_serie_descarta_series_vazias():
+    relogio = RelogioParede(INICIO)
+    rollup = _rollup(relogio)
+    for indice in range(100):
+        rollup.registrar("cpu", f"servico-{indice}", {}, datetime.fromtimestamp(INICIO), 1.0)
+    assert len(rollup._series) == 101  # Séries por origem + série global
+
+    relogio.epoch = INICIO + 7200
+    rollup.registrar("memoria", "api", {}, datetime.fromtimestamp(relogio.epoch), 1.0)
+    assert set(rollup._series) == {RollupMetricas.chave_serie("memoria", "api"),
+                                   RollupMetricas.chave_serie("memoria")}
+    assert rollup.series_descartadas == 101
+
+
+def test_amostra_anterior_a_retencao_nao_cria_serie():
+    relogio = RelogioParede(INICIO + 7200)
+    rollup = _rollup(relogio)
+    rollup.registrar("cpu", "api", {}, datetime.fromtimestamp(INICIO), 1.0)
+    assert rollup._series == {}
+
+
+def test_exportacao_omite_series_expiradas():
+    relogio = RelogioParede(INICIO)
+    rollup = _rollup(relogio)
+    rollup.registrar("cpu", "api", {}, datetime.fromtimestamp(INICIO), 1.0)
+    relogio.epoch = INICIO + 7200
+    assert rollup.para_dict()['series'] == []
+
+
+def test_histograma_colapsa_os_buckets_mais_baixos():
+    histograma = HistogramaLogaritmico(precisao_relativa=0.01, max_buckets=4)
+    valores = [50.0, 1.0, 1000.0, 2.0, 10.0, 0.5, 5000.0]  # Mínimos fora de ordem
+    for valor in valores:
+        histograma.registrar(valor)
+
+    assert len(histograma._buckets) == 4
+    assert sum(histograma._buckets.values()) == len(valores)
+    # Os quatro menores valores foram fundidos no bucket do 10.0
+    assert histograma.percentis([0, 50, 70, 100]) == [
+        pytest.approx(10.0, rel=0.01), pytest.approx(10.0, rel=0.01),
+        pytest.approx(50.0, rel=0.01), pytest.approx(5000.0, rel=0.01)
+    ]
+
+    # Mesclar e restaurar continuam colapsando pelo menor bucket
+    outro = HistogramaLogaritmico(precisao_relativa=0.01, max_buckets=4)
+    outro.registrar(0.1)
+    restaurado = HistogramaLogaritmico.de_dict(histograma.para_dict())
+    restaurado.mesclar(outro)
+    assert restaurado.percentis([0, 50]) == [pytest.approx(10.0, rel=0.01)] * 2
+    assert restaurado.minimo == 0.1 and restaurado.contagem == 8
+    assert len(restaurado._buckets) == 4
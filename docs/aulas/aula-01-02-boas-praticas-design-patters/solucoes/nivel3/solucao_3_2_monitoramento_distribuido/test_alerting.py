@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Testes das Regras de Alerta Declarativas
+
+OBJETIVO: Garantir a avaliação por janelas (inclusive janelas sem dados
+para regras de contagem), a deduplicação e o descarte de séries inativas.
+
+AUTOR: Prof. Jackson Antonio do Prado Lima
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Adicionar diretório atual ao path
+current_dir = os.path.dirname(os.path.abspath(__file__)) if '__file__' in globals() else os.getcwd()
+sys.path.append(current_dir)
+
+from alerting import MotorRegrasAlerta, compilar_regra
+from patterns import EventoSistema, TipoEvento
+
+# Início alinhado a janelas de 1 min e de 5 min
+INICIO = datetime.fromtimestamp(300 * 6_000_000)
+
+
+def _metrica(nome: str, valor: float, segundos: float, origem: str = "api") -> EventoSistema:
+    return EventoSistema(tipo=TipoEvento.METRICA_COLETADA, origem=origem,
+                         timestamp=INICIO + timedelta(seconds=segundos),
+                         dados={'nome': nome, 'valor': valor})
+
+
+def test_compilar_regra():
+    regra = compilar_regra("avg(response_time_ms) over 1m > 2000 for 3 windows")
+    assert (regra.agregacao, regra.metrica, regra.janela_segundos) == ('avg', 'response_time_ms', 60)
+    assert (regra.operador, regra.limite, regra.janelas) == ('>', 2000, 3)
+
+
+def test_media_por_janelas_consecutivas_com_deduplicacao():
+    motor = MotorRegrasAlerta()
+    motor.adicionar_regra("avg(response_time_ms) over 1m > 2000 for 2 windows")
+
+    alertas = []
+    for minuto in range(5):
+        alertas += motor.processar_lote([_metrica('response_time_ms', 3000, minuto * 60 + 1)])
+    alertas += motor.fechar_janelas(INICIO + timedelta(minutes=5))
+
+    assert len(alertas) == 1
+    assert alertas[0].dados['id'].endswith(":api:%d" % (int(INICIO.timestamp()) // 60 + 1))
+    assert motor.obter_metricas()['alertas_suprimidos'] == 3
+
+
+def test_contagem_menor_que_um_dispara_quando_serie_para_de_reportar():
+    motor = MotorRegrasAlerta()
+    motor.adicionar_regra("count(error_rate) over 5m < 1 for 2 windows", nome="sem_dados")
+
+    assert motor.processar_lote([_metrica('error_rate', 0.5, 10)]) == []
+    # Só a janela com o evento fechou: condição falsa
+    assert motor.fechar_janelas(INICIO + timedelta(minutes=5)) == []
+    # Uma janela vazia: ainda falta uma
+    assert motor.fechar_janelas(INICIO + timedelta(minutes=10)) == []
+
+    alertas = motor.fechar_janelas(INICIO + timedelta(minutes=15))
+    assert len(alertas) == 1
+    assert alertas[0].dados['titulo'] == "sem_dados"
+    assert alertas[0].dados['metadados']['valor'] == 0
+    assert alertas[0].timestamp == INICIO + timedelta(minutes=15)
+
+    # Disparo único; série silenciosa é descartada depois de avaliada
+    assert motor.fechar_janelas(INICIO + timedelta(minutes=40)) == []
+    metricas = motor.obter_metricas()
+    assert metricas['series'] == 0
+    assert metricas['series_descartadas'] == 1
+
+
+def test_contagem_dispara_em_lacuna_longa_fechada_de_uma_vez():
+    motor = MotorRegrasAlerta()
+    motor.adicionar_regra("count(error_rate) over 5m < 1 for 2 windows")
+    motor.processar_lote([_metrica('error_rate', 0.5, 10)])
+
+    # Janela com dados seguida de 3 janelas vazias na mesma chamada
+    alertas = motor.fechar_janelas(INICIO + timedelta(minutes=20))
+    assert len(alertas) == 1
+    assert alertas[0].timestamp == INICIO + timedelta(minutes=15)
+    assert motor.obter_metricas()['alertas_suprimidos'] == 1
+
+
+def test_serie_inativa_e_descartada_e_ativa_e_mantida():
+    motor = MotorRegrasAlerta()
+    motor.adicionar_regra("max(cpu_usage) over 1m >= 90")
+    motor.processar_lote([_metrica('cpu_usage', 50, 1, origem="antigo")])
+    for minuto in range(10):
+        motor.processar_lote([_metrica('cpu_usage', 50, minuto * 60 + 1, origem="vivo")])
+
+    motor.fechar_janelas(INICIO + timedelta(minutes=10))
+    assert motor.obter_metricas()['series'] == 1
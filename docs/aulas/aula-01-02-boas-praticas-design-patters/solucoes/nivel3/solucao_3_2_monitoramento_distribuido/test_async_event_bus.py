@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Testes do Event Bus Assíncrono
+
+OBJETIVO: Garantir que encerrar uma subscription (ou o bus) nunca deixa
+publicadores presos na backpressure de uma fila que ninguém mais consome,
+e que publicações, descartes e esperas aparecem nas métricas.
+
+AUTOR: Prof. Jackson Antonio do Prado Lima
+"""
+
+import asyncio
+import os
+import sys
+
+# Adicionar diretório atual ao path
+current_dir = os.path.dirname(os.path.abspath(__file__)) if '__file__' in globals() else os.getcwd()
+sys.path.append(current_dir)
+
+from async_event_bus import EventBusAssincrono, PoliticaOverflow
+from patterns import EventoSistema, TipoEvento
+
+
+async def _bus_com_publicadores_bloqueados(quantidade: int):
+    """Bus com fila de 1 evento, handler travado e publicadores em espera"""
+    bus = EventBusAssincrono(tamanho_fila=1, politica_padrao=PoliticaOverflow.BLOQUEAR)
+    liberar = asyncio.Event()
+
+    async def handler_travado(evento):
+        await liberar.wait()
+
+    inscricao = bus.subscrever(TipoEvento.METRICA_COLETADA.value, handler_travado)
+    await bus.publicar(EventoSistema())  # Consumido e travado no handler
+    await asyncio.sleep(0)
+    await bus.publicar(EventoSistema())  # Ocupa a única vaga da fila
+
+    publicadores = [asyncio.ensure_future(bus.publicar(EventoSistema()))
+                    for _ in range(quantidade)]
+    await asyncio.sleep(0.01)
+    assert not any(p.done() for p in publicadores)
+    return bus, inscricao, publicadores
+
+
+def test_desinscrever_libera_publicadores_bloqueados():
+    async def cenario():
+        bus, inscricao, publicadores = await _bus_com_publicadores_bloqueados(3)
+        assert bus.desinscrever(inscricao)
+        await asyncio.wait_for(asyncio.gather(*publicadores), 1.0)
+        # Publicações seguintes não encontram mais a subscription
+        await asyncio.wait_for(bus.publicar(EventoSistema()), 1.0)
+        await asyncio.wait_for(bus.aguardar_processamento(), 1.0)
+
+    asyncio.run(cenario())
+
+
+def test_fechar_sem_drenar_libera_publicadores_e_o_loop():
+    async def cenario():
+        bus, _, publicadores = await _bus_com_publicadores_bloqueados(2)
+        await asyncio.wait_for(bus.fechar(drenar=False), 1.0)
+        await asyncio.wait_for(asyncio.gather(*publicadores), 1.0)
+        return bus
+
+    bus = asyncio.run(cenario())
+    processados = []
+
+    async def reutilizar():
+        bus.subscrever_global(processados.append)
+        await bus.publicar(EventoSistema())
+        await bus.fechar()
+
+    # O bus se associa ao novo loop em vez de usar o loop encerrado
+    asyncio.run(reutilizar())
+    assert len(processados) == 1
+
+
+def test_metricas_de_publicacao_descarte_e_backpressure():
+    async def bloqueio():
+        bus, inscricao, publicadores = await _bus_com_publicadores_bloqueados(2)
+        await asyncio.sleep(0.01)
+        bus.desinscrever(inscricao)
+        await asyncio.wait_for(asyncio.gather(*publicadores), 1.0)
+        return bus.obter_metricas()
+
+    metricas = asyncio.run(bloqueio())
+    assert metricas['eventos_publicados'] == 4
+    assert metricas['espera_backpressure_ms']['count'] == 2
+    assert metricas['tempo_bloqueado_segundos'] >= 0.01
+    assert metricas['eventos_descartados'] == 0
+
+    async def descarte():
+        bus = EventBusAssincrono(tamanho_fila=1,
+                                 politica_padrao=PoliticaOverflow.DESCARTAR_MAIS_NOVO)
+        liberar = asyncio.Event()
+
+        async def handler_travado(evento):
+            await liberar.wait()
+
+        bus.subscrever(TipoEvento.METRICA_COLETADA.value, handler_travado)
+        await bus.publicar(EventoSistema())
+        await asyncio.sleep(0)  # Primeiro evento já no handler
+        for _ in range(3):
+            await bus.publicar(EventoSistema())  # Um ocupa a fila, dois são descartados
+        liberar.set()
+        await bus.fechar()
+        return bus.obter_metricas()
+
+    metricas = asyncio.run(descarte())
+    assert (metricas['eventos_publicados'], metricas['eventos_descartados']) == (4, 2)
+    assert metricas['tempo_bloqueado_segundos'] == 0
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Testes da Coleta Distribuída
+
+OBJETIVO: Garantir que uma falha no agregador é reportada a quem chamou
+sem interromper o consumo dos lotes dos demais coletores.
+
+AUTOR: Prof. Jackson Antonio do Prado Lima
+"""
+
+import os
+import sys
+
+import pytest
+
+# Adicionar diretório atual ao path
+current_dir = os.path.dirname(os.path.abspath(__file__)) if '__file__' in globals() else os.getcwd()
+sys.path.append(current_dir)
+
+from collector import CATALOGO_METRICAS, ColetorDistribuido
+from patterns import EventStore
+
+
+def coletar_instantaneo(servico_id, aleatorio):
+    """Coleta sem latência (nível de módulo: é enviada aos processos)"""
+    return [(indice, aleatorio.random()) for indice in range(len(CATALOGO_METRICAS))]
+
+
+class EventStoreFalhaNoPrimeiroLote(EventStore):
+    def __init__(self):
+        super().__init__()
+        self.lotes = 0
+
+    def adicionar_eventos(self, eventos):
+        self.lotes += 1
+        if self.lotes == 1:
+            raise IOError("disco cheio")
+        return super().adicionar_eventos(eventos)
+
+
+def test_falha_em_lote_e_reportada_e_demais_lotes_sao_consumidos():
+    store = EventStoreFalhaNoPrimeiroLote()
+    servicos = [f"svc-{i}" for i in range(20)]
+    coletor = ColetorDistribuido(store, processos=2, concorrencia_por_processo=2,
+                                 tamanho_lote=len(CATALOGO_METRICAS) * 2,
+                                 funcao_coleta=coletar_instantaneo)
+
+    with pytest.raises(RuntimeError) as erro:
+        coletor.coletar(servicos, rodadas=3)
+    assert isinstance(erro.value.__cause__, IOError)
+
+    metricas = coletor.obter_metricas()
+    total_amostras = len(servicos) * len(CATALOGO_METRICAS) * 3
+    assert metricas['lotes_falhados'] == 1
+    assert metricas['coletores_finalizados'] == 2
+    assert metricas['coletores_terminados'] == 0
+    assert 0 < store.ultima_sequencia < total_amostras
+    assert metricas['amostras_recebidas'] == store.ultima_sequencia
+
+
+def test_coleta_sem_falhas_nao_lanca():
+    store = EventStore()
+    coletor = ColetorDistribuido(store, processos=2, funcao_coleta=coletar_instantaneo)
+    metricas = coletor.coletar(["a", "b", "c"], rodadas=2)
+    assert metricas['lotes_falhados'] == 0
+    assert store.ultima_sequencia == 3 * len(CATALOGO_METRICAS) * 2
+    assert metricas['lotes_recebidos'] == metricas['processamento_lote_ms']['count']
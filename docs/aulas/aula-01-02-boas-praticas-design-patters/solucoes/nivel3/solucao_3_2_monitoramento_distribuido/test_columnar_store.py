@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Testes do Armazém Colunar de Métricas
+
+OBJETIVO: Garantir que as agregações do armazém colunar dão o mesmo
+resultado com o fallback em Python puro e com NumPy (quando instalado),
+e que a taxa de contadores trata resets.
+
+AUTOR: Prof. Jackson Antonio do Prado Lima
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+# Adicionar diretório atual ao path
+current_dir = os.path.dirname(os.path.abspath(__file__)) if '__file__' in globals() else os.getcwd()
+sys.path.append(current_dir)
+
+import columnar_store
+from columnar_store import ArmazemColunarMetricas
+
+BASE = datetime(2026, 1, 1)
+
+
+def _armazem() -> ArmazemColunarMetricas:
+    armazem = ArmazemColunarMetricas()
+    for indice in range(10):
+        instante = BASE + timedelta(seconds=indice)
+        armazem.registrar("requests_total", float(indice * 5), instante, "api",
+                          {'region': 'us'})
+        armazem.registrar("requests_total", float(indice), instante, "worker",
+                          {'region': 'eu'})
+    # Amostra atrasada: força o caminho sem busca binária
+    armazem.registrar("requests_total", 100.0, BASE - timedelta(seconds=1), "worker",
+                      {'region': 'eu'})
+    return armazem
+
+
+def _resultados(armazem: ArmazemColunarMetricas):
+    api = armazem.buscar_series("requests_total", tags={'region': 'us'})[0]
+    worker = armazem.buscar_series("requests_total", origem="worker")[0]
+    return {
+        'agregado': armazem.agregar(api),
+        'periodo': armazem.agregar(worker, desde=BASE, ate=BASE + timedelta(seconds=4)),
+        'taxa': armazem.taxa(api),
+        'media_movel': armazem.media_movel(api, 4),
+        'por_serie': armazem.agregar_por_serie("requests_total"),
+        'selecao': [list(coluna) for coluna in
+                    armazem.selecionar(worker, ate=BASE + timedelta(seconds=1))],
+    }
+
+
+def test_agregacoes_em_python_puro(monkeypatch):
+    monkeypatch.setattr(columnar_store, "np", None)
+    resultados = _resultados(_armazem())
+
+    assert resultados['agregado'] == {'count': 10, 'soma': 225.0, 'media': 22.5,
+                                      'min': 0.0, 'max': 45.0}
+    assert resultados['periodo']['count'] == 5
+    assert resultados['periodo']['max'] == 4.0
+    assert resultados['taxa'] == pytest.approx(5.0)
+    assert resultados['media_movel'] == [7.5, 12.5, 17.5, 22.5, 27.5, 32.5, 37.5]
+    assert resultados['por_serie'][1] == {'count': 11, 'soma': 145.0,
+                                          'media': 145.0 / 11, 'max': 100.0}
+    assert resultados['selecao'][1] == [0.0, 1.0, 100.0]
+
+
+def test_numpy_e_python_puro_concordam(monkeypatch):
+    pytest.importorskip("numpy")
+    armazem = _armazem()
+    vetorizado = _resultados(armazem)
+    monkeypatch.setattr(columnar_store, "np", None)
+    puro = _resultados(armazem)
+
+    assert vetorizado['agregado'] == puro['agregado']
+    assert vetorizado['periodo'] == puro['periodo']
+    assert vetorizado['taxa'] == pytest.approx(puro['taxa'])
+    assert vetorizado['media_movel'] == pytest.approx(puro['media_movel'])
+    assert vetorizado['por_serie'] == puro['por_serie']
+    assert sorted(vetorizado['selecao'][1]) == sorted(puro['selecao'][1])
+
+
+@pytest.mark.parametrize("vetorizado", [False, True])
+def test_taxa_ignora_reset_do_contador(monkeypatch, vetorizado):
+    if vetorizado:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(columnar_store, "np", None)
+
+    armazem = ArmazemColunarMetricas()
+    for segundos, valor in enumerate([0.0, 10.0, 20.0, 5.0, 15.0]):  # Reset em t=3
+        armazem.registrar("requests_total", valor, BASE + timedelta(seconds=segundos), "api")
+    armazem.registrar("requests_total", 7.0, BASE, "worker")
+
+    serie = armazem.buscar_series("requests_total", origem="api")[0]
+    assert armazem.taxa(serie) == pytest.approx(30.0 / 4)
+    assert armazem.taxa(serie, desde=BASE + timedelta(seconds=3)) == pytest.approx(10.0)
+
+
+def test_selecao_de_serie_em_python_puro_respeita_o_periodo(monkeypatch):
+    monkeypatch.setattr(columnar_store, "np", None)
+    armazem = ArmazemColunarMetricas()
+    for indice in range(20):
+        armazem.registrar("cpu", float(indice), BASE + timedelta(seconds=indice),
+                          "api" if indice % 2 else "db")
+
+    api = armazem.buscar_series("cpu", origem="api")[0]
+    timestamps, valores = armazem.selecionar(api, desde=BASE + timedelta(seconds=4),
+                                             ate=BASE + timedelta(seconds=9))
+    assert valores == [5.0, 7.0, 9.0]
+    assert timestamps == [columnar_store.para_nanossegundos(BASE + timedelta(seconds=s))
+                          for s in (5, 7, 9)]
+    assert armazem.selecionar(99) == ([], [])
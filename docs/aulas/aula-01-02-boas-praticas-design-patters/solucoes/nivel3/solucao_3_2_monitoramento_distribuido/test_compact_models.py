@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Testes dos Modelos Compactos
+
+OBJETIVO: Garantir que os modelos compactos continuam compatíveis com as
+classes originais (conversões de timestamp, igualdade, imutabilidade).
+
+AUTOR: Prof. Jackson Antonio do Prado Lima
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+# Adicionar diretório atual ao path
+current_dir = os.path.dirname(os.path.abspath(__file__)) if '__file__' in globals() else os.getcwd()
+sys.path.append(current_dir)
+
+from compact_models import (
+    EventoCompacto, MetricaCompacta, de_nanossegundos, para_nanossegundos
+)
+from patterns import EventoSistema, EventStore, TipoEvento
+
+
+def test_conversao_de_timestamp_preserva_microssegundos():
+    data = datetime(2026, 3, 1, 12, 30, 45, 123456)
+    assert de_nanossegundos(para_nanossegundos(data)) == data
+
+
+def test_store_indexa_eventos_compactos_e_comuns_pelo_mesmo_instante():
+    base = datetime(2026, 1, 1)
+    store = EventStore()
+    store.adicionar_evento(EventoCompacto(id_numerico=1, origem="api",
+                                          timestamp_ns=para_nanossegundos(base + timedelta(minutes=1))))
+    store.adicionar_evento(EventoSistema(id="comum", tipo=TipoEvento.METRICA_COLETADA, origem="api",
+                                         timestamp=base + timedelta(minutes=3)))
+    store.adicionar_evento(EventoCompacto(id_numerico=2, origem="db",  # Atrasado
+                                          timestamp_ns=para_nanossegundos(base + timedelta(minutes=2))))
+
+    ids = [evento.id for evento in store.obter_todos_eventos(desde=base + timedelta(minutes=2),
+                                                             ate=base + timedelta(minutes=3))]
+    assert ids == ["2", "comum"]
+    ids = [evento.id for evento in store.consultar(origem="api", ate=base + timedelta(minutes=2))]
+    assert ids == ["1"]
+
+
+def test_timestamp_criado_a_cada_acesso_sem_alterar_igualdade():
+    primeiro = EventoCompacto(id_numerico=1, timestamp_ns=10, origem="api")
+    segundo = EventoCompacto(id_numerico=1, timestamp_ns=10, origem="api")
+    assert primeiro.timestamp == segundo.timestamp
+    assert primeiro.timestamp is not primeiro.timestamp  # Nada fica guardado
+    assert primeiro == segundo
+
+    with pytest.raises(AttributeError):
+        primeiro.origem = "outro"
+
+
+def test_conversao_de_e_para_evento_sistema():
+    original = EventoSistema(tipo=TipoEvento.ALERTA_GERADO, origem="api",
+                             timestamp=datetime(2026, 1, 1, 8, 0, 0, 5), dados={'id': 'a'})
+    compacto = EventoCompacto.de_evento(original)
+    convertido = compacto.para_evento()
+    assert (convertido.timestamp, convertido.tipo, convertido.origem, convertido.dados) == (
+        original.timestamp, original.tipo, original.origem, original.dados)
+
+
+def test_metrica_compacta_rejeita_valor_negativo():
+    with pytest.raises(ValueError):
+        MetricaCompacta("cpu", -1, "%")
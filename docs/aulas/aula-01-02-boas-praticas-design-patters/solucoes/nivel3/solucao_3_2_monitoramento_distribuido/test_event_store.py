@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Testes do Event Store
+
+OBJETIVO: Garantir que retenção e compactação liberam os eventos certos e
+mantêm índices, sequências e cursores consistentes.
+
+AUTOR: Prof. Jackson Antonio do Prado Lima
+"""
+
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+# Adicionar diretório atual ao path
+current_dir = os.path.dirname(os.path.abspath(__file__)) if '__file__' in globals() else os.getcwd()
+sys.path.append(current_dir)
+
+from patterns import (
+    EventoSistema, EventStore, IngestorEventos, PoliticaRetencao, TipoEvento,
+    estimar_bytes_evento, intersectar_postagens
+)
+
+BASE = datetime(2026, 1, 1)
+
+
+def _evento(indice: int, origem: str = "api", minutos: float = 0,
+            tipo: TipoEvento = TipoEvento.METRICA_COLETADA) -> EventoSistema:
+    return EventoSistema(id=f"e{indice}", tipo=tipo, origem=origem,
+                         timestamp=BASE + timedelta(minutes=minutos),
+                         dados={'valor': float(indice), 'tags': {'env': 'prod'}})
+
+
+def _ids(eventos) -> list:
+    return [evento.id for evento in eventos]
+
+
+def _store(**politica) -> EventStore:
+    return EventStore(PoliticaRetencao(compactar_a_cada=None, **politica))
+
+
+def test_consulta_por_periodo_inclui_limites_e_mantem_ordem_temporal():
+    store = EventStore()
+    for indice in range(1, 11):
+        store.adicionar_evento(_evento(indice, minutos=indice))
+
+    def periodo(desde, ate):
+        return _ids(store.obter_todos_eventos(
+            desde=BASE + timedelta(minutes=desde) if desde is not None else None,
+            ate=BASE + timedelta(minutes=ate) if ate is not None else None
+        ))
+
+    assert periodo(3, 5) == ["e3", "e4", "e5"]  # Limites inclusivos
+    assert periodo(None, 2) == ["e1", "e2"]
+    assert periodo(9, None) == ["e9", "e10"]
+    assert periodo(5.5, 5.9) == []
+    assert periodo(20, 30) == []
+
+
+def test_eventos_atrasados_entram_na_posicao_temporal():
+    store = EventStore()
+    for indice, minutos in [(1, 1), (2, 5), (3, 3), (4, 5), (5, 0), (6, 3)]:
+        store.adicionar_evento(_evento(indice, origem="api" if indice % 2 else "db",
+                                       minutos=minutos))
+
+    # Empates preservam a ordem de chegada; ler_desde segue a sequência
+    assert _ids(store.obter_todos_eventos()) == ["e5", "e1", "e3", "e6", "e2", "e4"]
+    assert _ids(store.obter_todos_eventos(desde=BASE + timedelta(minutes=3),
+                                          ate=BASE + timedelta(minutes=4))) == ["e3", "e6"]
+    assert _ids(store.obter_eventos_por_origem("api", desde=BASE + timedelta(minutes=1))) == [
+        "e1", "e3"
+    ]
+    assert _ids(store.ler_desde(0)[0]) == [f"e{i}" for i in range(1, 7)]
+
+
+def test_ler_desde_pagina_com_limite_e_cursor():
+    store = EventStore()
+    assert store.ler_desde(0) == ([], 0)
+    for indice in range(1, 11):
+        store.adicionar_evento(_evento(indice))
+
+    lidos, cursor, paginas = [], 0, 0
+    while True:
+        pagina, cursor = store.ler_desde(cursor, limite=3)
+        if not pagina:
+            break
+        lidos.extend(_ids(pagina))
+        paginas += 1
+    assert lidos == [f"e{i}" for i in range(1, 11)]
+    assert (paginas, cursor) == (4, 10)
+    assert store.ler_desde(15) == ([], 15)  # Cursor à frente não retrocede
+
+
+def test_ler_desde_avanca_o_cursor_sobre_lacunas():
+    store = _store(max_eventos_por_origem=1)
+    store.adicionar_evento(_evento(1, origem="worker"))
+    for indice in range(2, 5):
+        store.adicionar_evento(_evento(indice))
+    assert store.compactar() == 2  # e2 e e3 viram lacunas atrás de e1
+
+    # O limite conta sequências, inclusive lacunas; o cursor passa por elas
+    assert _ids(store.ler_desde(0, limite=2)[0]) == ["e1"]
+    assert store.ler_desde(0, limite=2)[1] == 2
+    assert _ids(store.ler_desde(2, limite=2)[0]) == ["e4"]
+    assert store.ler_desde(2, limite=2)[1] == 4
+    assert store.adicionar_evento(_evento(5)) == 5  # Sequências nunca são reutilizadas
+    assert _ids(store.ler_desde(4)[0]) == ["e5"]
+
+
+def test_intersectar_postagens():
+    assert intersectar_postagens([]) == []
+    assert intersectar_postagens([[1, 4, 9, 12], [0, 4, 5, 9], [4, 9, 30]]) == [4, 9]
+    assert intersectar_postagens([[2, 3], [5, 6]]) == []
+    assert intersectar_postagens([[1, 4, 9, 12], [4, 9, 12]], limite_posicao=12) == [4, 9]
+
+
+def test_consultar_combina_tipo_tags_origem_e_periodo():
+    store = EventStore()
+    combinacoes = [
+        ("api", TipoEvento.METRICA_COLETADA, {'env': 'prod', 'region': 'us'}),
+        ("api", TipoEvento.ALERTA_GERADO, {'env': 'prod', 'region': 'us'}),
+        ("db", TipoEvento.METRICA_COLETADA, {'env': 'prod', 'region': 'us'}),
+        ("api", TipoEvento.METRICA_COLETADA, {'env': 'dev', 'region': 'us'}),
+        ("api", TipoEvento.METRICA_COLETADA, {'env': 'prod', 'region': 'eu'}),
+        ("api", TipoEvento.METRICA_COLETADA, {'env': 'prod', 'region': 'us'}),
+    ]
+    for indice, (origem, tipo, tags) in enumerate(combinacoes, start=1):
+        store.adicionar_evento(EventoSistema(id=f"e{indice}", tipo=tipo, origem=origem,
+                                             timestamp=BASE + timedelta(minutes=indice),
+                                             dados={'tags': tags}))
+
+    metricas_prod_us = dict(tipo=TipoEvento.METRICA_COLETADA,
+                            tags={'env': 'prod', 'region': 'us'})
+    assert _ids(store.consultar(**metricas_prod_us)) == ["e1", "e3", "e6"]
+    assert _ids(store.consultar(**metricas_prod_us, origem="api")) == ["e1", "e6"]
+    assert _ids(store.consultar(**metricas_prod_us, origem="api",
+                                desde=BASE + timedelta(minutes=2))) == ["e6"]
+    assert _ids(store.consultar(**metricas_prod_us, limite=2)) == ["e1", "e3"]
+    assert _ids(store.consultar(tags={'region': 'eu'})) == ["e5"]
+    assert store.consultar(tags={'env': 'staging'}) == []
+    assert store.consultar(tipo=TipoEvento.ALERTA_GERADO, origem="db") == []
+    assert store.contar_por_tipo()[TipoEvento.METRICA_COLETADA] == 5
+
+    # Evento atrasado: o período deixa de ser um intervalo de posições
+    store.adicionar_evento(EventoSistema(id="atrasado", tipo=TipoEvento.METRICA_COLETADA,
+                                         origem="api", timestamp=BASE,
+                                         dados={'tags': {'env': 'prod', 'region': 'us'}}))
+    assert _ids(store.consultar(**metricas_prod_us, ate=BASE + timedelta(minutes=3))) == [
+        "e1", "e3", "atrasado"
+    ]
+
+
+def test_retencao_por_idade():
+    store = _store(idade_maxima=timedelta(minutes=5))
+    for indice in range(1, 11):
+        store.adicionar_evento(_evento(indice, minutos=indice))
+
+    assert store.compactar(agora=BASE + timedelta(minutes=10)) == 5
+    assert store.primeira_sequencia == 6
+    assert store.ultima_sequencia == 10
+    assert _ids(store.obter_todos_eventos()) == [f"e{i}" for i in range(6, 11)]
+    assert _ids(store.ler_desde(7)[0]) == ["e8", "e9", "e10"]
+    assert store.ler_desde(0) == (store.obter_todos_eventos(), 10)
+
+
+def test_retencao_por_origem_deixa_lacunas_e_mantem_indices():
+    store = _store(max_eventos_por_origem=3)
+    store.adicionar_evento(_evento(1, origem="worker"))
+    store.adicionar_evento(_evento(2, origem="worker"))
+    for indice in range(3, 13):
+        store.adicionar_evento(_evento(indice, minutos=indice))
+
+    assert store.compactar() == 7
+    assert store.primeira_sequencia == 1  # Eventos do worker seguram o prefixo
+    assert _ids(store.ler_desde(0)[0]) == ["e1", "e2", "e10", "e11", "e12"]
+    assert store.ler_desde(2) == (store.obter_eventos_por_origem("api"), 12)
+    assert _ids(store.consultar(tipo=TipoEvento.METRICA_COLETADA, tags={'env': 'prod'},
+                                origem="api")) == ["e10", "e11", "e12"]
+    assert store.obter_metricas()['eventos_em_memoria'] == 5
+
+    # Novos eventos entram nos índices na posição certa depois da compactação
+    assert store.adicionar_evento(_evento(13, minutos=13)) == 13
+    assert _ids(store.consultar(origem="api", desde=BASE + timedelta(minutes=11))) == [
+        "e11", "e12", "e13"
+    ]
+    assert _ids(store.obter_eventos_por_tag("env", "prod"))[-2:] == ["e12", "e13"]
+
+
+def test_retencao_por_bytes_libera_os_mais_antigos():
+    tamanho = estimar_bytes_evento(_evento(1))
+    store = _store(max_bytes=tamanho * 3)
+    for indice in range(1, 11):
+        store.adicionar_evento(_evento(indice, minutos=indice))
+
+    assert store.compactar() == 7
+    metricas = store.obter_metricas()
+    assert metricas['bytes_estimados'] == sum(
+        estimar_bytes_evento(evento) for evento in store.obter_todos_eventos()
+    )
+    assert metricas['bytes_estimados'] <= tamanho * 3
+    assert _ids(store.obter_todos_eventos()) == ["e8", "e9", "e10"]
+
+    # A contabilidade continua correta em compactações seguintes
+    store.adicionar_evento(_evento(11, minutos=11))
+    assert store.compactar() == 1
+    assert store.obter_metricas()['bytes_estimados'] == tamanho * 3
+
+
+def test_politicas_combinadas_respeitam_o_limite_dos_consumidores():
+    class Consumidor:
+        def preparar(self) -> int:
+            return 4  # Só incorporou até a sequência 4
+
+    store = _store(idade_maxima=timedelta(minutes=1), max_eventos_por_origem=1)
+    consumidor = Consumidor()
+    store.registrar_consumidor(consumidor.preparar)
+    for indice in range(1, 9):
+        store.adicionar_evento(_evento(indice, origem=f"s{indice % 2}", minutos=indice))
+
+    assert store.compactar(agora=BASE + timedelta(minutes=100)) == 4
+    assert store.primeira_sequencia == 5
+    assert _ids(store.ler_desde(0)[0]) == ["e5", "e6", "e7", "e8"]
+
+
+def _evento_produtora(produtora: int, indice: int) -> EventoSistema:
+    return EventoSistema(id=f"p{produtora}-{indice}", tipo=TipoEvento.METRICA_COLETADA,
+                         origem=f"p{produtora}", timestamp=BASE + timedelta(minutes=indice),
+                         dados={'valor': float(indice), 'tags': {'env': 'prod'}})
+
+
+def _em_paralelo(alvo, quantidade: int) -> None:
+    threads = [threading.Thread(target=alvo, args=(n,)) for n in range(quantidade)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_ingestor_envia_lotes_cheios_e_descarrega_o_resto():
+    store = EventStore()
+    ingestor = IngestorEventos(store, tamanho_lote=4)
+    for indice in range(1, 11):
+        ingestor.adicionar_evento(_evento(indice))
+
+    assert _ids(store.ler_desde(0)[0]) == [f"e{i}" for i in range(1, 9)]
+    assert ingestor.descarregar() == 2
+    assert _ids(store.ler_desde(8)[0]) == ["e9", "e10"]
+    assert ingestor.descarregar() == 0
+
+
+def test_ingestor_preserva_a_ordem_de_cada_produtora():
+    store = EventStore()
+    ingestor = IngestorEventos(store, tamanho_lote=7)
+
+    def produzir(produtora: int) -> None:
+        for indice in range(200):
+            ingestor.adicionar_evento(_evento_produtora(produtora, indice))
+
+    _em_paralelo(produzir, 4)
+    ingestor.fechar()
+
+    eventos = store.obter_todos_eventos()
+    assert len(eventos) == 800
+    for produtora in range(4):
+        assert [e.id for e in eventos if e.origem == f"p{produtora}"] == [
+            f"p{produtora}-{i}" for i in range(200)
+        ]
+
+
+def test_ingestor_descarga_periodica_publica_lotes_incompletos():
+    store = EventStore()
+    ingestor = IngestorEventos(store, tamanho_lote=100, intervalo_descarga_segundos=0.01)
+    ingestor.adicionar_evento(_evento(1))
+    prazo = time.monotonic() + 2.0
+    while store.ultima_sequencia < 1 and time.monotonic() < prazo:
+        time.sleep(0.005)
+    ingestor.fechar()
+
+    assert _ids(store.ler_desde(0)[0]) == ["e1"]
+
+
+def test_visao_e_leituras_consistentes_com_produtores_concorrentes():
+    store = EventStore()
+    producao_encerrada = threading.Event()
+    falhas = []
+
+    def produzir(produtora: int) -> None:
+        for indice in range(1000):
+            store.adicionar_evento(_evento_produtora(produtora, indice))
+
+    def ler() -> None:
+        anterior = []
+        while not producao_encerrada.is_set():
+            visao = store.obter_visao()
+            eventos = list(visao)
+            if len(eventos) != len(visao) or eventos[:len(anterior)] != anterior:
+                falhas.append("visão alterada")
+            if visao.ler_desde(0) != (eventos, visao.ultima_sequencia):
+                falhas.append("ler_desde divergente da visão")
+            lidos, cursor = store.ler_desde(0)
+            if lidos[:len(eventos)] != eventos or cursor != len(lidos):
+                falhas.append("ler_desde do store divergente")
+            consultados = store.consultar(tags={'env': 'prod'}, origem="p0")
+            if [e.id for e in consultados] != [f"p0-{i}" for i in range(len(consultados))]:
+                falhas.append("consultar fora de ordem")
+            anterior = eventos
+
+    leitor = threading.Thread(target=ler)
+    leitor.start()
+    _em_paralelo(produzir, 3)
+    producao_encerrada.set()
+    leitor.join()
+
+    assert falhas == []
+    assert len(store.obter_visao()) == 3000
+
+
+def test_visao_capturada_nao_muda_com_a_compactacao():
+    store = _store(max_eventos_por_origem=2)
+    for indice in range(1, 6):
+        store.adicionar_evento(_evento(indice, minutos=indice))
+    visao = store.obter_visao()
+
+    assert store.compactar() == 3
+    assert _ids(visao) == ["e1", "e2", "e3", "e4", "e5"]
+    assert visao.ler_desde(3) == (list(visao)[3:], 5)
+    assert _ids(store.obter_visao()) == ["e4", "e5"]
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Testes do Health Check Agendado
+
+OBJETIVO: Garantir que a timer wheel dispara cada temporizador no tick
+certo depois das cascatas entre níveis, que cancelamentos valem em
+qualquer nível e que o motor só publica eventos nas transições.
+
+AUTOR: Prof. Jackson Antonio do Prado Lima
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Adicionar diretório atual ao path
+current_dir = os.path.dirname(os.path.abspath(__file__)) if '__file__' in globals() else os.getcwd()
+sys.path.append(current_dir)
+
+from health_check import MotorHealthCheck, RodaTemporizacao
+from instrumentation import Relogio
+from patterns import EventStore, Servico, StatusServico, TipoEvento
+
+
+class RelogioManual(Relogio):
+    """Relógio controlado pelo teste"""
+
+    def __init__(self):
+        self.segundos = 0.0
+
+    def monotonico(self) -> float:
+        return self.segundos
+
+    def monotonico_ns(self) -> int:
+        return round(self.segundos * 1_000_000_000)
+
+    def agora(self) -> datetime:
+        return datetime(2024, 1, 1) + timedelta(seconds=self.segundos)
+
+
+def _roda_pequena() -> RodaTemporizacao:
+    # 3 níveis de 4 slots: cascatas a cada 4 e 16 ticks, horizonte de 63
+    return RodaTemporizacao(resolucao_segundos=1.0, bits_por_nivel=2, niveis=3)
+
+
+def _disparos_tick_a_tick(roda: RodaTemporizacao, ate_tick: int, desde_tick: int = 0):
+    disparos = {}
+    for tick in range(desde_tick, ate_tick + 1):
+        for item in roda.avancar(tick):
+            disparos[item] = tick
+    return disparos
+
+
+def test_temporizadores_disparam_no_tick_apos_cascata():
+    roda = _roda_pequena()
+    roda.avancar(5)  # Começar fora do alinhamento dos giros
+    for tick in range(6, 6 + 58):
+        roda.agendar(tick, tick)
+
+    disparos = _disparos_tick_a_tick(roda, 70, desde_tick=6)
+    assert disparos == {tick: tick for tick in range(6, 64)}
+    assert roda.pendentes == 0
+
+
+def test_cancelamento_em_nivel_alto_e_apos_cascata():
+    roda = _roda_pequena()
+    alto = roda.agendar(40, 'alto')        # Nível 2 até o tick 32
+    medio = roda.agendar(13, 'medio')      # Nível 1 até o tick 12
+    mantido = roda.agendar(41, 'mantido')
+    roda.cancelar(alto)
+    assert roda.avancar(12) == []
+    roda.cancelar(medio)                   # Já desceu para o nível 0
+    roda.cancelar(medio)
+    assert roda.pendentes == 1
+
+    assert _disparos_tick_a_tick(roda, 50, desde_tick=13) == {'mantido': 41}
+    roda.cancelar(mantido)                 # Já disparado: no-op
+    assert roda.pendentes == 0
+
+
+def test_salto_grande_dispara_tudo_em_ordem():
+    roda = _roda_pequena()
+    ticks = [63, 1, 17, 4, 48, 16, 5]
+    for tick in ticks:
+        roda.agendar(tick, tick)
+
+    assert roda.avancar(1000) == sorted(ticks)
+    assert roda.pendentes == 0
+    # Depois do salto, novos agendamentos são relativos ao tick corrente
+    roda.agendar(1003, 'depois')
+    assert roda.avancar(1002) == []
+    assert roda.avancar(1003) == ['depois']
+
+
+def test_vencimento_alem_do_horizonte_e_limitado():
+    roda = _roda_pequena()
+    roda.agendar(500, 'distante')
+    assert roda.avancar(62) == []
+    assert roda.avancar(63) == ['distante']
+
+
+def test_motor_publica_apenas_transicoes():
+    relogio = RelogioManual()
+    store = EventStore()
+    motor = MotorHealthCheck(event_store=store, relogio=relogio, semente=0)
+    saudavel = [True]
+
+    def sonda():
+        if not saudavel[0]:
+            raise ConnectionError("sem resposta")
+
+    servico = Servico(id="api", nome="api")
+    motor.registrar(servico, sonda, intervalo_segundos=10.0)
+
+    def ciclo():
+        relogio.segundos += 10.0
+        assert motor.executar_pendentes() == 1
+
+    ciclo()
+    assert servico.status == StatusServico.ATIVO
+    saudavel[0] = False
+    ciclo()
+    ciclo()  # Segunda falha: abaixo do threshold do circuito (3)
+    assert servico.status == StatusServico.INDISPONIVEL
+    saudavel[0] = True
+    ciclo()
+    assert servico.status == StatusServico.INDISPONIVEL
+    ciclo()
+    ciclo()
+
+    eventos, _ = store.ler_desde(0)
+    assert [evento.tipo for evento in eventos] == [
+        TipoEvento.SISTEMA_INDISPONIVEL, TipoEvento.SISTEMA_RECUPERADO
+    ]
+    assert servico.status == StatusServico.ATIVO
+    assert motor.obter_metricas()['transicoes'] == 2
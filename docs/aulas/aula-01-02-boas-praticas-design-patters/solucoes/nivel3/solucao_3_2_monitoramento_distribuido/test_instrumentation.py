@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Testes da Instrumentação
+
+OBJETIVO: Garantir que métricas particionadas por thread não crescem com
+threads de vida curta e não perdem registros ao mesclar as partições.
+
+AUTOR: Prof. Jackson Antonio do Prado Lima
+"""
+
+import os
+import sys
+import threading
+
+# Adicionar diretório atual ao path
+current_dir = os.path.dirname(os.path.abspath(__file__)) if '__file__' in globals() else os.getcwd()
+sys.path.append(current_dir)
+
+from instrumentation import ContadorDistribuido, HistogramaLatencia
+
+
+def _em_threads_curtas(funcao, quantidade: int) -> None:
+    for _ in range(quantidade):
+        thread = threading.Thread(target=funcao)
+        thread.start()
+        thread.join()
+
+
+def test_histograma_mescla_particoes_de_threads_encerradas():
+    histograma = HistogramaLatencia('latencia')
+    _em_threads_curtas(lambda: histograma.registrar_ns(1_000_000), 500)
+
+    assert len(histograma._particoes) <= 1
+    histograma.registrar_ns(3_000_000)  # Partição da thread atual (viva)
+    resumo = histograma.resumo_ms()
+    assert resumo['count'] == 501
+    assert len(histograma._particoes) == 1
+    assert 0.99 <= resumo['min'] <= 1.01
+    assert 2.97 <= resumo['max'] <= 3.03
+
+
+def test_contador_incorpora_celulas_de_threads_encerradas():
+    contador = ContadorDistribuido('chamadas')
+    _em_threads_curtas(lambda: contador.incrementar(2), 200)
+
+    assert contador.valor == 400
+    assert contador._celulas == []
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Testes de Regressão de Desempenho - Gerador de Carga
+
+OBJETIVO: Garantir que o comportamento da pilha de resiliência sob o
+perfil de carga padrão não muda sem que a baseline seja atualizada.
+
+Como a simulação é determinística (semente + relógio virtual), as
+contagens do relatório precisam ser idênticas às gravadas em
+baseline_carga.json; latências e taxas (floats arredondados) são
+comparadas com tolerância relativa de 0,1%.
+Depois de uma mudança intencional, regravar a baseline com:
+
+    python load_generator.py --atualizar-baseline
+
+Com pytest-benchmark instalado, o tempo real da simulação também é
+medido e pode ser comparado entre execuções:
+
+    python -m pytest test_load_generator.py --benchmark-autosave
+    python -m pytest test_load_generator.py --benchmark-compare
+
+AUTOR: Prof. Jackson Antonio do Prado Lima
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+# Adicionar diretório atual ao path
+current_dir = os.path.dirname(os.path.abspath(__file__)) if '__file__' in globals() else os.getcwd()
+sys.path.append(current_dir)
+
+from load_generator import (
+    GeradorCarga, carregar_baseline, estavel, executar_cenario, indisponibilidade,
+    recuperacao
+)
+
+try:
+    import pytest_benchmark
+except ImportError:  # pytest-benchmark é opcional
+    pytest_benchmark = None
+
+
+def _aproximado(valor):
+    """Baseline com floats trocados por pytest.approx (inteiros seguem exatos)"""
+    if isinstance(valor, dict):
+        return {chave: _aproximado(item) for chave, item in valor.items()}
+    if isinstance(valor, list):
+        return [_aproximado(item) for item in valor]
+    if isinstance(valor, float):
+        return pytest.approx(valor, rel=1e-3)
+    return valor
+
+
+def _perfil_curto():
+    queda = indisponibilidade("queda", 5, 100)
+    return [
+        estavel("normal", 5, 100),
+        queda,
+        recuperacao("recuperacao", 10, 100, de=queda),
+    ]
+
+
+def test_cenario_padrao_reproduz_baseline():
+    assert executar_cenario('padrao') == _aproximado(carregar_baseline()['padrao'])
+
+
+def test_mesma_semente_produz_mesmo_relatorio():
+    primeiro = GeradorCarga(_perfil_curto(), semente=7).executar()
+    segundo = GeradorCarga(_perfil_curto(), semente=7).executar()
+    outra_semente = GeradorCarga(_perfil_curto(), semente=8).executar()
+
+    assert primeiro == segundo
+    assert primeiro != outra_semente
+
+
+def test_simulacao_nao_espera_tempo_real():
+    gerador = GeradorCarga(_perfil_curto())
+
+    inicio = time.perf_counter()
+    gerador.executar()
+    duracao_real = time.perf_counter() - inicio
+
+    assert gerador.relogio.monotonico() >= gerador.duracao_segundos
+    assert duracao_real < gerador.duracao_segundos / 2
+
+
+def test_indisponibilidade_abre_e_recupera_circuito():
+    relatorio = GeradorCarga(_perfil_curto()).executar()
+    queda = relatorio['fases'][1]
+
+    assert queda['sucessos'] == 0
+    assert queda['rejeitadas_circuito'] > 0
+    assert relatorio['circuit_breaker']['aberturas'] >= 1
+    assert relatorio['circuit_breaker']['estado_final'] == 'fechado'
+    assert relatorio['eventos']['entregues_event_bus'] == sum(
+        relatorio['eventos']['armazenados'].values()
+    )
+
+
+@pytest.mark.skipif(pytest_benchmark is None, reason="pytest-benchmark não instalado")
+def test_desempenho_cenario_padrao(benchmark):
+    relatorio = benchmark.pedantic(executar_cenario, args=('padrao',), rounds=3, iterations=1)
+    assert relatorio == _aproximado(carregar_baseline()['padrao'])
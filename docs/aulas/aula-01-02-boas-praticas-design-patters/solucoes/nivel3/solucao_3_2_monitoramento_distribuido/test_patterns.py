@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Testes dos Padrões de Resiliência
+
+OBJETIVO: Cobrir casos de borda dos padrões (cancelamento, encerramento,
+janelas) que a demonstração e o gerador de carga não exercitam.
+
+AUTOR: Prof. Jackson Antonio do Prado Lima
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+# Adicionar diretório atual ao path
+current_dir = os.path.dirname(os.path.abspath(__file__)) if '__file__' in globals() else os.getcwd()
+sys.path.append(current_dir)
+
+from instrumentation import NANOS_POR_MILISSEGUNDO, Relogio
+from patterns import (
+    AcumuladorLote, BulkheadTimeoutException, CircuitBreaker, CircuitBreakerAbertoException,
+    EstadoCircuitBreaker, EventBus, EventoSistema, JanelaContagem, JanelaTemporal,
+    LimiteAIMD, LimiteGradiente, OrcamentoRetry, RecursoBulkhead, RetryExecutor, RetryExhaustedException, RetryStrategy,
+    TipoEvento
+)
+
+
+class RelogioManual(Relogio):
+    """Relógio controlado pelo teste"""
+
+    def __init__(self):
+        self.segundos = 0.0
+
+    def monotonico(self) -> float:
+        return self.segundos
+
+    def monotonico_ns(self) -> int:
+        return round(self.segundos * 1_000_000_000)
+
+    def agora(self) -> datetime:
+        return datetime(2024, 1, 1) + timedelta(seconds=self.segundos)
+
+
+def _falhar():
+    raise ConnectionError("serviço indisponível")
+
+
+def _circuito_meio_aberto(relogio: RelogioManual) -> CircuitBreaker:
+    cb = CircuitBreaker(threshold_falhas=1, timeout_segundos=1, relogio=relogio)
+    with pytest.raises(ConnectionError):
+        cb.executar(_falhar)
+    assert cb._estado == EstadoCircuitBreaker.ABERTO
+    relogio.segundos += 2
+    return cb
+
+
+def test_cancelamento_libera_vaga_do_meio_aberto():
+    relogio = RelogioManual()
+    cb = _circuito_meio_aberto(relogio)
+
+    async def cenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(cb.executar_assincrono(asyncio.sleep, 10), 0.01)
+        assert cb._estado == EstadoCircuitBreaker.MEIO_ABERTO
+        return await cb.executar_assincrono(asyncio.sleep, 0, "ok")
+
+    assert asyncio.run(cenario()) == "ok"
+    metricas = cb.obter_metricas()
+    assert metricas['estado'] == EstadoCircuitBreaker.FECHADO.value
+    assert metricas['total_canceladas'] == 1
+    assert metricas['total_falhas'] == 1
+    assert metricas['chamadas_meio_aberto_em_andamento'] == 0
+
+
+def test_cancelamento_de_tarefa_nao_conta_como_falha():
+    relogio = RelogioManual()
+    cb = _circuito_meio_aberto(relogio)
+
+    async def cenario():
+        tarefa = asyncio.ensure_future(cb.executar_assincrono(asyncio.sleep, 10))
+        await asyncio.sleep(0)
+        tarefa.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await tarefa
+
+    asyncio.run(cenario())
+    assert cb._estado == EstadoCircuitBreaker.MEIO_ABERTO
+    assert cb.executar(lambda: "ok") == "ok"
+    assert cb._estado == EstadoCircuitBreaker.FECHADO
+
+
+def test_falha_de_geracao_anterior_nao_adia_a_recuperacao():
+    relogio = RelogioManual()
+    cb = CircuitBreaker(threshold_falhas=1, timeout_segundos=10, relogio=relogio)
+    iniciada, liberar = threading.Event(), threading.Event()
+
+    def lenta():
+        iniciada.set()
+        liberar.wait(2.0)
+        raise ConnectionError("resposta tardia")
+
+    def chamar_lenta():
+        with pytest.raises(ConnectionError):
+            cb.executar(lenta)
+
+    antiga = threading.Thread(target=chamar_lenta)
+    antiga.start()
+    assert iniciada.wait(2.0)
+    with pytest.raises(ConnectionError):
+        cb.executar(_falhar)  # Abre o circuito em t=0
+    assert cb._estado == EstadoCircuitBreaker.ABERTO
+
+    relogio.segundos = 8  # A chamada admitida antes da abertura falha agora
+    liberar.set()
+    antiga.join()
+    assert cb.obter_metricas()['total_falhas'] == 2
+
+    relogio.segundos = 11  # Timeout contado da abertura, não da falha antiga
+    assert cb.executar(lambda: "ok") == "ok"
+    assert cb._estado == EstadoCircuitBreaker.FECHADO
+
+
+def test_acumulador_mantem_chegada_do_evento_mais_antigo_restante():
+    acumulador = AcumuladorLote("id", None, lambda lote: None, max_lote=4, max_espera_ms=1000)
+    assert acumulador.prazo() is None
+
+    acumulador.adicionar([EventoSistema() for _ in range(3)])
+    chegada_inicial = acumulador.primeiro_em
+    time.sleep(0.01)
+    lotes = acumulador.adicionar([EventoSistema() for _ in range(3)])
+    assert [len(lote) for lote in lotes] == [4]
+    # Os 2 restantes chegaram na segunda chamada
+    assert acumulador.primeiro_em > chegada_inicial
+    assert acumulador.prazo() == acumulador.primeiro_em + 1.0
+
+    assert len(acumulador.retirar_expirado(forcar=True)) == 2
+    assert acumulador.prazo() is None
+
+
+def test_descarregador_entrega_no_prazo_e_nao_consulta_buffers_vazios():
+    bus = EventBus("teste-lotes")
+    entregues = []
+    entregue = threading.Event()
+
+    def handler(lote):
+        entregues.append(len(lote))
+        entregue.set()
+
+    bus.subscrever_lote(TipoEvento.METRICA_COLETADA.value, handler,
+                        max_lote=100, max_espera_ms=20)
+    acumulador = bus._tabela.todos_lotes[0]
+    consultas = []
+    prazo_original = acumulador.prazo
+    acumulador.prazo = lambda: consultas.append(1) or prazo_original()
+
+    time.sleep(0.2)  # Nada pendente: o descarregador só espera o aviso
+    assert len(consultas) <= 1
+
+    bus.publicar_lote([EventoSistema() for _ in range(3)])
+    assert entregue.wait(2.0)
+    assert entregues == [3]
+    bus.shutdown()
+
+
+def test_tabela_de_despacho_publicada_nao_muda_durante_a_entrega():
+    bus = EventBus("teste-tabela")
+    chamados = []
+    inscricoes = []
+
+    def reinscrever(evento):
+        chamados.append("reinscrever")
+        bus.desinscrever(inscricoes[0])  # Alterar inscrições durante a entrega
+        bus.subscrever(TipoEvento.METRICA_COLETADA.value, lambda e: chamados.append("novo"))
+
+    inscricoes.append(bus.subscrever(TipoEvento.METRICA_COLETADA.value, reinscrever))
+    bus.subscrever_global(lambda evento: chamados.append("global"))
+    tabela = bus._tabela
+
+    bus.publicar(EventoSistema(), assincrono=False)
+    assert chamados == ["reinscrever", "global"]  # Entrega usou a tabela capturada
+    assert tabela.handlers(TipoEvento.METRICA_COLETADA.value)[0].original_handler is reinscrever
+    assert bus._tabela is not tabela
+
+    chamados.clear()
+    bus.publicar(EventoSistema(), assincrono=False)
+    assert chamados == ["novo", "global"]  # Handlers do tipo antes dos globais
+    bus.shutdown()
+
+
+def test_inscricoes_concorrentes_com_publicacao_sem_lock():
+    bus = EventBus("teste-concorrencia")
+    recebidos = []
+    bus.subscrever(TipoEvento.METRICA_COLETADA.value, recebidos.append)
+    parar = threading.Event()
+    erros = []
+
+    def alternar_inscricoes():
+        try:
+            for _ in range(300):
+                ids = [bus.subscrever(TipoEvento.METRICA_COLETADA.value, lambda e: None),
+                       bus.subscrever_global(lambda e: None)]
+                for subscription_id in ids:
+                    assert bus.desinscrever(subscription_id)
+        except Exception as erro:
+            erros.append(erro)
+
+    def publicar():
+        while not parar.is_set():
+            bus.publicar(EventoSistema(), assincrono=False)
+
+    publicador = threading.Thread(target=publicar)
+    publicador.start()
+    threads = [threading.Thread(target=alternar_inscricoes) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    parar.set()
+    publicador.join()
+
+    assert erros == []
+    metricas = bus.obter_metricas()
+    assert metricas['total_subscribers'] == 1
+    assert metricas['subscribers_globais'] == 0
+    assert len(bus._tabela.handlers(TipoEvento.METRICA_COLETADA.value)) == 1
+    assert len(recebidos) == metricas['eventos_publicados'] > 0  # Nenhuma entrega perdida
+    bus.shutdown()
+
+
+def _executor_com_hedge(**kwargs) -> RetryExecutor:
+    """RetryExecutor com limite de hedge já calculado a partir de chamadas rápidas"""
+    executor = RetryExecutor(RetryStrategy(max_tentativas=1), hedge_percentil=50,
+                             hedge_minimo_amostras=5, **kwargs)
+    for _ in range(5):
+        executor.executar(time.sleep, 0.001)
+    return executor
+
+
+def test_hedge_sincrono_devolve_o_primeiro_sucesso():
+    executor = _executor_com_hedge()
+    tentativas = []
+
+    def servico():
+        tentativas.append(threading.current_thread())
+        if len(tentativas) == 1:
+            time.sleep(0.6)  # Primária lenta
+            return "primaria"
+        return "hedge"
+
+    inicio = time.perf_counter()
+    assert executor.executar(servico) == "hedge"
+    assert time.perf_counter() - inicio < 0.3  # Tempo da hedge, não da primária
+    assert threading.current_thread() not in tentativas
+    metricas = executor.obter_metricas()
+    assert metricas['hedges_disparados'] == 1
+    assert metricas['hedges_vencedores'] == 1
+    executor.fechar()
+
+
+def test_hedge_sincrono_usa_hedge_quando_a_primaria_falha():
+    executor = _executor_com_hedge()
+    tentativas = []
+
+    def servico():
+        tentativas.append(None)
+        if len(tentativas) == 1:
+            time.sleep(0.1)
+            raise ConnectionError("timeout no upstream")
+        time.sleep(0.2)
+        return "hedge"
+
+    assert executor.executar(servico) == "hedge"
+
+    executor.fechar()
+    assert executor._executor_hedge is None
+    chamadora = threading.current_thread()
+    assert executor.executar(threading.current_thread) is chamadora  # Sem hedge
+
+
+def test_retry_sem_tentativas_esgota():
+    executor = RetryExecutor(RetryStrategy(max_tentativas=0))
+    with pytest.raises(RetryExhaustedException):
+        executor.executar(lambda: "nunca")
+    with pytest.raises(RetryExhaustedException):
+        asyncio.run(executor.executar_assincrono(asyncio.sleep, 0))
+    assert executor.obter_metricas()['total_falhas'] == 2
+
+
+def test_hedge_negada_pelo_orcamento_e_contada():
+    orcamento = OrcamentoRetry(percentual=0, minimo_por_segundo=0, capacidade=0)
+    executor = _executor_com_hedge(orcamento=orcamento)
+
+    assert executor.executar(time.sleep, 0.05) is None
+    executor.fechar()
+    metricas = executor.obter_metricas()
+    assert metricas['hedges_disparados'] == 0
+    assert metricas['retries_negados_orcamento'] == 1
+    assert executor._executor_hedge is None
+
+
+def _motivos(cb: CircuitBreaker) -> list:
+    return [registro['motivo'] for registro in cb.obter_metricas()['historico_estados']]
+
+
+def test_janela_de_contagem_abre_pela_taxa_de_falhas_e_fecha_na_recuperacao():
+    relogio = RelogioManual()
+    cb = CircuitBreaker(janela=JanelaContagem(tamanho=6), minimo_chamadas=4,
+                        taxa_falhas_limite_pct=50.0, timeout_segundos=5, relogio=relogio)
+    with pytest.raises(ConnectionError):
+        cb.executar(_falhar)
+    assert cb._estado == EstadoCircuitBreaker.FECHADO  # 100%, abaixo do mínimo de chamadas
+
+    for _ in range(6):
+        cb.executar(lambda: "ok")  # A falha sai da janela de 6 chamadas
+    assert cb.obter_metricas()['janela']['taxa_falhas_pct'] == 0.0
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            cb.executar(_falhar)
+    assert cb._estado == EstadoCircuitBreaker.FECHADO  # 2 de 6 (33%)
+    with pytest.raises(ConnectionError):
+        cb.executar(_falhar)
+    assert cb._estado == EstadoCircuitBreaker.ABERTO  # 3 de 6 (50%)
+    with pytest.raises(CircuitBreakerAbertoException):
+        cb.executar(lambda: "ok")
+
+    relogio.segundos += 5
+    assert cb.executar(lambda: "ok") == "ok"
+    assert cb._estado == EstadoCircuitBreaker.FECHADO
+    assert cb.obter_metricas()['janela']['chamadas'] == 0  # Janela nova após fechar
+    assert _motivos(cb)[-3:] == ['taxa_falhas_50.0pct', 'tentativa_recuperacao',
+                                 'recuperacao_bem_sucedida']
+
+
+def test_janela_de_contagem_abre_por_chamadas_lentas_e_reabre_no_teste_lento():
+    relogio = RelogioManual()
+    cb = CircuitBreaker(janela=JanelaContagem(tamanho=4), minimo_chamadas=4,
+                        limite_chamada_lenta_ms=100, taxa_lentas_limite_pct=50.0,
+                        timeout_segundos=5, relogio=relogio)
+
+    def lenta():
+        relogio.segundos += 0.2
+        return "lenta"
+
+    cb.executar(lambda: "ok")
+    cb.executar(lambda: "ok")
+    cb.executar(lenta)
+    assert cb._estado == EstadoCircuitBreaker.FECHADO  # Abaixo do mínimo
+    cb.executar(lenta)
+    assert cb._estado == EstadoCircuitBreaker.ABERTO
+
+    relogio.segundos += 5
+    assert cb.executar(lenta) == "lenta"  # Teste bem-sucedido, porém lento
+    assert cb._estado == EstadoCircuitBreaker.ABERTO
+    assert _motivos(cb)[-3:] == ['taxa_chamadas_lentas_50.0pct', 'tentativa_recuperacao',
+                                 'chamada_lenta_no_meio_aberto']
+
+
+def test_janela_temporal_so_considera_os_ultimos_segundos():
+    relogio = RelogioManual()
+    cb = CircuitBreaker(janela=JanelaTemporal(segundos=10, relogio=relogio),
+                        minimo_chamadas=4, taxa_falhas_limite_pct=50.0, relogio=relogio)
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            cb.executar(_falhar)
+
+    relogio.segundos = 11  # Falhas de t=0 expiraram
+    for _ in range(3):
+        cb.executar(lambda: "ok")
+    with pytest.raises(ConnectionError):
+        cb.executar(_falhar)
+    assert cb._estado == EstadoCircuitBreaker.FECHADO  # 1 de 4 na janela (25%)
+
+    relogio.segundos = 15
+    with pytest.raises(ConnectionError):
+        cb.executar(_falhar)
+    assert cb._estado == EstadoCircuitBreaker.FECHADO  # 2 de 5 (40%)
+    with pytest.raises(ConnectionError):
+        cb.executar(_falhar)
+    assert cb._estado == EstadoCircuitBreaker.ABERTO  # 3 de 6 (50%)
+
+
+def test_janela_temporal_atualizar_descarta_buckets_expirados():
+    relogio = RelogioManual()
+    janela = JanelaTemporal(segundos=10, relogio=relogio)
+    janela.registrar(falha=True, lenta=False)
+    relogio.segundos += 5
+    janela.registrar(falha=False, lenta=True)
+
+    relogio.segundos += 7  # O primeiro registro saiu da janela
+    janela.atualizar()
+    assert (janela.total, janela.falhas, janela.lentas) == (1, 0, 1)
+
+    cb = CircuitBreaker(janela=janela, relogio=relogio)
+    relogio.segundos += 60
+    assert cb.obter_metricas()['janela']['chamadas'] == 0
+
+
+MS = NANOS_POR_MILISSEGUNDO
+
+
+def test_limite_aimd_cresce_sob_uso_e_reduz_com_latencia_alta():
+    limite = LimiteAIMD(limite_inicial=4, limite_minimo=2, limite_maximo=5,
+                        latencia_maxima_ms=100, fator_reducao=0.5)
+    assert limite.atualizar(10 * MS, em_uso=1) == 4  # Pool ocioso: não cresce
+    for _ in range(4):
+        limite.atualizar(10 * MS, em_uso=4)  # +1/limite por amostra
+    assert limite.atualizar(10 * MS, em_uso=4) == 5
+    for _ in range(20):
+        limite.atualizar(10 * MS, em_uso=5)
+    assert limite.limite == 5  # Teto
+
+    assert limite.atualizar(150 * MS, em_uso=5) == 2
+    assert limite.atualizar(150 * MS, em_uso=5) == 2  # Piso
+
+
+def test_limite_gradiente_reduz_quando_a_latencia_de_curto_prazo_sobe():
+    limite = LimiteGradiente(limite_inicial=20, limite_minimo=2, tolerancia=1.5,
+                             folga=2, suavizacao=0.5)
+    for _ in range(10):
+        limite.atualizar(10 * MS, em_uso=20)  # Latência estável: cresce pela folga
+    estavel = limite.limite
+    assert estavel > 20
+
+    assert limite.atualizar(10 * MS, em_uso=1) == int(estavel)  # Ocioso: não muda
+    for _ in range(20):
+        limite.atualizar(80 * MS, em_uso=estavel)  # Fila crescendo
+    assert limite.limite < estavel / 2
+    assert limite.descrever()['latencia_base_ms'] < 20  # Base não acompanhou a fila
+
+
+def test_bulkhead_adaptativo_encolhe_o_semaforo_pelas_proximas_liberacoes():
+    relogio = RelogioManual()
+    bulkhead = RecursoBulkhead("db", relogio=relogio, limite_adaptativo=LimiteAIMD(
+        limite_inicial=4, limite_minimo=1, latencia_maxima_ms=100, fator_reducao=0.5
+    ))
+    for _ in range(4):
+        bulkhead.adquirir_recurso(timeout_segundos=0.01)
+    with pytest.raises(BulkheadTimeoutException):
+        bulkhead.adquirir_recurso(timeout_segundos=0.01)
+
+    bulkhead.liberar_recurso(150 * MS)  # Lenta: limite 4 -> 2
+    assert bulkhead.obter_metricas()['tamanho_pool'] == 2
+    bulkhead.liberar_recurso(1 * MS)    # Estas duas pagam a redução
+    bulkhead.liberar_recurso(1 * MS)
+    assert bulkhead.obter_metricas()['recursos_em_uso'] == 1
+
+    bulkhead.adquirir_recurso(timeout_segundos=0.01)
+    with pytest.raises(BulkheadTimeoutException):
+        bulkhead.adquirir_recurso(timeout_segundos=0.01)  # Pool efetivo de 2
+    metricas = bulkhead.obter_metricas()
+    assert (metricas['recursos_em_uso'], metricas['limite_concorrencia']) == (2, 2)
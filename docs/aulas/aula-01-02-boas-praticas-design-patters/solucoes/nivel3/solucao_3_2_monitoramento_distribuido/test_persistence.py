@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Testes do Event Store Persistente
+
+OBJETIVO: Garantir que o log append-only sobrevive a restarts: replay a
+partir do snapshot, descarte de registros incompletos ou corrompidos no
+fim do arquivo e offsets corretos depois da compactação.
+
+AUTOR: Prof. Jackson Antonio do Prado Lima
+"""
+
+import os
+import sys
+import threading
+
+# Adicionar diretório atual ao path
+current_dir = os.path.dirname(os.path.abspath(__file__)) if '__file__' in globals() else os.getcwd()
+sys.path.append(current_dir)
+
+from patterns import EventoSistema, PoliticaRetencao, TipoEvento
+from persistence import (
+    CABECALHO_REGISTRO, MAGIC_LOG, EventStorePersistente, codificar_evento, iterar_registros
+)
+
+
+def _evento(indice: int) -> EventoSistema:
+    return EventoSistema(id=f"e{indice}", tipo=TipoEvento.METRICA_COLETADA, origem="api",
+                         dados={'nome': 'cpu_usage', 'valor': float(indice)})
+
+
+def _store_com_eventos(caminho: str, quantidade: int = 10, **kwargs) -> EventStorePersistente:
+    store = EventStorePersistente(caminho, **kwargs)
+    for indice in range(1, quantidade + 1):
+        store.adicionar_evento(_evento(indice))
+    return store
+
+
+def _ids(eventos) -> list:
+    return [evento.id for evento in eventos]
+
+
+def test_iterar_registros_para_no_registro_invalido():
+    registros = b"".join(codificar_evento(_evento(i)) for i in range(3))
+    assert len(list(iterar_registros(registros, 0))) == 3
+    assert len(list(iterar_registros(registros[:-1], 0))) == 2  # Incompleto
+    corrompido = bytearray(registros)
+    corrompido[CABECALHO_REGISTRO.size + 2] ^= 0xFF  # Payload do primeiro
+    assert list(iterar_registros(bytes(corrompido), 0)) == []
+
+
+def test_reabrir_reprocessa_apenas_a_cauda_apos_o_snapshot(tmp_path):
+    caminho = str(tmp_path / "eventos.log")
+    store = _store_com_eventos(caminho)
+    store.registrar_snapshot("projecao", 6, {'total': 6})
+    store.fechar()
+
+    reaberto = EventStorePersistente(caminho)
+    assert reaberto.primeira_sequencia == 7
+    assert reaberto.ultima_sequencia == 10
+    eventos, cursor = reaberto.ler_desde(6)
+    assert _ids(eventos) == ["e7", "e8", "e9", "e10"] and cursor == 10
+    assert reaberto.obter_snapshot("projecao")['estado'] == {'total': 6}
+
+    # Novos eventos continuam a numeração e o histórico segue no disco
+    assert reaberto.adicionar_evento(_evento(11)) == 11
+    assert _ids(reaberto.iterar_log()) == [f"e{i}" for i in range(1, 12)]
+    reaberto.fechar()
+
+
+def test_registro_incompleto_no_fim_e_truncado(tmp_path):
+    caminho = str(tmp_path / "eventos.log")
+    _store_com_eventos(caminho, 3).fechar()
+    tamanho_valido = os.path.getsize(caminho)
+    with open(caminho, 'ab') as arquivo:  # Escrita interrompida
+        arquivo.write(codificar_evento(_evento(4))[:-3])
+
+    reaberto = EventStorePersistente(caminho)
+    assert os.path.getsize(caminho) == tamanho_valido
+    assert reaberto.ultima_sequencia == 3
+    reaberto.adicionar_evento(_evento(4))
+    reaberto.fechar()
+
+    assert _ids(EventStorePersistente(caminho).iterar_log()) == ["e1", "e2", "e3", "e4"]
+
+
+def test_ultimo_registro_corrompido_e_truncado(tmp_path):
+    caminho = str(tmp_path / "eventos.log")
+    _store_com_eventos(caminho, 3).fechar()
+    with open(caminho, 'r+b') as arquivo:
+        arquivo.seek(-2, os.SEEK_END)
+        arquivo.write(b"##")
+
+    reaberto = EventStorePersistente(caminho)
+    assert reaberto.ultima_sequencia == 2
+    assert os.path.getsize(caminho) == len(MAGIC_LOG) + sum(
+        len(codificar_evento(_evento(i))) for i in (1, 2)
+    )
+    reaberto.fechar()
+
+
+def test_snapshot_apos_compactacao_usa_o_offset_do_evento(tmp_path):
+    caminho = str(tmp_path / "eventos.log")
+    politica = PoliticaRetencao(max_eventos_por_origem=3, compactar_a_cada=None)
+    store = _store_com_eventos(caminho, politica_retencao=politica)
+    assert store.compactar() == 7
+    assert store.primeira_sequencia == 8
+
+    store.adicionar_evento(_evento(11))
+    store.registrar_snapshot("projecao", 9, {'ate': 9})
+    offset_fim_e9 = len(MAGIC_LOG) + sum(len(codificar_evento(_evento(i))) for i in range(1, 10))
+    assert store.obter_snapshot("projecao")['offset'] == offset_fim_e9
+
+    # Sequência já liberada da memória: offset localizado no próprio log
+    store.registrar_snapshot("antiga", 2, {'ate': 2})
+    assert store.obter_snapshot("antiga")['offset'] == len(MAGIC_LOG) + sum(
+        len(codificar_evento(_evento(i))) for i in (1, 2)
+    )
+    store.fechar()
+
+    reaberto = EventStorePersistente(caminho, politica_retencao=politica)
+    assert reaberto.primeira_sequencia == 3  # Snapshot mais antigo
+    assert _ids(reaberto.ler_desde(2)[0]) == [f"e{i}" for i in range(3, 12)]
+    reaberto.fechar()
+
+
+def test_iterar_log_desde_sequencia(tmp_path):
+    store = _store_com_eventos(str(tmp_path / "eventos.log"))
+    assert _ids(store.iterar_log(desde_sequencia=7)) == ["e8", "e9", "e10"]
+    assert list(store.iterar_log(desde_sequencia=10)) == []
+    store.fechar()
+
+
+def test_snapshot_nao_bloqueia_produtores_durante_a_gravacao(tmp_path, monkeypatch):
+    import persistence
+
+    store = _store_com_eventos(str(tmp_path / "eventos.log"))
+    gravando, liberar = threading.Event(), threading.Event()
+    dump_original = persistence.json.dump
+
+    def dump_lento(*args, **kwargs):
+        gravando.set()
+        liberar.wait(2.0)
+        return dump_original(*args, **kwargs)
+
+    monkeypatch.setattr(persistence.json, "dump", dump_lento)
+    snapshot = threading.Thread(target=store.registrar_snapshot, args=("projecao", 10, {}))
+    snapshot.start()
+    assert gravando.wait(2.0)
+    assert store.adicionar_evento(_evento(11)) == 11
+    assert snapshot.is_alive()  # O produtor não esperou a gravação do snapshot
+    liberar.set()
+    snapshot.join()
+    store.fechar()
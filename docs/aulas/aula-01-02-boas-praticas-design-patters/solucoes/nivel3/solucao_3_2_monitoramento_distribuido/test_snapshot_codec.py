@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Testes do Snapshot Binário do Query Model
+
+OBJETIVO: Garantir que o codec preserva valores e tipos em ida e volta e
+que um snapshot só é carregado quando os eventos seguintes ao seu cursor
+ainda estão no Event Store.
+
+AUTOR: Prof. Jackson Antonio do Prado Lima
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+# Adicionar diretório atual ao path
+current_dir = os.path.dirname(os.path.abspath(__file__)) if '__file__' in globals() else os.getcwd()
+sys.path.append(current_dir)
+
+from patterns import EventoSistema, EventStore, PoliticaRetencao, QueryModel, TipoEvento
+from snapshot_codec import (
+    codificar_valor, decodificar_valor, escrever_snapshot, ler_snapshot
+)
+
+
+def _ida_e_volta(valor):
+    return decodificar_valor(codificar_valor(valor))
+
+
+@pytest.mark.parametrize("valor", [
+    None, True, False, 0, -1, 2 ** 63 - 1, -2 ** 63, 2 ** 64, -2 ** 100, 10 ** 40,
+    0.1, -1e300, "", "ação", b"\x00\xff", [], {},
+])
+def test_escalares(valor):
+    resultado = _ida_e_volta(valor)
+    assert resultado == valor
+    assert type(resultado) is type(valor)
+
+
+def test_datas_com_e_sem_fuso():
+    datas = [
+        datetime(2026, 1, 1, 12, 30, 15, 123456),
+        datetime(1960, 6, 1),
+        datetime(2026, 1, 1, tzinfo=timezone.utc),
+        datetime(2026, 1, 1, 9, tzinfo=timezone(timedelta(hours=-3))),
+        datetime(2026, 1, 1, 9, tzinfo=timezone(timedelta(hours=5, minutes=30))),
+    ]
+    for data in datas:
+        resultado = _ida_e_volta(data)
+        assert resultado == data
+        assert resultado.utcoffset() == data.utcoffset()
+    # Lista homogênea de datas (vetor compacto) e lista mista
+    assert _ida_e_volta(datas[:2]) == datas[:2]
+    resultado = _ida_e_volta(datas)
+    assert [d.utcoffset() for d in resultado] == [d.utcoffset() for d in datas]
+
+
+def test_linhas_tabelas_e_registros():
+    valor = {
+        'linha': [1, 2, 3, 2 ** 40],
+        'linha_real': [0.5, 1.5, -2.25],
+        'linha_grande': [1, 2 ** 70],
+        'tabela': [[1, 0.5, 3], [2, 1.5, 4]],
+        'tabela_irregular': [[1, 2], [3]],
+        'registros': [
+            {'nome': 'cpu', 'valor': 1.5, 'tags': {'env': 'prod'}},
+            {'nome': 'mem', 'valor': 2, 'tags': {}},
+        ],
+        'registros_chaves_diferentes': [{'a': 1}, {'b': 2}],
+        'aninhado': {'x': [{'t': datetime(2026, 1, 1), 'v': None}]},
+    }
+    resultado = _ida_e_volta(valor)
+    assert resultado == valor
+    assert type(resultado['registros'][1]['valor']) is int
+    assert type(resultado['linha_real'][0]) is float
+
+
+def test_arquivo_corrompido_e_rejeitado(tmp_path):
+    caminho = str(tmp_path / "estado.snap")
+    escrever_snapshot(caminho, 42, {'chave': [1, 2, 3]})
+    assert ler_snapshot(caminho) == (42, {'chave': [1, 2, 3]})
+
+    with open(caminho, 'r+b') as arquivo:
+        arquivo.seek(-1, os.SEEK_END)
+        ultimo = arquivo.read(1)
+        arquivo.seek(-1, os.SEEK_END)
+        arquivo.write(bytes([ultimo[0] ^ 0xFF]))
+    with pytest.raises(ValueError):
+        ler_snapshot(caminho)
+
+
+def _metrica(valor: float) -> EventoSistema:
+    return EventoSistema(tipo=TipoEvento.METRICA_COLETADA, origem="api",
+                         dados={'nome': 'cpu_usage', 'valor': valor, 'unidade': '%'})
+
+
+def _store_compactado_apos_snapshot(caminho: str, manter_consumidor: bool):
+    """Snapshot em arquivo na sequência 10; store compactado até a 25"""
+    store = EventStore(PoliticaRetencao(max_eventos_por_origem=5, compactar_a_cada=None))
+    store.adicionar_eventos([_metrica(i) for i in range(10)])
+    modelo = QueryModel(store)
+    modelo.atualizar_projecoes()
+    assert modelo.salvar_snapshot(caminho) == 10
+
+    store.adicionar_eventos([_metrica(i) for i in range(10, 30)])
+    if not manter_consumidor:
+        del modelo  # Sem consumidor, o store não guarda snapshot próprio
+    store.compactar()
+    assert store.primeira_sequencia == 26
+    return store
+
+
+def test_snapshot_anterior_a_compactacao_usa_snapshot_do_store(tmp_path):
+    caminho = str(tmp_path / "query_model.snap")
+    store = _store_compactado_apos_snapshot(caminho, manter_consumidor=True)
+
+    modelo = QueryModel(store)
+    assert modelo.carregar_snapshot(caminho) == 30
+    assert modelo.obter_metricas_agregadas('cpu_usage')['count'] == 30
+
+
+def test_snapshot_anterior_a_compactacao_sem_alternativa_e_rejeitado(tmp_path):
+    caminho = str(tmp_path / "query_model.snap")
+    store = _store_compactado_apos_snapshot(caminho, manter_consumidor=False)
+
+    modelo = QueryModel(store)
+    with pytest.raises(ValueError):
+        modelo.carregar_snapshot(caminho)